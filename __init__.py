@@ -9,6 +9,10 @@ VERSIONE ROBUSTA PER SVILUPPO CON VSCODE
 """
 
 import bpy # type: ignore
+import time
+
+# Tempo di avvio dell'addon (import + registrazione), per modulo in ms
+_startup_timings = {}
 
 # Info per compatibilità con versioni precedenti
 bl_info = {
@@ -25,12 +29,14 @@ bl_info = {
 
 def safe_import_module(module_name, package_path):
     """Import sicuro di un modulo con gestione errori"""
+    start_time = time.perf_counter()
     try:
         if package_path:
             module = __import__(f"{package_path}.{module_name}", fromlist=[module_name])
         else:
             module = __import__(module_name)
 
+        _startup_timings[f"import {module_name}"] = (time.perf_counter() - start_time) * 1000
         print(f"OpenShelf: Successfully imported {module_name}")
         return module
 
@@ -42,7 +48,9 @@ def safe_register_module(module, module_name):
     """Registrazione sicura di un modulo"""
     if module and hasattr(module, 'register'):
         try:
+            start_time = time.perf_counter()
             module.register()
+            _startup_timings[f"register {module_name}"] = (time.perf_counter() - start_time) * 1000
             print(f"OpenShelf: Successfully registered {module_name}")
             return True
         except Exception as e:
@@ -87,6 +95,13 @@ for module_name, module in [
 
 print(f"OpenShelf: Successfully imported {len(successfully_imported_modules)} modules")
 
+def report_startup_timings():
+    """Stampa i tempi di import e registrazione dell'addon"""
+    total = sum(_startup_timings.values())
+    print(f"OpenShelf: Add-on startup took {total:.1f}ms")
+    for step, elapsed_ms in sorted(_startup_timings.items(), key=lambda item: -item[1]):
+        print(f"  {step}: {elapsed_ms:.1f}ms")
+
 def register():
     """Registra tutti i moduli dell'addon - VERSIONE ROBUSTA"""
     print("OpenShelf: Starting robust registration...")
@@ -122,6 +137,8 @@ def register():
                 print(f"  ✗ {error}")
 
         # Se almeno un modulo è registrato, considera la registrazione un successo parziale
+        report_startup_timings()
+
         if registered_modules:
             print("OpenShelf: Registration completed (with some modules)")
         else:
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark estrazione ZIP: sequenziale (zipfile.extractall) vs ArchiveExtractor parallelo
+su archivi sintetici con OBJ + molte texture. Non richiede Blender.
+
+Uso:
+    python benchmarks/bench_extraction.py [--textures 24] [--texture-mb 8] [--runs 3]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from common import build_archive, import_addon_module # noqa: E402
+
+archive_extractor = import_addon_module("utils.archive_extractor")
+
+
+def time_run(func, runs):
+    """Esegue func più volte e restituisce il tempo minimo"""
+    best = None
+    for _ in range(runs):
+        elapsed = func()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenShelf ZIP extraction benchmark")
+    parser.add_argument("--textures", type=int, default=24)
+    parser.add_argument("--texture-mb", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="openshelf_bench_"))
+    try:
+        archive = work_dir / "asset.zip"
+        print(f"Building archive: {args.textures} textures x {args.texture_mb} MB...")
+        build_archive(archive, args.textures, args.texture_mb * 1024 * 1024)
+
+        with zipfile.ZipFile(archive) as zf:
+            total = sum(info.file_size for info in zf.infolist())
+        print(f"Archive: {os.path.getsize(archive) / 1e6:.1f} MB compressed, "
+              f"{total / 1e6:.1f} MB uncompressed")
+
+        def run_sequential():
+            out = work_dir / "seq"
+            shutil.rmtree(out, ignore_errors=True)
+            start = time.perf_counter()
+            with zipfile.ZipFile(archive) as zf:
+                zf.extractall(out)
+            return time.perf_counter() - start
+
+        extractor = archive_extractor.ArchiveExtractor(max_workers=args.workers)
+
+        def run_parallel():
+            out = work_dir / "par"
+            shutil.rmtree(out, ignore_errors=True)
+            start = time.perf_counter()
+            extractor.extract(str(archive), str(out))
+            return time.perf_counter() - start
+
+        seq_time = time_run(run_sequential, args.runs)
+        par_time = time_run(run_parallel, args.runs)
+
+        print(f"zipfile.extractall : {seq_time:.3f}s ({total / seq_time / 1e6:.0f} MB/s)")
+        print(f"ArchiveExtractor   : {par_time:.3f}s ({total / par_time / 1e6:.0f} MB/s)"
+              f" [{extractor.max_workers} workers]")
+        print(f"Speedup            : {seq_time / par_time:.2f}x")
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
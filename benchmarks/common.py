@@ -0,0 +1,89 @@
+"""
+Supporto comune ai benchmark OpenShelf: import dei moduli dell'addon senza
+eseguire l'__init__ di root (che richiede bpy), timing e archivi sintetici
+"""
+
+import importlib
+import importlib.machinery
+import importlib.util
+import io
+import random
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Nome con cui la root dell'addon viene registrata in sys.modules
+PACKAGE_NAME = "openshelf"
+
+
+def load_addon_package():
+    """
+    Registra la root dell'addon come package senza eseguirne __init__.py:
+    i sottopackage (utils, repositories) e i loro import relativi funzionano
+    anche fuori da Blender
+    """
+    package = sys.modules.get(PACKAGE_NAME)
+    if package is None:
+        spec = importlib.machinery.ModuleSpec(PACKAGE_NAME, None, is_package=True)
+        package = importlib.util.module_from_spec(spec)
+        package.__path__ = [str(ROOT)]
+        sys.modules[PACKAGE_NAME] = package
+    return package
+
+
+def import_addon_module(name: str):
+    """Importa un modulo dell'addon, es. import_addon_module('utils.archive_extractor')"""
+    load_addon_package()
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+
+def has_bpy() -> bool:
+    """True se il benchmark gira dentro Blender (blender -b --python ...)"""
+    return importlib.util.find_spec("bpy") is not None
+
+
+def time_runs(func, runs: int):
+    """Esegue func() più volte; restituisce (tempo minimo, tempo medio) in secondi"""
+    times = []
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times)
+
+
+def build_archive_bytes(textures: int, texture_size: int, vertices: int = 50000, seed: int = 42) -> bytes:
+    """
+    ZIP con un OBJ, il suo MTL, N texture referenziate e un file extra non
+    referenziato (che l'estrazione selettiva deve saltare)
+    """
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        lines = ["mtllib model.mtl\n"]
+        lines.extend(f"v {rng.random():.6f} {rng.random():.6f} {rng.random():.6f}\n"
+                     for _ in range(vertices))
+        lines.extend(f"f {i} {i + 1} {i + 2}\n" for i in range(1, max(1, vertices - 2), 3))
+        zf.writestr("model/model.obj", "".join(lines))
+        zf.writestr("model/model.mtl", "".join(
+            f"newmtl m{i}\nmap_Kd textures/tex_{i:02d}.jpg\n" for i in range(textures)))
+
+        for i in range(textures):
+            # Metà casuale, metà ripetuta: rapporto di compressione simile a texture reali
+            noise = rng.randbytes(texture_size // 2)
+            repeat = noise[:4096] or b"\0"
+            data = noise + repeat * ((texture_size - len(noise)) // len(repeat) + 1)
+            zf.writestr(f"model/textures/tex_{i:02d}.jpg", data[:texture_size])
+
+        zf.writestr("model/source/scan_notes.txt", "raw scan notes\n" * 1000)
+
+    return buffer.getvalue()
+
+
+def build_archive(path, textures: int, texture_size: int, vertices: int = 50000, seed: int = 42):
+    """Scrive su disco l'archivio di build_archive_bytes()"""
+    Path(path).write_bytes(build_archive_bytes(textures, texture_size, vertices, seed))
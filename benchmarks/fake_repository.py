@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Repository finto in locale per i benchmark: serve cataloghi sintetici nel
+formato di Ercolano (jsonData.records) e archivi ZIP generati, con supporto
+a Range, ETag/If-None-Match e limitazione di banda. Non richiede Blender.
+
+Uso standalone:
+    python benchmarks/fake_repository.py [--port 8765] [--throttle-kbps 0] [--no-range]
+
+Percorsi:
+    /catalog.json?records=N     catalogo con N record (modelli3D_hr -> /models/...)
+    /models/<inventario>.zip    archivio OBJ + MTL + texture
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from common import build_archive_bytes # noqa: E402
+
+OBJECT_TYPES = ["anello/ digitale", "lucerna", "statuetta", "anfora", "coppa", "fibula",
+                "moneta", "specchio", "balsamario", "bracciale", "olla", "piatto"]
+MATERIALS = ["oro/ laminatura", "bronzo/ fusione", "argilla/ tornio", "vetro/ soffiatura",
+             "argento/ sbalzo", "marmo/ scultura", "osso/ intaglio"]
+CHRONOLOGIES = ["sec. I a.C.", "sec. I d.C.", "sec. II a.C.", "età augustea", "età flavia"]
+
+# Blocchi in cui viene scritta una risposta (anche la granularità della limitazione)
+WRITE_CHUNK_SIZE = 64 * 1024
+
+
+def make_catalog(records: int, base_url: str, seed: int = 7) -> Dict:
+    """Catalogo sintetico con la stessa struttura del JSON di Ercolano"""
+    rng = random.Random(seed)
+    items = []
+
+    for i in range(records):
+        inventory = str(70000 + i)
+        object_type = rng.choice(OBJECT_TYPES)
+        items.append({
+            "id": f"MU{100000 + i}",
+            "nrInventario": inventory,
+            "oggetto": object_type,
+            "descrizione": f"{object_type} rinvenuto nell'insula {rng.randint(1, 7)}, "
+                           f"ambiente {rng.randint(1, 40)}, con decorazione {rng.choice(['incisa', 'dipinta', 'a rilievo'])}",
+            "materiaTecnicas": rng.sample(MATERIALS, rng.randint(1, 2)),
+            "cronologias": [rng.choice(CHRONOLOGIES)],
+            "modelli3D_hr": [f"{base_url}/models/{inventory}.zip"],
+            "provenienza": "Ercolano",
+            "nomeInventario": "Inventario MAV",
+            "linkDettaglio": f"{base_url}/detail/{inventory}",
+            "linkICCD": "",
+        })
+
+    return {
+        "messageBean": {"status": "OK"},
+        "jsonData": {"totRecord": records, "records": items},
+    }
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Intervallo singolo 'bytes=a-b', 'bytes=a-' o 'bytes=-n' -> (start, end) inclusivi
+
+    Raises:
+        ValueError: intervallo non soddisfacibile (risposta 416)
+    """
+    if not header.startswith("bytes=") or "," in header:
+        # Range multipli non supportati: risposta completa (consentito da RFC 9110)
+        return None
+
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    if not first:
+        length = int(last)
+        if length <= 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+class FakeRepositoryServer(ThreadingHTTPServer):
+    """Server HTTP locale con cataloghi e archivi generati su richiesta"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, textures: int = 8, texture_size: int = 512 * 1024,
+                 vertices: int = 20000, throttle_bps: int = 0,
+                 range_enabled: bool = True, etag_enabled: bool = True):
+        super().__init__(("127.0.0.1", port), _FakeRepositoryHandler)
+        self.textures = textures
+        self.texture_size = texture_size
+        self.vertices = vertices
+        self.throttle_bps = throttle_bps
+        self.range_enabled = range_enabled
+        self.etag_enabled = etag_enabled
+
+        self._bodies: Dict[str, Tuple[bytes, str]] = {}
+        self._bodies_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def catalog_url(self, records: int) -> str:
+        return f"{self.base_url}/catalog.json?records={records}"
+
+    def start(self) -> 'FakeRepositoryServer':
+        """Avvia il server in un thread in background"""
+        self._thread = threading.Thread(target=self.serve_forever, name="openshelf_fake_repository",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = {'requests': 0, 'range_requests': 0, 'not_modified': 0, 'bytes_sent': 0}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def get_body(self, path: str, query: Dict) -> Optional[Tuple[bytes, str]]:
+        """Corpo e content type per un percorso (generato una volta e tenuto in memoria)"""
+        key = path + "?" + "&".join(f"{k}={v[0]}" for k, v in sorted(query.items()))
+
+        with self._bodies_lock:
+            cached = self._bodies.get(key)
+        if cached is not None:
+            return cached
+
+        if path == "/catalog.json":
+            records = int(query.get("records", ["1000"])[0])
+            body = (json.dumps(make_catalog(records, self.base_url)).encode("utf-8"), "application/json")
+        elif path.startswith("/models/") and path.endswith(".zip"):
+            name = path[len("/models/"):-len(".zip")]
+            seed = int(hashlib.md5(name.encode("utf-8")).hexdigest()[:8], 16)
+            body = (build_archive_bytes(self.textures, self.texture_size, self.vertices, seed),
+                    "application/zip")
+        else:
+            return None
+
+        with self._bodies_lock:
+            self._bodies.setdefault(key, body)
+            return self._bodies[key]
+
+
+class _FakeRepositoryHandler(BaseHTTPRequestHandler):
+    """Risposte GET/HEAD con Range, ETag e limitazione di banda"""
+
+    protocol_version = "HTTP/1.1"
+    server: FakeRepositoryServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def _respond(self, head: bool):
+        self.server._count('requests')
+        url = urlparse(self.path)
+        found = self.server.get_body(url.path, parse_qs(url.query))
+        if found is None:
+            self._send_empty(404)
+            return
+
+        body, content_type = found
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+        if self.server.etag_enabled and self.headers.get("If-None-Match") == etag:
+            self.server._count('not_modified')
+            self._send_empty(304, {"ETag": etag})
+            return
+
+        status, start, end = 200, 0, len(body) - 1
+        range_header = self.headers.get("Range")
+        if range_header and self.server.range_enabled:
+            try:
+                byte_range = parse_range(range_header, len(body))
+            except ValueError:
+                self._send_empty(416, {"Content-Range": f"bytes */{len(body)}"})
+                return
+            if byte_range is not None:
+                status, (start, end) = 206, byte_range
+                self.server._count('range_requests')
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        if self.server.range_enabled:
+            self.send_header("Accept-Ranges", "bytes")
+        if self.server.etag_enabled:
+            self.send_header("ETag", etag)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        self.end_headers()
+
+        if not head:
+            self._write_throttled(memoryview(body)[start:end + 1])
+
+    def _send_empty(self, status: int, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _write_throttled(self, data: memoryview):
+        """Scrive a blocchi rispettando throttle_bps (0 = senza limiti)"""
+        throttle = self.server.throttle_bps
+        start = time.perf_counter()
+        sent = 0
+
+        try:
+            for offset in range(0, len(data), WRITE_CHUNK_SIZE):
+                chunk = data[offset:offset + WRITE_CHUNK_SIZE]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if throttle > 0:
+                    delay = sent / throttle - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server._count('bytes_sent', sent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenShelf fake repository server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--textures", type=int, default=8)
+    parser.add_argument("--texture-kb", type=int, default=512)
+    parser.add_argument("--vertices", type=int, default=20000)
+    parser.add_argument("--throttle-kbps", type=int, default=0, help="Bandwidth limit per response (0 = none)")
+    parser.add_argument("--no-range", action="store_true", help="Ignore Range headers (full downloads only)")
+    parser.add_argument("--no-etag", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeRepositoryServer(port=args.port, textures=args.textures,
+                                  texture_size=args.texture_kb * 1024, vertices=args.vertices,
+                                  throttle_bps=args.throttle_kbps * 1024,
+                                  range_enabled=not args.no_range, etag_enabled=not args.no_etag)
+    print(f"Fake repository at {server.base_url}")
+    print(f"Catalog: {server.catalog_url(1000)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Suite di benchmark offline: catalogo, parse, indice, ricerca, download,
+estrazione, installazione in libreria e scansione OBJ contro un repository finto in locale
+(benchmarks/fake_repository.py). I risultati vengono salvati in JSON e
+possono essere confrontati con una baseline.
+
+Uso:
+    python benchmarks/run_benchmarks.py [--records 1000,10000] [--only extract,install]
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json
+
+Gira in CPython puro (i moduli core non importano bpy); dentro Blender:
+    blender -b --factory-startup --python benchmarks/run_benchmarks.py -- [opzioni]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from common import has_bpy, import_addon_module, time_runs # noqa: E402
+from fake_repository import FakeRepositoryServer # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+RESULTS_FORMAT_VERSION = 1
+
+BENCHMARKS = ('catalog', 'parse', 'index', 'search', 'download', 'extract', 'install', 'scan')
+
+# Query della ricerca: (testo, filtri aggiuntivi)
+SEARCH_QUERIES = [
+    ("anfora", {}),
+    ("bronzo", {}),
+    ("insula 3", {}),
+    ("", {'object_type': "lucerna"}),
+    ("", {'material': "vetro", 'chronology': "sec. I d.C."}),
+    ("nessun risultato", {}),
+]
+
+SEARCH_LIMIT = 100
+
+
+class BenchmarkContext:
+    """Stato condiviso tra i benchmark: server, directory di lavoro e cataloghi"""
+
+    def __init__(self, args, server: FakeRepositoryServer, work_dir: Path):
+        self.args = args
+        self.server = server
+        self.work_dir = work_dir
+        self.results = {}
+        self._catalogs = {}
+        self._assets = {}
+
+    def record(self, case: str, seconds: float, mean_seconds: float, amount: float, unit: str, **extra):
+        """Salva un caso: il throughput è calcolato sul tempo migliore"""
+        throughput = amount / seconds if seconds > 0 else 0.0
+        self.results[case] = dict(seconds=round(seconds, 6), mean_seconds=round(mean_seconds, 6),
+                                  throughput=round(throughput, 3), unit=unit, **extra)
+        print(f"  {case:<28} {seconds * 1000:10.1f} ms  {throughput:14,.1f} {unit}")
+
+    def catalog(self, records: int) -> dict:
+        """Catalogo decodificato (scaricato una volta dal server)"""
+        if records not in self._catalogs:
+            with urllib.request.urlopen(self.server.catalog_url(records)) as response:
+                self._catalogs[records] = json.loads(response.read().decode('utf-8'))
+        return self._catalogs[records]
+
+    def parsed_assets(self, records: int) -> list:
+        """CulturalAsset del catalogo"""
+        if records not in self._assets:
+            self._assets[records] = ercolano_repository().parse_raw_data(self.catalog(records))
+        return self._assets[records]
+
+    def archive_url(self, index: int) -> str:
+        return f"{self.server.base_url}/models/{80000 + index}.zip"
+
+    def warm_archive(self, index: int) -> bytes:
+        """Genera l'archivio nel server prima di misurare"""
+        body, _ = self.server.get_body(f"/models/{80000 + index}.zip", {})
+        return body
+
+
+def ercolano_repository():
+    """ErcolanoRepository dell'addon"""
+    module = import_addon_module("repositories.ercolano_repository")
+    return module.ErcolanoRepository()
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    """Silenzia le print dell'addon durante le misure"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ------------------------------------------------------------------ benchmark
+
+def bench_catalog(ctx: BenchmarkContext):
+    """Download e decodifica JSON del catalogo"""
+    for records in ctx.args.records:
+        url = ctx.server.catalog_url(records)
+        payload = {}
+        ctx.server.get_body("/catalog.json", {'records': [str(records)]})
+
+        def fetch():
+            with urllib.request.urlopen(url) as response:
+                payload['raw'] = response.read()
+
+        best, mean = time_runs(fetch, ctx.args.runs)
+        ctx.record(f"catalog/fetch/{records}", best, mean, len(payload['raw']) / 1e6, "MB/s")
+
+        best, mean = time_runs(lambda: json.loads(payload['raw'].decode('utf-8')), ctx.args.runs)
+        ctx.record(f"catalog/decode/{records}", best, mean, records, "records/s")
+
+
+def bench_parse(ctx: BenchmarkContext):
+    """ErcolanoRepository.parse_raw_data sul catalogo decodificato"""
+    repository = ercolano_repository()
+    for records in ctx.args.records:
+        raw = ctx.catalog(records)
+        with quiet(not ctx.args.verbose):
+            best, mean = time_runs(lambda: repository.parse_raw_data(raw), ctx.args.runs)
+        ctx.record(f"parse/{records}", best, mean, records, "records/s")
+
+
+def bench_index(ctx: BenchmarkContext):
+    """LibraryIndex: inserimento, lookup e ricarica da disco"""
+    library_index = import_addon_module("utils.library_index")
+    assets = max(ctx.args.records)
+    files_per_asset = 10
+    ids = [f"MU{100000 + i}" for i in range(assets)]
+    files = [(f"model/textures/tex_{i:02d}.jpg", 1024 * (i + 1), None) for i in range(files_per_asset)]
+
+    def insert():
+        library_dir = ctx.work_dir / "index"
+        shutil.rmtree(library_dir, ignore_errors=True)
+        library_dir.mkdir(parents=True)
+        index = library_index.LibraryIndex(library_dir)
+        for asset_id in ids:
+            index.add_asset(asset_id, library_dir / "models" / asset_id, "model/model.obj", files)
+        index.close()
+
+    best, mean = time_runs(insert, ctx.args.runs)
+    ctx.record(f"index/insert/{assets}", best, mean, assets, "assets/s")
+
+    index = library_index.LibraryIndex(ctx.work_dir / "index")
+    lookups = ids * max(1, 100000 // assets)
+
+    def lookup():
+        for asset_id in lookups:
+            index.contains(asset_id)
+            index.get(asset_id)
+
+    best, mean = time_runs(lookup, ctx.args.runs)
+    ctx.record(f"index/lookup/{assets}", best, mean, len(lookups), "lookups/s")
+    index.close()
+
+    def reload():
+        library_index.LibraryIndex(ctx.work_dir / "index").close()
+
+    best, mean = time_runs(reload, ctx.args.runs)
+    ctx.record(f"index/reload/{assets}", best, mean, assets, "assets/s")
+
+
+def bench_search(ctx: BenchmarkContext):
+    """BaseRepository.search_assets sull'intero catalogo già parsato"""
+    repository = ercolano_repository()
+    for records in ctx.args.records:
+        assets = ctx.parsed_assets(records)
+        # Il catalogo completo è il candidato di ogni ricerca (nessuna rete)
+        repository.fetch_assets = lambda limit=100: assets
+
+        def run_queries():
+            for text, filters in SEARCH_QUERIES:
+                repository.search_assets(text, dict(filters), limit=SEARCH_LIMIT)
+
+        best, mean = time_runs(run_queries, ctx.args.runs)
+        ctx.record(f"search/{records}", best, mean, len(SEARCH_QUERIES), "queries/s")
+
+
+def bench_download(ctx: BenchmarkContext):
+    """Download HTTP completo di un archivio"""
+    body = ctx.warm_archive(0)
+    url = ctx.archive_url(0)
+
+    def download():
+        with urllib.request.urlopen(url) as response:
+            while response.read(256 * 1024):
+                pass
+
+    best, mean = time_runs(download, ctx.args.runs)
+    ctx.record("download/full", best, mean, len(body) / 1e6, "MB/s", bytes=len(body))
+
+
+def bench_extract(ctx: BenchmarkContext):
+    """zipfile.extractall, ArchiveExtractor completo e selettivo"""
+    archive_extractor = import_addon_module("utils.archive_extractor")
+    archive_planner = import_addon_module("utils.archive_planner")
+
+    archive = ctx.work_dir / "extract.zip"
+    archive.write_bytes(ctx.warm_archive(0))
+    with zipfile.ZipFile(archive) as zf:
+        total = sum(info.file_size for info in zf.infolist())
+
+    out = ctx.work_dir / "extracted"
+    extractor = archive_extractor.ArchiveExtractor()
+    plan = archive_planner.plan_archive(str(archive))
+
+    def sequential():
+        shutil.rmtree(out, ignore_errors=True)
+        with zipfile.ZipFile(archive) as zf:
+            zf.extractall(out)
+
+    def parallel():
+        shutil.rmtree(out, ignore_errors=True)
+        extractor.extract(str(archive), str(out))
+
+    def selective():
+        shutil.rmtree(out, ignore_errors=True)
+        extractor.extract(str(archive), str(out), members=plan.members)
+
+    for case, func, size in (("extract/sequential", sequential, total),
+                             ("extract/parallel", parallel, total),
+                             ("extract/selective", selective, plan.selected_size)):
+        best, mean = time_runs(func, ctx.args.runs)
+        ctx.record(case, best, mean, size / 1e6, "MB/s", bytes=size, workers=extractor.max_workers)
+
+
+def bench_install(ctx: BenchmarkContext):
+    """LocalLibraryManager.download_asset: streaming per intervalli e download completo"""
+    local_library_manager = import_addon_module("utils.local_library_manager")
+    assets = ctx.args.install_assets
+    for i in range(assets):
+        ctx.warm_archive(i)
+
+    def make_asset(i):
+        inventory = str(80000 + i)
+        return SimpleNamespace(
+            asset_id=f"BENCH{inventory}", name=f"Bench asset {inventory}", description="",
+            repository="Ercolano", object_type="anfora", inventory_number=inventory,
+            materials="argilla/ tornio", chronology="sec. I d.C.", license_info="",
+            quality_score=80, model_urls=json.dumps([ctx.archive_url(i)]),
+        )
+
+    for mode, range_enabled in (("stream", True), ("full", False)):
+        ctx.server.range_enabled = range_enabled
+        ctx.server.reset_stats()
+        library_dir = ctx.work_dir / f"library_{mode}"
+        run = [0]
+
+        def install():
+            # Libreria nuova a ogni giro: nessun asset già presente
+            run[0] += 1
+            with quiet(not ctx.args.verbose):
+                manager = local_library_manager.LocalLibraryManager(str(library_dir / str(run[0])))
+                for i in range(assets):
+                    if not manager.download_asset(make_asset(i)):
+                        raise RuntimeError(f"Install failed for asset {i} ({mode})")
+            manager.index.close()
+
+        best, mean = time_runs(install, ctx.args.runs)
+        network_bytes = ctx.server.stats['bytes_sent'] // max(1, run[0])
+        ctx.record(f"install/{mode}", best, mean, assets, "assets/s",
+                   network_bytes=network_bytes, requests=ctx.server.stats['requests'] // max(1, run[0]))
+
+    ctx.server.range_enabled = True
+
+
+def bench_scan(ctx: BenchmarkContext):
+    """Validazione OBJ: readlines() dell'intero file contro la scansione a blocchi e la cache"""
+    obj_scanner = import_addon_module("utils.obj_scanner")
+
+    obj_path = ctx.work_dir / "scan" / "model.obj"
+    obj_path.parent.mkdir(parents=True, exist_ok=True)
+    vertices = ctx.args.scan_vertices
+    with open(obj_path, 'w') as f:
+        f.write("mtllib model.mtl\ng scan\n")
+        for i in range(vertices):
+            f.write(f"v {i * 0.001:.6f} {(i % 997) * 0.01:.6f} {(i % 31) * 0.1:.6f}\n")
+        for i in range(1, max(1, vertices - 2), 3):
+            f.write(f"f {i} {i + 1} {i + 2}\n")
+    size = obj_path.stat().st_size
+
+    def readlines():
+        with open(obj_path, 'r', encoding='utf-8', errors='ignore') as f:
+            lines = f.readlines()
+        return sum(1 for line in lines[:1000] if line.startswith('v '))
+
+    def scan():
+        obj_scanner.scan_obj(str(obj_path))
+
+    cache = obj_scanner.ObjStatsCache()
+    cache.get(str(obj_path))
+
+    def cached():
+        cache.get(str(obj_path))
+
+    for case, func in (("scan/readlines", readlines), ("scan/stream", scan), ("scan/cached", cached)):
+        best, mean = time_runs(func, ctx.args.runs)
+        ctx.record(case, best, mean, size / 1e6, "MB/s", bytes=size, vertices=vertices)
+
+
+BENCHMARK_FUNCTIONS = {
+    'catalog': bench_catalog,
+    'parse': bench_parse,
+    'index': bench_index,
+    'search': bench_search,
+    'download': bench_download,
+    'extract': bench_extract,
+    'install': bench_install,
+    'scan': bench_scan,
+}
+
+
+# ------------------------------------------------------------------ risultati
+
+def environment_info() -> dict:
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'blender': None,
+    }
+    if has_bpy():
+        import bpy # type: ignore
+        info['blender'] = bpy.app.version_string
+    return info
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float) -> list:
+    """Casi con throughput sceso oltre la tolleranza rispetto alla baseline"""
+    regressions = []
+    print(f"\nComparison with baseline ({baseline.get('timestamp', '?')}):")
+
+    for case, result in current['results'].items():
+        previous = baseline.get('results', {}).get(case)
+        if not previous or not previous.get('throughput'):
+            print(f"  {case:<28} (new)")
+            continue
+
+        ratio = result['throughput'] / previous['throughput']
+        flag = ""
+        if ratio < 1.0 - tolerance:
+            flag = "  REGRESSION"
+            regressions.append(case)
+        print(f"  {case:<28} {ratio:6.2f}x{flag}")
+
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="OpenShelf offline benchmark suite")
+    parser.add_argument("--records", default="1000,10000",
+                        help="Comma separated catalog sizes (e.g. 1000,10000,100000)")
+    parser.add_argument("--only", default="", help=f"Comma separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--textures", type=int, default=8, help="Textures per generated archive")
+    parser.add_argument("--texture-kb", type=int, default=512)
+    parser.add_argument("--vertices", type=int, default=20000)
+    parser.add_argument("--scan-vertices", type=int, default=1000000, help="Vertices of the scanned OBJ")
+    parser.add_argument("--install-assets", type=int, default=4, help="Assets installed per library run")
+    parser.add_argument("--throttle-kbps", type=int, default=0, help="Server bandwidth limit (0 = none)")
+    parser.add_argument("--output", default="", help="Result JSON path (default: benchmarks/results/)")
+    parser.add_argument("--compare", default="", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed throughput drop before a case counts as a regression")
+    parser.add_argument("--verbose", action="store_true", help="Keep add-on console output")
+
+    args = parser.parse_args(argv)
+    args.records = [int(value) for value in args.records.split(",") if value.strip()]
+    args.only = [name.strip() for name in args.only.split(",") if name.strip()] or list(BENCHMARKS)
+
+    unknown = set(args.only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    if argv is None:
+        # Dentro Blender gli argomenti dello script seguono '--'
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+
+    # Metriche di cache del benchmark separate da quelle dell'utente
+    work_dir = Path(tempfile.mkdtemp(prefix="openshelf_bench_"))
+    cache_metrics = import_addon_module("utils.cache_metrics")
+    cache_metrics._global_cache_metrics = cache_metrics.CacheMetricsRegistry(str(work_dir / "metrics.json"))
+    if not args.verbose:
+        import_addon_module("utils.log").configure_logging(log_level='WARNING')
+
+    server = FakeRepositoryServer(textures=args.textures, texture_size=args.texture_kb * 1024,
+                                  vertices=args.vertices, throttle_bps=args.throttle_kbps * 1024)
+    report = {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment_info(),
+        'config': {key: value for key, value in vars(args).items()
+                   if key not in ('output', 'compare', 'verbose')},
+        'results': {},
+    }
+
+    try:
+        with server:
+            ctx = BenchmarkContext(args, server, work_dir)
+            for name in args.only:
+                print(f"[{name}]")
+                BENCHMARK_FUNCTIONS[name](ctx)
+            report['results'] = ctx.results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare_results(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions beyond {args.tolerance:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,12 +7,16 @@ FIX: Import corretto usando importlib invece di __import__
 import bpy
 import importlib
 import sys
+import time
+from ..utils import redraw_scheduler
+from ..utils.ui_timer_utils import get_progress_pump
 
 def safe_import_operator_module(module_name):
     """Import sicuro di un modulo operatori - FIX CON IMPORTLIB"""
     try:
         # Usa importlib.import_module che è più robusto
         full_module_name = f"{__name__}.{module_name}"
+        start_time = time.perf_counter()
 
         # Se il modulo è già importato, ricaricalo per sviluppo
         if full_module_name in sys.modules:
@@ -20,7 +24,8 @@ def safe_import_operator_module(module_name):
         else:
             module = importlib.import_module(f".{module_name}", package=__name__)
 
-        print(f"OpenShelf: Successfully imported operator module {module_name}")
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        print(f"OpenShelf: Successfully imported operator module {module_name} ({elapsed_ms:.1f}ms)")
         return module
 
     except ImportError as e:
@@ -74,6 +79,8 @@ repository_operators = safe_import_operator_module('repository_operators')
 modal_import_operators = safe_import_operator_module('modal_import_operators')
 cache_operators = safe_import_operator_module('cache_operators')
 library_import_operators = safe_import_operator_module('library_import_operators')
+lod_operators = safe_import_operator_module('lod_operators')
+texture_operators = safe_import_operator_module('texture_operators')
 
 # Moduli opzionali
 debug_operators = safe_import_operator_module('debug_operators')
@@ -88,6 +95,8 @@ for module_name, module in [
     ('modal_import_operators', modal_import_operators),
     ('cache_operators', cache_operators),
     ('library_import_operators', library_import_operators),
+    ('lod_operators', lod_operators),
+    ('texture_operators', texture_operators),
     ('debug_operators', debug_operators),  # Opzionale
 ]:
     if module:
@@ -134,12 +143,19 @@ def register():
     global _registered_operator_modules
     _registered_operator_modules = registered_modules
 
+    # Risultati di ricerca e import arrivano come eventi del pump: attivo con gli operatori, non con la UI
+    redraw_scheduler.register()
+    get_progress_pump().start()
+
     print("OpenShelf: Operator registration completed")
 
 def unregister():
     """Deregistra tutti gli operatori - VERSIONE ROBUSTA"""
     print("OpenShelf: Starting robust operator unregistration...")
 
+    get_progress_pump().stop()
+    redraw_scheduler.unregister()
+
     unregistered_modules = []
     unregistration_errors = []
 
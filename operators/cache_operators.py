@@ -12,7 +12,11 @@ import platform
 import tempfile
 import shutil
 from pathlib import Path
-from ..utils.chunked_download_manager import get_chunked_download_manager
+from ..utils.lazy_import import lazy_import
+from ..utils.redraw_scheduler import request_redraw
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+get_chunked_download_manager = lazy_import('..utils.chunked_download_manager', 'get_chunked_download_manager', __package__)
 
 
 class OPENSHELF_OT_clear_repository_cache(Operator):
@@ -144,9 +148,7 @@ class OPENSHELF_OT_clear_repository_cache(Operator):
                 print(f"OpenShelf: {success_msg}")
 
             # Force UI refresh per aggiornare statistiche
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
+            request_redraw()
 
             return {'FINISHED'}
 
@@ -309,11 +311,8 @@ class OPENSHELF_OT_reset_ui_state(Operator):
                 print(f"OpenShelf: Warning during download cancellation: {e}")
 
             # Force UI refresh completo
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
-                    for region in area.regions:
-                        region.tag_redraw()
+            request_redraw()
+            request_redraw(region_type='WINDOW')
 
             self.report({'INFO'}, "OpenShelf UI state reset successfully")
             print("OpenShelf: UI state reset completed")
@@ -575,6 +574,28 @@ class OPENSHELF_OT_cache_statistics(Operator):
 
         return {'FINISHED'}
 
+class OPENSHELF_OT_reset_cache_metrics(Operator):
+    """Azzera le metriche di efficacia delle cache"""
+    bl_idname = "openshelf.reset_cache_metrics"
+    bl_label = "Reset Cache Metrics"
+    bl_description = "Reset cache hit/miss, bytes and latency counters"
+    bl_options = {'REGISTER'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
+
+    def execute(self, context):
+        try:
+            from ..utils.cache_metrics import get_cache_metrics
+            get_cache_metrics().reset()
+            self.report({'INFO'}, "Cache metrics reset")
+
+        except Exception as e:
+            print(f"OpenShelf: Error resetting cache metrics: {e}")
+            self.report({'ERROR'}, f"Error resetting cache metrics: {str(e)}")
+
+        return {'FINISHED'}
+
 class OPENSHELF_OT_cache_health_report(bpy.types.Operator):
     """Mostra report salute cache"""
     bl_idname = "openshelf.cache_health_report"
@@ -722,6 +743,7 @@ operators = [
     OPENSHELF_OT_migrate_cache,
     OPENSHELF_OT_cache_statistics,
     OPENSHELF_OT_cache_health_report,
+    OPENSHELF_OT_reset_cache_metrics,
     OPENSHELF_OT_reset_ui_state,
     OPENSHELF_OT_test_chunked_download,
 
@@ -734,5 +756,8 @@ def register():
 
 def unregister():
     """Deregistra gli operatori cache"""
+    from ..utils.cache_metrics import flush_cache_metrics
+    flush_cache_metrics()
+
     for op in reversed(operators):
         bpy.utils.unregister_class(op)
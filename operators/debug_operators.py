@@ -7,6 +7,11 @@ import bpy
 from bpy.types import Operator
 from bpy.props import StringProperty, BoolProperty
 import os
+from ..utils.lazy_import import lazy_import
+from ..utils.redraw_scheduler import request_redraw
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+center_origin = lazy_import('..utils.mesh_ops', 'center_origin', __package__)
 
 class OPENSHELF_OT_test_direct_import(Operator):
     """Test import diretto di un file OBJ"""
@@ -66,9 +71,7 @@ class OPENSHELF_OT_test_direct_import(Operator):
 
                 # Test centering
                 print("Step 4: Testing centering...")
-                bpy.context.view_layer.objects.active = main_obj
-                bpy.ops.object.origin_set(type='GEOMETRY_ORIGIN', center='BOUNDS')
-                main_obj.location = (0, 0, 0)
+                center_origin(main_obj)
                 print("Centering completed")
 
                 self.report({'INFO'}, f"✅ SUCCESS: Imported {main_obj.name}")
@@ -182,9 +185,7 @@ class OPENSHELF_OT_emergency_reset(Operator):
             bpy.ops.object.select_all(action='DESELECT')
 
             # Force UI update
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
+            request_redraw()
 
             print("OpenShelf: Emergency reset completed")
             self.report({'INFO'}, "Emergency reset completed")
@@ -296,13 +297,64 @@ class OPENSHELF_OT_debug_selection(Operator):
         return {'FINISHED'}
 
 
+class OPENSHELF_OT_export_trace(Operator):
+    """Esporta le operazioni tracciate in formato Chrome trace"""
+    bl_idname = "openshelf.export_trace"
+    bl_label = "Export Trace"
+    bl_description = "Export traced operations as Chrome trace JSON (chrome://tracing, Perfetto)"
+    bl_options = {'REGISTER'}
+
+    filepath: StringProperty(
+        name="File Path",
+        description="Path of the trace JSON file",
+        default="openshelf_trace.json",
+        subtype='FILE_PATH'
+    )
+
+    def execute(self, context):
+        from ..utils.tracing import get_tracer
+
+        tracer = get_tracer()
+        operations = tracer.get_operations()
+        if not operations:
+            self.report({'WARNING'}, "No traced operations to export")
+            return {'CANCELLED'}
+
+        if tracer.export_chrome_trace(self.filepath, list(reversed(operations))):
+            self.report({'INFO'}, f"Exported {len(operations)} operations to {self.filepath}")
+        else:
+            self.report({'ERROR'}, f"Cannot export trace to {self.filepath}")
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class OPENSHELF_OT_clear_traces(Operator):
+    """Svuota il ring buffer delle operazioni tracciate"""
+    bl_idname = "openshelf.clear_traces"
+    bl_label = "Clear Traces"
+    bl_description = "Discard all traced operations"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        from ..utils.tracing import get_tracer
+        get_tracer().clear()
+        context.scene.openshelf_trace_index = 0
+        self.report({'INFO'}, "Traces cleared")
+        return {'FINISHED'}
+
+
 # Registrazione debug operators
 debug_operators = [
     OPENSHELF_OT_test_direct_import,
     OPENSHELF_OT_debug_context_info,
     OPENSHELF_OT_emergency_reset,
     OPENSHELF_OT_test_cache_info,
-    OPENSHELF_OT_debug_selection
+    OPENSHELF_OT_debug_selection,
+    OPENSHELF_OT_export_trace,
+    OPENSHELF_OT_clear_traces,
 ]
 
 def register():
@@ -11,10 +11,20 @@ import threading
 import json
 import os
 import time
-from ..utils.download_manager import get_download_manager
-from ..utils.obj_loader import OBJLoader
-from ..utils.gltf_loader import GLTFLoader
-from ..repositories.registry import RepositoryRegistry
+from ..utils.lazy_import import lazy_import
+from ..utils.redraw_scheduler import request_redraw
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+get_download_manager = lazy_import('..utils.download_manager', 'get_download_manager', __package__)
+get_library_manager = lazy_import('..utils.local_library_manager', 'get_library_manager', __package__)
+BatchImportPipeline = lazy_import('..utils.batch_pipeline', 'BatchImportPipeline', __package__)
+snapshot_asset = lazy_import('..utils.batch_pipeline', 'snapshot_asset', __package__)
+import_with_registry = lazy_import('..utils.instance_registry', 'import_with_registry', __package__)
+is_background_conversion_enabled = lazy_import('..utils.background_converter', 'is_background_conversion_enabled', __package__)
+get_background_converter = lazy_import('..utils.background_converter', 'get_background_converter', __package__)
+OBJLoader = lazy_import('..utils.obj_loader', 'OBJLoader', __package__)
+GLTFLoader = lazy_import('..utils.gltf_loader', 'GLTFLoader', __package__)
+RepositoryRegistry = lazy_import('..repositories.registry', 'RepositoryRegistry', __package__)
 
 class ImportThreadState:
     """Stato condiviso thread-safe per l'import"""
@@ -293,9 +303,7 @@ class OPENSHELF_OT_import_asset_old_threading(Operator):
                     return None  # Non ripetere timer
 
             # Forza aggiornamento UI
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
+            request_redraw()
 
             # Continua timer se download in corso
             return 0.1 if _import_state.is_downloading else None
@@ -332,16 +340,22 @@ class OPENSHELF_OT_import_asset_old_threading(Operator):
                 'metadata': import_settings
             }
 
-            # Import con loader appropriato
+            # Import con loader appropriato (o istanza della mesh già presente)
             imported_obj = None
 
             if file_ext == '.obj':
-                imported_obj = OBJLoader.import_obj(model_path, **import_settings)
+                imported_obj = import_with_registry(
+                    context, asset_data.asset_id, model_path,
+                    lambda: OBJLoader.import_obj(model_path, **import_settings), import_settings
+                )
                 if imported_obj and import_settings['add_metadata']:
                     OBJLoader.apply_cultural_metadata(imported_obj, asset_dict)
 
             elif file_ext in ['.gltf', '.glb']:
-                imported_obj = GLTFLoader.import_gltf(model_path, **import_settings)
+                imported_obj = import_with_registry(
+                    context, asset_data.asset_id, model_path,
+                    lambda: GLTFLoader.import_gltf(model_path, **import_settings), import_settings
+                )
                 if imported_obj and import_settings['add_metadata']:
                     all_objects = [obj for obj in context.scene.objects if obj.get('openshelf_import_batch')]
                     GLTFLoader.apply_cultural_metadata(imported_obj, all_objects, asset_dict)
@@ -372,15 +386,15 @@ class OPENSHELF_OT_import_asset_old_threading(Operator):
                 _import_state.error_message = f"Import error: {str(e)}"
 
 class OPENSHELF_OT_batch_import(Operator):
-    """Importa multipli asset in batch"""
+    """Importa multipli asset in batch: download concorrenti, import nel main thread"""
     bl_idname = "openshelf.batch_import"
     bl_label = "Batch Import"
-    bl_description = "Import multiple assets at once"
+    bl_description = "Import multiple assets at once (press ESC to cancel)"
     bl_options = {'REGISTER', 'UNDO'}
 
     max_concurrent: IntProperty(
         name="Max Concurrent",
-        description="Maximum number of concurrent imports",
+        description="Maximum number of concurrent downloads",
         default=3,
         min=1,
         max=10
@@ -394,81 +408,187 @@ class OPENSHELF_OT_batch_import(Operator):
         max=100.0
     )
 
+    # Tempo massimo per tick dedicato agli import, per non bloccare la UI
+    IMPORT_TIME_BUDGET = 0.1
+
+    _timer = None
+    _pipeline = None
+    _import_settings = None
+    _imported_objects = None
+
     def execute(self, context):
         scene = context.scene
 
         # Ottieni asset selezionati (per ora importa tutti i risultati)
-        selected_assets = []
-        for result in scene.openshelf_search_results:
-            if result.asset_id:
-                selected_assets.append(result.asset_id)
+        assets = [snapshot_asset(result) for result in scene.openshelf_search_results if result.asset_id]
 
-        if not selected_assets:
+        if not assets:
             self.report({'ERROR'}, "No assets to import")
             return {'CANCELLED'}
 
-        if len(selected_assets) > 20:
-            self.report({'ERROR'}, "Too many assets selected (max 20)")
-            return {'CANCELLED'}
+        self._import_settings = {
+            'import_scale': scene.openshelf_import_scale / 100.0,
+            'auto_center': scene.openshelf_auto_center,
+            'apply_materials': scene.openshelf_apply_materials,
+            'add_metadata': scene.openshelf_add_metadata
+        }
+        self._imported_objects = []
+
+        # Conversione opzionale in processi Blender headless: qui si appende solo il .blend
+        convert_func = None
+        if is_background_conversion_enabled():
+            converter = get_background_converter()
+            convert_func = converter.convert
+
+        self._pipeline = BatchImportPipeline(get_library_manager(), assets, self.max_concurrent,
+                                             convert_func=convert_func)
+        self._pipeline.start()
+
+        scene.openshelf_is_downloading = True
+        scene.openshelf_download_progress = 0
+        scene.openshelf_status_message = f"Batch import: 0/{len(self._pipeline.items)}"
 
-        # Batch import usando modal operators
-        self.report({'INFO'}, f"Batch import of {len(selected_assets)} assets using stable modal import")
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
 
-        imported_count = 0
-        failed_count = 0
+        print(f"OpenShelf: Batch import of {len(self._pipeline.items)} assets "
+              f"with {self.max_concurrent} concurrent downloads")
+        return {'RUNNING_MODAL'}
 
-        # Importa uno alla volta usando modal operator (più sicuro)
-        for i, asset_id in enumerate(selected_assets[:5]):  # Limita a 5 per evitare sovraccarico
-            try:
-                print(f"OpenShelf: Batch import {i+1}/{len(selected_assets[:5])}: {asset_id}")
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self._pipeline.cancel()
+            return self._finish(context)
 
-                # Usa modal import per ogni asset
-                result = bpy.ops.openshelf.modal_import_asset(asset_id=asset_id)
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
 
-                if result == {'FINISHED'}:
-                    imported_count += 1
-                    # Piccola pausa tra import per stabilità
-                    time.sleep(0.5)
-                else:
-                    failed_count += 1
+        # Import degli asset pronti, entro il budget di tempo del tick
+        deadline = time.time() + self.IMPORT_TIME_BUDGET
+        while time.time() < deadline:
+            item = self._pipeline.pop_ready()
+            if item is None:
+                break
+            self._import_item(context, item)
 
-            except Exception as e:
-                print(f"OpenShelf: Batch import error for {asset_id}: {e}")
-                failed_count += 1
-                continue
+        scene = context.scene
+        counts = self._pipeline.get_counts()
+        done = counts.get('IMPORTED', 0) + counts.get('FAILED', 0)
+        scene.openshelf_download_progress = int(self._pipeline.get_progress())
+        message = (
+            f"Batch import: {done}/{len(self._pipeline.items)} "
+            f"({counts.get('DOWNLOADING', 0)} downloading, {counts.get('CONVERTING', 0)} converting, "
+            f"{counts.get('FAILED', 0)} failed)"
+        )
+        pending_seconds = self._pipeline.get_pending_import_seconds()
+        if pending_seconds >= 1:
+            message += f" ~{pending_seconds:.0f}s to import"
+        scene.openshelf_status_message = message
 
-        # Raggruppa oggetti importati se richiesto
-        if imported_count > 1 and self.import_spacing > 0:
-            self._arrange_imported_objects(context, self.import_spacing)
+        request_redraw()
 
-        # Report finale
-        total_attempted = len(selected_assets[:5])
-        self.report({'INFO'}, f"Batch import completed: {imported_count} success, {failed_count} failed of {total_attempted} total")
+        if self._pipeline.is_finished():
+            return self._finish(context)
 
-        return {'FINISHED'}
+        return {'RUNNING_MODAL'}
 
-    def _arrange_imported_objects(self, context, spacing):
-        """Arrangia oggetti importati in griglia"""
+    def _import_item(self, context, item):
+        """Importa nel main thread un asset già scaricato nella libreria"""
+        asset = item.asset
         try:
-            # Trova oggetti recentemente importati (con metadati OpenShelf)
-            imported_objects = []
-            for obj in context.scene.objects:
-                if obj.get('openshelf_id'):
-                    imported_objects.append(obj)
+            file_ext = os.path.splitext(item.model_file)[1].lower()
 
-            if len(imported_objects) <= 1:
-                return
+            # Prepara dati asset per loader
+            asset_dict = {
+                'id': asset.asset_id,
+                'name': asset.name,
+                'description': asset.description,
+                'repository': asset.repository,
+                'object_type': asset.object_type,
+                'inventory_number': asset.inventory_number,
+                'materials': asset.materials.split(', ') if asset.materials else [],
+                'chronology': asset.chronology.split(', ') if asset.chronology else [],
+                'license_info': asset.license_info,
+                'quality_score': asset.quality_score,
+                'metadata': self._import_settings
+            }
 
-            # Arrangia in griglia
+            imported_obj = None
+
+            if file_ext == '.obj':
+                imported_obj = import_with_registry(
+                    context, asset.asset_id, item.model_file,
+                    lambda: OBJLoader.import_obj(item.model_file, **self._import_settings),
+                    self._import_settings
+                )
+                if imported_obj and self._import_settings['add_metadata']:
+                    OBJLoader.apply_cultural_metadata(imported_obj, asset_dict)
+
+            elif file_ext in ['.gltf', '.glb']:
+                imported_obj = import_with_registry(
+                    context, asset.asset_id, item.model_file,
+                    lambda: GLTFLoader.import_gltf(item.model_file, **self._import_settings),
+                    self._import_settings
+                )
+                if imported_obj and self._import_settings['add_metadata']:
+                    all_objects = [obj for obj in context.scene.objects if obj.get('openshelf_import_batch')]
+                    GLTFLoader.apply_cultural_metadata(imported_obj, all_objects, asset_dict)
+
+            if not imported_obj:
+                raise Exception("Failed to import 3D model")
+
+            self._imported_objects.append(imported_obj)
+            self._pipeline.mark_imported(asset.asset_id)
+
+        except Exception as e:
+            print(f"OpenShelf: Batch import error for {asset.asset_id}: {e}")
+            self._pipeline.mark_failed(asset.asset_id, str(e))
+
+    def _finish(self, context):
+        """Chiude il modal, dispone gli oggetti e riporta l'esito per asset"""
+        scene = context.scene
+        context.window_manager.event_timer_remove(self._timer)
+        self._timer = None
+        self._pipeline.shutdown()
+
+        # Raggruppa oggetti importati se richiesto
+        if len(self._imported_objects) > 1 and self.import_spacing > 0:
+            self._arrange_imported_objects(self._imported_objects, self.import_spacing)
+
+        summary = self._pipeline.get_summary()
+
+        message = (f"Batch import completed: {len(summary.imported)} success, "
+                   f"{len(summary.failed)} failed of {summary.total} total")
+        if summary.cancelled:
+            message += f" ({len(summary.cancelled)} cancelled)"
+
+        scene.openshelf_is_downloading = False
+        scene.openshelf_download_progress = 100
+        scene.openshelf_status_message = message
+
+        if summary.failed:
+            failed_ids = ", ".join(list(summary.failed)[:5])
+            if len(summary.failed) > 5:
+                failed_ids += ", ..."
+            self.report({'WARNING'}, f"{message}. Failed: {failed_ids} (see console)")
+        else:
+            self.report({'INFO'}, message)
+
+        return {'FINISHED'} if summary.imported else {'CANCELLED'}
+
+    def _arrange_imported_objects(self, objects, spacing):
+        """Arrangia gli oggetti importati dal batch in griglia"""
+        try:
             import math
-            cols = math.ceil(math.sqrt(len(imported_objects)))
+            cols = math.ceil(math.sqrt(len(objects)))
 
-            for i, obj in enumerate(imported_objects[-5:]):  # Ultimi 5 importati
+            for i, obj in enumerate(objects):
                 row = i // cols
                 col = i % cols
                 obj.location = (col * spacing, row * spacing, 0)
 
-            print(f"OpenShelf: Arranged {len(imported_objects[-5:])} objects in grid")
+            print(f"OpenShelf: Arranged {len(objects)} objects in grid")
 
         except Exception as e:
             print(f"OpenShelf: Error arranging objects: {e}")
@@ -819,9 +939,7 @@ class OPENSHELF_OT_cancel_import(Operator):
             _import_state.error_message = "Cancelled by user"
 
         # Force UI redraw
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+        request_redraw()
 
         self.report({'INFO'}, "Import cancelled")
         return {'FINISHED'}
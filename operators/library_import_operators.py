@@ -11,24 +11,154 @@ import threading
 import json
 import os
 import time
-from ..utils.local_library_manager import get_library_manager
-from ..utils.obj_loader import OBJLoader
-from ..utils.gltf_loader import GLTFLoader
-from ..repositories.registry import RepositoryRegistry
-
-class LibraryImportState:
-    """Stato thread-safe per l'import dalla libreria"""
-    def __init__(self):
-        self.is_downloading = False
-        self.download_progress = 0
-        self.status_message = "Ready"
-        self.pending_import_data = None
-        self.error_message = None
-        self.completed = False
-        self.lock = threading.Lock()
-
-# Istanza globale per lo stato
-_library_import_state = LibraryImportState()
+import uuid
+from ..utils.lazy_import import lazy_import
+from ..utils.progress_channel import get_progress_channel, KIND_DOWNLOAD
+from ..utils.ui_timer_utils import get_progress_pump
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+get_library_manager = lazy_import('..utils.local_library_manager', 'get_library_manager', __package__)
+import_with_registry = lazy_import('..utils.instance_registry', 'import_with_registry', __package__)
+OBJLoader = lazy_import('..utils.obj_loader', 'OBJLoader', __package__)
+GLTFLoader = lazy_import('..utils.gltf_loader', 'GLTFLoader', __package__)
+RepositoryRegistry = lazy_import('..repositories.registry', 'RepositoryRegistry', __package__)
+snapshot_asset = lazy_import('..utils.batch_pipeline', 'snapshot_asset', __package__)
+
+# Evento pubblicato dal thread di download quando il modello è in libreria
+LIBRARY_IMPORT_EVENT = 'library_import_ready'
+
+
+def _progress_from_message(message, current):
+    """Stima la percentuale complessiva dai messaggi di LocalLibraryManager.download_asset"""
+    if "Starting download" in message:
+        return 10
+    if "Downloading" in message and "%" in message:
+        try:
+            percent = int(''.join(filter(str.isdigit, message.split('%')[0])))
+            return 10 + (percent * 0.6)  # 10-70%
+        except ValueError:
+            return min(70, current + 5)
+    if "Extracting" in message:
+        return 75
+    if "Organizing" in message:
+        if "%" in message:
+            try:
+                percent = int(''.join(filter(str.isdigit, message.split('%')[0])))
+                return 80 + (percent * 0.15)  # 80-95%
+            except ValueError:
+                return 85
+        return 85
+    if "Processing textures" in message:
+        return 95
+    lowered = message.lower()
+    if "organized" in lowered or "complete" in lowered or "ready" in lowered:
+        return 100
+    return current
+
+
+def _import_model_file(context, model_file, asset_data, metadata, import_settings):
+    """Esegue l'import del file 3D (main thread)"""
+    try:
+        print(f"OpenShelf: Importing 3D file: {model_file}")
+
+        file_ext = os.path.splitext(model_file)[1].lower()
+
+        # Prepara dati asset per loader
+        asset_dict = {
+            'id': asset_data.asset_id,
+            'name': asset_data.name,
+            'description': asset_data.description,
+            'repository': asset_data.repository,
+            'object_type': asset_data.object_type,
+            'inventory_number': asset_data.inventory_number,
+            'materials': asset_data.materials.split(', ') if asset_data.materials else [],
+            'chronology': asset_data.chronology.split(', ') if asset_data.chronology else [],
+            'license_info': asset_data.license_info,
+            'quality_score': asset_data.quality_score,
+            'metadata': import_settings
+        }
+
+        # Aggiungi metadati dalla libreria se disponibili
+        if metadata:
+            asset_dict.update(metadata)
+
+        # Import con loader appropriato
+        def load_model():
+            imported_obj = None
+
+            if file_ext == '.obj':
+                # Usa il metodo corretto per i metadati culturali
+                if hasattr(OBJLoader, 'import_with_cultural_metadata'):
+                    imported_obj = OBJLoader.import_with_cultural_metadata(model_file, asset_dict)
+                elif hasattr(OBJLoader, 'import_obj'):
+                    # Prova con istanza invece di metodo statico
+                    loader = OBJLoader()
+                    imported_obj = loader.import_obj(model_file, import_settings)
+                elif hasattr(OBJLoader, 'load_obj'):\
+                    imported_obj = OBJLoader.load_obj(model_file, import_settings)
+                else:
+                    # Fallback: import Blender standard
+                    bpy.ops.wm.obj_import(filepath=model_file)
+                    imported_obj = bpy.context.selected_objects[0] if bpy.context.selected_objects else None
+
+                # Se l'import è andato a buon fine, aggiungi i metadati manualmente
+                if imported_obj and import_settings.get('add_metadata', True):
+                    for key, value in asset_dict.items():
+                        if isinstance(value, (str, int, float)):
+                            imported_obj[f"openshelf_{key}"] = value
+            elif file_ext in ['.gltf', '.glb']:
+                imported_obj = GLTFLoader.import_gltf_with_metadata(
+                    model_file, asset_dict, import_settings
+                )
+            else:
+                raise Exception(f"Unsupported file format: {file_ext}")
+
+            return imported_obj
+
+        # Riusa la mesh se l'asset è già nel file, altrimenti importa
+        imported_obj = import_with_registry(context, asset_data.asset_id, model_file,
+                                            load_model, import_settings)
+
+        if imported_obj:
+            print(f"OpenShelf: Successfully imported {asset_data.name}")
+
+            # Seleziona oggetto importato
+            try:
+                context.view_layer.objects.active = imported_obj
+                bpy.ops.object.select_all(action='DESELECT')
+                imported_obj.select_set(True)
+            except:
+                pass
+
+            return imported_obj
+        else:
+            raise Exception("Import returned None")
+
+    except Exception as e:
+        print(f"OpenShelf: Import error: {e}")
+        return None
+
+
+def _on_library_import_ready(import_data):
+    """Gestore (main thread): importa il modello appena scaricato in libreria"""
+    context = bpy.context
+    asset_data = import_data['asset_data']
+    try:
+        print(f"OpenShelf: Executing final import of {import_data['model_file']}")
+
+        imported_obj = _import_model_file(context, import_data['model_file'], asset_data,
+                                          import_data['metadata'], import_data['import_settings'])
+
+        if imported_obj:
+            context.scene.openshelf_status_message = f"Successfully imported {asset_data.name}"
+            print(f"OpenShelf: Import successful: {asset_data.name}")
+        else:
+            context.scene.openshelf_status_message = "Import failed"
+
+    except Exception as e:
+        print(f"OpenShelf: Library import execution error: {e}")
+        context.scene.openshelf_status_message = f"Import error: {str(e)}"
+
 
 class OPENSHELF_OT_library_import_asset(Operator):
     """Importa un asset usando la libreria locale (NUOVO SISTEMA)"""
@@ -99,6 +229,7 @@ class OPENSHELF_OT_library_import_asset(Operator):
         # Controlla se è già nella libreria
         if library_manager.is_asset_downloaded(self.asset_id):
             print(f"OpenShelf: Asset {self.asset_id} found in library, importing directly")
+            library_manager.record_library_hit(self.asset_id)
             return self._import_from_library(context, library_manager, asset_data)
         else:
             print(f"OpenShelf: Asset {self.asset_id} not in library, downloading first")
@@ -137,15 +268,20 @@ class OPENSHELF_OT_library_import_asset(Operator):
     def _download_and_import(self, context, library_manager, asset_data):
         """Scarica nella libreria e poi importa"""
 
-        # Inizia download in thread separato
+        # Lo stato visibile passa dal ProgressChannel; la scena si scrive solo qui e nel pump
         scene = context.scene
         scene.openshelf_is_downloading = True
         scene.openshelf_download_progress = 0
         scene.openshelf_status_message = "Starting download..."
 
-        # Prepara parametri thread
+        operation_id = f"library-{self.asset_id}-{uuid.uuid4().hex[:8]}"
+        get_progress_channel().publish(operation_id, kind=KIND_DOWNLOAD,
+                                       message="Preparing download...", progress=5)
+
+        # Prepara parametri thread (solo valori Python: i risultati possono cambiare durante il download)
         thread_params = {
-            'asset_data': asset_data,
+            'operation_id': operation_id,
+            'asset_data': snapshot_asset(asset_data),
             'import_scale': self.import_scale,
             'auto_center': self.auto_center,
             'apply_materials': self.apply_materials,
@@ -160,51 +296,23 @@ class OPENSHELF_OT_library_import_asset(Operator):
         )
         download_thread.start()
 
-        # Avvia timer per aggiornamento UI
-        bpy.app.timers.register(self._update_library_ui_state, first_interval=0.1)
+        get_progress_pump().wake()
 
         return {'FINISHED'}
 
-    def _download_to_library_thread(self, thread_params):
-        """Thread per scaricare asset nella libreria locale - FIX COMUNICAZIONE FINALE"""
-        try:
-            asset_data = thread_params['asset_data']
-
-            with _library_import_state.lock:
-                _library_import_state.is_downloading = True
-                _library_import_state.status_message = "Preparing download..."
-                _library_import_state.download_progress = 5
+    @staticmethod
+    def _download_to_library_thread(thread_params):
+        """Thread per scaricare asset nella libreria locale"""
+        channel = get_progress_channel()
+        operation_id = thread_params['operation_id']
+        asset_data = thread_params['asset_data']
 
-            # FIX CRITICO: Progress callback che aggiorna lo stato del thread
+        try:
             def progress_callback(message):
-                print(f"OpenShelf: Download thread progress: {message}")  # Debug
-                with _library_import_state.lock:
-                    _library_import_state.status_message = message
-
-                    # Aggiorna progress in base al messaggio
-                    if "Starting download" in message:
-                        _library_import_state.download_progress = 10
-                    elif "Downloading" in message and "%" in message:
-                        try:
-                            percent = int(''.join(filter(str.isdigit, message.split('%')[0])))
-                            _library_import_state.download_progress = 10 + (percent * 0.6)  # 10-70%
-                        except:
-                            _library_import_state.download_progress = min(70, _library_import_state.download_progress + 5)
-                    elif "Extracting" in message:
-                        _library_import_state.download_progress = 75
-                    elif "Organizing" in message:
-                        if "%" in message:
-                            try:
-                                percent = int(''.join(filter(str.isdigit, message.split('%')[0])))
-                                _library_import_state.download_progress = 80 + (percent * 0.15)  # 80-95%
-                            except:
-                                _library_import_state.download_progress = 85
-                        else:
-                            _library_import_state.download_progress = 85
-                    elif "organized" in message.lower() or "complete" in message.lower() or "ready" in message.lower():
-                        # FIX CRITICO: Marca download come completato
-                        _library_import_state.download_progress = 100
-                        print(f"OpenShelf: Download marked as complete: {message}")
+                previous = channel.latest(operation_id)
+                current = previous.progress if previous else 0
+                channel.publish(operation_id, message=message,
+                                progress=_progress_from_message(message, current))
 
             # Scarica nella libreria con callback
             library_manager = get_library_manager()
@@ -215,13 +323,15 @@ class OPENSHELF_OT_library_import_asset(Operator):
             print(f"OpenShelf: Download thread completed, model_file: {model_file}")
 
             if not model_file:
-                with _library_import_state.lock:
-                    _library_import_state.error_message = "Failed to download asset to library"
+                channel.finish(operation_id, error="Failed to download asset to library")
                 return
 
             # Prepara dati per import
             metadata = library_manager.get_asset_metadata(asset_data.asset_id)
 
+            # Scansione del modello nel thread: l'import trova le statistiche in cache (decisione LOD)
+            library_manager.get_model_stats(asset_data.asset_id)
+
             import_data = {
                 'model_file': model_file,
                 'asset_data': asset_data,
@@ -234,199 +344,26 @@ class OPENSHELF_OT_library_import_asset(Operator):
                 }
             }
 
-            # FIX CRITICO: Assicurati che il download sia marcato come completo
-            with _library_import_state.lock:
-                _library_import_state.download_progress = 100
-                _library_import_state.status_message = "Download complete, preparing import..."
-                _library_import_state.pending_import_data = import_data
-                print("OpenShelf: Download thread state updated - import data ready")
+            # L'import (API bpy) avviene nel main thread, nel gestore dell'evento
+            channel.post_event(LIBRARY_IMPORT_EVENT, import_data)
+            channel.finish(operation_id, message="Download complete, preparing import...")
 
         except Exception as e:
             print(f"OpenShelf: Library download error: {e}")
             import traceback
             traceback.print_exc()
-            with _library_import_state.lock:
-                _library_import_state.error_message = f"Download error: {str(e)}"
-
-    def _update_library_ui_state(self):
-        """Aggiorna UI con stato dal thread - FIX TERMINAZIONE GARANTITA"""
-        try:
-            context = bpy.context
-            scene = context.scene
-
-            with _library_import_state.lock:
-                # Aggiorna proprietà UI
-                scene.openshelf_is_downloading = _library_import_state.is_downloading
-                scene.openshelf_download_progress = _library_import_state.download_progress
-                scene.openshelf_status_message = _library_import_state.status_message
-
-                # Debug progress
-                if _library_import_state.download_progress >= 100:
-                    print(f"OpenShelf: UI update - download at 100%, checking for import data")
-
-                # FIX CRITICO: Controlla se c'è un import da eseguire
-                if _library_import_state.pending_import_data:
-                    print("OpenShelf: Executing import from library data")
-                    import_data = _library_import_state.pending_import_data
-                    _library_import_state.pending_import_data = None
-                    _library_import_state.is_downloading = False  # Stop il loop
-
-                    # Esegui import nel main thread
-                    self._do_import_from_library_data(context, import_data)
-                    return None  # Stop il timer
-
-                # FIX CRITICO: Se progress = 100% ma nessun import data, forza stop
-                if _library_import_state.download_progress >= 100 and not _library_import_state.pending_import_data:
-                    print("OpenShelf: Progress 100% reached, forcing completion")
-                    scene.openshelf_is_downloading = False
-                    scene.openshelf_status_message = "Download completed"
-                    _library_import_state.is_downloading = False
-                    _library_import_state.completed = True
-                    return None  # Stop il timer
-
-                # Controlla errori
-                if _library_import_state.error_message:
-                    scene.openshelf_status_message = _library_import_state.error_message
-                    scene.openshelf_is_downloading = False
-                    scene.openshelf_download_progress = 0
-                    _library_import_state.is_downloading = False
-                    print(f"OpenShelf: Error in download: {_library_import_state.error_message}")
-                    return None  # Stop il timer
-
-                # Controlla se completato
-                if _library_import_state.completed:
-                    scene.openshelf_is_downloading = False
-                    _library_import_state.is_downloading = False
-                    print("OpenShelf: Download marked as completed")
-                    return None  # Stop il timer
-
-            # Aggiorna UI
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
-
-            # FIX CRITICO: Continua timer SOLO se download in corso
-            return 0.1 if _library_import_state.is_downloading else None
-
-        except Exception as e:
-            print(f"OpenShelf: Library UI update error: {e}")
-            # In caso di errore, forza stop
-            try:
-                context.scene.openshelf_is_downloading = False
-                _library_import_state.is_downloading = False
-            except:
-                pass
-            return None
-
-    def _do_import_from_library_data(self, context, import_data):
-        """Esegue l'import dai dati della libreria - FIX FINALE"""
-        try:
-            model_file = import_data['model_file']
-            asset_data = import_data['asset_data']
-            metadata = import_data['metadata']
-            import_settings = import_data['import_settings']
-
-            print(f"OpenShelf: Executing final import of {model_file}")
-
-            imported_obj = self._do_import(context, model_file, asset_data, metadata, import_settings)
-
-            if imported_obj:
-                context.scene.openshelf_status_message = f"Successfully imported {asset_data.name}"
-                print(f"OpenShelf: Import successful: {asset_data.name}")
-                with _library_import_state.lock:
-                    _library_import_state.completed = True
-                    _library_import_state.is_downloading = False
-            else:
-                with _library_import_state.lock:
-                    _library_import_state.error_message = "Import failed"
-
-        except Exception as e:
-            print(f"OpenShelf: Library import execution error: {e}")
-            with _library_import_state.lock:
-                _library_import_state.error_message = f"Import error: {str(e)}"
+            channel.finish(operation_id, error=f"Download error: {str(e)}")
 
     def _do_import(self, context, model_file, asset_data, metadata=None, import_settings=None):
         """Esegue l'import del file 3D"""
-        try:
-            if import_settings is None:
-                import_settings = {
-                    'import_scale': self.import_scale,
-                    'auto_center': self.auto_center,
-                    'apply_materials': self.apply_materials,
-                    'add_metadata': self.add_metadata
-                }
-
-            print(f"OpenShelf: Importing 3D file: {model_file}")
-
-            file_ext = os.path.splitext(model_file)[1].lower()
-
-            # Prepara dati asset per loader
-            asset_dict = {
-                'id': asset_data.asset_id,
-                'name': asset_data.name,
-                'description': asset_data.description,
-                'repository': asset_data.repository,
-                'object_type': asset_data.object_type,
-                'inventory_number': asset_data.inventory_number,
-                'materials': asset_data.materials.split(', ') if asset_data.materials else [],
-                'chronology': asset_data.chronology.split(', ') if asset_data.chronology else [],
-                'license_info': asset_data.license_info,
-                'quality_score': asset_data.quality_score,
-                'metadata': import_settings
+        if import_settings is None:
+            import_settings = {
+                'import_scale': self.import_scale,
+                'auto_center': self.auto_center,
+                'apply_materials': self.apply_materials,
+                'add_metadata': self.add_metadata
             }
-
-            # Aggiungi metadati dalla libreria se disponibili
-            if metadata:
-                asset_dict.update(metadata)
-
-            # Import con loader appropriato
-            imported_obj = None
-
-            if file_ext == '.obj':
-                # Usa il metodo corretto per i metadati culturali
-                if hasattr(OBJLoader, 'import_with_cultural_metadata'):
-                    imported_obj = OBJLoader.import_with_cultural_metadata(model_file, asset_dict)
-                elif hasattr(OBJLoader, 'import_obj'):
-                    # Prova con istanza invece di metodo statico
-                    loader = OBJLoader()
-                    imported_obj = loader.import_obj(model_file, import_settings)
-                elif hasattr(OBJLoader, 'load_obj'):\
-                    imported_obj = OBJLoader.load_obj(model_file, import_settings)
-                else:
-                    # Fallback: import Blender standard
-                    bpy.ops.wm.obj_import(filepath=model_file)
-                    imported_obj = bpy.context.selected_objects[0] if bpy.context.selected_objects else None
-
-                # Se l'import è andato a buon fine, aggiungi i metadati manualmente
-                if imported_obj and import_settings.get('add_metadata', True):
-                    for key, value in asset_dict.items():
-                        if isinstance(value, (str, int, float)):
-                            imported_obj[f"openshelf_{key}"] = value
-            elif file_ext in ['.gltf', '.glb']:
-                imported_obj = GLTFLoader.import_gltf_with_metadata(
-                    model_file, asset_dict, import_settings
-                )
-            else:
-                raise Exception(f"Unsupported file format: {file_ext}")
-
-            if imported_obj:
-                print(f"OpenShelf: Successfully imported {asset_data.name}")
-
-                # Seleziona oggetto importato
-                try:
-                    context.view_layer.objects.active = imported_obj
-                    bpy.ops.object.select_all(action='DESELECT')
-                    imported_obj.select_set(True)
-                except:
-                    pass
-
-                return imported_obj
-            else:
-                raise Exception("Import returned None")
-
-        except Exception as e:
-            print(f"OpenShelf: Import error: {e}")
-            return None
+        return _import_model_file(context, model_file, asset_data, metadata, import_settings)
 
 
 class OPENSHELF_OT_import_from_library_only(Operator):
@@ -483,16 +420,75 @@ class OPENSHELF_OT_import_from_library_only(Operator):
         )
 
 
+class OPENSHELF_OT_fetch_skipped_files(Operator):
+    """Scarica i file dell'archivio saltati dall'estrazione selettiva"""
+    bl_idname = "openshelf.fetch_skipped_files"
+    bl_label = "Fetch Skipped Files"
+    bl_description = "Download the archive files that were skipped when the asset was installed (documents, unused textures)"
+
+    asset_id: StringProperty(
+        name="Asset ID",
+        description="ID of the library asset (empty = active object)",
+        default=""
+    )
+
+    def execute(self, context):
+        asset_id = self.asset_id
+        if not asset_id and context.active_object is not None:
+            asset_id = context.active_object.get('openshelf_id', "")
+
+        library_manager = get_library_manager()
+        if not asset_id or not library_manager.is_asset_downloaded(asset_id):
+            self.report({'WARNING'}, "Asset not found in local library")
+            return {'CANCELLED'}
+
+        metadata = library_manager.get_asset_metadata(asset_id) or {}
+        skipped = metadata.get('skipped_files', [])
+        if not skipped:
+            self.report({'INFO'}, f"Asset {asset_id} has no skipped files")
+            return {'CANCELLED'}
+
+        operation_id = f"fetch-{asset_id}-{uuid.uuid4().hex[:8]}"
+        get_progress_channel().publish(operation_id, kind=KIND_DOWNLOAD,
+                                       message=f"Fetching {len(skipped)} skipped files...", progress=5)
+
+        threading.Thread(target=self._fetch_thread, args=(operation_id, asset_id), daemon=True).start()
+        get_progress_pump().wake()
+
+        self.report({'INFO'}, f"Fetching {len(skipped)} skipped files of {asset_id}")
+        return {'FINISHED'}
+
+    @staticmethod
+    def _fetch_thread(operation_id, asset_id):
+        """Thread: scarica l'archivio ed estrae i membri saltati nella directory dell'asset"""
+        channel = get_progress_channel()
+
+        def progress_callback(message):
+            previous = channel.latest(operation_id)
+            current = previous.progress if previous else 0
+            channel.publish(operation_id, message=message,
+                            progress=_progress_from_message(message, current))
+
+        extracted = get_library_manager().fetch_skipped_files(asset_id, progress_callback=progress_callback)
+        if extracted:
+            channel.finish(operation_id, message=f"Fetched {len(extracted)} skipped files")
+        else:
+            channel.finish(operation_id, error="Failed to fetch skipped files")
+
+
 # Lista classi da registrare
 classes = [
     OPENSHELF_OT_library_import_asset,
     OPENSHELF_OT_import_from_library_only,
+    OPENSHELF_OT_fetch_skipped_files,
 ]
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    get_progress_channel().subscribe(LIBRARY_IMPORT_EVENT, _on_library_import_ready)
 
 def unregister():
+    get_progress_channel().unsubscribe(LIBRARY_IMPORT_EVENT)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
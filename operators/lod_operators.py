@@ -0,0 +1,65 @@
+"""
+OpenShelf LOD Operators
+Operatori per passare gli asset importati tra proxy e risoluzione piena
+"""
+
+import bpy # type: ignore
+from bpy.types import Operator # type: ignore
+from bpy.props import EnumProperty # type: ignore
+from ..utils.lazy_import import lazy_import
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+get_lod_manager = lazy_import('..utils.lod_manager', 'get_lod_manager', __package__)
+
+
+class OPENSHELF_OT_swap_lod(Operator):
+    """Cambia il livello di dettaglio degli oggetti selezionati"""
+    bl_idname = "openshelf.swap_lod"
+    bl_label = "Swap Level of Detail"
+    bl_description = "Switch selected OpenShelf objects between proxy and full resolution meshes"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    level: EnumProperty(
+        name="Level",
+        description="Level of detail to use",
+        items=[
+            ('PROXY', 'Proxy', 'Decimated mesh (5% of faces)'),
+            ('MEDIUM', 'Medium', 'Decimated mesh (25% of faces)'),
+            ('FULL', 'Full', 'Original mesh at full resolution'),
+        ],
+        default='FULL'
+    )
+
+    @classmethod
+    def poll(cls, context):
+        # Nessun import del LOD manager per il solo poll
+        return any(obj.get("openshelf_lod_level") for obj in context.selected_objects)
+
+    def execute(self, context):
+        lod_manager = get_lod_manager()
+        targets = [obj for obj in context.selected_objects if lod_manager.get_level(obj)]
+
+        swapped = sum(1 for obj in targets if lod_manager.swap(obj, self.level))
+
+        if swapped < len(targets):
+            self.report({'WARNING'}, f"Swapped {swapped} of {len(targets)} objects to {self.level}")
+        else:
+            self.report({'INFO'}, f"Swapped {swapped} objects to {self.level}")
+
+        return {'FINISHED'}
+
+
+# Lista operatori da registrare
+operators = [
+    OPENSHELF_OT_swap_lod,
+]
+
+def register():
+    """Registra gli operatori LOD"""
+    for op in operators:
+        bpy.utils.register_class(op)
+
+def unregister():
+    """Deregistra gli operatori LOD"""
+    for op in reversed(operators):
+        bpy.utils.unregister_class(op)
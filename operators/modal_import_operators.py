@@ -10,8 +10,16 @@ from bpy.props import StringProperty, BoolProperty, FloatProperty
 import os
 import json
 import time
-from ..utils.download_manager import get_download_manager
-from ..utils.obj_loader import OBJLoader
+from ..utils.lazy_import import lazy_import
+from ..utils.tracing import get_tracer, span
+from ..utils.redraw_scheduler import request_redraw
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+get_download_manager = lazy_import('..utils.download_manager', 'get_download_manager', __package__)
+OBJLoader = lazy_import('..utils.obj_loader', 'OBJLoader', __package__)
+import_with_registry = lazy_import('..utils.instance_registry', 'import_with_registry', __package__)
+post_process_objects = lazy_import('..utils.mesh_ops', 'post_process_objects', __package__)
+center_origin = lazy_import('..utils.mesh_ops', 'center_origin', __package__)
 
 class OPENSHELF_OT_modal_import_asset(Operator):
     """Import asset usando operatore modal sicuro - FIX PROGRESS BAR"""
@@ -64,6 +72,10 @@ class OPENSHELF_OT_modal_import_asset(Operator):
     _timeout = 180
     _step_start_time = 0
 
+    # Tracing: operazione corrente e ultimo step registrato come span
+    _trace = None
+    _traced_step = None
+
     # FIX: Nuove variabili per progress fluido
     _last_progress_update = 0
     _smooth_progress_target = 0
@@ -124,6 +136,8 @@ class OPENSHELF_OT_modal_import_asset(Operator):
         self._step_start_time = time.time()
         self._download_manager = get_download_manager()
         self._error_message = None
+        self._trace = get_tracer().begin("import", asset_id=self.asset_id)
+        self._traced_step = None
 
         # FIX: Inizializza progress fluido
         self._last_progress_update = time.time()
@@ -136,9 +150,9 @@ class OPENSHELF_OT_modal_import_asset(Operator):
         scene.openshelf_download_progress = 0
         scene.openshelf_status_message = "Initializing import..."
 
-        # Avvia timer modal più frequente per progress fluido
+        # Timer degli step: il ridisegno è raggruppato dallo scheduler (FRAME_BUDGET)
         wm = context.window_manager
-        self._timer = wm.event_timer_add(0.02, window=context.window)  # 20ms = 50 FPS per UI fluida
+        self._timer = wm.event_timer_add(0.05, window=context.window)
         wm.modal_handler_add(self)
 
 
@@ -177,18 +191,20 @@ class OPENSHELF_OT_modal_import_asset(Operator):
                 return {'CANCELLED'}
 
             # Aggiorna progress smooth
-            self._update_smooth_progress()
+            self._update_smooth_progress(context)
+            self._trace_step()
 
-            # Processa step corrente
+            # Processa step corrente (gli span finiscono nell'operazione di import)
             try:
-                if self._current_step == 'INIT':
-                    return self._step_init(context)
-                elif self._current_step == 'DOWNLOAD':
-                    return self._step_download(context)
-                elif self._current_step == 'IMPORT':
-                    return self._step_import(context)
-                elif self._current_step == 'COMPLETE':
-                    return self._step_complete(context)
+                with get_tracer().activate(self._trace):
+                    if self._current_step == 'INIT':
+                        return self._step_init(context)
+                    elif self._current_step == 'DOWNLOAD':
+                        return self._step_download(context)
+                    elif self._current_step == 'IMPORT':
+                        return self._step_import(context)
+                    elif self._current_step == 'COMPLETE':
+                        return self._step_complete(context)
 
             except Exception as e:
                 print(f"OpenShelf: Modal step error: {e}")
@@ -196,11 +212,6 @@ class OPENSHELF_OT_modal_import_asset(Operator):
                 self._current_step = 'ERROR'
                 return {'RUNNING_MODAL'}
 
-            # Force UI update
-            if time.time() - self._last_progress_update > 0.1:
-                self._force_ui_update(context)
-                self._last_progress_update = time.time()
-
             return {'RUNNING_MODAL'}
 
         elif event.type == 'ESC':
@@ -210,6 +221,12 @@ class OPENSHELF_OT_modal_import_asset(Operator):
 
         return {'RUNNING_MODAL'}
 
+    def _trace_step(self):
+        """Apre un nuovo span di tracing a ogni cambio di step"""
+        if self._trace is not None and self._traced_step != self._current_step:
+            self._traced_step = self._current_step
+            self._trace.mark_step(self._current_step.lower())
+
     def _debug_progress_panel_visibility(self, context):
         """Debug: verifica se il pannello progress è visibile"""
         scene = context.scene
@@ -266,22 +283,12 @@ class OPENSHELF_OT_modal_import_asset(Operator):
         else:
             self._smooth_progress_current = target_progress
 
-        # SEMPRE aggiorna UI se cambiato anche di poco
+        # Redraw solo se il valore mostrato cambia
         new_progress = int(self._smooth_progress_current)
         if new_progress != scene.openshelf_download_progress:
             scene.openshelf_download_progress = new_progress
-
-            # FORCE UI update immediato e aggressivo
             self._force_ui_update(context)
 
-            # EXTRA: Try another way to trigger UI refresh
-            try:
-                if hasattr(context, 'window'):
-                    context.window.cursor_modal_set('WAIT')
-                    context.window.cursor_modal_restore()
-            except:
-                pass
-
     def _get_step_progress_baseline(self) -> float:
         """Ottiene progress baseline per lo step corrente"""
         if self._current_step == 'INIT':
@@ -435,44 +442,8 @@ class OPENSHELF_OT_modal_import_asset(Operator):
         return {'RUNNING_MODAL'}
 
     def _force_ui_update(self, context):
-        """Force immediate UI update - versione CORRETTA senza errori"""
-        try:
-            # 1. Update del window manager (principale)
-            if hasattr(context, 'window_manager'):
-                context.window_manager.update_tag()
-
-            # 2. Update di TUTTE le aree 3D in tutti gli screen
-            if hasattr(bpy, 'data') and hasattr(bpy.data, 'screens'):
-                for screen in bpy.data.screens:
-                    for area in screen.areas:
-                        if area.type == 'VIEW_3D':
-                            area.tag_redraw()
-                            # Force update anche delle regioni
-                            for region in area.regions:
-                                if region.type == 'UI':
-                                    region.tag_redraw()
-
-            # 3. Fallback: current context areas
-            if hasattr(context, 'screen') and hasattr(context.screen, 'areas'):
-                for area in context.screen.areas:
-                    if area.type == 'VIEW_3D':
-                        area.tag_redraw()
-                        for region in area.regions:
-                            if region.type == 'UI':
-                                region.tag_redraw()
-
-            # 4. RIMOSSO: update_tag che causava errori
-            # Scene update (solo se il metodo esiste)
-            if hasattr(context, 'scene'):
-                if hasattr(context.scene, 'update_tag'):
-                    context.scene.update_tag()
-
-            # 5. RIMOSSO: ViewLayer.update_tag che non esiste sempre
-            # Non chiamare context.view_layer.update_tag() che causava l'errore
-
-        except Exception as e:
-            # Fallback molto silenzioso - solo per errori gravi
-            pass  # Non stampare più errori "non-critical"
+        """Segna la sidebar OpenShelf da ridisegnare (un solo redraw per frame budget)"""
+        request_redraw()
 
     def _step_extract(self, context):
         """Step 2: Estrazione con progress fluido"""
@@ -490,7 +461,7 @@ class OPENSHELF_OT_modal_import_asset(Operator):
                 if total > 0:
                     extract_percent = (extracted / total) * 15  # 15% del totale per estrazione
                     self._smooth_progress_target = 75 + extract_percent
-                    scene.openshelf_status_message = f"Extracting {extracted}/{total} files"
+                    scene.openshelf_status_message = f"Extracting... {int(extracted / total * 100)}%"
 
             if not hasattr(self, '_extract_dir'):
                 extract_dir = self._download_manager.extract_archive(
@@ -560,12 +531,17 @@ class OPENSHELF_OT_modal_import_asset(Operator):
             try:
                 print(f"OpenShelf: Importing OBJ file: {self._model_path}")
 
-                # Import con Blender standard
-                bpy.ops.wm.obj_import(filepath=self._model_path)
+                def load_model():
+                    # Import con Blender standard
+                    with span("import.obj"):
+                        bpy.ops.wm.obj_import(filepath=self._model_path)
+                    return bpy.context.selected_objects[0] if bpy.context.selected_objects else None
+
+                # Riusa la mesh se l'asset è già nel file (duplicato linkato)
+                imported_obj = import_with_registry(context, self.asset_id, self._model_path, load_model)
 
                 # Verifica risultato
-                if bpy.context.selected_objects:
-                    imported_obj = bpy.context.selected_objects[0]
+                if imported_obj:
 
                     # Applica metadati se richiesto
                     if self.add_metadata and imported_obj:
@@ -576,9 +552,9 @@ class OPENSHELF_OT_modal_import_asset(Operator):
                         imported_obj.scale = (self.import_scale, self.import_scale, self.import_scale)
 
                     if self.auto_center:
-                        # Centro l'oggetto
-                        bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
-                        imported_obj.location = (0, 0, 0)
+                        # Centro l'oggetto (la mesh condivisa di un'istanza è già centrata)
+                        timer = post_process_objects([imported_obj], auto_center=True)
+                        print(f"OpenShelf: Post-processed {imported_obj.name}: {timer.report()}")
 
                     # Successo!
                     scene.openshelf_status_message = "Import completed successfully!"
@@ -643,10 +619,7 @@ class OPENSHELF_OT_modal_import_asset(Operator):
     def _center_object(self, obj):
         """Centra oggetto"""
         try:
-            bpy.context.view_layer.objects.active = obj
-            obj.select_set(True)
-            bpy.ops.object.origin_set(type='GEOMETRY_ORIGIN', center='BOUNDS')
-            obj.location = (0, 0, 0)
+            center_origin(obj)
         except Exception as e:
             print(f"OpenShelf: Error centering object: {e}")
 
@@ -733,6 +706,10 @@ class OPENSHELF_OT_modal_import_asset(Operator):
                 except:
                     pass
 
+            # Chiude l'operazione di tracing (finisce nel ring buffer)
+            get_tracer().finish(self._trace, 'OK' if result_type == 'FINISHED' else result_type)
+            self._trace = None
+
             # Reset UI state
             scene.openshelf_is_downloading = False
             scene.openshelf_download_progress = 0
@@ -7,7 +7,17 @@ import bpy
 from bpy.types import Operator
 from bpy.props import StringProperty, BoolProperty
 import threading
-from ..repositories.registry import RepositoryRegistry
+import uuid
+from ..utils.lazy_import import lazy_import
+from ..utils.redraw_scheduler import request_redraw
+from ..utils.progress_channel import get_progress_channel
+from ..utils.ui_timer_utils import get_progress_pump
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+RepositoryRegistry = lazy_import('..repositories.registry', 'RepositoryRegistry', __package__)
+
+# Evento pubblicato dal thread delle statistiche (il popup si apre nel main thread)
+STATISTICS_EVENT = 'repository_statistics'
 
 class OPENSHELF_OT_refresh_repositories(Operator):
     """Aggiorna la lista dei repository"""
@@ -22,9 +32,7 @@ class OPENSHELF_OT_refresh_repositories(Operator):
             RepositoryRegistry.refresh_all_repositories()
 
             # Aggiorna UI
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
+            request_redraw()
 
             self.report({'INFO'}, "Repositories refreshed")
 
@@ -59,41 +67,43 @@ class OPENSHELF_OT_test_repository(Operator):
             self.report({'ERROR'}, "Please select a specific repository to test")
             return {'CANCELLED'}
 
+        operation_id = f"test-{uuid.uuid4().hex[:8]}"
+        get_progress_channel().publish(operation_id, message=f"Testing {repo_name}...")
+
         # Avvia test in thread separato
         test_thread = threading.Thread(
             target=self._test_repository_thread,
-            args=(context, repo_name)
+            args=(operation_id, repo_name)
         )
         test_thread.daemon = True
         test_thread.start()
+        get_progress_pump().wake()
 
         self.report({'INFO'}, f"Testing connection to {repo_name}...")
 
         return {'FINISHED'}
 
-    def _test_repository_thread(self, context, repo_name):
-        """Thread per testare repository"""
-        scene = context.scene
+    def _test_repository_thread(self, operation_id, repo_name):
+        """Thread per testare repository (pubblica l'esito sul canale di progresso)"""
+        channel = get_progress_channel()
 
         try:
-            scene.openshelf_status_message = f"Testing {repo_name}..."
-
             # Testa connessione
             result = RepositoryRegistry.test_repository_connection(repo_name)
 
             # Aggiorna stato
             if result['status'] == 'success':
-                scene.openshelf_status_message = f"✓ {repo_name}: {result['message']}"
+                channel.finish(operation_id, message=f"✓ {repo_name}: {result['message']}")
                 print(f"OpenShelf: Repository test successful: {result}")
             elif result['status'] == 'warning':
-                scene.openshelf_status_message = f"⚠ {repo_name}: {result['message']}"
+                channel.finish(operation_id, message=f"⚠ {repo_name}: {result['message']}")
                 print(f"OpenShelf: Repository test warning: {result}")
             else:
-                scene.openshelf_status_message = f"✗ {repo_name}: {result['message']}"
+                channel.finish(operation_id, error=f"✗ {repo_name}: {result['message']}")
                 print(f"OpenShelf: Repository test failed: {result}")
 
         except Exception as e:
-            scene.openshelf_status_message = f"✗ {repo_name}: Test error"
+            channel.finish(operation_id, error=f"✗ {repo_name}: Test error")
             print(f"OpenShelf: Repository test error: {e}")
 
 class OPENSHELF_OT_repository_info(Operator):
@@ -163,51 +173,42 @@ class OPENSHELF_OT_repository_statistics(Operator):
     bl_options = {'REGISTER'}
 
     def execute(self, context):
+        operation_id = f"stats-{uuid.uuid4().hex[:8]}"
+        get_progress_channel().publish(operation_id, message="Collecting statistics...")
+
         # Avvia raccolta statistiche in thread separato
         stats_thread = threading.Thread(
             target=self._collect_statistics_thread,
-            args=(context,)
+            args=(operation_id,)
         )
         stats_thread.daemon = True
         stats_thread.start()
+        get_progress_pump().wake()
 
         self.report({'INFO'}, "Collecting repository statistics...")
 
         return {'FINISHED'}
 
-    def _collect_statistics_thread(self, context):
+    def _collect_statistics_thread(self, operation_id):
         """Thread per raccogliere statistiche"""
-        scene = context.scene
+        channel = get_progress_channel()
 
         try:
-            scene.openshelf_status_message = "Collecting statistics..."
-
             # Ottieni statistiche
             stats = RepositoryRegistry.get_repository_statistics()
 
-            # Salva statistiche in una variabile temporanea per il popup
-            self.collected_stats = stats
-
-            # Mostra popup con statistiche - deve essere chiamato dal main thread
-            bpy.app.timers.register(
-                lambda: self._show_statistics_popup(context),
-                first_interval=0.1
-            )
-
-            scene.openshelf_status_message = "Statistics collected"
+            # Il popup deve essere aperto dal main thread: lo consegna il progress pump
+            channel.post_event(STATISTICS_EVENT, stats)
+            channel.finish(operation_id, message="Statistics collected")
 
         except Exception as e:
-            scene.openshelf_status_message = f"Statistics error: {str(e)}"
+            channel.finish(operation_id, error=f"Statistics error: {str(e)}")
             print(f"OpenShelf: Statistics error: {e}")
 
-    def _show_statistics_popup(self, context):
-        """Mostra popup con statistiche"""
+    @staticmethod
+    def show_statistics_popup(stats):
+        """Mostra popup con statistiche (main thread)"""
         try:
-            if not hasattr(self, 'collected_stats'):
-                return None
-
-            stats = self.collected_stats
-
             def draw_statistics_popup(popup_self, popup_context):
                 layout = popup_self.layout
                 layout.label(text="Repository Statistics", icon='GRAPH')
@@ -280,21 +281,20 @@ class OPENSHELF_OT_repository_statistics(Operator):
                             col.label(text=f"  ... and {total_periods - 3} more periods")
 
             # Mostra popup grande
-            context.window_manager.popup_menu(
+            bpy.context.window_manager.popup_menu(
                 draw_statistics_popup,
                 title="Repository Statistics",
                 icon='GRAPH'
             )
 
             # Stampa anche in console per backup
-            self._print_console_stats(stats)
+            OPENSHELF_OT_repository_statistics._print_console_stats(stats)
 
         except Exception as e:
             print(f"OpenShelf: Error showing statistics popup: {e}")
 
-        return None  # Non ripetere il timer
-
-    def _print_console_stats(self, stats):
+    @staticmethod
+    def _print_console_stats(stats):
         """Stampa statistiche in console come backup"""
         print("\n" + "="*50)
         print("OpenShelf: Repository Statistics")
@@ -522,8 +522,10 @@ def register():
     """Registra gli operatori repository"""
     for op in operators:
         bpy.utils.register_class(op)
+    get_progress_channel().subscribe(STATISTICS_EVENT, OPENSHELF_OT_repository_statistics.show_statistics_popup)
 
 def unregister():
     """Deregistra gli operatori repository"""
+    get_progress_channel().unsubscribe(STATISTICS_EVENT)
     for op in reversed(operators):
         bpy.utils.unregister_class(op)
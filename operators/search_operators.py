@@ -1,7 +1,7 @@
 """
 OpenShelf Search Operators - VERSIONE COMPLETA CORRETTA
 Operatori per ricerca e filtri negli asset culturali
-FIX: Timer standalone per evitare ReferenceError
+Il thread di ricerca pubblica sul ProgressChannel: niente scritture RNA fuori dal main thread
 AGGIUNTO: OPENSHELF_OT_clear_filters e tutti gli operatori completi
 """
 
@@ -11,31 +11,73 @@ from bpy.props import StringProperty, BoolProperty, IntProperty
 import threading
 import time
 import json
-from ..repositories.registry import RepositoryRegistry
+import uuid
+from ..utils.lazy_import import lazy_import
+from ..utils.tracing import span
+from ..utils.redraw_scheduler import request_redraw
+from ..utils.progress_channel import get_progress_channel, KIND_SEARCH
+from ..utils.ui_timer_utils import get_progress_pump
 
-# FUNZIONE STANDALONE PER TIMER (SOLUZIONE AL BUG)
-def _check_search_progress_standalone(context):
-    """Controlla progresso ricerca e aggiorna UI - STANDALONE"""
-    try:
-        scene = context.scene
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+RepositoryRegistry = lazy_import('..repositories.registry', 'RepositoryRegistry', __package__)
+
+# Evento pubblicato dal thread di ricerca quando i risultati sono pronti
+SEARCH_RESULTS_EVENT = 'search_results'
 
-        # Controlla se il context è ancora valido
-        if not scene:
-            return None
 
-        # Forza aggiornamento UI
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+def _on_search_results(payload):
+    """Gestore (main thread) dei risultati: unico punto che scrive le collezioni"""
+    results, filters, repo_id = payload
+    with span("search.results", count=len(results)):
+        _update_search_results(bpy.context.scene, results, filters, repo_id)
 
-        # Continua timer solo se ricerca in corso
-        return 0.1 if getattr(scene, 'openshelf_is_searching', False) else None
 
-    except (ReferenceError, AttributeError):
-        return None
+def _update_search_results(scene, results, filters, repo_id):
+    """Aggiorna i risultati nella UI"""
+    try:
+        # Pulisci risultati precedenti
+        scene.openshelf_search_results.clear()
+        scene.openshelf_assets_cache.clear()
+
+        # Aggiungi nuovi risultati
+        for asset in results:
+            # Aggiungi a cache
+            cache_item = scene.openshelf_assets_cache.add()
+            cache_item.asset_id = asset.id
+            cache_item.name = asset.name
+            cache_item.description = asset.description
+            cache_item.repository = asset.repository
+            cache_item.object_type = asset.object_type
+            cache_item.materials = ', '.join(asset.materials)
+            cache_item.chronology = ', '.join(asset.chronology)
+            cache_item.inventory_number = asset.inventory_number
+            cache_item.model_urls = json.dumps(asset.model_urls) if asset.model_urls else "[]"
+            cache_item.thumbnail_url = asset.thumbnail_url
+            cache_item.quality_score = asset.quality_score
+
+            # Aggiungi ai risultati visibili
+            result_item = scene.openshelf_search_results.add()
+            result_item.asset_id = asset.id
+            result_item.name = asset.name
+            result_item.description = asset.description
+            result_item.repository = asset.repository
+            result_item.object_type = asset.object_type
+            result_item.inventory_number = asset.inventory_number
+            result_item.quality_score = asset.quality_score
+            result_item.model_urls = json.dumps(asset.model_urls) if asset.model_urls else "[]"
+            result_item.thumbnail_url = asset.thumbnail_url
+            result_item.materials = ', '.join(asset.materials)
+            result_item.chronology = ', '.join(asset.chronology)
+
+        # Aggiorna statistiche
+        scene.openshelf_search_count = len(results)
+        scene.openshelf_last_search = filters.get('search', '')
+        scene.openshelf_last_repository = repo_id
+        scene.openshelf_status_message = f"Found {len(results)} assets"
+
     except Exception as e:
-        print(f"OpenShelf: Timer error: {e}")
-        return None
+        print(f"OpenShelf: Error updating search results: {e}")
+        scene.openshelf_status_message = f"Error updating results: {str(e)}"
 
 
 class OPENSHELF_OT_search_assets(Operator):
@@ -78,35 +120,38 @@ class OPENSHELF_OT_search_assets(Operator):
             self.report({'WARNING'}, "Please enter search criteria")
             return {'CANCELLED'}
 
+        # Il thread riceve solo valori Python: la scena si legge qui, nel main thread
+        repo_id = scene.openshelf_active_repository
+        limit = scene.openshelf_search_limit
+        operation_id = f"search-{uuid.uuid4().hex[:8]}"
+
+        scene.openshelf_is_searching = True
+        scene.openshelf_status_message = "Searching..."
+        get_progress_channel().publish(operation_id, kind=KIND_SEARCH, message="Searching...")
+
         # Avvia ricerca in thread separato
         search_thread = threading.Thread(
             target=self._search_thread,
-            args=(context, filters)
+            args=(operation_id, repo_id, limit, filters)
         )
         search_thread.daemon = True
         search_thread.start()
 
-        # FIX: USA FUNZIONE STANDALONE PER TIMER
-        bpy.app.timers.register(
-            lambda: _check_search_progress_standalone(context),
-            first_interval=0.1
-        )
+        get_progress_pump().wake()
+        request_redraw()
 
         return {'FINISHED'}
 
-    def _search_thread(self, context, filters):
+    def _search_thread(self, operation_id, repo_id, limit, filters):
         """Thread per eseguire ricerca senza bloccare UI"""
-        scene = context.scene
+        # Operazione di tracing: fetch, parse e filtro del catalogo finiscono qui dentro
+        with span("search", repository=repo_id):
+            self._run_search(operation_id, repo_id, limit, filters)
 
+    def _run_search(self, operation_id, repo_id, limit, filters):
+        """Esegue la ricerca e pubblica i risultati sul canale di progresso"""
+        channel = get_progress_channel()
         try:
-            # Imposta stato ricerca
-            scene.openshelf_is_searching = True
-            scene.openshelf_status_message = "Searching..."
-
-            # Ottieni repository attivo
-            repo_id = scene.openshelf_active_repository
-            limit = scene.openshelf_search_limit
-
             # Cerca negli asset
             if repo_id == 'all':
                 # Cerca in tutti i repository
@@ -119,7 +164,7 @@ class OPENSHELF_OT_search_assets(Operator):
                 # Cerca in repository specifico
                 repository = RepositoryRegistry.get_repository(repo_id)
                 if not repository:
-                    scene.openshelf_status_message = f"Repository '{repo_id}' not found"
+                    channel.finish(operation_id, error=f"Repository '{repo_id}' not found")
                     return
 
                 results = repository.search_assets(
@@ -128,61 +173,13 @@ class OPENSHELF_OT_search_assets(Operator):
                     limit=limit
                 )
 
-            # Aggiorna risultati nella UI (thread-safe)
-            self._update_search_results(scene, results, filters)
+            # Le collezioni della scena vengono riempite dal gestore nel main thread
+            channel.post_event(SEARCH_RESULTS_EVENT, (results, filters, repo_id))
+            channel.finish(operation_id, message=f"Found {len(results)} assets")
 
         except Exception as e:
             print(f"OpenShelf: Search error: {e}")
-            scene.openshelf_status_message = f"Search error: {str(e)}"
-        finally:
-            scene.openshelf_is_searching = False
-
-    def _update_search_results(self, scene, results, filters):
-        """Aggiorna i risultati nella UI"""
-        try:
-            # Pulisci risultati precedenti
-            scene.openshelf_search_results.clear()
-            scene.openshelf_assets_cache.clear()
-
-            # Aggiungi nuovi risultati
-            for asset in results:
-                # Aggiungi a cache
-                cache_item = scene.openshelf_assets_cache.add()
-                cache_item.asset_id = asset.id
-                cache_item.name = asset.name
-                cache_item.description = asset.description
-                cache_item.repository = asset.repository
-                cache_item.object_type = asset.object_type
-                cache_item.materials = ', '.join(asset.materials)
-                cache_item.chronology = ', '.join(asset.chronology)
-                cache_item.inventory_number = asset.inventory_number
-                cache_item.model_urls = json.dumps(asset.model_urls) if asset.model_urls else "[]"
-                cache_item.thumbnail_url = asset.thumbnail_url
-                cache_item.quality_score = asset.quality_score
-
-                # Aggiungi ai risultati visibili
-                result_item = scene.openshelf_search_results.add()
-                result_item.asset_id = asset.id
-                result_item.name = asset.name
-                result_item.description = asset.description
-                result_item.repository = asset.repository
-                result_item.object_type = asset.object_type
-                result_item.inventory_number = asset.inventory_number
-                result_item.quality_score = asset.quality_score
-                result_item.model_urls = json.dumps(asset.model_urls) if asset.model_urls else "[]"
-                result_item.thumbnail_url = asset.thumbnail_url
-                result_item.materials = ', '.join(asset.materials)
-                result_item.chronology = ', '.join(asset.chronology)
-
-            # Aggiorna statistiche
-            scene.openshelf_search_count = len(results)
-            scene.openshelf_last_search = filters.get('search', '')
-            scene.openshelf_last_repository = scene.openshelf_active_repository
-            scene.openshelf_status_message = f"Found {len(results)} assets"
-
-        except Exception as e:
-            print(f"OpenShelf: Error updating search results: {e}")
-            scene.openshelf_status_message = f"Error updating results: {str(e)}"
+            channel.finish(operation_id, error=f"Search error: {str(e)}")
 
 
 class OPENSHELF_OT_clear_search(Operator):
@@ -625,8 +622,10 @@ def register():
     """Registra gli operatori di ricerca"""
     for op in operators:
         bpy.utils.register_class(op)
+    get_progress_channel().subscribe(SEARCH_RESULTS_EVENT, _on_search_results)
 
 def unregister():
     """Deregistra gli operatori di ricerca"""
+    get_progress_channel().unsubscribe(SEARCH_RESULTS_EVENT)
     for op in reversed(operators):
         bpy.utils.unregister_class(op)
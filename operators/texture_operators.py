@@ -0,0 +1,172 @@
+"""
+OpenShelf Texture Operators
+Operatori per cambiare il tier di risoluzione delle texture degli asset importati
+e per renderizzare con le texture originali
+"""
+
+import bpy # type: ignore
+from bpy.types import Operator # type: ignore
+from bpy.props import EnumProperty, BoolProperty # type: ignore
+from bpy.app.handlers import persistent # type: ignore
+from ..utils.lazy_import import lazy_import
+
+# Implementazioni caricate alla prima esecuzione (avvio di Blender più rapido)
+get_texture_tier_processor = lazy_import('..utils.texture_tiers', 'get_texture_tier_processor', __package__)
+is_render_upgrade_enabled = lazy_import('..utils.texture_tiers', 'is_render_upgrade_enabled', __package__)
+
+# True se il render in corso usa le texture originali al posto dei tier
+_render_upgraded = False
+
+# Controllo della fine del render avviato dall'operatore (secondi)
+RENDER_POLL_INTERVAL = 0.5
+
+
+class OPENSHELF_OT_set_texture_tier(Operator):
+    """Cambia la risoluzione delle texture degli oggetti selezionati"""
+    bl_idname = "openshelf.set_texture_tier"
+    bl_label = "Set Texture Resolution"
+    bl_description = "Switch the textures of selected OpenShelf objects to another resolution tier"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tier: EnumProperty(
+        name="Tier",
+        description="Texture resolution to use",
+        items=[
+            ('1K', '1K', 'Longest side up to 1024 px'),
+            ('2K', '2K', 'Longest side up to 2048 px'),
+            ('4K', '4K', 'Longest side up to 4096 px'),
+            ('ORIGINAL', 'Original', 'Textures as provided by the archive'),
+        ],
+        default='ORIGINAL'
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return any(obj.get('openshelf_id') for obj in context.selected_objects)
+
+    def execute(self, context):
+        processor = get_texture_tier_processor()
+        changed = 0
+
+        for obj in context.selected_objects:
+            asset_id = obj.get('openshelf_id')
+            if asset_id:
+                changed += processor.apply(obj, asset_id, self.tier)
+
+        self.report({'INFO'}, f"Switched {changed} textures to {self.tier}")
+        return {'FINISHED'}
+
+
+class OPENSHELF_OT_render_full_resolution(Operator):
+    """Renderizza con le texture originali al posto dei tier ridotti"""
+    bl_idname = "openshelf.render_full_resolution"
+    bl_label = "Render with Original Textures"
+    bl_description = ("Render using the original textures of OpenShelf assets, "
+                      "then switch back to the reduced tiers")
+
+    animation: BoolProperty(
+        name="Animation",
+        description="Render the whole animation instead of the current frame",
+        default=False
+    )
+
+    def execute(self, context):
+        # Le immagini si cambiano qui, sul main thread, prima che parta il job di render
+        _upgrade_textures()
+
+        result = bpy.ops.render.render('INVOKE_DEFAULT', animation=self.animation)
+        if 'CANCELLED' in result:
+            _restore_textures()
+            return {'CANCELLED'}
+
+        if _render_upgraded:
+            bpy.app.timers.register(_restore_when_render_done, first_interval=RENDER_POLL_INTERVAL)
+        return {'FINISHED'}
+
+
+def _upgrade_textures():
+    """Texture originali al posto dei tier ridotti (solo main thread)"""
+    global _render_upgraded
+
+    # Nessun import del modulo texture se il file non usa tier ridotti
+    if not any(image.get('openshelf_texture_tier', 'ORIGINAL') != 'ORIGINAL' for image in bpy.data.images):
+        return
+
+    if is_render_upgrade_enabled():
+        get_texture_tier_processor().upgrade_for_render()
+        _render_upgraded = True
+
+
+def _restore_textures():
+    """Ripristina i tier dopo il render (solo main thread)"""
+    global _render_upgraded
+
+    if _render_upgraded:
+        get_texture_tier_processor().restore_after_render()
+        _render_upgraded = False
+
+
+def _restore_when_render_done():
+    """Timer: ripristina i tier quando il job di render (completato o annullato) è terminato"""
+    if bpy.app.is_job_running('RENDER'):
+        return RENDER_POLL_INTERVAL
+    _restore_textures()
+    return None
+
+
+@persistent
+def _on_render_pre(scene, *args):
+    """
+    Render da riga di comando (blender -b): gira sul main thread, quindi le
+    texture si possono cambiare qui. Nei render interattivi l'handler gira
+    nel thread del job e non tocca le immagini (vedi render_full_resolution)
+    """
+    if bpy.app.background:
+        _upgrade_textures()
+
+
+@persistent
+def _on_render_end(scene, *args):
+    """Dopo un render da riga di comando (completato o annullato): ripristina i tier"""
+    if bpy.app.background:
+        _restore_textures()
+
+
+def register_render_handlers():
+    """Aggiunge gli handler che passano alle texture originali durante il render"""
+    if _on_render_pre not in bpy.app.handlers.render_pre:
+        bpy.app.handlers.render_pre.append(_on_render_pre)
+    for handlers in (bpy.app.handlers.render_complete, bpy.app.handlers.render_cancel):
+        if _on_render_end not in handlers:
+            handlers.append(_on_render_end)
+
+
+def unregister_render_handlers():
+    """Rimuove gli handler di render"""
+    for handlers, handler in ((bpy.app.handlers.render_pre, _on_render_pre),
+                              (bpy.app.handlers.render_complete, _on_render_end),
+                              (bpy.app.handlers.render_cancel, _on_render_end)):
+        if handler in handlers:
+            handlers.remove(handler)
+    if bpy.app.timers.is_registered(_restore_when_render_done):
+        bpy.app.timers.unregister(_restore_when_render_done)
+    _restore_textures()
+
+
+# Lista operatori da registrare
+operators = [
+    OPENSHELF_OT_set_texture_tier,
+    OPENSHELF_OT_render_full_resolution,
+]
+
+def register():
+    """Registra gli operatori texture e gli handler di render"""
+    for op in operators:
+        bpy.utils.register_class(op)
+    register_render_handlers()
+
+def unregister():
+    """Deregistra gli operatori texture e gli handler di render"""
+    unregister_render_handlers()
+    for op in reversed(operators):
+        bpy.utils.unregister_class(op)
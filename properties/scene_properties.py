@@ -13,6 +13,7 @@ from bpy.props import (
     BoolProperty
 )
 from bpy.types import PropertyGroup
+from ..utils.redraw_scheduler import request_redraw
 
 class OpenShelfAssetProperty(PropertyGroup):
     """Proprietà per un singolo asset culturale"""
@@ -129,9 +130,7 @@ def selection_update_callback(self, context):
             print(f"OpenShelf: Selected asset changed to: {selected_asset.name} (ID: {selected_asset.asset_id})")
 
         # Force UI redraw
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+        request_redraw()
 
     except Exception as e:
         print(f"OpenShelf: Error in selection update callback: {e}")
@@ -365,6 +364,45 @@ def register():
         default=True
     ))
 
+    safe_add_scene_property('openshelf_reuse_mesh_data', BoolProperty(
+        name="Reuse Mesh Data",
+        description="Import assets already in this file as linked duplicates sharing mesh data",
+        default=True
+    ))
+
+    safe_add_scene_property('openshelf_use_blend_cache', BoolProperty(
+        name="Use Blend Cache",
+        description="Save imported library assets as .blend and append them on later imports",
+        default=True
+    ))
+
+    safe_add_scene_property('openshelf_proxy_import', BoolProperty(
+        name="Proxy First Import",
+        description="Import heavy meshes as a decimated proxy (LODs generated once per asset)",
+        default=True
+    ))
+
+    safe_add_scene_property('openshelf_texture_tier', EnumProperty(
+        name="Texture Resolution",
+        description="Texture resolution tier for imported library assets",
+        items=[
+            ('DEFAULT', 'Default', 'Use the default resolution from the preferences'),
+            ('1K', '1K', 'Longest side up to 1024 px'),
+            ('2K', '2K', 'Longest side up to 2048 px'),
+            ('4K', '4K', 'Longest side up to 4096 px'),
+            ('ORIGINAL', 'Original', 'Textures as provided by the archive'),
+        ],
+        default='DEFAULT'
+    ))
+
+    # === TRACING ===
+    safe_add_scene_property('openshelf_trace_index', IntProperty(
+        name="Trace",
+        description="Traced operation shown in the timeline (0 = most recent)",
+        default=0,
+        min=0
+    ))
+
     print("OpenShelf: Scene properties registration completed")
 
 def unregister():
@@ -397,6 +435,11 @@ def unregister():
         'openshelf_auto_center',
         'openshelf_apply_materials',
         'openshelf_add_metadata',
+        'openshelf_reuse_mesh_data',
+        'openshelf_use_blend_cache',
+        'openshelf_proxy_import',
+        'openshelf_texture_tier',
+        'openshelf_trace_index',
     ]
 
     # Rimuovi proprietà scene
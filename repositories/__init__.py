@@ -1,20 +1,21 @@
 """
 OpenShelf Repositories Module
 Sistema modulare per gestire diversi repository di beni culturali
+
+Le classi dei repository vengono importate alla prima ricerca:
+RepositoryRegistry si inizializza da solo al primo accesso
 """
 
-from . import base_repository
-from . import ercolano_repository
-from . import registry
+import sys
 
 def register():
-    """Registra tutti i repository"""
-    # Inizializza il registry con i repository disponibili
-    registry.RepositoryRegistry.initialize()
-    print("OpenShelf: Repositories registered")
+    """Registra tutti i repository (inizializzazione differita al primo uso)"""
+    print("OpenShelf: Repositories registered (loaded on first use)")
 
 def unregister():
     """Deregistra tutti i repository"""
-    # Cleanup del registry
-    registry.RepositoryRegistry.cleanup()
+    # Cleanup del registry solo se è stato caricato
+    registry = sys.modules.get(f"{__name__}.registry")
+    if registry is not None:
+        registry.RepositoryRegistry.cleanup()
     print("OpenShelf: Repositories unregistered")
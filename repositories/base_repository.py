@@ -6,6 +6,7 @@ Classe base per tutti i repository di asset culturali
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 import json
+from ..utils.tracing import span
 
 class CulturalAsset:
     """Rappresentazione standardizzata di un asset culturale"""
@@ -198,13 +199,14 @@ class BaseRepository(ABC):
 
         # Applica filtri
         filtered_assets = []
-        for asset in all_assets:
-            if asset.matches_filter(filters):
-                filtered_assets.append(asset)
-
-            # Limita i risultati
-            if len(filtered_assets) >= limit:
-                break
+        with span("search.filter", assets=len(all_assets)):
+            for asset in all_assets:
+                if asset.matches_filter(filters):
+                    filtered_assets.append(asset)
+
+                # Limita i risultati
+                if len(filtered_assets) >= limit:
+                    break
 
         return filtered_assets
 
@@ -3,19 +3,18 @@ OpenShelf Ercolano Repository
 Repository per gli asset 3D del Museo Archeologico Virtuale di Ercolano
 """
 
-import bpy # type: ignore
 import urllib.request
 import json
+import logging
 import time
 from typing import List, Dict, Any
 from .base_repository import BaseRepository, CulturalAsset
+from ..utils.cache_metrics import get_cache_metrics
+from ..utils.log import get_logger
+from ..utils.tracing import span, traced
+from ..utils.host import check_online_access
 
-def check_online_access():
-    if not hasattr(bpy.app, 'online_access'):
-        return True
-    if not bpy.app.online_access:
-        raise Exception("Online access is disabled in Blender preferences")
-    return True
+logger = get_logger(__name__)
 
 class ErcolanoRepository(BaseRepository):
     """Repository per gli asset 3D di Ercolano"""
@@ -35,6 +34,9 @@ class ErcolanoRepository(BaseRepository):
         # URL aggiornato per il dataset JSON
         self.json_url = "https://opendata-ercolano.cultura.gov.it/dataset/55608c19-2406-419f-84db-fa3d0b9cd033/resource/64324e26-a659-4c96-8958-98dbc5ecd3a9/download/modelli_3d_hig_res.json"
 
+        # Dimensione dell'ultimo catalogo scaricato (per metriche byte risparmiati)
+        self._catalog_payload_size = 0
+
         # URL alternativo della pagina dataset
         self.dataset_page_url = "https://opendata-ercolano.cultura.gov.it/dataset/modelli-3d-lr/resource/64324e26-a659-4c96-8958-98dbc5ecd3a9"
 
@@ -57,13 +59,13 @@ class ErcolanoRepository(BaseRepository):
             if isinstance(raw_data, dict) and "jsonData" in raw_data:
                 json_data = raw_data["jsonData"]
                 total_records = json_data.get("totRecord", 0)
-                print(f"OpenShelf: Total records from Ercolano API: {total_records}")
+                logger.debug("Total records from Ercolano API: %s", total_records)
                 return total_records
 
             return 0
 
         except Exception as e:
-            print(f"OpenShelf: Error getting total count from Ercolano: {e}")
+            logger.error("Error getting total count from Ercolano: %s", e)
             return 0
 
     def fetch_assets(self, limit: int = 100) -> List[CulturalAsset]:
@@ -71,7 +73,7 @@ class ErcolanoRepository(BaseRepository):
         try:
             check_online_access()
         except Exception as e:
-            print(f"OpenShelf: {e}")
+            logger.error("%s", e)
             return []
         # Determina se stiamo fetchando per statistiche (limit alto) o per UI normale
         is_stats_fetch = limit > 1000
@@ -81,18 +83,19 @@ class ErcolanoRepository(BaseRepository):
         if (cache_key in self._cache and
             self._last_fetch_time and
             time.time() - self._last_fetch_time < self._cache_duration):
-            print(f"OpenShelf: Using cached Ercolano data ({'all assets' if is_stats_fetch else f'{limit} assets'})")
+            logger.debug("Using cached Ercolano data (%s)", "all assets" if is_stats_fetch else f"{limit} assets")
             cached_assets = self._cache[cache_key]
+            get_cache_metrics().record_hit('catalog', self._catalog_payload_size)
             # Per richieste normali, limita comunque il risultato
             return cached_assets if is_stats_fetch else cached_assets[:limit]
 
         try:
             if is_stats_fetch:
-                print(f"OpenShelf: Fetching ALL assets from Ercolano for statistics...")
+                logger.info("Fetching ALL assets from Ercolano for statistics...")
             else:
-                print(f"OpenShelf: Fetching {limit} assets from Ercolano...")
+                logger.info("Fetching %s assets from Ercolano...", limit)
 
-            print(f"OpenShelf: Using URL: {self.json_url}")
+            logger.debug("Using URL: %s", self.json_url)
 
             # Configurazione richiesta
             req = urllib.request.Request(
@@ -105,15 +108,21 @@ class ErcolanoRepository(BaseRepository):
             )
 
             # Esegui richiesta
-            with urllib.request.urlopen(req, timeout=30) as response:
+            fetch_start = time.time()
+            with span("catalog.fetch", repository=self.name), \
+                    urllib.request.urlopen(req, timeout=30) as response:
                 if response.status != 200:
                     raise Exception(f"HTTP {response.status}: {response.reason}")
 
                 content = response.read()
-                print(f"OpenShelf: Downloaded {len(content)} bytes from Ercolano")
+                logger.debug("Downloaded %s bytes from Ercolano", len(content))
 
+            with span("catalog.decode", bytes=len(content)):
                 raw_data = json.loads(content.decode('utf-8'))
 
+            self._catalog_payload_size = len(content)
+            get_cache_metrics().record_miss('catalog', len(content), time.time() - fetch_start)
+
             # Parsa TUTTI i dati (senza limit qui)
             all_assets = self.parse_raw_data(raw_data)
 
@@ -130,17 +139,17 @@ class ErcolanoRepository(BaseRepository):
             # Restituisci risultato appropriato
             result_assets = all_assets if is_stats_fetch else all_assets[:limit]
 
-            print(f"OpenShelf: Fetched {len(result_assets)} assets from Ercolano (total available: {len(all_assets)})")
+            logger.info("Fetched %s assets from Ercolano (total available: %s)", len(result_assets), len(all_assets))
             return result_assets
 
         except urllib.error.URLError as e:
-            print(f"OpenShelf: Network error fetching from Ercolano: {e}")
+            logger.error("Network error fetching from Ercolano: %s", e)
             return []
         except json.JSONDecodeError as e:
-            print(f"OpenShelf: JSON decode error from Ercolano: {e}")
+            logger.error("JSON decode error from Ercolano: %s", e)
             return []
         except Exception as e:
-            print(f"OpenShelf: Error fetching from Ercolano: {e}")
+            logger.error("Error fetching from Ercolano: %s", e)
             return []
 
     def get_total_assets_count(self) -> int:
@@ -177,15 +186,16 @@ class ErcolanoRepository(BaseRepository):
             return len(records)
 
         except Exception as e:
-            print(f"OpenShelf: Error getting asset count: {e}")
+            logger.error("Error getting asset count: %s", e)
             return 0
 
 
+    @traced("catalog.parse")
     def parse_raw_data(self, raw_data: Dict[str, Any]) -> List[CulturalAsset]:
         """Converte i dati di Ercolano in CulturalAsset standardizzati"""
         assets = []
 
-        print(f"OpenShelf: Parsing Ercolano JSON structure...")
+        logger.debug("Parsing Ercolano JSON structure...")
 
         # STRUTTURA CORRETTA dal JSON:
         # {
@@ -206,29 +216,30 @@ class ErcolanoRepository(BaseRepository):
             if isinstance(json_data, dict):
                 # Ottieni informazioni totali
                 total_records = json_data.get("totRecord", 0)
-                print(f"OpenShelf: Total records available in Ercolano: {total_records}")
+                logger.debug("Total records available in Ercolano: %s", total_records)
 
                 # Ottieni array records
                 if "records" in json_data and isinstance(json_data["records"], list):
                     records = json_data["records"]
-                    print(f"OpenShelf: Found {len(records)} records in this response")
+                    logger.debug("Found %s records in this response", len(records))
                 else:
-                    print("OpenShelf: No 'records' array found in jsonData")
+                    logger.warning("No 'records' array found in jsonData")
             else:
-                print("OpenShelf: jsonData is not a dictionary")
+                logger.warning("jsonData is not a dictionary")
         else:
-            print("OpenShelf: No 'jsonData' key found in response")
-            print(f"OpenShelf: Available keys: {list(raw_data.keys()) if isinstance(raw_data, dict) else 'Not a dict'}")
+            logger.warning("No 'jsonData' key found in response")
+            logger.warning("Available keys: %s", list(raw_data.keys()) if isinstance(raw_data, dict) else 'Not a dict')
             return assets
 
         if not records:
-            print("OpenShelf: No records found to process")
+            logger.warning("No records found to process")
             return assets
 
         # Debug: mostra struttura del primo record
         if records and len(records) > 0:
             sample_record = records[0]
-            print(f"OpenShelf: Sample record keys: {list(sample_record.keys()) if isinstance(sample_record, dict) else 'Not a dict'}")
+            logger.debug("Sample record keys: %s",
+                         list(sample_record.keys()) if isinstance(sample_record, dict) else 'Not a dict')
 
             # Verifica presenza campi chiave
             key_fields = ["id", "nrInventario", "oggetto", "materiaTecnicas", "cronologias", "modelli3D_hr"]
@@ -238,25 +249,26 @@ class ErcolanoRepository(BaseRepository):
                     missing_fields.append(field)
 
             if missing_fields:
-                print(f"OpenShelf: Warning - Missing expected fields: {missing_fields}")
+                logger.warning("Missing expected fields: %s", missing_fields)
             else:
-                print("OpenShelf: ✓ All expected fields found in sample record")
+                logger.debug("✓ All expected fields found in sample record")
 
         # Processa ogni record
         processed_count = 0
         error_count = 0
+        debug_records = logger.isEnabledFor(logging.DEBUG)
 
         for i, record in enumerate(records):
             try:
                 # Valida record
                 if not isinstance(record, dict):
-                    print(f"OpenShelf: Skipping non-dict record {i}")
+                    logger.debug("Skipping non-dict record %s", i)
                     error_count += 1
                     continue
 
                 # Verifica campi minimi
                 if not record.get("id"):
-                    print(f"OpenShelf: Skipping record {i} - missing ID")
+                    logger.debug("Skipping record %s - missing ID", i)
                     error_count += 1
                     continue
 
@@ -269,23 +281,21 @@ class ErcolanoRepository(BaseRepository):
                 processed_count += 1
 
                 # Debug per primi 3 record
-                if i < 3:
-                    print(f"OpenShelf: Record {i+1}: {asset.inventory_number} - {asset.object_type}")
-                    print(f"  - Materials: {asset.materials}")
-                    print(f"  - Model URLs: {len(asset.model_urls)} found")
-                    if asset.model_urls:
-                        print(f"    First URL: {asset.model_urls[0]}")
+                if debug_records and i < 3:
+                    logger.debug("Record %d: %s - %s | materials: %s | %d model URLs%s",
+                                 i + 1, asset.inventory_number, asset.object_type, asset.materials,
+                                 len(asset.model_urls),
+                                 f" (first: {asset.model_urls[0]})" if asset.model_urls else "")
 
             except Exception as e:
-                print(f"OpenShelf: Error processing Ercolano record {i}: {e}")
+                logger.error("Error processing Ercolano record %s: %s", i, e)
                 error_count += 1
                 continue
 
-        print(f"OpenShelf: Processing complete:")
-        print(f"  - Total available: {total_records}")
-        print(f"  - Successfully processed: {processed_count}")
-        print(f"  - Errors: {error_count}")
-        print(f"  - Assets with 3D models: {len([a for a in assets if a.has_3d_model()])}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Parsed Ercolano records: %d of %d processed, %d errors, %d with 3D models",
+                        processed_count, total_records, error_count,
+                        sum(1 for a in assets if a.has_3d_model()))
 
         return assets
 
@@ -473,7 +483,7 @@ class ErcolanoRepository(BaseRepository):
                     object_types.add(asset.object_type)
             return sorted(list(object_types))
         except Exception as e:
-            print(f"OpenShelf: Error getting object types: {e}")
+            logger.error("Error getting object types: %s", e)
             return []
 
     def get_available_materials(self) -> List[str]:
@@ -486,7 +496,7 @@ class ErcolanoRepository(BaseRepository):
                     materials.add(material)
             return sorted(list(materials))
         except Exception as e:
-            print(f"OpenShelf: Error getting materials: {e}")
+            logger.error("Error getting materials: %s", e)
             return []
 
     def get_available_chronologies(self) -> List[str]:
@@ -499,5 +509,5 @@ class ErcolanoRepository(BaseRepository):
                     chronologies.add(chron)
             return sorted(list(chronologies))
         except Exception as e:
-            print(f"OpenShelf: Error getting chronologies: {e}")
+            logger.error("Error getting chronologies: %s", e)
             return []
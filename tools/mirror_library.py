@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Mirror di un repository in una libreria locale OpenShelf (pre-popolamento
+notturno di una libreria condivisa). Idempotente e riprendibile: rilanciato
+installa solo gli asset mancanti o danneggiati.
+
+Uso:
+    python tools/mirror_library.py --repository Ercolano --query "material:bronzo" \\
+        --library /srv/OpenShelf_Library --workers 8 --report mirror_report.json
+    python tools/mirror_library.py --shared /mnt/nas/OpenShelf_Shared --library /tmp/seed
+    blender --background --python tools/mirror_library.py -- --repository Ercolano
+
+Dentro Blender libreria e accesso alla rete seguono le preferenze dell'addon;
+in Python puro la libreria di default è quella di LocalLibraryManager.
+
+Codici di uscita: 0 tutto installato, 1 alcuni asset falliti, 2 errore di
+configurazione, 130 interrotto (rilanciare per riprendere)
+"""
+
+import argparse
+import importlib
+import importlib.machinery
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE_NAME = "openshelf"
+
+
+def load_addon_package():
+    """Registra la root dell'addon come package senza eseguirne __init__.py (vedi benchmarks/common.py)"""
+    if PACKAGE_NAME not in sys.modules:
+        spec = importlib.machinery.ModuleSpec(PACKAGE_NAME, None, is_package=True)
+        package = importlib.util.module_from_spec(spec)
+        package.__path__ = [str(ROOT)]
+        sys.modules[PACKAGE_NAME] = package
+
+
+def parse_args(argv):
+    # Con 'blender --python script -- args' gli argomenti dello script seguono '--'
+    if "--" in argv:
+        argv = argv[argv.index("--") + 1:]
+
+    parser = argparse.ArgumentParser(description="Mirror OpenShelf repository assets into a local library")
+    parser.add_argument("--repository", default="Ercolano", help="Repository name, or 'all'")
+    parser.add_argument("--query", default="",
+                        help="Free text plus field filters, e.g. 'anfora material:bronzo type:lucerna'")
+    parser.add_argument("--library", help="Library directory (default: add-on preference or ~/Documents/OpenShelf_Library)")
+    parser.add_argument("--shared", help="Shared library to read from and publish to (default: add-on preference)")
+    parser.add_argument("--catalog-url", help="Override the repository catalog URL (local copy or mirror)")
+    parser.add_argument("--limit", type=int, default=100000, help="Maximum number of matching assets")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--verify-checksums", action="store_true",
+                        help="Verify SHA-256 of installed files (slower, detects silent corruption)")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Skip assets that already failed this many times in previous runs")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry assets regardless of previous failures")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be installed")
+    parser.add_argument("--report", help="Write the summary report as JSON to this file")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    load_addon_package()
+    log = importlib.import_module(f"{PACKAGE_NAME}.utils.log")
+    log.configure_logging(log_level='DEBUG' if args.verbose else 'INFO')
+
+    if importlib.util.find_spec("bpy") is not None:
+        importlib.import_module(f"{PACKAGE_NAME}.utils.blender_host").install_blender_host()
+
+    library = importlib.import_module(f"{PACKAGE_NAME}.utils.local_library_manager")
+    mirror_module = importlib.import_module(f"{PACKAGE_NAME}.utils.library_mirror")
+    registry = importlib.import_module(f"{PACKAGE_NAME}.repositories.registry").RepositoryRegistry
+
+    if args.repository.lower() == "all":
+        repositories = registry.get_all_repositories()
+    else:
+        repository = registry.get_repository(args.repository)
+        if repository is None:
+            print(f"Unknown repository '{args.repository}'. Available: "
+                  f"{', '.join(registry.get_available_repositories())}", file=sys.stderr)
+            return 2
+        repositories = [repository]
+
+    if args.catalog_url:
+        for repository in repositories:
+            if hasattr(repository, 'json_url'):
+                repository.json_url = args.catalog_url
+                repository.clear_cache()
+
+    try:
+        assets = []
+        for repository in repositories:
+            assets.extend(mirror_module.select_assets(repository, args.query, args.limit))
+    except ValueError as e:
+        print(f"Invalid query: {e}", file=sys.stderr)
+        return 2
+    assets = assets[:args.limit]
+
+    manager = (library.LocalLibraryManager(args.library) if args.library
+               else library.get_library_manager())
+    if args.shared:
+        shared = importlib.import_module(f"{PACKAGE_NAME}.utils.shared_library").get_shared_library(args.shared, wait=True)
+        if shared is None:
+            print(f"Shared library {args.shared} not available", file=sys.stderr)
+            return 2
+        manager.shared_library = shared
+    print(f"OpenShelf mirror: {len(assets)} matching assets -> {manager.library_path}")
+
+    mirror = mirror_module.LibraryMirror(manager, max_concurrent=args.workers,
+                                         verify_checksums=args.verify_checksums,
+                                         max_attempts=args.max_attempts,
+                                         retry_failed=args.retry_failed,
+                                         progress_callback=print)
+
+    if args.dry_run:
+        report = mirror_module.MirrorReport()
+        todo = mirror.plan(assets, report, remove_damaged=False)
+        for snapshot, repair in todo:
+            print(f"  {'repair' if repair else 'install'} {snapshot.asset_id} {snapshot.name}")
+        print(f"{len(todo)} to install, {len(report.already_present)} already present, "
+              f"{len(report.skipped_failed)} skipped")
+        return 0
+
+    report = mirror.mirror(assets)
+
+    print()
+    for line in report.summary_lines():
+        print(line)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Report written to {args.report}")
+
+    if report.cancelled:
+        return 130
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    code = main()
+    # In Blender sys.exit chiuderebbe l'istanza anche senza --background
+    if importlib.util.find_spec("bpy") is None:
+        sys.exit(code)
@@ -15,6 +15,29 @@ from bpy.props import ( # type: ignore
 )
 import os
 import shutil
+from pathlib import Path
+from ..utils.lazy_import import lazy_import
+from ..utils.tracing import DEFAULT_TRACE_BUFFER_SIZE
+
+# Logging e host policy caricati alla prima chiamata, non all'import del pannello
+configure_from_preferences = lazy_import('..utils.log', 'configure_from_preferences', __package__)
+shutdown_logging = lazy_import('..utils.log', 'shutdown_logging', __package__)
+configure_tracing = lazy_import('..utils.tracing', 'configure_from_preferences', __package__)
+install_blender_host = lazy_import('..utils.blender_host', 'install_blender_host', __package__)
+uninstall_blender_host = lazy_import('..utils.blender_host', 'uninstall_blender_host', __package__)
+refresh_host_preferences = lazy_import('..utils.blender_host', 'refresh_host_preferences', __package__)
+
+def _update_logging(self, context):
+    """Riapplica livello e file di log quando cambiano le preferenze"""
+    configure_from_preferences(self)
+
+def _update_tracing(self, context):
+    """Accende/spegne il tracing e ridimensiona il ring buffer"""
+    configure_tracing(self)
+
+def _update_host_preferences(self, context):
+    """Aggiorna la copia delle preferenze letta dai moduli core (anche dai thread)"""
+    refresh_host_preferences(self)
 
 class OpenShelfPreferences(AddonPreferences):
     """Preferenze addon OpenShelf"""
@@ -109,6 +132,50 @@ class OpenShelfPreferences(AddonPreferences):
         default=False
     )
 
+    background_conversion: BoolProperty(
+        name="Background Conversion",
+        description="Convert batch-downloaded assets to .blend in background Blender processes, "
+                    "so the interactive session only appends the result",
+        default=False,
+        update=_update_host_preferences
+    )
+
+    conversion_workers: IntProperty(
+        name="Conversion Workers",
+        description="Number of background Blender processes (0 = number of CPU cores)",
+        default=0,
+        min=0,
+        max=32,
+        update=_update_host_preferences
+    )
+
+    texture_tiers_enabled: BoolProperty(
+        name="Generate Texture Tiers",
+        description="Create 1K/2K/4K copies of large textures when assets are installed in the library",
+        default=True,
+        update=_update_host_preferences
+    )
+
+    default_texture_tier: EnumProperty(
+        name="Default Texture Resolution",
+        description="Texture resolution used for imports when the import panel is set to Default",
+        items=[
+            ('1K', '1K', 'Longest side up to 1024 px'),
+            ('2K', '2K', 'Longest side up to 2048 px'),
+            ('4K', '4K', 'Longest side up to 4096 px'),
+            ('ORIGINAL', 'Original', 'Textures as provided by the archive'),
+        ],
+        default='2K',
+        update=_update_host_preferences
+    )
+
+    texture_render_upgrade: BoolProperty(
+        name="Full Resolution for Render",
+        description="Temporarily switch reduced textures to the originals while rendering",
+        default=True,
+        update=_update_host_preferences
+    )
+
     # === IMPOSTAZIONI UI ===
     search_results_limit: IntProperty(
         name="Search Results Limit",
@@ -140,7 +207,8 @@ class OpenShelfPreferences(AddonPreferences):
     debug_mode: BoolProperty(
         name="Debug Mode",
         description="Enable debug logging and extended error messages",
-        default=False
+        default=False,
+        update=_update_logging
     )
 
     log_level: EnumProperty(
@@ -152,14 +220,47 @@ class OpenShelfPreferences(AddonPreferences):
             ('INFO', 'Info', 'Log general information'),
             ('DEBUG', 'Debug', 'Log detailed debug information'),
         ],
-        default='INFO'
+        default='INFO',
+        update=_update_logging
+    )
+
+    log_to_file: BoolProperty(
+        name="Log to File",
+        description="Also write the log to a rotating file (5 MB, 3 backups)",
+        default=False,
+        update=_update_logging
+    )
+
+    log_file_path: StringProperty(
+        name="Log File",
+        description="Log file path (leave empty for the system temporary directory)",
+        default="",
+        subtype='FILE_PATH',
+        update=_update_logging
+    )
+
+    trace_enabled: BoolProperty(
+        name="Trace Operations",
+        description="Record timing spans for catalog, search, download, extract, import and post-processing",
+        default=False,
+        update=_update_tracing
+    )
+
+    trace_buffer_size: IntProperty(
+        name="Kept Traces",
+        description="Number of completed operations kept in memory",
+        default=DEFAULT_TRACE_BUFFER_SIZE,
+        min=1,
+        max=500,
+        update=_update_tracing
     )
 
     custom_cache_directory: StringProperty(
         name="Custom Cache Directory",
         description="Custom directory for cache files (leave empty for default)",
         default="",
-        subtype='DIR_PATH'
+        subtype='DIR_PATH',
+        update=_update_host_preferences
     )
 
     # === IMPOSTAZIONI QUALITÀ ===
@@ -213,7 +314,17 @@ class OpenShelfPreferences(AddonPreferences):
         name="Local Library Path",
         description="Path to the local 3D models library directory",
         default="",
-        subtype='DIR_PATH'
+        subtype='DIR_PATH',
+        update=_update_host_preferences
+    )
+
+    shared_library_path: StringProperty(
+        name="Shared Library Path",
+        description="Network library shared by the team: assets are downloaded once, "
+                    "then copied from the share into each local library (empty = disabled)",
+        default="",
+        subtype='DIR_PATH',
+        update=_update_host_preferences
     )
 
     auto_save_to_library: BoolProperty(
@@ -282,6 +393,32 @@ class OpenShelfPreferences(AddonPreferences):
         settings_col.prop(self, "auto_save_to_library")
         settings_col.prop(self, "show_library_status")
 
+        # Libreria condivisa di rete
+        shared_box = layout.box()
+        shared_box.label(text="Shared Library", icon='NETWORK_DRIVE')
+        shared_col = shared_box.column()
+        shared_col.prop(self, "shared_library_path", text="Shared Path")
+
+        if self.shared_library_path.strip():
+            try:
+                from ..utils.shared_library import get_shared_library, is_shared_library_probing
+                shared_path = self.shared_library_path.strip()
+                # Nessun I/O sulla share dal draw: apertura e refresh avvengono nei worker
+                shared_library = get_shared_library(shared_path)
+                info_col = shared_col.column(align=True)
+                info_col.scale_y = 0.8
+                if shared_library is None and is_shared_library_probing(shared_path):
+                    info_col.label(text="Connecting to shared library...", icon='TIME')
+                elif shared_library is None:
+                    info_col.alert = True
+                    info_col.label(text="Shared library not reachable", icon='ERROR')
+                else:
+                    shared_stats = shared_library.get_stats(refresh=False)
+                    shared_mb = shared_stats['total_size_bytes'] / (1024 * 1024)
+                    info_col.label(text=f"📦 Shared assets: {shared_stats['asset_count']} ({shared_mb:.1f} MB)")
+            except Exception as e:
+                shared_col.label(text=f"Cannot access shared library: {str(e)}", icon='ERROR')
+
         # Informazioni libreria attuale
         box = layout.box()
         box.label(text="📊 Library Information", icon='GRAPH')
@@ -388,6 +525,25 @@ class OpenShelfPreferences(AddonPreferences):
         col.prop(self, "add_cultural_metadata")
         col.prop(self, "recalculate_normals")
 
+        # Background conversion
+        box = layout.box()
+        box.label(text="Background Conversion", icon='SYSTEM')
+
+        col = box.column()
+        col.prop(self, "background_conversion")
+        sub = col.column()
+        sub.enabled = self.background_conversion
+        sub.prop(self, "conversion_workers")
+
+        # Texture tiers
+        box = layout.box()
+        box.label(text="Texture Resolution", icon='TEXTURE')
+
+        col = box.column()
+        col.prop(self, "texture_tiers_enabled")
+        col.prop(self, "default_texture_tier")
+        col.prop(self, "texture_render_upgrade")
+
         # Download settings
         box = layout.box()
         box.label(text="Download Settings", icon='URL')
@@ -570,6 +726,9 @@ class OpenShelfPreferences(AddonPreferences):
             error_col = box.column()
             error_col.label(text=f"❌ Cache info unavailable: {str(e)}", icon='ERROR')
 
+        # Metriche di efficacia cache (persistite tra sessioni)
+        self.draw_cache_metrics(layout)
+
         # Cache actions con icone e descrizioni
         box = layout.box()
         box.label(text="🛠️ Cache Management", icon='TOOL_SETTINGS')
@@ -608,6 +767,60 @@ class OpenShelfPreferences(AddonPreferences):
             tips_col.separator()
             tips_col.label(text="⚡ Enable cache for much faster repeated imports!", icon='INFO')
 
+    def draw_cache_metrics(self, layout):
+        """Disegna hit-rate, byte risparmiati e latenza delle cache"""
+        box = layout.box()
+        header = box.row()
+        header.label(text="⚡ Cache Performance", icon='SORTTIME')
+        header.operator("openshelf.reset_cache_metrics", text="", icon='LOOP_BACK')
+
+        try:
+            from ..utils.cache_metrics import get_cache_metrics
+            from ..utils.file_utils import FileUtils
+            import time
+
+            metrics = get_cache_metrics()
+            since = time.strftime('%Y-%m-%d %H:%M', time.localtime(metrics.get_since()))
+
+            info_col = box.column(align=True)
+            info_col.scale_y = 0.7
+            info_col.label(text=f"Collected since {since}")
+
+            labels = {
+                'download': ("Downloads", 'IMPORT'),
+                'catalog': ("Catalog", 'WORLD_DATA'),
+                'library': ("Local Library", 'ASSET_MANAGER'),
+                'shared': ("Shared Library", 'NETWORK_DRIVE'),
+            }
+
+            for cache_name, snapshot in metrics.get_all_snapshots().items():
+                title, icon = labels.get(cache_name, (cache_name.title(), 'FILE_CACHE'))
+
+                sub_box = box.box()
+                sub_box.label(text=title, icon=icon)
+
+                col = sub_box.column(align=True)
+                col.scale_y = 0.8
+
+                if snapshot['lookups'] == 0:
+                    col.label(text="No activity recorded yet")
+                    continue
+
+                col.label(text=f"Hit rate: {snapshot['hit_rate']:.1f}% "
+                               f"({snapshot['hits']} hits / {snapshot['misses']} misses)")
+                col.label(text=f"Served from cache: {FileUtils.format_file_size(snapshot['bytes_from_cache'])}")
+                col.label(text=f"Fetched from network: {FileUtils.format_file_size(snapshot['bytes_from_network'])}")
+
+                if snapshot['fetch_count'] > 0:
+                    col.label(text=f"Avg fetch time: {snapshot['avg_fetch_time']:.2f}s")
+
+                if snapshot['evictions'] > 0:
+                    col.label(text=f"Evictions: {snapshot['evictions']} "
+                                   f"({FileUtils.format_file_size(snapshot['bytes_evicted'])})")
+
+        except Exception as e:
+            box.label(text=f"❌ Metrics unavailable: {str(e)}", icon='ERROR')
+
     def draw_advanced_tab(self, layout):
         """Disegna tab impostazioni avanzate"""
 
@@ -618,11 +831,30 @@ class OpenShelfPreferences(AddonPreferences):
         col = box.column()
         col.prop(self, "debug_mode")
         col.prop(self, "log_level")
+        col.prop(self, "log_to_file")
+        sub = col.column()
+        sub.enabled = self.log_to_file
+        sub.prop(self, "log_file_path")
 
         if self.debug_mode:
             col.separator()
             col.label(text="Debug mode enabled - check console for detailed logs")
 
+        # Tracing
+        box = layout.box()
+        box.label(text="Tracing", icon='SORTTIME')
+
+        col = box.column()
+        col.prop(self, "trace_enabled")
+        sub = col.column()
+        sub.enabled = self.trace_enabled
+        sub.prop(self, "trace_buffer_size")
+
+        row = box.row(align=True)
+        row.operator("openshelf.export_trace", text="Export Chrome Trace", icon='EXPORT')
+        row.operator("openshelf.clear_traces", text="Clear", icon='TRASH')
+        box.label(text="Timeline: 3D View > OpenShelf > Trace Timeline", icon='INFO')
+
         # Advanced cache
         box = layout.box()
         box.label(text="Advanced Cache", icon='SETTINGS')
@@ -769,13 +1001,13 @@ class OPENSHELF_OT_refresh_library(Operator):
 
     def execute(self, context):
         try:
-            # Forza ricreazione del library manager
+            # Ricostruisce l'indice dal contenuto reale della cartella models/
             from ..utils.local_library_manager import get_library_manager
-            global _global_library_manager
-            _global_library_manager = None
-
-            # Ricrea manager
             library_manager = get_library_manager()
+            # Solo dimensioni: gli SHA-256 dell'intera libreria bloccherebbero l'interfaccia
+            if library_manager.rebuild_index(with_checksum=False) is None:
+                self.report({'ERROR'}, "Cannot rebuild library index (see console)")
+                return {'CANCELLED'}
             stats = library_manager.get_library_stats()
 
             if stats.get("error"):
@@ -805,29 +1037,23 @@ class OPENSHELF_OT_cleanup_library(Operator):
             from ..utils.local_library_manager import get_library_manager
             library_manager = get_library_manager()
 
-            # Trova asset corrotti o incompleti
-            models_dir = library_manager.models_dir
-            cleaned_count = 0
+            # L'indice ricostruito contiene solo asset con metadata.json e un modello 3D;
+            # se la ricostruzione fallisce l'indice non è affidabile e non si cancella nulla
+            if library_manager.rebuild_index(with_checksum=False) is None:
+                self.report({'ERROR'}, "Cannot rebuild library index, cleanup aborted (see console)")
+                return {'CANCELLED'}
 
-            for asset_dir in models_dir.iterdir():
-                if asset_dir.is_dir():
-                    # Controlla se ha metadata.json
-                    metadata_file = asset_dir / "metadata.json"
-                    if not metadata_file.exists():
-                        shutil.rmtree(asset_dir)
-                        cleaned_count += 1
-                        continue
-
-                    # Controlla se ha almeno un file 3D
-                    has_3d_file = False
-                    for ext in ['.obj', '.gltf', '.glb']:
-                        if list(asset_dir.glob(f"*{ext}")):
-                            has_3d_file = True
-                            break
-
-                    if not has_3d_file:
-                        shutil.rmtree(asset_dir)
-                        cleaned_count += 1
+            indexed_names = {
+                Path(library_manager.index.get(asset_id)['asset_dir']).name
+                for asset_id in library_manager.index.asset_ids()
+            }
+
+            # Rimuove gli asset corrotti o incompleti
+            cleaned_count = 0
+            for asset_dir in library_manager.models_dir.iterdir():
+                if asset_dir.is_dir() and asset_dir.name not in indexed_names:
+                    shutil.rmtree(asset_dir)
+                    cleaned_count += 1
 
             if cleaned_count > 0:
                 self.report({'INFO'}, f"Cleaned up {cleaned_count} invalid assets")
@@ -854,7 +1080,20 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
 
+    # Rete e preferenze per i moduli core (repository, download, libreria)
+    install_blender_host()
+
+    # Livello di log e tracing dalle preferenze salvate
+    try:
+        prefs = get_addon_preferences()
+        configure_from_preferences(prefs)
+        configure_tracing(prefs)
+    except Exception as e:
+        print(f"OpenShelf: Cannot apply logging preferences: {e}")
+
 def unregister():
     """Deregistra le preferenze"""
+    shutdown_logging()
+    uninstall_blender_host()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
@@ -6,7 +6,23 @@ FIX: Gestione robusta operatori mancanti e selezione asset
 
 import bpy # type: ignore
 from bpy.types import Panel # type: ignore
-from ..utils.local_library_manager import get_library_manager
+from ..utils.redraw_scheduler import request_redraw
+from ..utils.lazy_import import lazy_import
+from ..utils.library_status import STATUS_DOWNLOADED, STATUS_PARTIAL
+
+# La libreria (SQLite, download) si carica al primo draw che ne ha bisogno
+get_library_manager = lazy_import('..utils.local_library_manager', 'get_library_manager', __package__)
+
+# Icone badge per lo stato libreria dei risultati
+LIBRARY_STATUS_ICONS = {
+    STATUS_DOWNLOADED: 'CHECKMARK',  # ✓ Asset in libreria
+    STATUS_PARTIAL: 'SORTTIME',      # ⏳ Download in corso
+}
+
+# Stato libreria dei risultati, ricalcolato in filter_items solo se risultati o libreria cambiano
+_results_library_status = {}
+# (status_version della libreria, ID dei risultati) dell'ultimo calcolo
+_results_status_key = None
 
 def check_operator_available(operator_idname):
     """Controlla se un operatore è disponibile"""
@@ -570,6 +586,10 @@ class OPENSHELF_PT_import_settings_panel(Panel):
         col = box.column(align=True)
         col.prop(scene, 'openshelf_apply_materials', text="Apply Materials")
         col.prop(scene, 'openshelf_add_metadata', text="Cultural Metadata")
+        col.prop(scene, 'openshelf_reuse_mesh_data', text="Reuse Mesh Data")
+        col.prop(scene, 'openshelf_use_blend_cache', text="Blend Cache")
+        col.prop(scene, 'openshelf_proxy_import', text="Proxy First (LOD)")
+        col.prop(scene, 'openshelf_texture_tier', text="Textures")
 
         # SEZIONE PRESET
         box = layout.box()
@@ -695,15 +715,9 @@ class OPENSHELF_UL_search_results(bpy.types.UIList):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             row = layout.row(align=True)
 
-            # 🔹 Icona status libreria
-            try:
-                library_manager = get_library_manager()
-                if library_manager.is_asset_downloaded(item.asset_id):
-                    row.label(icon='CHECKMARK')  # ✓ Asset in libreria
-                else:
-                    row.label(icon='IMPORT')     # ⬇️ Asset da scaricare
-            except:
-                row.label(icon='OBJECT_DATAMODE')  # Fallback
+            # 🔹 Icona status libreria (precalcolata per tutte le righe)
+            status = _results_library_status.get(item.asset_id)
+            row.label(icon=LIBRARY_STATUS_ICONS.get(status, 'IMPORT'))  # ⬇️ Asset da scaricare
 
             # 🔹 INVENTORY (6 caratteri max)
             inv = item.inventory_number[:6] if item.inventory_number else f"#{item.asset_id[:4]}"
@@ -727,6 +741,35 @@ class OPENSHELF_UL_search_results(bpy.types.UIList):
             #repo_abbr = item.repository[:3].upper() if item.repository else "UNK"
             #row.label(text=repo_abbr)
 
+    def filter_items(self, context, data, propname):
+        """Filtro/ordinamento standard + stato libreria di tutti i risultati in un colpo solo"""
+        items = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+
+        flt_flags = []
+        flt_neworder = []
+
+        if self.filter_name:
+            flt_flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name")
+        if self.use_filter_sort_alpha:
+            flt_neworder = helper.sort_items_by_name(items, "name")
+
+        global _results_status_key
+        try:
+            library_manager = get_library_manager()
+            asset_ids = [item.asset_id for item in items]
+            key = (library_manager.status_version, tuple(asset_ids))
+            if key != _results_status_key:
+                _results_library_status.clear()
+                _results_library_status.update(library_manager.get_assets_status(asset_ids))
+                _results_status_key = key
+        except Exception as e:
+            print(f"OpenShelf: Cannot get library status for results: {e}")
+            _results_library_status.clear()
+            _results_status_key = None
+
+        return flt_flags, flt_neworder
+
 
 # Operatori per preset e utilità - con controlli robustezza
 class OPENSHELF_OT_apply_import_preset(bpy.types.Operator):
@@ -962,9 +1005,7 @@ class OPENSHELF_OT_select_result(bpy.types.Operator):
             scene.openshelf_selected_result_index = self.result_index
 
             # Force UI redraw
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
+            request_redraw()
 
             selected_asset = scene.openshelf_search_results[self.result_index]
             print(f"OpenShelf: Selected asset {self.result_index}: {selected_asset.name}")
@@ -214,11 +214,52 @@ class OPENSHELF_PT_object_info(Panel):
             texture_icon = 'CHECKMARK' if has_textures else 'X'
             box.label(text=f"Textures: {'Yes' if has_textures else 'No'}", icon=texture_icon)
 
+        # File dell'archivio non estratti all'installazione (documenti, texture non referenziate)
+        if 'openshelf_id' in openshelf_props:
+            op = box.operator("openshelf.fetch_skipped_files", icon='IMPORT')
+            op.asset_id = openshelf_props['openshelf_id']
+
         # Timestamp import
         if 'openshelf_import_timestamp' in openshelf_props:
             timestamp = openshelf_props['openshelf_import_timestamp']
             box.label(text=f"Imported: Frame {timestamp}")
 
+        # Risoluzione texture
+        tiers = set()
+        for slot in obj.material_slots:
+            if not slot.material or not slot.material.use_nodes or not slot.material.node_tree:
+                continue
+            for node in slot.material.node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image and node.image.get('openshelf_texture_tier'):
+                    tiers.add(node.image['openshelf_texture_tier'])
+
+        if tiers:
+            box = layout.box()
+            box.label(text="Texture Resolution", icon='TEXTURE')
+            box.label(text=f"Current: {', '.join(sorted(tiers))}")
+
+            row = box.row(align=True)
+            for tier, label in (('1K', "1K"), ('2K', "2K"), ('4K', "4K"), ('ORIGINAL', "Original")):
+                op = row.operator("openshelf.set_texture_tier", text=label, depress=tiers == {tier})
+                op.tier = tier
+
+            if tiers != {'ORIGINAL'}:
+                box.operator("openshelf.render_full_resolution", icon='RENDER_STILL')
+
+        # Livello di dettaglio
+        if 'openshelf_lod_level' in openshelf_props:
+            box = layout.box()
+            box.label(text="Level of Detail", icon='MOD_DECIM')
+
+            faces = len(obj.data.polygons) if obj.type == 'MESH' and obj.data else 0
+            box.label(text=f"Current: {openshelf_props['openshelf_lod_level']} ({faces:,} faces)")
+
+            row = box.row(align=True)
+            for level, label in (('PROXY', "Proxy"), ('MEDIUM', "Medium"), ('FULL', "Full")):
+                op = row.operator("openshelf.swap_lod", text=label,
+                                  depress=openshelf_props['openshelf_lod_level'] == level)
+                op.level = level
+
         # Link esterni
         if any(key in openshelf_props for key in ['openshelf_detail_url', 'openshelf_catalog_url']):
             box = layout.box()
@@ -347,12 +388,77 @@ class OPENSHELF_PT_help_panel(Panel):
         col.label(text="Cultural Heritage Assets")
         col.label(text="GPL-3.0-or-later")
 
+class OPENSHELF_PT_trace_panel(Panel):
+    """Timeline delle operazioni tracciate (debug)"""
+    bl_label = "Trace Timeline"
+    bl_idname = "OPENSHELF_PT_trace_panel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "OpenShelf"
+    bl_parent_id = "OPENSHELF_PT_main_panel"
+    bl_order = 12
+    bl_options = {'DEFAULT_CLOSED'}
+
+    # Righe di span mostrate per operazione (il resto è nell'export)
+    MAX_SPAN_ROWS = 40
+
+    @classmethod
+    def poll(cls, context):
+        try:
+            addon = context.preferences.addons[__package__.split('.')[0]]
+            return addon.preferences.trace_enabled
+        except (KeyError, AttributeError):
+            return False
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        from ..utils.tracing import get_tracer
+        operations = get_tracer().get_operations()
+
+        row = layout.row(align=True)
+        row.label(text=f"{len(operations)} operations", icon='SORTTIME')
+        row.operator("openshelf.export_trace", text="", icon='EXPORT')
+        row.operator("openshelf.clear_traces", text="", icon='TRASH')
+
+        if not operations:
+            layout.label(text="Run a search or an import to record a trace")
+            return
+
+        layout.prop(scene, "openshelf_trace_index")
+        operation = operations[min(scene.openshelf_trace_index, len(operations) - 1)]
+
+        box = layout.box()
+        header = box.column(align=True)
+        status_icon = 'CHECKMARK' if operation.status == 'OK' else 'ERROR'
+        header.label(text=f"{operation.name}: {operation.duration_ms:.1f} ms", icon=status_icon)
+        for key, value in operation.args.items():
+            header.label(text=f"{key}: {value}")
+
+        total_ms = max(operation.duration_ms, 0.001)
+        spans = sorted(operation.spans, key=lambda span: span.start)
+
+        col = box.column(align=True)
+        col.scale_y = 0.8
+        for span in spans[:self.MAX_SPAN_ROWS]:
+            offset_ms = (span.start - operation.start) * 1000
+
+            row = col.split(factor=0.45)
+            row.label(text="  " * span.depth + span.name)
+            row.progress(factor=min(span.duration_ms / total_ms, 1.0), type='BAR',
+                         text=f"+{offset_ms:.0f}  {span.duration_ms:.1f} ms")
+
+        if len(spans) > self.MAX_SPAN_ROWS:
+            col.label(text=f"... {len(spans) - self.MAX_SPAN_ROWS} more spans (export for the full trace)")
+
 # Lista pannelli da registrare
 panels = [
     OPENSHELF_PT_object_info,
     OPENSHELF_PT_quick_actions,
     OPENSHELF_PT_statistics_panel,
     OPENSHELF_PT_help_panel,
+    OPENSHELF_PT_trace_panel,
 ]
 
 def register():
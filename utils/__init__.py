@@ -1,12 +1,21 @@
 """
 OpenShelf Utils Module
 Utilities riutilizzabili per download, import e gestione file
+
+I sottomoduli non vengono importati qui: ognuno viene caricato dal primo
+operatore che lo usa (vedi lazy_import), così l'avvio di Blender non paga
+download manager, loader e dipendenze di rete
 """
 
-from . import download_manager
-from . import obj_loader
-from . import gltf_loader
-from . import file_utils
+import importlib
+
+_LAZY_SUBMODULES = ('download_manager', 'obj_loader', 'gltf_loader', 'file_utils')
+
+def __getattr__(name):
+    """Compatibilità con 'from .utils import download_manager' (import su richiesta)"""
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Non c'è bisogno di registrazione per le utils
 def register():
@@ -0,0 +1,262 @@
+"""
+OpenShelf Archive Extractor
+Estrazione parallela di archivi ZIP (texture multiple) con I/O bufferizzato,
+preallocazione dei file e progresso per byte
+"""
+
+import os
+import zipfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, List, Callable, Iterable
+from .tracing import traced
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Buffer di lettura/scrittura per membro (1MB)
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Sotto queste soglie il thread pool non conviene: estrazione sequenziale
+MIN_PARALLEL_MEMBERS = 2
+MIN_PARALLEL_BYTES = 4 * 1024 * 1024
+
+# Intervallo di polling del thread chiamante per il progresso (secondi)
+PROGRESS_POLL_INTERVAL = 0.05
+
+
+def safe_member_path(dest_dir: Path, member_name: str) -> Optional[Path]:
+    """
+    Calcola il path di destinazione di un membro ZIP impedendo path traversal
+
+    Args:
+        dest_dir: Directory di destinazione
+        member_name: Nome del membro nell'archivio
+
+    Returns:
+        Path di destinazione o None se il nome non è sicuro
+    """
+    name = member_name.replace('\\', '/')
+    parts = [part for part in name.split('/') if part not in ('', '.')]
+
+    if not parts or any(part == '..' for part in parts):
+        return None
+
+    # Rimuove eventuali lettere di drive (es. "C:")
+    parts[0] = os.path.splitdrive(parts[0])[1] or parts[0]
+    if ':' in parts[0]:
+        return None
+
+    return dest_dir.joinpath(*parts)
+
+
+def _preallocate(file_obj, size: int):
+    """Prealloca lo spazio su disco per ridurre la frammentazione"""
+    if size <= 0:
+        return
+
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(file_obj.fileno(), 0, size)
+            return
+    except OSError:
+        pass
+
+    try:
+        file_obj.truncate(size)
+    except OSError:
+        pass
+
+
+class ArchiveExtractor:
+    """Estrae i membri indipendenti di uno ZIP in un thread pool (zlib rilascia il GIL)"""
+
+    def __init__(self, max_workers: Optional[int] = None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 2)
+
+        self.max_workers = max(1, max_workers)
+        self.buffer_size = buffer_size
+
+    @traced("extract")
+    def extract(self, archive_path: str, dest_dir: str,
+                members: Optional[Iterable[str]] = None,
+                progress_callback: Optional[Callable[[int, int], None]] = None,
+                cancel_event: Optional[threading.Event] = None) -> List[str]:
+        """
+        Estrae un archivio ZIP
+
+        Args:
+            archive_path: Path all'archivio ZIP
+            dest_dir: Directory di destinazione
+            members: Nomi dei membri da estrarre (None = tutti)
+            progress_callback: Callback (bytes_estratti, bytes_totali), sempre
+                invocata nel thread chiamante
+            cancel_event: Evento per interrompere l'estrazione
+
+        Returns:
+            Lista dei path estratti
+        """
+        dest_path = Path(dest_dir)
+        dest_path.mkdir(parents=True, exist_ok=True)
+
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            infos = self._select_members(zip_ref, members)
+
+        # Prepara destinazioni e directory nel thread chiamante
+        jobs = []
+        for info in infos:
+            target = safe_member_path(dest_path, info.filename)
+            if target is None:
+                logger.warning("Skipping unsafe archive member %s", info.filename)
+                continue
+
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            jobs.append((info, target))
+
+        total_bytes = sum(info.file_size for info, _ in jobs)
+        if progress_callback:
+            progress_callback(0, total_bytes)
+
+        if (self.max_workers == 1 or len(jobs) < MIN_PARALLEL_MEMBERS
+                or total_bytes < MIN_PARALLEL_BYTES):
+            self._extract_sequential(archive_path, jobs, total_bytes, progress_callback, cancel_event)
+        else:
+            self._extract_parallel(archive_path, jobs, total_bytes, progress_callback, cancel_event)
+
+        return [str(target) for _, target in jobs]
+
+    def _select_members(self, zip_ref: zipfile.ZipFile,
+                        members: Optional[Iterable[str]]) -> List[zipfile.ZipInfo]:
+        """Filtra i membri richiesti mantenendo l'ordine dell'archivio"""
+        infos = zip_ref.infolist()
+        if members is None:
+            return infos
+
+        wanted = set(members)
+        return [info for info in infos if info.filename in wanted]
+
+    def _extract_sequential(self, archive_path, jobs, total_bytes, progress_callback, cancel_event):
+        """Estrazione su singolo thread (archivi piccoli)"""
+        done = [0]
+
+        def on_bytes(count):
+            done[0] += count
+            if progress_callback:
+                progress_callback(done[0], total_bytes)
+
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            for info, target in jobs:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise InterruptedError("Extraction cancelled")
+                self._extract_member(zip_ref, info, target, on_bytes, cancel_event)
+
+    def _extract_parallel(self, archive_path, jobs, total_bytes, progress_callback, cancel_event):
+        """Estrazione nel thread pool con un handle ZIP per worker"""
+        local = threading.local()
+        handles = []
+        handles_lock = threading.Lock()
+        progress_lock = threading.Lock()
+        done = [0]
+        # Evento privato: un errore in un worker non deve impostare l'evento del chiamante,
+        # mentre l'annullamento del chiamante viene inoltrato dal ciclo di polling
+        stop_event = threading.Event()
+
+        def get_handle():
+            zip_ref = getattr(local, 'zip_ref', None)
+            if zip_ref is None:
+                zip_ref = zipfile.ZipFile(archive_path, 'r')
+                local.zip_ref = zip_ref
+                with handles_lock:
+                    handles.append(zip_ref)
+            return zip_ref
+
+        def on_bytes(count):
+            with progress_lock:
+                done[0] += count
+
+        def worker(info, target):
+            if stop_event.is_set():
+                raise InterruptedError("Extraction cancelled")
+            self._extract_member(get_handle(), info, target, on_bytes, stop_event)
+
+        # I membri più grandi per primi bilanciano meglio il carico
+        ordered = sorted(jobs, key=lambda job: job[0].file_size, reverse=True)
+        last_reported = -1
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                      thread_name_prefix="openshelf_extract")
+        try:
+            pending = {executor.submit(worker, info, target) for info, target in ordered}
+
+            while pending:
+                finished, pending = wait(pending, timeout=PROGRESS_POLL_INTERVAL,
+                                         return_when=FIRST_COMPLETED)
+
+                if cancel_event is not None and cancel_event.is_set():
+                    stop_event.set()
+
+                for future in finished:
+                    error = future.exception()
+                    if error is not None:
+                        stop_event.set()
+                        raise error
+
+                if progress_callback:
+                    with progress_lock:
+                        current = done[0]
+                    if current != last_reported:
+                        progress_callback(current, total_bytes)
+                        last_reported = current
+
+            if stop_event.is_set():
+                raise InterruptedError("Extraction cancelled")
+
+        finally:
+            executor.shutdown(wait=True)
+            for zip_ref in handles:
+                zip_ref.close()
+
+    def _extract_member(self, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path,
+                        on_bytes: Callable[[int], None], cancel_event: Optional[threading.Event]):
+        """Decomprime un singolo membro con buffer grandi e preallocazione"""
+        written = 0
+
+        with zip_ref.open(info, 'r') as source, \
+                open(target, 'wb', buffering=self.buffer_size) as dest:
+            _preallocate(dest, info.file_size)
+
+            while True:
+                # Mai un ritorno silenzioso: il membro resterebbe troncato
+                if cancel_event is not None and cancel_event.is_set():
+                    raise InterruptedError("Extraction cancelled")
+
+                chunk = source.read(self.buffer_size)
+                if not chunk:
+                    break
+
+                dest.write(chunk)
+                written += len(chunk)
+                on_bytes(len(chunk))
+
+            # Allinea la dimensione se la preallocazione ha ecceduto
+            if written != info.file_size:
+                dest.truncate(written)
+
+
+# Istanza globale
+_global_archive_extractor = None
+
+def get_archive_extractor() -> ArchiveExtractor:
+    """Ottiene l'istanza globale dell'estrattore archivi"""
+    global _global_archive_extractor
+
+    if _global_archive_extractor is None:
+        _global_archive_extractor = ArchiveExtractor()
+
+    return _global_archive_extractor
@@ -0,0 +1,286 @@
+"""
+OpenShelf Archive Planner
+Legge la central directory di uno ZIP e sceglie cosa estrarre: il modello principale
+più esattamente i file MTL/texture/buffer che referenzia
+"""
+
+import io
+import json
+import posixpath
+import zipfile
+from urllib.parse import unquote
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any
+from .tracing import traced
+
+# Priorità formati (stessa di LocalLibraryManager._get_primary_model_file)
+MODEL_EXTENSIONS = ['.obj', '.gltf', '.glb']
+
+# Marcatori di nomi che indicano varianti da non preferire come modello principale
+SECONDARY_MODEL_MARKERS = ('preview', 'thumb', 'lod1', 'lod2', 'lod3', 'lowres', 'low_res', '_low', 'proxy')
+
+# Blocchi letti dall'OBJ cercando le direttive mtllib (possono stare ovunque nel file)
+OBJ_SCAN_CHUNK_BYTES = 1024 * 1024
+
+# Estensioni immagine incluse in blocco se qualche texture non è risolvibile
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tif', '.tiff', '.bmp', '.tga', '.exr', '.hdr', '.webp')
+
+# Direttive MTL che referenziano file texture
+MTL_MAP_KEYWORDS = (
+    'map_ka', 'map_kd', 'map_ks', 'map_ns', 'map_d', 'map_bump', 'bump',
+    'disp', 'decal', 'refl', 'map_pr', 'map_pm', 'map_ps', 'map_ke', 'norm'
+)
+
+
+@dataclass
+class ArchivePlan:
+    """Piano di estrazione selettiva di un archivio"""
+    primary_model: Optional[str] = None
+    members: List[str] = field(default_factory=list)
+    skipped: List[Dict[str, Any]] = field(default_factory=list)
+    unresolved: List[str] = field(default_factory=list)
+    total_size: int = 0
+    selected_size: int = 0
+
+    @property
+    def is_selective(self) -> bool:
+        """True se il piano esclude almeno un membro"""
+        return bool(self.skipped)
+
+
+class _MemberIndex:
+    """Indice dei membri per risolvere riferimenti con path/case non coerenti"""
+
+    def __init__(self, infos: List[zipfile.ZipInfo]):
+        self.by_name = {}
+        self.by_lower = {}
+        self.by_basename = {}
+
+        for info in infos:
+            if info.is_dir():
+                continue
+            name = info.filename
+            self.by_name[name] = info
+            self.by_lower.setdefault(name.lower(), name)
+            self.by_basename.setdefault(posixpath.basename(name).lower(), []).append(name)
+
+    def resolve(self, base_dir: str, reference: str) -> Optional[str]:
+        """Risolve un riferimento relativo a base_dir su un membro esistente"""
+        reference = reference.strip().strip('"').replace('\\', '/')
+        if not reference or reference.startswith('data:'):
+            return None
+
+        candidate = posixpath.normpath(posixpath.join(base_dir, reference)) if base_dir else posixpath.normpath(reference)
+
+        if candidate in self.by_name:
+            return candidate
+
+        lowered = self.by_lower.get(candidate.lower())
+        if lowered:
+            return lowered
+
+        # Fallback: stesso nome file altrove nell'archivio (preferisce il più vicino al modello)
+        matches = self.by_basename.get(posixpath.basename(reference).lower(), [])
+        if matches:
+            return sorted(matches, key=lambda name: (not name.startswith(base_dir), len(name)))[0]
+
+        return None
+
+
+def choose_primary_model(infos: List[zipfile.ZipInfo]) -> Optional[zipfile.ZipInfo]:
+    """Sceglie il modello principale: formato prioritario, niente varianti, più grande"""
+    for ext in MODEL_EXTENSIONS:
+        candidates = [info for info in infos
+                      if not info.is_dir() and info.filename.lower().endswith(ext)
+                      and not posixpath.basename(info.filename).startswith('._')]
+        if not candidates:
+            continue
+
+        def sort_key(info):
+            name = posixpath.basename(info.filename).lower()
+            is_secondary = any(marker in name for marker in SECONDARY_MODEL_MARKERS)
+            return (is_secondary, -info.file_size)
+
+        return sorted(candidates, key=sort_key)[0]
+
+    return None
+
+
+def _read_text_lines(zip_ref: zipfile.ZipFile, name: str) -> List[str]:
+    """Legge un membro testuale come lista di righe"""
+    with zip_ref.open(name, 'r') as member:
+        data = member.read()
+
+    text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', errors='ignore')
+    return text.readlines()
+
+
+def _read_mtllib_lines(zip_ref: zipfile.ZipFile, name: str) -> List[str]:
+    """
+    Righe mtllib di un OBJ, cercate in tutto il file a blocchi: solo i blocchi
+    che contengono la direttiva vengono divisi in righe
+    """
+    lines = []
+
+    def collect(data: bytes):
+        if b'mtllib' in data.lower():
+            lines.extend(line.decode('utf-8', errors='ignore') for line in data.splitlines()
+                         if line.lstrip().lower().startswith(b'mtllib'))
+
+    remainder = b''
+    with zip_ref.open(name, 'r') as member:
+        while True:
+            chunk = member.read(OBJ_SCAN_CHUNK_BYTES)
+            if not chunk:
+                break
+            data = remainder + chunk
+            cut = data.rfind(b'\n') + 1
+            remainder = data[cut:]
+            collect(data[:cut])
+
+    collect(remainder)
+    return lines
+
+
+def _parse_mtllib_references(lines: List[str]) -> List[str]:
+    """Estrae i nomi file dalle direttive mtllib di un OBJ"""
+    references = []
+    for line in lines:
+        stripped = line.strip()
+        if stripped.lower().startswith('mtllib '):
+            value = stripped[7:].strip()
+            # Nomi con spazi sono ammessi: prova prima il valore intero
+            if value:
+                references.append(value)
+    return references
+
+
+def _parse_mtl_texture_references(lines: List[str]) -> List[str]:
+    """Estrae i path texture da un file MTL (ignora le opzioni -bm, -s, ...)"""
+    references = []
+    for line in lines:
+        tokens = line.strip().split()
+        if len(tokens) < 2 or tokens[0].lower() not in MTL_MAP_KEYWORDS:
+            continue
+
+        # Il path è l'ultimo argomento dopo le opzioni
+        args = tokens[1:]
+        i = 0
+        while i < len(args) and args[i].startswith('-'):
+            option = args[i].lower()
+            if option in ('-o', '-s', '-t'):
+                i += 4
+            elif option == '-mm':
+                i += 3
+            else:
+                i += 2
+        if i < len(args):
+            references.append(" ".join(args[i:]))
+    return references
+
+
+def _collect_obj_dependencies(zip_ref, index, primary_name, plan):
+    """Aggiunge al piano gli MTL e le texture referenziate da un OBJ"""
+    base_dir = posixpath.dirname(primary_name)
+    mtl_refs = _parse_mtllib_references(_read_mtllib_lines(zip_ref, primary_name))
+
+    mtl_members = []
+    for ref in mtl_refs:
+        resolved = index.resolve(base_dir, ref)
+        if resolved is None:
+            # mtllib con più file separati da spazi
+            for part in ref.split():
+                part_resolved = index.resolve(base_dir, part)
+                if part_resolved:
+                    mtl_members.append(part_resolved)
+                else:
+                    plan.unresolved.append(part)
+        else:
+            mtl_members.append(resolved)
+
+    if not mtl_refs:
+        # Nessun mtllib nel modello: usa l'MTL con lo stesso nome del modello
+        stem = posixpath.splitext(primary_name)[0].lower()
+        same_name = index.by_lower.get(f"{stem}.mtl")
+        if same_name:
+            mtl_members.append(same_name)
+
+    for mtl_name in mtl_members:
+        if mtl_name in plan.members:
+            continue
+        plan.members.append(mtl_name)
+
+        mtl_dir = posixpath.dirname(mtl_name)
+        for texture_ref in _parse_mtl_texture_references(_read_text_lines(zip_ref, mtl_name)):
+            texture_name = index.resolve(mtl_dir, texture_ref)
+            if texture_name is None:
+                plan.unresolved.append(texture_ref)
+            elif texture_name not in plan.members:
+                plan.members.append(texture_name)
+
+
+def _collect_gltf_dependencies(zip_ref, index, primary_name, plan):
+    """Aggiunge al piano buffer e immagini esterne referenziati da un .gltf"""
+    base_dir = posixpath.dirname(primary_name)
+    with zip_ref.open(primary_name, 'r') as member:
+        gltf = json.loads(member.read().decode('utf-8', errors='ignore'))
+
+    for entry in gltf.get('buffers', []) + gltf.get('images', []):
+        uri = entry.get('uri')
+        if not uri or uri.startswith('data:'):
+            continue
+
+        resolved = index.resolve(base_dir, unquote(uri))
+        if resolved is None:
+            plan.unresolved.append(uri)
+        elif resolved not in plan.members:
+            plan.members.append(resolved)
+
+
+@traced("extract.plan")
+def plan_archive(archive_path: str) -> Optional[ArchivePlan]:
+    """
+    Costruisce il piano di estrazione selettiva di un archivio ZIP
+
+    Args:
+        archive_path: Path all'archivio ZIP
+
+    Returns:
+        ArchivePlan o None se l'archivio non contiene modelli supportati
+    """
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        infos = [info for info in zip_ref.infolist() if not info.is_dir()]
+        primary = choose_primary_model(infos)
+
+        if primary is None:
+            return None
+
+        plan = ArchivePlan(primary_model=primary.filename, members=[primary.filename])
+        index = _MemberIndex(infos)
+        extension = posixpath.splitext(primary.filename)[1].lower()
+
+        try:
+            if extension == '.obj':
+                _collect_obj_dependencies(zip_ref, index, primary.filename, plan)
+            elif extension == '.gltf':
+                _collect_gltf_dependencies(zip_ref, index, primary.filename, plan)
+        except Exception as e:
+            # Piano non affidabile: meglio estrarre tutto che perdere texture
+            print(f"OpenShelf: Cannot plan dependencies of {primary.filename}: {e}")
+            plan.members = [info.filename for info in infos]
+
+        if plan.unresolved:
+            # Riferimenti non risolti: meglio includere tutte le immagini che perdere texture
+            for info in infos:
+                if info.filename.lower().endswith(IMAGE_EXTENSIONS) and info.filename not in plan.members:
+                    plan.members.append(info.filename)
+
+    selected = set(plan.members)
+    plan.total_size = sum(info.file_size for info in infos)
+    plan.selected_size = sum(info.file_size for info in infos if info.filename in selected)
+    plan.skipped = [
+        {'name': info.filename, 'size': info.file_size}
+        for info in infos if info.filename not in selected
+    ]
+
+    return plan
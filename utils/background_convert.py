@@ -0,0 +1,140 @@
+"""
+OpenShelf Background Convert
+Script eseguito da un Blender headless (non importato dall'addon):
+
+    blender --background --factory-startup --python background_convert.py -- <modello> <output.blend>
+    blender --background --factory-startup --python background_convert.py -- --lod <sorgente.blend> <lod.blend> <spec JSON>
+
+Importa il modello OBJ/glTF in una scena vuota, prepara materiali e origine come
+OBJLoader e scrive gli oggetti nel .blend di cache dell'asset. Con --lod carica
+l'oggetto salvato dalla sessione interattiva e scrive le mesh decimate dei LOD
+"""
+
+import json
+import os
+import sys
+
+import bpy # type: ignore
+
+# mesh_ops (e tracing) caricabili accanto allo script senza il package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mesh_ops import center_origin # noqa: E402
+
+
+def parse_args():
+    """Argomenti dopo '--' nella riga di comando di Blender"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if len(argv) == 4 and argv[0] == "--lod":
+        return argv
+    if len(argv) != 2:
+        raise SystemExit("Usage: blender --background --python background_convert.py -- <model> <output.blend>\n"
+                         "       ... -- --lod <source.blend> <lod.blend> <spec JSON>")
+    return argv
+
+
+def import_model(model_file):
+    """Importa il modello con gli stessi assi di OBJLoader e restituisce gli oggetti creati"""
+    ext = os.path.splitext(model_file)[1].lower()
+
+    if ext == '.obj':
+        bpy.ops.wm.obj_import(filepath=model_file, use_split_objects=True,
+                              forward_axis='NEGATIVE_Z', up_axis='Y')
+    elif ext in ('.gltf', '.glb'):
+        bpy.ops.import_scene.gltf(filepath=model_file)
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+    return list(bpy.context.selected_objects)
+
+
+def prepare_objects(objects):
+    """Materiali a nodi e origine centrata sul modello principale (come auto_center)"""
+    for obj in objects:
+        if obj.type != 'MESH' or obj.data is None:
+            continue
+        for material in obj.data.materials:
+            if material is not None and not material.use_nodes:
+                material.use_nodes = True
+
+    roots = [obj for obj in objects if obj.parent is None]
+    main = next((obj for obj in roots if obj.type == 'MESH'), roots[0] if roots else None)
+    if main is not None:
+        center_origin(main)
+
+
+def write_atomic(output_path, datablocks):
+    """Scrittura su file temporaneo + rename: la sessione interattiva non vede mai un .blend parziale"""
+    partial_path = output_path + ".part"
+    bpy.data.libraries.write(partial_path, set(datablocks), path_remap='RELATIVE_ALL', fake_user=True)
+    os.replace(partial_path, output_path)
+
+
+def generate_lods(source_path, output_path, spec):
+    """
+    Decima l'oggetto spec['object'] di source_path per ogni livello di spec['levels']
+    ([livello, rapporto, nome mesh]); ogni mesh riceve spec['properties'], il
+    livello in spec['level_key'] e la matrix_world originale in spec['matrix_key']
+    """
+    with bpy.data.libraries.load(source_path, link=False) as (data_from, data_to):
+        data_to.objects = [spec['object']]
+
+    obj = data_to.objects[0]
+    if obj is None or obj.type != 'MESH':
+        raise ValueError(f"Object {spec['object']} not found in {source_path}")
+    bpy.context.scene.collection.objects.link(obj)
+
+    meshes = {}
+    for level, ratio, _ in spec['levels']:
+        if ratio >= 1.0:
+            meshes[level] = obj.data
+            continue
+        modifier = obj.modifiers.new(name="OpenShelf_LOD", type='DECIMATE')
+        modifier.ratio = ratio
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        meshes[level] = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph),
+                                                        preserve_all_data_layers=True,
+                                                        depsgraph=depsgraph)
+        obj.modifiers.remove(modifier)
+
+    for level, _, mesh_name in spec['levels']:
+        mesh = meshes[level]
+        mesh.name = mesh_name
+        for key, value in spec['properties'].items():
+            mesh[key] = value
+        mesh[spec['level_key']] = level
+        mesh[spec['matrix_key']] = spec['matrix']
+
+    write_atomic(output_path, meshes.values())
+
+    faces = {level: len(mesh.polygons) for level, mesh in meshes.items()}
+    print(f"OpenShelf: Generated LODs {output_path}: {faces}")
+    return 0
+
+
+def main():
+    args = parse_args()
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+    if args[0] == "--lod":
+        return generate_lods(args[1], args[2], json.loads(args[3]))
+
+    model_file, output_path = args
+    objects = import_model(model_file)
+    if not objects:
+        print(f"OpenShelf: No objects imported from {model_file}")
+        return 1
+
+    prepare_objects(objects)
+
+    write_atomic(output_path, objects)
+
+    print(f"OpenShelf: Converted {model_file} -> {output_path} ({len(objects)} objects)")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"OpenShelf: Background conversion failed: {e}")
+        sys.exit(1)
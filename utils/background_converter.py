@@ -0,0 +1,172 @@
+"""
+OpenShelf Background Converter
+Pool di processi Blender headless che convertono gli asset della libreria nel
+.blend di cache (e ne generano i LOD): la sessione interattiva appende solo il
+risultato finito
+"""
+
+import bpy
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Any, Optional, Dict, List
+
+from .local_library_manager import get_library_manager
+from .library_index import describe_files
+from .blend_cache import get_blend_cache
+from .instance_registry import get_instance_registry
+from .host import get_preference
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+WORKER_SCRIPT = Path(__file__).with_name("background_convert.py")
+
+# Timeout per singola conversione (secondi)
+DEFAULT_CONVERSION_TIMEOUT = 900
+
+
+class BackgroundConverter:
+    """Converte asset in processi 'blender --background' paralleli"""
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: int = DEFAULT_CONVERSION_TIMEOUT):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.timeout = timeout
+        # I thread attendono soltanto i processi figli
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="openshelf_convert")
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available() -> bool:
+        """True se l'eseguibile di Blender è disponibile per lanciare i worker"""
+        return bool(bpy.app.binary_path) and os.path.exists(bpy.app.binary_path)
+
+    def convert(self, asset_id: str) -> Future:
+        """
+        Accoda la conversione di un asset della libreria (una sola per asset)
+
+        Returns:
+            Future con True se il .blend di cache è pronto
+        """
+        with self._lock:
+            job = self._jobs.get(asset_id)
+            if job is None or job.done():
+                job = self._executor.submit(self._convert_asset, asset_id)
+                self._jobs[asset_id] = job
+            return job
+
+    def _convert_asset(self, asset_id: str) -> bool:
+        """Esegue la conversione in un processo Blender separato"""
+        library_manager = get_library_manager()
+        model_file = library_manager._get_primary_model_file(asset_id)
+        if not model_file:
+            logger.warning("Cannot convert %s: asset not in library", asset_id)
+            return False
+
+        checksum = get_instance_registry().get_source_checksum(model_file, asset_id)
+        blend_path = get_blend_cache().get_blend_path(asset_id, checksum) if checksum else None
+        if blend_path is None:
+            return False
+        if blend_path.exists():
+            return True
+
+        if not self._run_worker([model_file, str(blend_path)], blend_path, f"conversion of {asset_id}"):
+            return False
+
+        library_manager.index.add_files(
+            asset_id, describe_files(blend_path.parent, [blend_path.name], with_checksum=False)
+        )
+        logger.info("Background conversion of %s ready: %s", asset_id, blend_path.name)
+        return True
+
+    def generate_lods(self, asset_id: str, source_blend: Path, lod_path: Path,
+                      spec: Dict[str, Any]) -> Future:
+        """
+        Accoda la decimazione dei LOD di un oggetto salvato in source_blend
+
+        Args:
+            asset_id: ID dell'asset
+            source_blend: .blend temporaneo con l'oggetto a risoluzione piena (rimosso alla fine)
+            lod_path: .blend dei LOD da scrivere nella libreria
+            spec: Oggetto, livelli, nomi e proprietà delle mesh (vedi background_convert.py)
+
+        Returns:
+            Future con True se il .blend dei LOD è pronto
+        """
+        key = f"lod:{asset_id}"
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.done():
+                job = self._executor.submit(self._generate_lods, asset_id, source_blend, lod_path, spec)
+                self._jobs[key] = job
+            return job
+
+    def _generate_lods(self, asset_id: str, source_blend: Path, lod_path: Path,
+                       spec: Dict[str, Any]) -> bool:
+        try:
+            if not self._run_worker(["--lod", str(source_blend), str(lod_path), json.dumps(spec)],
+                                    lod_path, f"LOD generation of {asset_id}"):
+                return False
+        finally:
+            if source_blend.exists():
+                source_blend.unlink()
+
+        get_library_manager().index.add_files(
+            asset_id, describe_files(lod_path.parent, [lod_path.name], with_checksum=False)
+        )
+        return True
+
+    def _run_worker(self, arguments: List[str], output_path: Path, label: str) -> bool:
+        """Lancia background_convert.py in un Blender headless; True se output_path è stato scritto"""
+        command = [
+            bpy.app.binary_path, "--background", "--factory-startup",
+            "--python", str(WORKER_SCRIPT), "--", *arguments
+        ]
+
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    text=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            logger.error("Background %s timed out", label)
+            return False
+        except Exception as e:
+            logger.error("Cannot start background %s: %s", label, e)
+            return False
+
+        if result.returncode != 0 or not output_path.exists():
+            tail = "\n".join(result.stdout.splitlines()[-5:])
+            logger.error("Background %s failed (exit %d):\n%s", label, result.returncode, tail)
+            return False
+
+        return True
+
+    def shutdown(self):
+        """Annulla le conversioni in coda (quelle in corso terminano)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def is_background_conversion_enabled() -> bool:
+    """True se la conversione in background è attiva nelle preferenze e possibile"""
+    return bool(get_preference('background_conversion', False)) and BackgroundConverter.is_available()
+
+
+# Istanza globale
+_global_background_converter = None
+
+def get_background_converter() -> BackgroundConverter:
+    """Ottiene l'istanza globale del converter (dimensionata dalle preferenze)"""
+    global _global_background_converter
+
+    wanted = get_preference('conversion_workers', 0) or os.cpu_count() or 2
+
+    if _global_background_converter is None or _global_background_converter.max_workers != wanted:
+        if _global_background_converter is not None:
+            _global_background_converter.shutdown()
+        _global_background_converter = BackgroundConverter(max_workers=wanted)
+
+    return _global_background_converter
@@ -0,0 +1,105 @@
+"""
+OpenShelf Background Textures
+Script eseguito da un Blender headless (non importato dall'addon):
+
+    blender --background --factory-startup --python background_textures.py -- <job.json>
+
+Per ogni texture del job scrive le versioni ridotte (1K/2K/4K, ...) sotto la
+directory dei tier e un manifest JSON che associa l'originale ai suoi tier
+"""
+
+import json
+import os
+import sys
+
+import bpy # type: ignore
+
+# Sorgenti con compressione lossy: i tier restano JPEG, il resto diventa PNG
+JPEG_EXTENSIONS = {'.jpg', '.jpeg'}
+
+
+def parse_args():
+    """Argomenti dopo '--' nella riga di comando di Blender"""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if len(argv) != 1:
+        raise SystemExit("Usage: blender --background --python background_textures.py -- <job.json>")
+    return argv[0]
+
+
+def write_tier(source_path, output_path, width, height, file_format):
+    """Carica l'originale, lo ridimensiona e lo salva nel formato del tier"""
+    image = bpy.data.images.load(source_path, check_existing=False)
+    try:
+        image.scale(width, height)
+        image.filepath_raw = output_path
+        image.file_format = file_format
+        image.save()
+    finally:
+        bpy.data.images.remove(image)
+
+
+def process_texture(asset_dir, relative_path, tiers, output_dir):
+    """Genera i tier di una texture; restituisce la voce del manifest o None"""
+    source_path = os.path.join(asset_dir, relative_path)
+    probe = bpy.data.images.load(source_path, check_existing=False)
+    width, height = probe.size
+    bpy.data.images.remove(probe)
+
+    longest = max(width, height)
+    if longest == 0:
+        print(f"OpenShelf: Cannot read texture {relative_path}")
+        return None
+
+    ext = os.path.splitext(relative_path)[1]
+    file_format, out_ext = ('JPEG', '.jpg') if ext.lower() in JPEG_EXTENSIONS else ('PNG', '.png')
+
+    entry = {'size': [width, height], 'tiers': {}}
+    for tier, max_size in sorted(tiers.items(), key=lambda item: item[1]):
+        # L'originale è già entro questo tier: non serve una copia
+        if longest <= max_size:
+            continue
+
+        factor = max_size / longest
+        # Nome completo dell'originale + estensione del tier: a.tif e a.png non si sovrascrivono
+        tier_relative = "/".join([output_dir, tier, relative_path + out_ext]).replace("\\", "/")
+        tier_path = os.path.join(asset_dir, tier_relative)
+        os.makedirs(os.path.dirname(tier_path), exist_ok=True)
+
+        write_tier(source_path, tier_path, max(1, round(width * factor)),
+                   max(1, round(height * factor)), file_format)
+        entry['tiers'][tier] = tier_relative
+
+    return entry
+
+
+def main():
+    with open(parse_args(), 'r', encoding='utf-8') as f:
+        job = json.load(f)
+
+    asset_dir = job['asset_dir']
+    output_dir = job['output_dir']
+
+    manifest = {}
+    for relative_path in job['textures']:
+        try:
+            entry = process_texture(asset_dir, relative_path, job['tiers'], output_dir)
+            if entry is not None:
+                manifest[relative_path] = entry
+        except Exception as e:
+            print(f"OpenShelf: Cannot process texture {relative_path}: {e}")
+
+    manifest_path = os.path.join(asset_dir, job['manifest'])
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"OpenShelf: Processed {len(manifest)} of {len(job['textures'])} textures")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"OpenShelf: Texture processing failed: {e}")
+        sys.exit(1)
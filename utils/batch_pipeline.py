@@ -0,0 +1,270 @@
+"""
+OpenShelf Batch Pipeline
+Download/estrazione concorrente di molti asset nella libreria locale con coda
+di import consumata dal main thread (i loader Blender non sono thread-safe)
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional, List, Dict, Any, Callable
+
+from .obj_scanner import estimate_import_seconds
+
+# Campi copiati dai PropertyGroup dei risultati: i worker non toccano dati bpy
+ASSET_FIELDS = (
+    'asset_id', 'name', 'description', 'repository', 'object_type', 'inventory_number',
+    'materials', 'chronology', 'license_info', 'quality_score', 'model_urls'
+)
+
+# Quota del progresso di un asset assegnata a download/estrazione (il resto è l'import)
+DOWNLOAD_WEIGHT = 0.8
+
+
+def snapshot_asset(asset_data) -> SimpleNamespace:
+    """Copia i campi di un risultato di ricerca in un oggetto Python puro"""
+    return SimpleNamespace(**{name: getattr(asset_data, name, "") for name in ASSET_FIELDS})
+
+
+@dataclass
+class BatchItem:
+    """Stato di un asset nella pipeline"""
+    asset: Any
+    state: str = 'QUEUED'  # QUEUED, DOWNLOADING, CONVERTING, READY, IMPORTED, FAILED, CANCELLED
+    progress: float = 0.0
+    model_file: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    import_estimate: float = 0.0  # secondi stimati di import nel main thread
+
+
+@dataclass
+class BatchSummary:
+    """Riepilogo finale del batch"""
+    total: int = 0
+    imported: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    cancelled: List[str] = field(default_factory=list)
+
+
+class BatchImportPipeline:
+    """Scarica gli asset in parallelo (max_concurrent worker) e li accoda per l'import"""
+
+    def __init__(self, library_manager, assets: List[Any], max_concurrent: int = 3,
+                 convert_func: Optional[Callable[[str], Future]] = None):
+        self.library_manager = library_manager
+        # Conversione opzionale dopo il download (es. worker Blender in background):
+        # restituisce un Future, il worker di download non ne attende la fine
+        self.convert_func = convert_func
+        self.max_concurrent = max(1, max_concurrent)
+        self.items: Dict[str, BatchItem] = {}
+        for asset in assets:
+            self.items.setdefault(asset.asset_id, BatchItem(asset=asset))
+
+        self.ready_queue: "queue.Queue[str]" = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._futures = []
+
+    def start(self):
+        """Avvia i worker di download"""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                            thread_name_prefix="openshelf_batch")
+        self._futures = [self._executor.submit(self._download_worker, asset_id)
+                         for asset_id in self.items]
+
+    def _download_worker(self, asset_id: str):
+        """Scarica ed estrae un asset, poi lo mette in coda per l'import"""
+        item = self.items[asset_id]
+        if self.cancel_event.is_set():
+            self._set_state(item, 'CANCELLED')
+            return
+
+        self._set_state(item, 'DOWNLOADING')
+
+        last_error = [None]
+
+        def progress_callback(message):
+            if message.startswith("Error"):
+                last_error[0] = message
+                return
+
+            # Solo i messaggi con percentuale spostano la barra dell'asset
+            if "%" in message:
+                try:
+                    percent = int(''.join(filter(str.isdigit, message.split('%')[0])))
+                except ValueError:
+                    return
+                with self._lock:
+                    item.progress = max(item.progress, min(percent, 100) / 100.0 * DOWNLOAD_WEIGHT)
+
+        try:
+            model_file = self.library_manager.download_asset(item.asset, progress_callback=progress_callback)
+            if not model_file:
+                raise Exception(last_error[0] or "Failed to download asset to library")
+
+            if self.cancel_event.is_set():
+                # L'asset resta in libreria, ma non viene importato
+                self._set_state(item, 'CANCELLED')
+                return
+
+            if self.convert_func is not None:
+                self._set_state(item, 'CONVERTING')
+                # L'asset viene completato quando la conversione termina: il worker passa al prossimo download
+                self.convert_func(asset_id).add_done_callback(
+                    lambda future: self._conversion_done(asset_id, model_file, future))
+                return
+
+            self._queue_for_import(asset_id, model_file)
+
+        except Exception as e:
+            print(f"OpenShelf: Batch download failed for {asset_id}: {e}")
+            self.mark_failed(asset_id, str(e))
+
+    def _conversion_done(self, asset_id: str, model_file: str, future: Future):
+        """Callback del Future di conversione (thread del converter)"""
+        try:
+            converted = bool(future.result())
+        except Exception:
+            # Conversione fallita o annullata alla chiusura del converter
+            converted = False
+
+        # Se la conversione fallisce l'asset viene comunque importato dal modello
+        if not converted:
+            print(f"OpenShelf: Background conversion unavailable for {asset_id}, importing model")
+
+        if self.cancel_event.is_set():
+            self._set_state(self.items[asset_id], 'CANCELLED')
+            return
+
+        try:
+            self._queue_for_import(asset_id, model_file)
+        except Exception as e:
+            print(f"OpenShelf: Batch import preparation failed for {asset_id}: {e}")
+            self.mark_failed(asset_id, str(e))
+
+    def _queue_for_import(self, asset_id: str, model_file: str):
+        """Legge metadati e statistiche del modello, poi accoda l'asset per il main thread"""
+        item = self.items[asset_id]
+        metadata = self.library_manager.get_asset_metadata(asset_id)
+
+        # Validazione nel worker: un OBJ rotto fallisce qui invece che nell'import
+        import_estimate = self._inspect_model(asset_id)
+
+        with self._lock:
+            item.model_file = model_file
+            item.metadata = metadata
+            item.import_estimate = import_estimate
+            item.progress = DOWNLOAD_WEIGHT
+            item.state = 'READY'
+        self.ready_queue.put(asset_id)
+
+    def _inspect_model(self, asset_id: str) -> float:
+        """
+        Scansiona il modello (statistiche in cache nell'indice, così il main
+        thread non rilegge il file) e stima il tempo di import
+
+        Raises:
+            Exception: Se il modello OBJ non è importabile
+        """
+        stats = self.library_manager.get_model_stats(asset_id)
+        if stats is None:
+            return 0.0
+
+        if stats.vertex_count == 0:
+            raise Exception("Model has no vertices")
+        if stats.invalid_face_count:
+            raise Exception(f"Model has {stats.invalid_face_count} faces referencing undefined vertices")
+
+        return estimate_import_seconds(stats)
+
+    def _set_state(self, item: BatchItem, state: str):
+        with self._lock:
+            item.state = state
+            if state == 'CANCELLED':
+                item.progress = 1.0
+
+    # ------------------------------------------------------------ main thread
+
+    def pop_ready(self) -> Optional[BatchItem]:
+        """Prossimo asset pronto per l'import (non bloccante)"""
+        try:
+            asset_id = self.ready_queue.get_nowait()
+        except queue.Empty:
+            return None
+        return self.items[asset_id]
+
+    def mark_imported(self, asset_id: str):
+        """Segna un asset come importato nella scena"""
+        item = self.items[asset_id]
+        with self._lock:
+            item.state = 'IMPORTED'
+            item.progress = 1.0
+
+    def mark_failed(self, asset_id: str, error: str):
+        """Segna un asset come fallito"""
+        item = self.items[asset_id]
+        with self._lock:
+            item.state = 'FAILED'
+            item.error = error
+            item.progress = 1.0
+
+    def cancel(self):
+        """Annulla gli asset non ancora avviati (i download in corso terminano)"""
+        self.cancel_event.set()
+        for future in self._futures:
+            future.cancel()
+
+        with self._lock:
+            for item in self.items.values():
+                if item.state in ('QUEUED', 'READY'):
+                    item.state = 'CANCELLED'
+                    item.progress = 1.0
+
+    def shutdown(self):
+        """Chiude il thread pool senza attendere i download in corso"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    # --------------------------------------------------------------- progress
+
+    def get_progress(self) -> float:
+        """Progresso aggregato del batch (0-100)"""
+        with self._lock:
+            if not self.items:
+                return 100.0
+            return sum(item.progress for item in self.items.values()) / len(self.items) * 100.0
+
+    def get_pending_import_seconds(self) -> float:
+        """Tempo di import stimato degli asset già scaricati e in coda"""
+        with self._lock:
+            return sum(item.import_estimate for item in self.items.values() if item.state == 'READY')
+
+    def get_counts(self) -> Dict[str, int]:
+        """Numero di asset per stato"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for item in self.items.values():
+                counts[item.state] = counts.get(item.state, 0) + 1
+        return counts
+
+    def is_finished(self) -> bool:
+        """True quando nessun asset è in coda, in download o in attesa di import"""
+        with self._lock:
+            return all(item.state in ('IMPORTED', 'FAILED', 'CANCELLED') for item in self.items.values())
+
+    def get_summary(self) -> BatchSummary:
+        """Riepilogo per stato, con errore per ogni asset fallito"""
+        summary = BatchSummary(total=len(self.items))
+        with self._lock:
+            for asset_id, item in self.items.items():
+                if item.state == 'IMPORTED':
+                    summary.imported.append(asset_id)
+                elif item.state == 'FAILED':
+                    summary.failed[asset_id] = item.error or "Unknown error"
+                elif item.state == 'CANCELLED':
+                    summary.cancelled.append(asset_id)
+        return summary
@@ -0,0 +1,101 @@
+"""
+OpenShelf Blend Cache
+Cache .blend per asset nella libreria locale: dopo il primo import l'oggetto
+elaborato (materiali, metadati) viene salvato accanto al modello, e gli import
+successivi lo appendono con bpy.data.libraries.load invece di ri-parsare l'OBJ
+"""
+
+import bpy
+from pathlib import Path
+from typing import Optional, List
+
+from .local_library_manager import get_library_manager
+from .library_index import describe_files
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Il nome include il checksum del sorgente: un modello aggiornato invalida la cache
+BLEND_CACHE_PATTERN = "openshelf_{checksum}.blend"
+CHECKSUM_PREFIX_LENGTH = 16
+
+
+class BlendAssetCache:
+    """Salva e carica la versione .blend di un asset della libreria"""
+
+    def get_blend_path(self, asset_id: str, checksum: str) -> Optional[Path]:
+        """Path del .blend in cache per un asset della libreria (None se non in libreria)"""
+        record = get_library_manager().index.get(asset_id)
+        if not record:
+            return None
+
+        name = BLEND_CACHE_PATTERN.format(checksum=checksum[:CHECKSUM_PREFIX_LENGTH])
+        return Path(record['asset_dir']) / name
+
+    def load(self, context, asset_id: str, checksum: str) -> List[bpy.types.Object]:
+        """
+        Appende gli oggetti dal .blend in cache e li collega alla collection attiva
+
+        Returns:
+            Oggetti appesi, il principale per primo (lista vuota se la cache non esiste)
+        """
+        blend_path = self.get_blend_path(asset_id, checksum)
+        if blend_path is None or not blend_path.exists():
+            return []
+
+        try:
+            with bpy.data.libraries.load(str(blend_path), link=False) as (data_from, data_to):
+                data_to.objects = list(data_from.objects)
+
+            objects = [obj for obj in data_to.objects if obj is not None]
+            if not objects:
+                return []
+
+            for obj in objects:
+                context.collection.objects.link(obj)
+
+            # Oggetto principale: la prima mesh radice (quella salvata per prima dall'addon)
+            roots = [obj for obj in objects if obj.parent is None] or objects
+            main = next((obj for obj in roots if obj.type == 'MESH'), roots[0])
+
+            logger.info("Loaded asset %s (%d objects) from blend cache %s", asset_id, len(objects), blend_path.name)
+            return [main] + [obj for obj in objects if obj is not main]
+
+        except Exception as e:
+            logger.error("Cannot load blend cache %s: %s", blend_path, e)
+            return []
+
+    def save(self, asset_id: str, checksum: str, objects: List[bpy.types.Object]) -> bool:
+        """Scrive gli oggetti di un import (con mesh, materiali e metadati) nel .blend dell'asset"""
+        blend_path = self.get_blend_path(asset_id, checksum)
+        if blend_path is None or blend_path.exists() or not objects:
+            return False
+
+        try:
+            # Percorsi texture relativi al .blend: restano validi se la libreria viene spostata
+            bpy.data.libraries.write(str(blend_path), set(objects), path_remap='RELATIVE_ALL', fake_user=True)
+
+            library_manager = get_library_manager()
+            library_manager.index.add_files(
+                asset_id, describe_files(blend_path.parent, [blend_path.name], with_checksum=False)
+            )
+
+            logger.info("Saved blend cache for asset %s: %s", asset_id, blend_path.name)
+            return True
+
+        except Exception as e:
+            logger.error("Cannot write blend cache for %s: %s", asset_id, e)
+            return False
+
+
+# Istanza globale
+_global_blend_cache = None
+
+def get_blend_cache() -> BlendAssetCache:
+    """Ottiene l'istanza globale della cache .blend"""
+    global _global_blend_cache
+
+    if _global_blend_cache is None:
+        _global_blend_cache = BlendAssetCache()
+
+    return _global_blend_cache
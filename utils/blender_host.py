@@ -0,0 +1,97 @@
+"""
+OpenShelf Blender Host
+Adattatore sottile tra i moduli core e Blender: accesso online da
+bpy.app.online_access, preferenze dell'addon e directory di configurazione
+utente. Installato alla registrazione dell'addon
+"""
+
+import bpy # type: ignore
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .host import HostPolicy, set_host_policy, get_host_policy
+
+
+class BlenderHostPolicy(HostPolicy):
+    """
+    Politica che legge lo stato di Blender. Le preferenze vengono copiate sul
+    main thread alla registrazione e a ogni modifica (update delle proprietà):
+    get_preference è una lettura del dizionario da qualsiasi thread, anche dal
+    draw dei pannelli
+    """
+
+    name = "blender"
+
+    def __init__(self):
+        self._preferences: Dict[str, Any] = {}
+        self._preferences_lock = threading.Lock()
+        # False finché le preferenze non sono state lette (contesto ristretto alla registrazione)
+        self._has_snapshot = False
+
+    def online_access_allowed(self) -> bool:
+        # Blender < 4.2 non ha il flag: rete sempre consentita
+        return getattr(bpy.app, 'online_access', True)
+
+    def online_access_message(self) -> str:
+        if getattr(bpy.app, 'online_access_overridden', False):
+            return "Online access disabled by command line. Use --online-mode to enable OpenShelf."
+        return "Online access is disabled in Blender preferences"
+
+    def _addon_preferences(self):
+        for addon_name in bpy.context.preferences.addons.keys():
+            if 'openshelf' in addon_name.lower():
+                return bpy.context.preferences.addons[addon_name].preferences
+        return None
+
+    def get_preference(self, name: str, default: Any = None) -> Any:
+        if not self._has_snapshot and threading.current_thread() is threading.main_thread():
+            self.snapshot_preferences()
+
+        with self._preferences_lock:
+            return self._preferences.get(name, default)
+
+    def snapshot_preferences(self, prefs=None):
+        """Copia le preferenze per i thread di lavoro (solo main thread)"""
+        if prefs is None:
+            try:
+                prefs = self._addon_preferences()
+            except AttributeError:
+                return
+            if prefs is None:
+                return
+
+        values = {}
+        for prop in prefs.bl_rna.properties:
+            if prop.identifier != 'rna_type' and prop.type in {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}:
+                value = getattr(prefs, prop.identifier)
+                # Array RNA e set (enum flag) copiati: nessun riferimento a dati Blender nei thread
+                if getattr(prop, 'is_array', False):
+                    value = tuple(value)
+                values[prop.identifier] = value
+        with self._preferences_lock:
+            self._preferences = values
+        self._has_snapshot = True
+
+    def user_config_dir(self) -> Optional[Path]:
+        config_dir = bpy.utils.user_resource('CONFIG', path="openshelf", create=True)
+        return Path(config_dir) if config_dir else None
+
+
+def install_blender_host():
+    """Rende BlenderHostPolicy la politica attiva"""
+    policy = BlenderHostPolicy()
+    policy.snapshot_preferences()
+    set_host_policy(policy)
+
+
+def refresh_host_preferences(prefs=None):
+    """Aggiorna la copia delle preferenze (callback update= delle proprietà, main thread)"""
+    policy = get_host_policy()
+    if isinstance(policy, BlenderHostPolicy):
+        policy.snapshot_preferences(prefs)
+
+
+def uninstall_blender_host():
+    """Ripristina la politica CPython di default"""
+    set_host_policy(None)
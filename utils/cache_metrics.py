@@ -0,0 +1,231 @@
+"""
+OpenShelf Cache Metrics
+Registro leggero in-process dei contatori delle cache (download, catalogo, libreria)
+con persistenza su file JSON tra le sessioni
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from .host import get_host_policy
+
+# Cache monitorate ('shared' = libreria condivisa di rete)
+CACHE_NAMES = ('download', 'catalog', 'library', 'shared')
+
+# Intervallo minimo tra due salvataggi su disco (secondi)
+SAVE_INTERVAL = 30.0
+
+METRICS_FILENAME = "cache_metrics.json"
+
+
+def _empty_counters() -> Dict[str, Any]:
+    """Contatori azzerati per una singola cache"""
+    return {
+        'hits': 0,
+        'misses': 0,
+        'bytes_from_cache': 0,
+        'bytes_from_network': 0,
+        'fetch_count': 0,
+        'fetch_time_total': 0.0,
+        'evictions': 0,
+        'bytes_evicted': 0,
+    }
+
+
+def _get_default_storage_path() -> Path:
+    """Path di default del file metriche (config utente dell'ambiente ospite se disponibile)"""
+    try:
+        config_dir = get_host_policy().user_config_dir()
+        if config_dir:
+            return Path(config_dir) / METRICS_FILENAME
+    except Exception:
+        pass
+
+    return Path.home() / ".openshelf" / METRICS_FILENAME
+
+
+class CacheMetricsRegistry:
+    """Registro thread-safe dei contatori hit/miss/byte/latenza/eviction"""
+
+    def __init__(self, storage_path: Optional[str] = None):
+        self.storage_path = Path(storage_path) if storage_path else _get_default_storage_path()
+        self._lock = threading.Lock()
+        self._counters = {name: _empty_counters() for name in CACHE_NAMES}
+        self._since = time.time()
+        self._dirty = False
+        self._last_save = 0.0
+        self.load()
+
+    def _get(self, cache_name: str) -> Dict[str, Any]:
+        """Ottiene (o crea) i contatori di una cache. Chiamare con lock acquisito"""
+        counters = self._counters.get(cache_name)
+        if counters is None:
+            counters = _empty_counters()
+            self._counters[cache_name] = counters
+        return counters
+
+    def record_hit(self, cache_name: str, bytes_served: int = 0):
+        """
+        Registra un hit di cache
+
+        Args:
+            cache_name: Nome della cache ('download', 'catalog', 'library', 'shared')
+            bytes_served: Byte serviti dalla cache invece che dalla rete
+        """
+        with self._lock:
+            counters = self._get(cache_name)
+            counters['hits'] += 1
+            counters['bytes_from_cache'] += max(0, int(bytes_served))
+            self._dirty = True
+        self._maybe_save()
+
+    def record_miss(self, cache_name: str, bytes_fetched: int = 0, fetch_time: float = 0.0):
+        """
+        Registra un miss di cache con il relativo fetch dalla rete
+
+        Args:
+            cache_name: Nome della cache
+            bytes_fetched: Byte scaricati dalla rete
+            fetch_time: Durata del fetch in secondi (0 se il fetch non è avvenuto)
+        """
+        with self._lock:
+            counters = self._get(cache_name)
+            counters['misses'] += 1
+            counters['bytes_from_network'] += max(0, int(bytes_fetched))
+            if fetch_time > 0:
+                counters['fetch_count'] += 1
+                counters['fetch_time_total'] += fetch_time
+            self._dirty = True
+        self._maybe_save()
+
+    def record_eviction(self, cache_name: str, count: int = 1, bytes_evicted: int = 0):
+        """
+        Registra la rimozione di elementi dalla cache per limiti di spazio o età
+
+        Args:
+            cache_name: Nome della cache
+            count: Numero di elementi rimossi
+            bytes_evicted: Byte liberati
+        """
+        if count <= 0:
+            return
+
+        with self._lock:
+            counters = self._get(cache_name)
+            counters['evictions'] += count
+            counters['bytes_evicted'] += max(0, int(bytes_evicted))
+            self._dirty = True
+        self._maybe_save()
+
+    def get_snapshot(self, cache_name: str) -> Dict[str, Any]:
+        """
+        Ottiene i contatori di una cache con i valori derivati
+
+        Returns:
+            Dizionario con contatori, hit_rate (0-100) e avg_fetch_time (secondi)
+        """
+        with self._lock:
+            snapshot = dict(self._get(cache_name))
+
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['lookups'] = lookups
+        snapshot['hit_rate'] = (snapshot['hits'] / lookups * 100) if lookups else 0.0
+        snapshot['avg_fetch_time'] = (
+            snapshot['fetch_time_total'] / snapshot['fetch_count']
+            if snapshot['fetch_count'] else 0.0
+        )
+        return snapshot
+
+    def get_all_snapshots(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot di tutte le cache monitorate"""
+        with self._lock:
+            names = list(self._counters.keys())
+        return {name: self.get_snapshot(name) for name in names}
+
+    def get_since(self) -> float:
+        """Timestamp di inizio raccolta (ultimo reset)"""
+        return self._since
+
+    def reset(self):
+        """Azzera tutti i contatori e salva subito"""
+        with self._lock:
+            self._counters = {name: _empty_counters() for name in CACHE_NAMES}
+            self._since = time.time()
+            self._dirty = True
+        self.save(force=True)
+
+    def load(self):
+        """Carica i contatori persistiti dalla sessione precedente"""
+        try:
+            if not self.storage_path.exists():
+                return
+
+            with open(self.storage_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            with self._lock:
+                self._since = data.get('since', self._since)
+                for name, stored in data.get('caches', {}).items():
+                    counters = self._get(name)
+                    for key in counters:
+                        if key in stored:
+                            counters[key] = type(counters[key])(stored[key])
+
+        except Exception as e:
+            print(f"OpenShelf: Error loading cache metrics: {e}")
+
+    def save(self, force: bool = False):
+        """
+        Salva i contatori su disco
+
+        Args:
+            force: Se True ignora l'intervallo minimo tra salvataggi
+        """
+        with self._lock:
+            if not self._dirty and not force:
+                return
+            data = {
+                'version': 1,
+                'since': self._since,
+                'caches': {name: dict(counters) for name, counters in self._counters.items()}
+            }
+            self._dirty = False
+            self._last_save = time.time()
+
+        try:
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.storage_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.storage_path)
+        except Exception as e:
+            print(f"OpenShelf: Error saving cache metrics: {e}")
+
+    def _maybe_save(self):
+        """Salva solo se è passato abbastanza tempo dall'ultimo salvataggio"""
+        if time.time() - self._last_save >= SAVE_INTERVAL:
+            self.save()
+
+
+# Istanza globale
+_global_cache_metrics = None
+
+def get_cache_metrics() -> CacheMetricsRegistry:
+    """Ottiene l'istanza globale del registro metriche cache"""
+    global _global_cache_metrics
+
+    if _global_cache_metrics is None:
+        _global_cache_metrics = CacheMetricsRegistry()
+
+    return _global_cache_metrics
+
+def flush_cache_metrics():
+    """Salva su disco le metriche non ancora persistite"""
+    if _global_cache_metrics is not None:
+        _global_cache_metrics.save()
+
+atexit.register(flush_cache_metrics)
@@ -3,7 +3,6 @@ OpenShelf Download Manager - COMPLETE FIXED VERSION
 Gestisce download, cache e estrazione file per gli asset culturali
 """
 
-import bpy # type: ignore
 import os
 import tempfile
 import urllib.request
@@ -15,6 +14,14 @@ import hashlib
 import json
 import time
 import threading
+from .cache_metrics import get_cache_metrics
+from .archive_extractor import get_archive_extractor
+from .archive_planner import plan_archive
+from .log import get_logger, progress_due
+from .tracing import traced
+from .host import get_host_policy, get_preference
+
+logger = get_logger(__name__)
 class DownloadProgress:
     """Classe migliorata per tracciare il progresso del download"""
 
@@ -214,14 +221,14 @@ class DownloadCache:
         # FIX: Crea directory e parents se non esistono, con gestione errori
         try:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-            print(f"OpenShelf: Using cache directory: {self.cache_dir}")
+            logger.debug("Using cache directory: %s", self.cache_dir)
         except Exception as e:
-            print(f"OpenShelf: Error creating cache directory {self.cache_dir}: {e}")
+            logger.error("Error creating cache directory %s: %s", self.cache_dir, e)
             # Fallback a directory temporanea
             fallback_dir = os.path.join(tempfile.gettempdir(), "openshelf_cache_fallback")
             self.cache_dir = Path(fallback_dir)
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-            print(f"OpenShelf: Using fallback cache directory: {self.cache_dir}")
+            logger.warning("Using fallback cache directory: %s", self.cache_dir)
 
         self.index_file = self.cache_dir / "cache_index.json"
         self.max_cache_size = 1024 * 1024 * 500  # 500MB max cache
@@ -236,7 +243,7 @@ class DownloadCache:
             else:
                 self.index = {}
         except Exception as e:
-            print(f"OpenShelf: Error loading cache index: {e}")
+            logger.error("Error loading cache index: %s", e)
             self.index = {}
 
     def save_index(self):
@@ -245,7 +252,7 @@ class DownloadCache:
             with open(self.index_file, 'w', encoding='utf-8') as f:
                 json.dump(self.index, f, indent=2)
         except Exception as e:
-            print(f"OpenShelf: Error saving cache index: {e}")
+            logger.error("Error saving cache index: %s", e)
 
     def get_cache_key(self, url: str) -> str:
         """Genera chiave cache per URL"""
@@ -269,6 +276,7 @@ class DownloadCache:
         # Verifica età del file (opzionale)
         max_age = 7 * 24 * 3600  # 7 giorni
         if time.time() - cache_info.get('timestamp', 0) > max_age:
+            get_cache_metrics().record_eviction('download', 1, cache_info.get('size', 0))
             self.remove_from_cache(url)
             return False
 
@@ -323,7 +331,7 @@ class DownloadCache:
             return str(cache_path)
 
         except Exception as e:
-            print(f"OpenShelf: Error adding to cache: {e}")
+            logger.error("Error adding to cache: %s", e)
             return local_path
 
     def remove_from_cache(self, url: str):
@@ -340,7 +348,7 @@ class DownloadCache:
                 del self.index[cache_key]
                 self.save_index()
             except Exception as e:
-                print(f"OpenShelf: Error removing from cache: {e}")
+                logger.error("Error removing from cache: %s", e)
 
     def clear_cache(self):
         """Pulisce tutta la cache"""
@@ -354,7 +362,7 @@ class DownloadCache:
             self.save_index()
 
         except Exception as e:
-            print(f"OpenShelf: Error clearing cache: {e}")
+            logger.error("Error clearing cache: %s", e)
 
     def get_cache_size(self) -> int:
         """Ottiene dimensione totale cache"""
@@ -373,16 +381,21 @@ class DownloadCache:
             )
 
             # Rimuovi i file più vecchi
+            evicted_count = 0
+            evicted_bytes = 0
             for cache_key, cache_info in sorted_items[:len(sorted_items)//2]:
                 cache_path = self.cache_dir / cache_info['filename']
                 try:
                     if cache_path.exists():
                         cache_path.unlink()
                     del self.index[cache_key]
+                    evicted_count += 1
+                    evicted_bytes += cache_info.get('size', 0)
                 except Exception as e:
-                    print(f"OpenShelf: Error during cleanup: {e}")
+                    logger.error("Error during cleanup: %s", e)
 
             self.save_index()
+            get_cache_metrics().record_eviction('download', evicted_count, evicted_bytes)
 class DownloadManager:
     """Gestore centralizzato per i download"""
 
@@ -420,7 +433,7 @@ class DownloadManager:
             return 0
 
         except Exception as e:
-            print(f"OpenShelf: Error getting file size for {url}: {e}")
+            logger.error("Error getting file size for %s: %s", url, e)
             return 0
 
     def get_file_info_quick(self, url: str) -> Dict[str, Any]:
@@ -480,6 +493,7 @@ class DownloadManager:
 
         return f"{size:.1f} {units[unit_index]}"
 
+    @traced("download")
     def download_file(self, url: str, use_cache: bool = True,
                      progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[str]:
         """
@@ -494,18 +508,20 @@ class DownloadManager:
             Path al file scaricato o None se errore
         """
 
-        if hasattr(bpy.app, 'online_access') and not bpy.app.online_access:
-            print("OpenShelf: Online access disabled in Blender preferences")
+        policy = get_host_policy()
+        if not policy.online_access_allowed():
+            logger.warning("%s", policy.online_access_message())
             return None
 
         # Controlla cache
         if use_cache and self.cache.is_cached(url):
             cached_path = self.cache.get_cached_path(url)
             if cached_path:
-                print(f"OpenShelf: Using cached file for {url}")
+                logger.debug("Using cached file for %s", url)
+                file_size = os.path.getsize(cached_path)
+                get_cache_metrics().record_hit('download', file_size)
                 if progress_callback:
                     # Simula progresso istantaneo per file cached
-                    file_size = os.path.getsize(cached_path)
                     progress_callback(file_size, file_size)
                 return cached_path
 
@@ -527,11 +543,16 @@ class DownloadManager:
                 progress.set_callback(progress_callback)
 
             # Scarica file con progress tracking
+            fetch_start = time.time()
             success = self._download_with_progress(url, local_path, progress)
 
             if not success:
                 return None
 
+            if use_cache:
+                get_cache_metrics().record_miss('download', progress.downloaded_size,
+                                                time.time() - fetch_start)
+
             # Aggiungi alla cache se richiesto
             if use_cache:
                 cached_path = self.cache.add_to_cache(url, local_path)
@@ -540,9 +561,10 @@ class DownloadManager:
             return local_path
 
         except Exception as e:
-            print(f"OpenShelf: Error downloading {url}: {e}")
+            logger.error("Error downloading %s: %s", url, e)
             return None
 
+    @traced("download.fetch")
     def _download_with_progress(self, url: str, local_path: str, progress: DownloadProgress) -> bool:
         """Scarica file con tracking del progresso"""
         try:
@@ -576,22 +598,30 @@ class DownloadManager:
                         f.write(chunk)
                         downloaded += len(chunk)
                         progress.update(downloaded)
+                        if progress_due(logger, local_path):
+                            logger.info("Downloading %s: %d%% (%s)", os.path.basename(local_path),
+                                        progress.get_percentage(), progress.get_speed_text())
+
+                if progress_due(logger, local_path, final=True):
+                    logger.info("Downloaded %s (%d bytes)", os.path.basename(local_path), downloaded)
 
                 return True
 
         except Exception as e:
-            print(f"OpenShelf: Download error: {e}")
+            logger.error("Download error: %s", e)
             return False
 
     def extract_archive(self, archive_path: str, extract_to: Optional[str] = None,
-                       progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[str]:
+                       progress_callback: Optional[Callable[[int, int], None]] = None,
+                       selective: bool = True) -> Optional[str]:
         """
         Estrae un archivio ZIP
 
         Args:
             archive_path: Path all'archivio ZIP
             extract_to: Directory di destinazione (opzionale)
-            progress_callback: Callback per progresso estrazione
+            progress_callback: Callback per progresso estrazione (bytes estratti, bytes totali)
+            selective: Estrae solo il modello principale e i file che referenzia
 
         Returns:
             Path alla directory estratta o None se errore
@@ -602,22 +632,21 @@ class DownloadManager:
                     self.temp_dir = tempfile.mkdtemp(prefix="openshelf_")
                 extract_to = os.path.join(self.temp_dir, "extracted")
 
-            os.makedirs(extract_to, exist_ok=True)
+            members = None
+            if selective:
+                plan = plan_archive(archive_path)
+                if plan is not None:
+                    members = plan.members
 
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                file_list = zip_ref.infolist()
-                total_files = len(file_list)
-
-                for i, file_info in enumerate(file_list):
-                    zip_ref.extract(file_info, extract_to)
-
-                    if progress_callback:
-                        progress_callback(i + 1, total_files)
+            # Estrazione parallela, progress in bytes (extracted, total)
+            get_archive_extractor().extract(
+                archive_path, extract_to, members=members, progress_callback=progress_callback
+            )
 
             return extract_to
 
         except Exception as e:
-            print(f"OpenShelf: Error extracting {archive_path}: {e}")
+            logger.error("Error extracting %s: %s", archive_path, e)
             return None
 
     def find_files_by_extension(self, directory: str, extensions: List[str]) -> List[str]:
@@ -666,9 +695,9 @@ class DownloadManager:
             try:
                 shutil.rmtree(self.temp_dir)
                 self.temp_dir = None
-                print("OpenShelf: Temporary files cleaned up")
+                logger.debug("Temporary files cleaned up")
             except Exception as e:
-                print(f"OpenShelf: Error cleaning up temp files: {e}")
+                logger.error("Error cleaning up temp files: %s", e)
 
     def get_cache_statistics(self) -> Dict[str, any]:
         """Ottiene statistiche sulla cache"""
@@ -758,25 +787,14 @@ def get_download_manager() -> DownloadManager:
     """Ottiene l'istanza globale del download manager CON SUPPORTO DIRECTORY PERSONALIZZATA"""
     global _global_download_manager
 
-    # Ottieni directory cache dalle preferenze
-    cache_dir = None
-    try:
-        import bpy
-        # Cerca nelle preferenze addon
-        for addon_name in bpy.context.preferences.addons.keys():
-            if 'openshelf' in addon_name.lower():
-                prefs = bpy.context.preferences.addons[addon_name].preferences
-                if hasattr(prefs, 'custom_cache_directory') and prefs.custom_cache_directory.strip():
-                    cache_dir = prefs.custom_cache_directory.strip()
-                    break
-    except:
-        pass  # Fallback se non riesce a leggere preferenze
+    # Directory cache dalle preferenze (politica dell'ambiente ospite)
+    cache_dir = (get_preference('custom_cache_directory', '') or '').strip() or None
 
     # Se cache_dir è cambiata o manager non esiste, ricrea
     if (_global_download_manager is None or
         (cache_dir and str(_global_download_manager.cache.cache_dir) != cache_dir)):
 
-        print(f"OpenShelf: Creating download manager with cache dir: {cache_dir or 'default'}")
+        logger.debug("Creating download manager with cache dir: %s", cache_dir or 'default')
         _global_download_manager = DownloadManager(cache_dir)
 
     return _global_download_manager
@@ -7,11 +7,14 @@ import bpy
 import os
 from typing import Optional, Dict, Any, List
 from mathutils import Vector
+from .mesh_ops import StageTimer, center_objects
+from .tracing import traced
 
 class GLTFLoader:
     """Loader riutilizzabile per file GLTF/GLB"""
     
     @staticmethod
+    @traced("import.gltf")
     def import_gltf(filepath: str, **kwargs) -> Optional[bpy.types.Object]:
         """
         Importa un file GLTF/GLB in Blender
@@ -87,20 +90,25 @@ class GLTFLoader:
     
     @staticmethod
     def _post_process_objects(objects: List[bpy.types.Object], **kwargs):
-        """Applica post-processing agli oggetti importati"""
+        """Applica post-processing agli oggetti importati (tempi per fase nel log)"""
+        timer = StageTimer()
         
         # Raggruppa oggetti se richiesto
         if kwargs.get('group_objects', True):
-            GLTFLoader._group_objects(objects, kwargs.get('group_name', 'GLTF_Import'))
+            with timer.stage("group"):
+                GLTFLoader._group_objects(objects, kwargs.get('group_name', 'GLTF_Import'))
         
         # Centra oggetti se richiesto
         if kwargs.get('auto_center', True):
-            GLTFLoader._center_objects(objects)
+            with timer.stage("center"):
+                GLTFLoader._center_objects(objects)
         
         # Applica scala se richiesta
         scale_factor = kwargs.get('scale_factor', 1.0)
         if scale_factor != 1.0:
             GLTFLoader._scale_objects(objects, scale_factor)
+        
+        print(f"OpenShelf: Post-processed {len(objects)} GLTF objects: {timer.report()}")
     
     @staticmethod
     def _group_objects(objects: List[bpy.types.Object], group_name: str):
@@ -132,27 +140,8 @@ class GLTFLoader:
             if not objects:
                 return
             
-            # Calcola bounding box combinato
-            min_coords = Vector((float('inf'), float('inf'), float('inf')))
-            max_coords = Vector((float('-inf'), float('-inf'), float('-inf')))
-            
-            for obj in objects:
-                if obj.type == 'MESH' and obj.data:
-                    # Trasforma coordinate locali in globali
-                    matrix = obj.matrix_world
-                    for vertex in obj.data.vertices:
-                        world_coord = matrix @ vertex.co
-                        
-                        for i in range(3):
-                            min_coords[i] = min(min_coords[i], world_coord[i])
-                            max_coords[i] = max(max_coords[i], world_coord[i])
-            
-            # Calcola centro
-            center = (min_coords + max_coords) / 2
-            
-            # Sposta tutti gli oggetti
-            for obj in objects:
-                obj.location -= center
+            # Bounds vettorializzati (NumPy); si spostano solo le radici della gerarchia
+            center_objects(objects)
                 
         except Exception as e:
             print(f"OpenShelf: Error centering objects: {e}")
@@ -0,0 +1,92 @@
+"""
+OpenShelf Host
+Politica dell'ambiente ospite (accesso alla rete, preferenze, directory di
+configurazione) per i moduli core: repository, indice, cache e download non
+importano bpy e funzionano in CPython puro, nei worker e nei benchmark.
+Dentro Blender l'addon installa BlenderHostPolicy (vedi blender_host.py)
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+
+class OnlineAccessDisabled(Exception):
+    """L'ambiente ospite non consente l'accesso alla rete"""
+
+
+class HostPolicy:
+    """Politica di default per CPython puro: rete consentita, preferenze ai valori di default"""
+
+    name = "python"
+
+    def online_access_allowed(self) -> bool:
+        return True
+
+    def online_access_message(self) -> str:
+        """Motivo mostrato quando l'accesso alla rete è negato"""
+        return "Online access is disabled"
+
+    def get_preference(self, name: str, default: Any = None) -> Any:
+        """Valore di una preferenza dell'addon (default se non disponibile)"""
+        return default
+
+    def user_config_dir(self) -> Optional[Path]:
+        """Directory per i file di configurazione persistenti (None = default del modulo)"""
+        return None
+
+
+class StaticHostPolicy(HostPolicy):
+    """Politica configurata esplicitamente (worker, test runner, strumenti a riga di comando)"""
+
+    name = "static"
+
+    def __init__(self, online_access: bool = True, preferences: Optional[dict] = None,
+                 config_dir: Optional[str] = None):
+        self.online_access = online_access
+        self.preferences = dict(preferences or {})
+        self.config_dir = Path(config_dir) if config_dir else None
+
+    def online_access_allowed(self) -> bool:
+        return self.online_access
+
+    def get_preference(self, name: str, default: Any = None) -> Any:
+        return self.preferences.get(name, default)
+
+    def user_config_dir(self) -> Optional[Path]:
+        return self.config_dir
+
+
+_policy: HostPolicy = HostPolicy()
+_policy_lock = threading.Lock()
+
+
+def get_host_policy() -> HostPolicy:
+    """Politica attiva"""
+    return _policy
+
+
+def set_host_policy(policy: Optional[HostPolicy]) -> HostPolicy:
+    """Installa una politica (None = default CPython) e restituisce la precedente"""
+    global _policy
+
+    with _policy_lock:
+        previous = _policy
+        _policy = policy if policy is not None else HostPolicy()
+    return previous
+
+
+def check_online_access() -> bool:
+    """Solleva OnlineAccessDisabled se la politica attiva nega la rete"""
+    policy = _policy
+    if not policy.online_access_allowed():
+        raise OnlineAccessDisabled(policy.online_access_message())
+    return True
+
+
+def get_preference(name: str, default: Any = None) -> Any:
+    """Scorciatoia per get_host_policy().get_preference()"""
+    try:
+        return _policy.get_preference(name, default)
+    except Exception:
+        return default
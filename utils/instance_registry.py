@@ -0,0 +1,321 @@
+"""
+OpenShelf Instance Registry
+Registro asset -> mesh datablock: gli import ripetuti dello stesso asset (stesso
+file sorgente) creano duplicati linkati che condividono mesh e materiali
+invece di ri-parsare il modello
+"""
+
+import bpy
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Callable, Any
+
+from .local_library_manager import get_library_manager
+from .blend_cache import get_blend_cache
+from .lod_manager import get_lod_manager
+from .mesh_ops import root_objects
+from .texture_tiers import get_texture_tier_processor, get_import_texture_tier
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Proprietà custom sulla mesh: sopravvivono al salvataggio del .blend
+MESH_ASSET_KEY = "openshelf_asset_id"
+MESH_CHECKSUM_KEY = "openshelf_source_checksum"
+
+# Proprietà custom sugli oggetti: id comune a tutte le parti di un import (OBJ/glTF multi-oggetto)
+OBJECT_GROUP_KEY = "openshelf_import_group"
+
+
+def _file_identity(model_file: str, stat: os.stat_result) -> str:
+    """Chiave esadecimale di (path, dimensione, mtime_ns) per i file senza checksum nell'indice"""
+    key = f"{os.path.abspath(model_file)}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class AssetInstanceRegistry:
+    """Associa (asset_id, checksum sorgente) alla mesh importata"""
+
+    def __init__(self):
+        # (asset_id, checksum) -> nome della mesh in bpy.data.meshes
+        self._meshes: Dict[Tuple[str, str], str] = {}
+
+    def get_source_checksum(self, model_file: str, asset_id: Optional[str] = None) -> Optional[str]:
+        """
+        Chiave del contenuto del file sorgente: lo SHA-256 dall'indice della
+        libreria se disponibile, altrimenti una chiave di (path, dimensione,
+        mtime). Il file non viene mai letto: la chiamata avviene sul main thread
+        """
+        try:
+            if asset_id:
+                library_manager = get_library_manager()
+                record = library_manager.index.get(asset_id)
+                if record:
+                    relative = Path(model_file).relative_to(record['asset_dir']).as_posix()
+                    checksum = library_manager.index.get_file_checksum(asset_id, relative)
+                    if checksum:
+                        return checksum
+        except ValueError:
+            # File fuori dalla directory dell'asset
+            pass
+        except Exception as e:
+            logger.warning("Cannot read checksum from library index: %s", e)
+
+        try:
+            return _file_identity(model_file, os.stat(model_file))
+        except OSError as e:
+            logger.error("Cannot stat %s: %s", model_file, e)
+            return None
+
+    def find_mesh(self, asset_id: str, checksum: str) -> Optional[bpy.types.Mesh]:
+        """Mesh già importata per l'asset, anche da un .blend riaperto"""
+        key = (asset_id, checksum)
+        name = self._meshes.get(key)
+        if name:
+            mesh = bpy.data.meshes.get(name)
+            if mesh and self._matches(mesh, asset_id, checksum):
+                return mesh
+            del self._meshes[key]
+
+        # Cache vuota o mesh rinominata: cerca per proprietà custom
+        for mesh in bpy.data.meshes:
+            if self._matches(mesh, asset_id, checksum):
+                self._meshes[key] = mesh.name
+                return mesh
+
+        return None
+
+    @staticmethod
+    def _matches(mesh, asset_id: str, checksum: str) -> bool:
+        return mesh.get(MESH_ASSET_KEY) == asset_id and mesh.get(MESH_CHECKSUM_KEY) == checksum
+
+    def find_source_object(self, asset_id: str, checksum: str) -> Optional[bpy.types.Object]:
+        """Oggetto che usa la mesh registrata (porta metadati e slot materiali)"""
+        mesh = self.find_mesh(asset_id, checksum)
+        if mesh is None or mesh.users == 0:
+            return None
+
+        for obj in bpy.data.objects:
+            if obj.data == mesh:
+                return obj
+        return None
+
+    def find_source_objects(self, asset_id: str, checksum: str) -> List[bpy.types.Object]:
+        """Tutte le parti dell'import che contiene l'oggetto sorgente (principale per primo)"""
+        source = self.find_source_object(asset_id, checksum)
+        if source is None:
+            return []
+
+        group = source.get(OBJECT_GROUP_KEY)
+        if not group:
+            return [source]
+
+        return [source] + [obj for obj in bpy.data.objects
+                           if obj is not source and obj.get(OBJECT_GROUP_KEY) == group]
+
+    def register(self, asset_id: str, checksum: str, obj: bpy.types.Object,
+                 objects: Optional[List[bpy.types.Object]] = None):
+        """
+        Registra la mesh dell'oggetto principale di un import appena completato
+
+        Args:
+            obj: Oggetto principale (la sua mesh identifica l'asset)
+            objects: Tutti gli oggetti dell'import, marcati con un id di gruppo comune
+        """
+        if obj is None or obj.type != 'MESH' or obj.data is None:
+            return
+
+        group = uuid.uuid4().hex
+        for part in objects or [obj]:
+            part[OBJECT_GROUP_KEY] = group
+
+        obj.data[MESH_ASSET_KEY] = asset_id
+        obj.data[MESH_CHECKSUM_KEY] = checksum
+        self._meshes[(asset_id, checksum)] = obj.data.name
+
+    def instance(self, context, asset_id: str, checksum: str,
+                 import_settings: Optional[Dict[str, Any]] = None) -> Optional[bpy.types.Object]:
+        """
+        Crea un duplicato linkato (mesh condivisa) di un asset già importato
+
+        Args:
+            context: Contesto Blender
+            asset_id: ID dell'asset
+            checksum: Checksum del file sorgente
+            import_settings: import_scale/auto_center da applicare alla nuova istanza
+
+        Returns:
+            Nuovo oggetto principale o None se l'asset non è ancora nel file
+        """
+        sources = self.find_source_objects(asset_id, checksum)
+        if not sources:
+            return None
+
+        # object.copy() condivide obj.data: equivale ad Alt+D
+        copies = {source: source.copy() for source in sources}
+        group = uuid.uuid4().hex
+        for new_obj in copies.values():
+            # Le gerarchie interne all'asset puntano alle nuove copie
+            if new_obj.parent in copies:
+                new_obj.parent = copies[new_obj.parent]
+            new_obj[OBJECT_GROUP_KEY] = group
+            context.collection.objects.link(new_obj)
+
+        new_objects = list(copies.values())
+        _place_objects(context, new_objects, import_settings)
+
+        logger.info("Instanced asset %s (%d objects) from existing mesh %s",
+                    asset_id, len(new_objects), new_objects[0].data.name)
+        return new_objects[0]
+
+
+def _place_objects(context, objects: List[bpy.types.Object], import_settings: Optional[Dict[str, Any]]):
+    """
+    Applica scala/centratura dell'import corrente alla radice dell'oggetto
+    principale (il primo), sposta le altre radici del gruppo della stessa
+    trasformazione e seleziona gli oggetti
+    """
+    main = objects[0]
+    if import_settings:
+        members = set(objects)
+        anchor = main
+        while anchor.parent in members:
+            anchor = anchor.parent
+
+        before = anchor.matrix_basis.copy()
+        scale = import_settings.get('import_scale', 1.0)
+        anchor.scale = (scale, scale, scale)
+        if import_settings.get('auto_center', True):
+            anchor.location = (0, 0, 0)
+
+        delta = anchor.matrix_basis @ before.inverted_safe()
+        for root in root_objects(objects):
+            if root is not anchor:
+                root.matrix_basis = delta @ root.matrix_basis
+
+    try:
+        for selected in context.selected_objects:
+            selected.select_set(False)
+        for obj in objects:
+            obj.select_set(True)
+        context.view_layer.objects.active = main
+    except Exception:
+        pass
+
+
+def import_with_registry(context, asset_id: str, model_file: str,
+                         import_func: Callable[[], Optional[bpy.types.Object]],
+                         import_settings: Optional[Dict[str, Any]] = None) -> Optional[bpy.types.Object]:
+    """
+    Riusa la mesh dell'asset se già presente nel file, poi prova il proxy LOD e la
+    cache .blend della libreria, altrimenti importa, registra e pianifica la
+    post-elaborazione (salvataggio in cache, generazione LOD). Le texture
+    vengono puntate al tier di risoluzione scelto nel pannello di import
+
+    Args:
+        context: Contesto Blender
+        asset_id: ID dell'asset
+        model_file: File sorgente del modello
+        import_func: Import completo (chiamato solo se né il file né la cache hanno l'asset)
+        import_settings: Impostazioni di import per la nuova istanza
+
+    Returns:
+        Oggetto importato o istanziato
+    """
+    obj = _import_or_reuse(context, asset_id, model_file, import_func, import_settings)
+
+    if obj is not None:
+        get_texture_tier_processor().apply(obj, asset_id, get_import_texture_tier(context.scene))
+
+    return obj
+
+
+def _import_or_reuse(context, asset_id: str, model_file: str,
+                     import_func: Callable[[], Optional[bpy.types.Object]],
+                     import_settings: Optional[Dict[str, Any]]) -> Optional[bpy.types.Object]:
+    """Istanza, proxy LOD, cache .blend o import completo, nell'ordine"""
+    registry = get_instance_registry()
+    checksum = registry.get_source_checksum(model_file, asset_id)
+    reuse = getattr(context.scene, 'openshelf_reuse_mesh_data', True)
+
+    if checksum and reuse:
+        instanced = registry.instance(context, asset_id, checksum, import_settings)
+        if instanced is not None:
+            return instanced
+
+    use_proxy = checksum and getattr(context.scene, 'openshelf_proxy_import', True)
+    if use_proxy and get_lod_manager().has_lods(asset_id, checksum):
+        proxy_obj = get_lod_manager().create_proxy_object(context, asset_id, checksum)
+        if proxy_obj is not None:
+            _place_objects(context, [proxy_obj], import_settings)
+            registry.register(asset_id, checksum, proxy_obj)
+            return proxy_obj
+
+    # Mesh leggere: niente LOD da generare (lo dicono le statistiche del file, senza importarlo)
+    if use_proxy and not get_lod_manager().model_needs_lods(asset_id):
+        use_proxy = False
+
+    use_blend_cache = checksum and getattr(context.scene, 'openshelf_use_blend_cache', True)
+    if use_blend_cache:
+        cached_objects = get_blend_cache().load(context, asset_id, checksum)
+        if cached_objects:
+            _place_objects(context, cached_objects, import_settings)
+            registry.register(asset_id, checksum, cached_objects[0], cached_objects)
+            if use_proxy:
+                _schedule_post_import(asset_id, checksum, cached_objects, False, True)
+            return cached_objects[0]
+
+    # Gli importer restituiscono solo l'oggetto principale: le altre parti sono i nuovi oggetti
+    existing = set(bpy.data.objects.keys())
+    imported_obj = import_func()
+    if imported_obj is not None and checksum:
+        imported_objects = [imported_obj] + [obj for obj in bpy.data.objects
+                                             if obj.name not in existing and obj != imported_obj]
+        registry.register(asset_id, checksum, imported_obj, imported_objects)
+        if use_blend_cache or use_proxy:
+            _schedule_post_import(asset_id, checksum, imported_objects, use_blend_cache, use_proxy)
+
+    return imported_obj
+
+
+def _schedule_post_import(asset_id: str, checksum: str, objects: List[bpy.types.Object],
+                          save_blend: bool, make_proxy: bool):
+    """
+    Post-elaborazione alla fine dell'operatore corrente, quando materiali e
+    metadati sono già stati applicati: prima la cache .blend (risoluzione piena),
+    poi LOD e passaggio al proxy
+    """
+    # Solo gli asset della libreria hanno cache .blend e LOD
+    if get_library_manager().index.get(asset_id) is None:
+        return
+
+    object_names = [obj.name for obj in objects]
+
+    def post_import():
+        imported_obj = bpy.data.objects.get(object_names[0])
+        if imported_obj is None:
+            return None
+
+        if save_blend:
+            parts = [bpy.data.objects.get(name) for name in object_names]
+            get_blend_cache().save(asset_id, checksum, [obj for obj in parts if obj is not None])
+        if make_proxy:
+            get_lod_manager().apply_proxy_first(bpy.context, imported_obj, asset_id, checksum)
+        return None
+
+    bpy.app.timers.register(post_import, first_interval=0.0)
+
+
+# Istanza globale
+_global_instance_registry = None
+
+def get_instance_registry() -> AssetInstanceRegistry:
+    """Ottiene l'istanza globale del registro istanze"""
+    global _global_instance_registry
+
+    if _global_instance_registry is None:
+        _global_instance_registry = AssetInstanceRegistry()
+
+    return _global_instance_registry
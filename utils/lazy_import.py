@@ -0,0 +1,71 @@
+"""
+OpenShelf Lazy Import
+Riferimenti a funzioni e classi dei moduli pesanti (download, loader,
+repository) che importano il modulo solo al primo uso: gli operatori si
+registrano all'avvio di Blender senza caricare l'implementazione
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Moduli caricati su richiesta: nome -> millisecondi di import
+_load_timings: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+class LazyAttribute:
+    """Proxy di un attributo di modulo: importa al primo accesso o chiamata"""
+
+    __slots__ = ('_module_name', '_attr', '_package', '_target')
+
+    def __init__(self, module_name: str, attr: str, package: Optional[str] = None):
+        self._module_name = module_name
+        self._attr = attr
+        self._package = package
+        self._target = None
+
+    def _resolve(self) -> Any:
+        if self._target is None:
+            with _lock:
+                if self._target is None:
+                    start_time = time.perf_counter()
+                    module = importlib.import_module(self._module_name, self._package)
+                    full_name = module.__name__
+                    if full_name not in _load_timings:
+                        _load_timings[full_name] = (time.perf_counter() - start_time) * 1000
+                        print(f"OpenShelf: Loaded {full_name} on first use "
+                              f"({_load_timings[full_name]:.1f}ms)")
+                    self._target = getattr(module, self._attr)
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<LazyAttribute {self._module_name}.{self._attr} ({state})>"
+
+
+def lazy_import(module_name: str, attr: str, package: Optional[str] = None) -> LazyAttribute:
+    """
+    Riferimento pigro a module_name.attr
+
+    Args:
+        module_name: Nome del modulo (anche relativo, es. '..utils.download_manager')
+        attr: Funzione o classe da usare
+        package: __package__ del chiamante per gli import relativi
+
+    Returns:
+        Proxy chiamabile che inoltra attributi e chiamate all'oggetto reale
+    """
+    return LazyAttribute(module_name, attr, package)
+
+
+def get_load_timings() -> Dict[str, float]:
+    """Moduli caricati su richiesta finora, con il tempo di import in ms"""
+    return dict(_load_timings)
@@ -0,0 +1,354 @@
+"""
+OpenShelf Library Index
+Indice SQLite della libreria locale (asset, modello principale, file, dimensioni, checksum)
+con copia in memoria per letture O(1) senza accessi al filesystem
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILENAME = "library_index.db"
+INDEX_SCHEMA_VERSION = 1
+
+# Sottocartella degli asset (i path salvati sono relativi alla root della libreria)
+MODELS_DIRNAME = "models"
+
+# Blocco di lettura per il calcolo dei checksum
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    asset_id TEXT PRIMARY KEY,
+    asset_dir TEXT NOT NULL,
+    primary_model TEXT,
+    total_size INTEGER NOT NULL DEFAULT 0,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    installed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    asset_id TEXT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    checksum TEXT,
+    PRIMARY KEY (asset_id, path)
+);
+CREATE TABLE IF NOT EXISTS model_stats (
+    checksum TEXT PRIMARY KEY,
+    stats TEXT NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def compute_checksum(file_path: Path) -> str:
+    """SHA-256 di un file letto a blocchi"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe_files(asset_dir: Path, relative_paths: Optional[Iterable[str]] = None,
+                   with_checksum: bool = True) -> List[Tuple[str, int, Optional[str]]]:
+    """
+    Raccoglie (path relativo, dimensione, checksum) dei file di un asset
+
+    Args:
+        asset_dir: Directory dell'asset
+        relative_paths: File da descrivere (None = tutti tranne metadata.json)
+        with_checksum: Se calcolare lo SHA-256
+
+    Returns:
+        Lista di tuple (path, size, checksum)
+    """
+    if relative_paths is None:
+        relative_paths = [
+            path.relative_to(asset_dir).as_posix()
+            for path in asset_dir.rglob("*")
+            if path.is_file() and path.name != "metadata.json"
+        ]
+
+    entries = []
+    for relative in relative_paths:
+        file_path = asset_dir / relative
+        if not file_path.is_file():
+            continue
+        checksum = compute_checksum(file_path) if with_checksum else None
+        entries.append((relative, file_path.stat().st_size, checksum))
+
+    return entries
+
+
+class LibraryIndex:
+    """Indice transazionale della libreria con mirror in memoria"""
+
+    def __init__(self, library_path: Path):
+        self.library_path = Path(library_path)
+        self.index_path = self.library_path / INDEX_FILENAME
+        self._lock = threading.RLock()
+        self._assets: Dict[str, Dict[str, Any]] = {}
+        self._total_size = 0
+        self.version = 0
+        self._ids = frozenset()
+        self._ids_version = -1
+        self.is_new = not self.index_path.exists()
+
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+            (str(INDEX_SCHEMA_VERSION),)
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        """Carica l'intero indice in memoria"""
+        with self._lock:
+            self._assets.clear()
+            rows = self._conn.execute(
+                "SELECT asset_id, asset_dir, primary_model, total_size, file_count, installed_at FROM assets"
+            ).fetchall()
+
+            for asset_id, asset_dir, primary_model, total_size, file_count, installed_at in rows:
+                self._assets[asset_id] = {
+                    'asset_id': asset_id,
+                    'asset_dir': self._resolve_dir(asset_dir),
+                    'primary_model': primary_model,
+                    'total_size': total_size,
+                    'file_count': file_count,
+                    'installed_at': installed_at,
+                }
+
+            self._total_size = sum(record['total_size'] for record in self._assets.values())
+            self.version += 1
+
+    def _relative_dir(self, asset_dir) -> str:
+        """
+        Path dell'asset relativo alla root della libreria, così l'indice resta
+        valido se la libreria viene spostata, copiata o montata altrove
+        """
+        path = Path(asset_dir)
+        if not path.is_absolute():
+            return path.as_posix()
+        try:
+            return path.relative_to(self.library_path).as_posix()
+        except ValueError:
+            # Path assoluto di un'altra posizione (indici delle versioni precedenti)
+            return f"{MODELS_DIRNAME}/{path.name}"
+
+    def _resolve_dir(self, stored: str) -> str:
+        """Path assoluto della directory di un asset a partire dal valore salvato"""
+        return str(self.library_path / self._relative_dir(stored))
+
+    # ----------------------------------------------------------------- lettura
+
+    def contains(self, asset_id: str) -> bool:
+        """True se l'asset è installato (solo memoria)"""
+        return asset_id in self._assets
+
+    def installed_ids(self) -> frozenset:
+        """Insieme degli ID installati, ricalcolato solo quando cambia la versione"""
+        with self._lock:
+            if self._ids_version != self.version:
+                self._ids = frozenset(self._assets)
+                self._ids_version = self.version
+            return self._ids
+
+    def get(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        """Record dell'asset o None (solo memoria)"""
+        record = self._assets.get(asset_id)
+        return dict(record) if record else None
+
+    def asset_ids(self) -> List[str]:
+        """ID di tutti gli asset installati"""
+        with self._lock:
+            return list(self._assets.keys())
+
+    def get_totals(self) -> Tuple[int, int]:
+        """(numero asset, dimensione totale in bytes) senza accessi al disco"""
+        with self._lock:
+            return len(self._assets), self._total_size
+
+    def get_files(self, asset_id: str) -> List[Dict[str, Any]]:
+        """File registrati per un asset"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, checksum FROM files WHERE asset_id = ? ORDER BY path",
+                (asset_id,)
+            ).fetchall()
+        return [{'path': path, 'size': size, 'checksum': checksum} for path, size, checksum in rows]
+
+    def get_file_checksum(self, asset_id: str, path: str) -> Optional[str]:
+        """Checksum registrato per un file di un asset (path relativo)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT checksum FROM files WHERE asset_id = ? AND path = ?",
+                (asset_id, path)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_model_stats(self, checksum: str) -> Optional[Dict[str, Any]]:
+        """Statistiche del modello con questo checksum (vedi obj_scanner), se già calcolate"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stats FROM model_stats WHERE checksum = ?", (checksum,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # -------------------------------------------------------------- scrittura
+
+    def put_model_stats(self, checksum: str, stats: Dict[str, Any]):
+        """Salva le statistiche di un modello; legate al contenuto, sopravvivono a rebuild()"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO model_stats (checksum, stats, scanned_at) VALUES (?, ?, ?)",
+                    (checksum, json.dumps(stats), time.time())
+                )
+
+    def add_asset(self, asset_id: str, asset_dir: Path, primary_model: Optional[str],
+                  files: List[Tuple[str, int, Optional[str]]]):
+        """
+        Registra (o sostituisce) un asset installato in un'unica transazione
+
+        Args:
+            asset_id: ID dell'asset
+            asset_dir: Directory dell'asset
+            primary_model: Path relativo del modello principale
+            files: Lista (path relativo, dimensione, checksum)
+        """
+        total_size = sum(size for _, size, _ in files)
+        relative_dir = self._relative_dir(asset_dir)
+        record = {
+            'asset_id': asset_id,
+            'asset_dir': self._resolve_dir(relative_dir),
+            'primary_model': primary_model,
+            'total_size': total_size,
+            'file_count': len(files),
+            'installed_at': time.time(),
+        }
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM files WHERE asset_id = ?", (asset_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO assets "
+                    "(asset_id, asset_dir, primary_model, total_size, file_count, installed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (asset_id, relative_dir, primary_model, total_size, len(files),
+                     record['installed_at'])
+                )
+                self._conn.executemany(
+                    "INSERT INTO files (asset_id, path, size, checksum) VALUES (?, ?, ?, ?)",
+                    [(asset_id, path, size, checksum) for path, size, checksum in files]
+                )
+
+            previous = self._assets.get(asset_id)
+            if previous:
+                self._total_size -= previous['total_size']
+            self._assets[asset_id] = record
+            self._total_size += total_size
+            self.version += 1
+
+    def add_files(self, asset_id: str, files: List[Tuple[str, int, Optional[str]]]):
+        """Aggiunge file a un asset già registrato (es. membri recuperati in seguito)"""
+        with self._lock:
+            record = self._assets.get(asset_id)
+            if record is None:
+                return
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (asset_id, path, size, checksum) VALUES (?, ?, ?, ?)",
+                    [(asset_id, path, size, checksum) for path, size, checksum in files]
+                )
+                total_size, file_count = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM files WHERE asset_id = ?",
+                    (asset_id,)
+                ).fetchone()
+                self._conn.execute(
+                    "UPDATE assets SET total_size = ?, file_count = ? WHERE asset_id = ?",
+                    (total_size, file_count, asset_id)
+                )
+
+            self._total_size += total_size - record['total_size']
+            record['total_size'] = total_size
+            record['file_count'] = file_count
+            self.version += 1
+
+    def remove_asset(self, asset_id: str) -> bool:
+        """Rimuove un asset dall'indice"""
+        with self._lock:
+            if asset_id not in self._assets:
+                return False
+
+            with self._conn:
+                self._conn.execute("DELETE FROM files WHERE asset_id = ?", (asset_id,))
+                self._conn.execute("DELETE FROM assets WHERE asset_id = ?", (asset_id,))
+
+            self._total_size -= self._assets.pop(asset_id)['total_size']
+            self.version += 1
+            return True
+
+    def rebuild(self, entries: List[Dict[str, Any]]):
+        """
+        Ricostruisce l'indice da zero in un'unica transazione
+
+        Args:
+            entries: Lista di dict con asset_id, asset_dir, primary_model, files
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute("DELETE FROM assets")
+
+                for entry in entries:
+                    files = entry['files']
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO assets "
+                        "(asset_id, asset_dir, primary_model, total_size, file_count, installed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (entry['asset_id'], self._relative_dir(entry['asset_dir']), entry.get('primary_model'),
+                         sum(size for _, size, _ in files), len(files),
+                         entry.get('installed_at', time.time()))
+                    )
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO files (asset_id, path, size, checksum) VALUES (?, ?, ?, ?)",
+                        [(entry['asset_id'], path, size, checksum) for path, size, checksum in files]
+                    )
+
+            self._load()
+
+    def close(self):
+        """Chiude la connessione SQLite"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception as e:
+                logger.warning("Error closing library index: %s", e)
+
+
+def load_metadata_file(asset_dir: Path) -> Optional[Dict[str, Any]]:
+    """Legge metadata.json di una directory asset (usato solo in ricostruzione)"""
+    try:
+        with open(asset_dir / "metadata.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
@@ -0,0 +1,304 @@
+"""
+OpenShelf Library Mirror
+Pre-popolamento di una libreria locale (anche condivisa) con tutti gli asset
+di un repository che corrispondono a una query: download concorrenti,
+verifica dei file installati, journal per riprendere un mirror interrotto e
+report finale. Idempotente: gli asset già presenti e integri vengono saltati.
+Non richiede bpy (vedi tools/mirror_library.py per la riga di comando)
+"""
+
+import json
+import os
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Journal del mirror nella root della libreria
+JOURNAL_FILENAME = ".openshelf_mirror.json"
+
+# Alias accettati nelle espressioni 'campo:valore' -> chiave dei filtri del repository
+FILTER_ALIASES = {
+    'type': 'object_type',
+    'object_type': 'object_type',
+    'material': 'material',
+    'chronology': 'chronology',
+    'date': 'chronology',
+    'inventory': 'inventory',
+}
+
+
+def parse_filter_expression(expression: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Divide un'espressione in testo libero e filtri per campo
+
+        'anfora material:bronzo chronology:"sec. I d.C."'
+        -> ('anfora', {'material': 'bronzo', 'chronology': 'sec. I d.C.'})
+
+    Raises:
+        ValueError: campo sconosciuto o virgolette non chiuse
+    """
+    words = []
+    filters = {}
+
+    for token in shlex.split(expression or ""):
+        name, sep, value = token.partition(":")
+        if sep and name.lower() in FILTER_ALIASES:
+            filters[FILTER_ALIASES[name.lower()]] = value
+        elif sep and name and ' ' not in name and not name.startswith(('http', '/')):
+            raise ValueError(f"Unknown filter field '{name}' (use one of: {', '.join(sorted(FILTER_ALIASES))})")
+        else:
+            words.append(token)
+
+    return " ".join(words), filters
+
+
+def library_asset(asset) -> SimpleNamespace:
+    """CulturalAsset del repository -> oggetto accettato da LocalLibraryManager.download_asset"""
+    return SimpleNamespace(
+        asset_id=asset.id,
+        name=asset.name,
+        description=asset.description,
+        repository=asset.repository,
+        object_type=asset.object_type,
+        inventory_number=asset.inventory_number,
+        materials=', '.join(asset.materials),
+        chronology=', '.join(asset.chronology),
+        license_info=asset.license_info,
+        quality_score=asset.quality_score,
+        model_urls=json.dumps(asset.model_urls),
+    )
+
+
+def select_assets(repository, expression: str = "", limit: int = 100000) -> List[Any]:
+    """Asset del repository che corrispondono all'espressione (solo quelli con modelli 3D)"""
+    query, filters = parse_filter_expression(expression)
+    assets = repository.search_assets(query, filters, limit=limit)
+    return [asset for asset in assets if asset.model_urls]
+
+
+class MirrorJournal:
+    """Stato persistente per asset: riprende i mirror interrotti e limita i tentativi"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('assets', {})
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable mirror journal %s: %s", self.path, e)
+            self.entries = {}
+
+    def save(self):
+        """Scrittura atomica (file temporaneo + rename) sotto lock: il temporaneo è condiviso"""
+        with self._lock:
+            data = json.dumps({'assets': self.entries}, indent=1)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(data, encoding='utf-8')
+            os.replace(tmp_path, self.path)
+
+    def attempts(self, asset_id: str) -> int:
+        with self._lock:
+            entry = self.entries.get(asset_id)
+            return entry['attempts'] if entry and entry['status'] == 'failed' else 0
+
+    def record(self, asset_id: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            previous = self.entries.get(asset_id, {})
+            attempts = previous.get('attempts', 0) + 1 if status == 'failed' else 0
+            self.entries[asset_id] = {
+                'status': status,
+                'attempts': attempts,
+                'error': error,
+                'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+
+
+@dataclass
+class MirrorReport:
+    """Riepilogo di un mirror"""
+    matched: int = 0
+    installed: List[str] = field(default_factory=list)
+    repaired: List[str] = field(default_factory=list)
+    already_present: List[str] = field(default_factory=list)
+    skipped_failed: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    cancelled: List[str] = field(default_factory=list)
+    bytes_installed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.cancelled
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def summary_lines(self) -> List[str]:
+        lines = [
+            f"Matched assets:   {self.matched}",
+            f"Installed:        {len(self.installed)} ({self.bytes_installed / (1024 * 1024):.1f} MB)",
+            f"Repaired:         {len(self.repaired)}",
+            f"Already present:  {len(self.already_present)}",
+            f"Failed:           {len(self.failed)}",
+        ]
+        if self.skipped_failed:
+            lines.append(f"Skipped (too many failed attempts): {len(self.skipped_failed)}")
+        if self.cancelled:
+            lines.append(f"Cancelled:        {len(self.cancelled)} (re-run to resume)")
+        lines.append(f"Elapsed:          {self.elapsed:.1f}s")
+        for asset_id, error in sorted(self.failed.items()):
+            lines.append(f"  ✗ {asset_id}: {error}")
+        return lines
+
+
+class LibraryMirror:
+    """Installa molti asset in una LocalLibraryManager con max_concurrent download paralleli"""
+
+    def __init__(self, library_manager, max_concurrent: int = 8, verify_checksums: bool = False,
+                 max_attempts: int = 3, retry_failed: bool = False,
+                 progress_callback: Optional[Callable[[str], None]] = None):
+        self.library_manager = library_manager
+        self.max_concurrent = max(1, max_concurrent)
+        self.verify_checksums = verify_checksums
+        self.max_attempts = max(1, max_attempts)
+        self.retry_failed = retry_failed
+        self.progress_callback = progress_callback
+        self.journal = MirrorJournal(Path(library_manager.library_path) / JOURNAL_FILENAME)
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._done = 0
+
+    def _report_progress(self, message: str):
+        if self.progress_callback:
+            self.progress_callback(message)
+        else:
+            logger.info("%s", message)
+
+    def plan(self, assets: List[Any], report: MirrorReport,
+             remove_damaged: bool = True) -> List[Tuple[SimpleNamespace, bool]]:
+        """
+        Decide cosa scaricare: (asset, è_una_riparazione). Gli asset già presenti
+        vengono verificati; quelli danneggiati sono rimossi (se remove_damaged)
+        e reinstallati
+        """
+        todo = []
+        seen = set()
+
+        for asset in assets:
+            snapshot = asset if hasattr(asset, 'asset_id') else library_asset(asset)
+            if snapshot.asset_id in seen:
+                continue
+            seen.add(snapshot.asset_id)
+            report.matched += 1
+
+            if self.library_manager.is_asset_downloaded(snapshot.asset_id):
+                problems = self.library_manager.verify_asset(snapshot.asset_id, self.verify_checksums)
+                if not problems:
+                    report.already_present.append(snapshot.asset_id)
+                    continue
+                logger.warning("Asset %s damaged (%s), reinstalling", snapshot.asset_id, "; ".join(problems[:3]))
+                if remove_damaged:
+                    self.library_manager.remove_asset(snapshot.asset_id)
+                todo.append((snapshot, True))
+                continue
+
+            if not self.retry_failed and self.journal.attempts(snapshot.asset_id) >= self.max_attempts:
+                report.skipped_failed.append(snapshot.asset_id)
+                continue
+
+            todo.append((snapshot, False))
+
+        return todo
+
+    def mirror(self, assets: List[Any]) -> MirrorReport:
+        """Installa tutti gli asset mancanti; Ctrl+C interrompe lasciando un journal riprendibile"""
+        report = MirrorReport()
+        start_time = time.time()
+        todo = self.plan(assets, report)
+        self._done = 0
+
+        self._report_progress(f"{report.matched} assets matched, {len(report.already_present)} already "
+                              f"in library, {len(todo)} to install")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="openshelf_mirror")
+        futures = {executor.submit(self._install, snapshot, repair, len(todo), report): snapshot.asset_id
+                   for snapshot, repair in todo}
+
+        try:
+            # Journal salvato una volta per blocco di max_concurrent asset completati
+            for completed, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                if completed % self.max_concurrent == 0:
+                    self.journal.save()
+        except KeyboardInterrupt:
+            self.cancel()
+            self._report_progress("Interrupted: waiting for running downloads to finish...")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, asset_id in futures.items():
+                if future.cancelled():
+                    report.cancelled.append(asset_id)
+            self.journal.save()
+
+        report.elapsed = time.time() - start_time
+        return report
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _install(self, snapshot, repair: bool, total: int, report: MirrorReport):
+        """Worker: download, verifica e registrazione nel journal di un asset"""
+        asset_id = snapshot.asset_id
+        if self.cancel_event.is_set():
+            with self._lock:
+                report.cancelled.append(asset_id)
+            return
+
+        last_error = [None]
+
+        def progress_callback(message):
+            if message.startswith("Error"):
+                last_error[0] = message
+
+        error = None
+        try:
+            if not self.library_manager.download_asset(snapshot, progress_callback=progress_callback):
+                error = last_error[0] or "download failed"
+            else:
+                problems = self.library_manager.verify_asset(asset_id, self.verify_checksums)
+                if problems:
+                    self.library_manager.remove_asset(asset_id)
+                    error = "verification failed: " + "; ".join(problems[:3])
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            self._done += 1
+            if error is None:
+                size = self.library_manager.get_asset_size(asset_id)
+                report.bytes_installed += size
+                (report.repaired if repair else report.installed).append(asset_id)
+                status = f"✓ {asset_id} ({size / (1024 * 1024):.1f} MB)"
+            else:
+                report.failed[asset_id] = error
+                status = f"✗ {asset_id}: {error}"
+            done = self._done
+
+        self.journal.record(asset_id, 'installed' if error is None else 'failed', error)
+        self._report_progress(f"[{done}/{total}] {status}")
@@ -0,0 +1,10 @@
+"""
+OpenShelf Library Status
+Stati di un asset rispetto alla libreria locale (vedi
+LocalLibraryManager.get_assets_status): modulo senza dipendenze, importabile
+dai pannelli alla registrazione senza caricare la libreria
+"""
+
+STATUS_DOWNLOADED = 'DOWNLOADED'
+STATUS_PARTIAL = 'PARTIAL'    # download/installazione in corso
+STATUS_MISSING = 'MISSING'
@@ -13,16 +13,32 @@ import tempfile
 import zipfile
 import uuid
 import time
+from .cache_metrics import get_cache_metrics
+from .archive_extractor import get_archive_extractor
+from .archive_planner import plan_archive
+from .streaming_archive import StreamingArchiveDownload, RangeNotSupported
+from .library_index import LibraryIndex, compute_checksum, describe_files, load_metadata_file
+from .tracing import traced
+from .host import check_online_access, get_preference
+from .shared_library import asset_dirname, get_shared_library
+from .obj_scanner import ObjStatsCache
+from .log import get_logger
+from .library_status import STATUS_DOWNLOADED, STATUS_PARTIAL, STATUS_MISSING
+
+logger = get_logger(__name__)
 
 class LocalLibraryManager:
     """Gestisce la libreria locale di modelli 3D"""
 
-    def __init__(self, library_path: Optional[str] = None):
+    def __init__(self, library_path: Optional[str] = None, shared_library=None,
+                 shared_library_path: Optional[str] = None):
         """
         Inizializza il gestore della libreria locale
 
         Args:
             library_path: Path alla directory della libreria locale
+            shared_library: SharedLibrary di rete da cui leggere e in cui pubblicare (opzionale)
+            shared_library_path: Path della share, aperta dai worker se shared_library è None
         """
         if library_path:
             self.library_path = Path(library_path)
@@ -40,6 +56,29 @@ class LocalLibraryManager:
         self.models_dir.mkdir(exist_ok=True)
         self.temp_dir.mkdir(exist_ok=True)
 
+        # Indice della libreria: le letture non toccano il filesystem
+        self.index = LibraryIndex(self.library_path)
+        if self.index.is_new:
+            # Il manager nasce anche dal draw dei pannelli: nessun SHA-256 della libreria qui
+            self.rebuild_index(with_checksum=False)
+
+        # Asset con download in corso (stato PARTIAL)
+        self._pending_downloads = set()
+        self._pending_version = 0
+
+        # Libreria condivisa del team (None = solo libreria locale)
+        self.shared_library = shared_library
+        self.shared_library_path = shared_library_path
+
+        # Statistiche dei modelli OBJ per checksum, persistite nell'indice
+        self.model_stats = ObjStatsCache(self.index)
+
+    def _get_shared_library(self):
+        """Libreria condivisa per i worker: attende l'apertura della share (mai dal thread UI)"""
+        if self.shared_library is None and self.shared_library_path:
+            self.shared_library = get_shared_library(self.shared_library_path, wait=True)
+        return self.shared_library
+
     @property
     def cache_dir(self):
         """Proprietà di compatibilità - restituisce temp_dir"""
@@ -48,25 +87,141 @@ class LocalLibraryManager:
     def get_asset_directory(self, asset_id: str) -> Path:
         """Ottiene la directory per un asset specifico"""
         # Sanitizza l'asset_id per il filesystem
-        safe_id = "".join(c for c in asset_id if c.isalnum() or c in "._-")
-        return self.models_dir / f"asset_{safe_id}"
+        return self.models_dir / asset_dirname(asset_id)
 
     def is_asset_downloaded(self, asset_id: str) -> bool:
-        """Controlla se un asset è già presente nella libreria locale"""
-        asset_dir = self.get_asset_directory(asset_id)
-        metadata_file = asset_dir / "metadata.json"
+        """Controlla se un asset è già presente nella libreria locale (solo indice in memoria)"""
+        return self.index.contains(asset_id)
 
-        # Deve esistere sia la directory che il file metadata
-        if not asset_dir.exists() or not metadata_file.exists():
-            return False
+    @property
+    def status_version(self) -> int:
+        """Contatore che cambia a ogni variazione dello stato degli asset"""
+        return self.index.version + self._pending_version
 
-        # Verifica che ci sia almeno un file 3D
-        supported_extensions = ['.obj', '.gltf', '.glb']
-        for ext in supported_extensions:
-            if list(asset_dir.glob(f"*{ext}")):
-                return True
+    def get_assets_status(self, asset_ids: List[str]) -> Dict[str, str]:
+        """
+        Stato di molti asset in una sola chiamata, senza accessi al filesystem
+
+        Args:
+            asset_ids: ID degli asset (es. tutti i risultati visibili)
+
+        Returns:
+            Dict asset_id -> STATUS_DOWNLOADED / STATUS_PARTIAL / STATUS_MISSING
+        """
+        installed = self.index.installed_ids()
+        pending = self._pending_downloads
+
+        status = {}
+        for asset_id in asset_ids:
+            if asset_id in pending:
+                status[asset_id] = STATUS_PARTIAL
+            elif asset_id in installed:
+                status[asset_id] = STATUS_DOWNLOADED
+            else:
+                status[asset_id] = STATUS_MISSING
+        return status
+
+    def _set_pending(self, asset_id: str, pending: bool):
+        """Segna (o rimuove) un asset come in download"""
+        if pending:
+            self._pending_downloads.add(asset_id)
+        else:
+            self._pending_downloads.discard(asset_id)
+        self._pending_version += 1
+
+    def get_asset_size(self, asset_id: str) -> int:
+        """Dimensione totale in bytes dei file di un asset nella libreria"""
+        record = self.index.get(asset_id)
+        return record['total_size'] if record else 0
+
+    def verify_asset(self, asset_id: str, with_checksum: bool = False) -> List[str]:
+        """
+        Confronta i file di un asset installato con quelli registrati nell'indice
+
+        Args:
+            asset_id: ID dell'asset
+            with_checksum: Se ricalcolare anche gli SHA-256 (più lento)
+
+        Returns:
+            Lista dei problemi trovati (vuota se l'asset è integro)
+        """
+        record = self.index.get(asset_id)
+        if not record:
+            return ["not installed"]
+
+        asset_dir = Path(record['asset_dir'])
+        problems = []
+
+        if not record['primary_model'] or not (asset_dir / record['primary_model']).is_file():
+            problems.append(f"missing primary model {record['primary_model']}")
+
+        for entry in self.index.get_files(asset_id):
+            file_path = asset_dir / entry['path']
+            if not file_path.is_file():
+                problems.append(f"missing {entry['path']}")
+            elif file_path.stat().st_size != entry['size']:
+                problems.append(f"size mismatch {entry['path']}")
+            elif with_checksum and entry['checksum'] and compute_checksum(file_path) != entry['checksum']:
+                problems.append(f"checksum mismatch {entry['path']}")
+
+        return problems
+
+    @traced("index.build")
+    def rebuild_index(self, with_checksum: bool = True) -> Optional[int]:
+        """
+        Ricostruisce l'indice scansionando models/ (prima apertura o refresh manuale)
+
+        Args:
+            with_checksum: Se calcolare gli SHA-256 dei file; senza, i checksum
+                già noti vengono conservati per i file con la stessa dimensione
+
+        Returns:
+            Numero di asset indicizzati, o None se la ricostruzione è fallita
+        """
+        entries = []
+
+        try:
+            for asset_dir in self.models_dir.iterdir():
+                if not asset_dir.is_dir():
+                    continue
+
+                metadata = load_metadata_file(asset_dir)
+                if not metadata or not metadata.get('asset_id'):
+                    continue
+
+                primary_model = self._probe_primary_model(asset_dir, metadata)
+                if not primary_model:
+                    continue
+
+                files = describe_files(asset_dir, with_checksum=with_checksum)
+                if not with_checksum:
+                    known = {entry['path']: entry for entry in self.index.get_files(metadata['asset_id'])}
+                    files = [
+                        (path, size, known[path]['checksum']
+                         if path in known and known[path]['size'] == size else None)
+                        for path, size, _ in files
+                    ]
+
+                entries.append({
+                    'asset_id': metadata['asset_id'],
+                    'asset_dir': asset_dir,
+                    'primary_model': primary_model,
+                    'files': files,
+                    'installed_at': asset_dir.stat().st_mtime,
+                })
+
+            self.index.rebuild(entries)
+            logger.info("Library index rebuilt with %d assets", len(entries))
+
+        except Exception as e:
+            logger.error("Error rebuilding library index: %s", e)
+            return None
 
-        return False
+        return len(entries)
+
+    def record_library_hit(self, asset_id: str):
+        """Registra nelle metriche un asset servito dalla libreria locale"""
+        get_cache_metrics().record_hit('library', self.get_asset_size(asset_id))
 
     def get_asset_metadata(self, asset_id: str) -> Optional[Dict[str, Any]]:
         """Legge i metadati di un asset dalla libreria locale"""
@@ -80,7 +235,37 @@ class LocalLibraryManager:
             with open(metadata_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"OpenShelf: Error reading metadata for {asset_id}: {e}")
+            logger.error("Error reading metadata for %s: %s", asset_id, e)
+            return None
+
+    def get_model_stats(self, asset_id: str, scan: bool = True):
+        """
+        Statistiche (ObjStats) del modello principale dell'asset
+
+        Usa il checksum già registrato nell'indice, quindi il file viene
+        scansionato una sola volta per contenuto
+
+        Args:
+            asset_id: ID dell'asset
+            scan: Se False usa solo le statistiche in cache, senza leggere
+                il file (main thread)
+
+        Returns:
+            ObjStats o None se l'asset non è installato o il modello non è un OBJ
+        """
+        model_file = self._get_primary_model_file(asset_id)
+        if not model_file or not model_file.lower().endswith('.obj'):
+            return None
+
+        record = self.index.get(asset_id)
+        checksum = self.index.get_file_checksum(asset_id, record['primary_model']) if record else None
+
+        try:
+            if not scan:
+                return self.model_stats.peek(model_file, checksum)
+            return self.model_stats.get(model_file, checksum)
+        except (OSError, ValueError) as e:
+            logger.warning("Cannot scan model of %s: %s", asset_id, e)
             return None
 
     def save_asset_metadata(self, asset_id: str, metadata: Dict[str, Any]) -> bool:
@@ -88,21 +273,30 @@ class LocalLibraryManager:
         asset_dir = self.get_asset_directory(asset_id)
         asset_dir.mkdir(parents=True, exist_ok=True)
 
-        metadata_file = asset_dir / "metadata.json"
-
         try:
-            # Aggiungi timestamp
-            import time
-            metadata['downloaded_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
-            metadata['library_version'] = "1.0"
-
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            self._write_metadata_file(asset_dir, metadata)
             return True
         except Exception as e:
-            print(f"OpenShelf: Error saving metadata for {asset_id}: {e}")
+            logger.error("Error saving metadata for %s: %s", asset_id, e)
             return False
 
+    def _write_metadata_file(self, directory: Path, metadata: Dict[str, Any]):
+        """Scrive metadata.json in una directory (asset finale o staging) in modo atomico"""
+        # Aggiungi timestamp
+        metadata['downloaded_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        metadata['library_version'] = "1.0"
+
+        # File temporaneo + rename: i lettori non vedono mai un JSON scritto a metà
+        tmp_file = directory / f"metadata.json.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, directory / "metadata.json")
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+
+    @traced("library.install")
     def download_asset(self, asset_data, progress_callback: Optional[callable] = None) -> Optional[str]:
         """
         Scarica un asset nella libreria locale - FIX COMPLETO
@@ -120,11 +314,27 @@ class LocalLibraryManager:
         if self.is_asset_downloaded(asset_id):
             primary_model = self._get_primary_model_file(asset_id)
             if primary_model and os.path.exists(primary_model):
+                self.record_library_hit(asset_id)
                 if progress_callback:
                     progress_callback("Asset already available!")
                 return primary_model
 
-        print(f"OpenShelf: Downloading asset {asset_id} - {asset_data.name}")
+        # Read-through: se un'altra postazione l'ha già scaricato basta una copia dalla share
+        shared_library = self._get_shared_library()
+        if shared_library is not None:
+            primary_model = self._install_from_shared(asset_id, progress_callback)
+            if primary_model:
+                return primary_model
+
+        try:
+            check_online_access()
+        except Exception as e:
+            logger.error("Cannot download asset %s: %s", asset_id, e)
+            if progress_callback:
+                progress_callback(f"Error: {str(e)}")
+            return None
+
+        logger.info("Downloading asset %s - %s", asset_id, asset_data.name)
 
         # Estrai URL dai dati dell'asset
         try:
@@ -153,15 +363,24 @@ class LocalLibraryManager:
                 raise Exception("No valid model URLs found")
 
         except Exception as e:
-            print(f"OpenShelf: Error parsing model URLs: {e}")
+            logger.error("Error parsing model URLs: %s", e)
             if progress_callback:
                 progress_callback(f"Error: {str(e)}")
             return None
 
         # FIX CRITICO: Inizializza temp_download_dir all'inizio
         temp_download_dir = None
+        shared_lock = None
 
         try:
+            # Un solo download per asset in tutto il team (lock rilasciato nel finally)
+            if shared_library is not None:
+                shared_lock, primary_model = self._lock_shared_asset(asset_id, progress_callback)
+                if primary_model:
+                    return primary_model
+
+            self._set_pending(asset_id, True)
+
             # Setup directory
             temp_download_dir = self.temp_dir / f"download_{uuid.uuid4().hex[:8]}"
             temp_download_dir.mkdir(parents=True, exist_ok=True)
@@ -175,11 +394,20 @@ class LocalLibraryManager:
                 if progress_callback:
                     progress_callback(message)
 
+            staging_dir = temp_download_dir / "staging"
             downloaded_archive = None
+            plan = None
+            fetch_start = time.time()
             for i, url in enumerate(model_urls):
                 if progress_callback:
                     progress_callback(f"Trying download {i+1}/{len(model_urls)}")
 
+                # Modalità pipeline: download per intervalli con estrazione sovrapposta
+                plan = self._stream_archive(url, temp_download_dir, staging_dir,
+                                            progress_callback=progress_callback)
+                if plan is not None:
+                    break
+
                 downloaded_archive = self._download_file(
                     url,
                     temp_download_dir,
@@ -188,32 +416,31 @@ class LocalLibraryManager:
                 if downloaded_archive:
                     break
 
-            if not downloaded_archive:
+            if plan is None and not downloaded_archive:
                 raise Exception("Failed to download from any URL")
 
-            # Extract
-            if progress_callback:
-                progress_callback("Extracting archive...")
-
-            extract_dir = temp_download_dir / "extracted"
-            self._extract_archive(downloaded_archive, extract_dir)
+            if plan is None:
+                get_cache_metrics().record_miss('library', downloaded_archive.stat().st_size,
+                                                time.time() - fetch_start)
 
-            # Trova file 3D
-            model_files = self._find_3d_files(extract_dir)
-            if not model_files:
-                raise Exception("No 3D files found in archive")
+                # Install: estrazione diretta in staging e rename atomico nella directory finale
+                if progress_callback:
+                    progress_callback("Extracting archive...")
 
-            # Crea directory asset finale
-            asset_dir.mkdir(parents=True, exist_ok=True)
+                # Estrae solo il modello principale e i file che referenzia
+                plan = plan_archive(str(downloaded_archive))
+                if plan is None:
+                    raise Exception("No 3D files found in archive")
 
-            # FIX CRITICO: Passa il callback alla copia
-            def copy_progress(message):
-                if progress_callback:
-                    progress_callback(message)
+                self._extract_archive(downloaded_archive, staging_dir, members=plan.members,
+                                      progress_callback=progress_callback)
 
-            self._copy_asset_files(extract_dir, asset_dir, progress_callback=copy_progress)
+            if plan.is_selective:
+                logger.info("Installed %d of %d archive members (%d/%d bytes)",
+                            len(plan.members), len(plan.members) + len(plan.skipped),
+                            plan.selected_size, plan.total_size)
 
-            # Salva metadati
+            # Salva metadati nello staging, così l'asset appare completo in un colpo solo
             metadata = {
                 'asset_id': asset_data.asset_id,
                 'name': asset_data.name,
@@ -226,10 +453,25 @@ class LocalLibraryManager:
                 'license_info': asset_data.license_info,
                 'quality_score': asset_data.quality_score,
                 'source_urls': model_urls,
-                'files': [f.name for f in asset_dir.iterdir() if f.is_file()]
+                'primary_model': plan.primary_model,
+                'files': plan.members,
+                # Membri non estratti, recuperabili con fetch_skipped_files()
+                'skipped_files': plan.skipped
             }
 
-            self.save_asset_metadata(asset_id, metadata)
+            # Tier di risoluzione delle texture, generati prima che l'asset sia visibile
+            tier_files = self._generate_texture_tiers(staging_dir, plan.members, progress_callback)
+
+            self._write_metadata_file(staging_dir, metadata)
+            indexed_files = describe_files(staging_dir, plan.members + tier_files)
+            self._commit_staging_dir(staging_dir, asset_dir)
+            self.index.add_asset(asset_id, asset_dir, plan.primary_model, indexed_files)
+
+            if shared_lock is not None and shared_lock.lost:
+                logger.warning("Shared lock for %s was taken over, not publishing", asset_id)
+            elif shared_lock is not None:
+                self._publish_to_shared(asset_id, asset_dir, plan.primary_model, indexed_files,
+                                        progress_callback)
 
             # Trova e restituisci il file modello principale
             primary_model = self._get_primary_model_file(asset_id)
@@ -238,40 +480,205 @@ class LocalLibraryManager:
             if progress_callback:
                 progress_callback("Download complete!")
 
-            print(f"OpenShelf: Asset {asset_id} downloaded to {asset_dir}")
+            logger.info("Asset %s downloaded to %s", asset_id, asset_dir)
             return primary_model
 
         except Exception as e:
-            print(f"OpenShelf: Error downloading asset {asset_id}: {e}")
+            logger.error("Error downloading asset %s: %s", asset_id, e)
             if progress_callback:
                 progress_callback(f"Error: {str(e)}")
             return None
         finally:
+            self._set_pending(asset_id, False)
+            if shared_lock is not None:
+                shared_lock.release()
+
             # FIX CRITICO: Controlla se temp_download_dir è definito prima di usarlo
             if temp_download_dir is not None and temp_download_dir.exists():
                 try:
                     import shutil
                     shutil.rmtree(temp_download_dir, ignore_errors=True)
-                    print(f"OpenShelf: Cleaned up temp directory: {temp_download_dir}")
+                    logger.debug("Cleaned up temp directory: %s", temp_download_dir)
                 except Exception as e:
-                    print(f"OpenShelf: Error cleaning temp directory: {e}")
+                    logger.warning("Error cleaning temp directory: %s", e)
 
 
 
-    def _get_primary_model_file(self, asset_id: str) -> Optional[str]:
-        """Trova il file modello principale per un asset"""
-        asset_dir = self.get_asset_directory(asset_id)
+    @traced("library.shared_copy")
+    def _install_from_shared(self, asset_id: str, progress_callback: Optional[callable] = None) -> Optional[str]:
+        """
+        Copia un asset dalla libreria condivisa nella libreria locale
 
-        # Priorità: .obj, .gltf, .glb
-        priority_extensions = ['.obj', '.gltf', '.glb']
+        Returns:
+            Path al modello principale, o None se l'asset non è nella share
+        """
+        if self.shared_library.lookup(asset_id) is None:
+            get_cache_metrics().record_miss('shared')
+            return None
+
+        staging_dir = self.temp_dir / f"shared_{uuid.uuid4().hex[:8]}"
+        self._set_pending(asset_id, True)
+
+        try:
+            if progress_callback:
+                progress_callback("Copying from shared library...")
+
+            entry = self.shared_library.copy_to(asset_id, staging_dir)
+            if entry is None:
+                return None
+
+            files = [tuple(file_entry) for file_entry in entry['files']]
+            asset_dir = self.get_asset_directory(asset_id)
+            self._commit_staging_dir(staging_dir, asset_dir)
+            self.index.add_asset(asset_id, asset_dir, entry['primary_model'], files)
+            get_cache_metrics().record_hit('shared', sum(size for _, size, _ in files))
+
+            if progress_callback:
+                progress_callback("Download complete!")
+
+            logger.info("Asset %s copied from shared library %s", asset_id, self.shared_library.root)
+            return self._get_primary_model_file(asset_id)
+
+        except Exception as e:
+            logger.error("Error copying asset %s from shared library: %s", asset_id, e)
+            return None
+        finally:
+            self._set_pending(asset_id, False)
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def _lock_shared_asset(self, asset_id: str, progress_callback: Optional[callable] = None):
+        """
+        Acquisisce il lock condiviso dell'asset prima del download
+
+        Se un'altra postazione lo sta già scaricando attende che finisca e copia
+        il risultato. Se l'attesa scade si scarica comunque, senza pubblicare.
+
+        Returns:
+            (lock acquisito o None, path del modello se copiato dalla share)
+        """
+        lock = self.shared_library.lock(asset_id)
+
+        if not lock.acquire():
+            if progress_callback:
+                progress_callback("Waiting for another workstation to finish the download...")
+            if not lock.acquire(self.shared_library.lock_timeout):
+                logger.warning("Shared lock for %s still held, downloading privately", asset_id)
+                return None, None
+
+        # Un'altra postazione può aver pubblicato l'asset mentre aspettavamo
+        primary_model = self._install_from_shared(asset_id, progress_callback)
+        if primary_model:
+            lock.release()
+            return None, primary_model
+
+        return lock, None
+
+    def _publish_to_shared(self, asset_id: str, asset_dir: Path, primary_model: str,
+                           files: List, progress_callback: Optional[callable] = None):
+        """Pubblica nella share un asset appena installato (errori non fatali per l'installazione locale)"""
+        try:
+            if progress_callback:
+                progress_callback("Publishing to shared library...")
+            self.shared_library.publish(asset_id, asset_dir, primary_model, files)
+        except Exception as e:
+            logger.error("Cannot publish asset %s to shared library: %s", asset_id, e)
+
+    @traced("textures.tiers")
+    def _generate_texture_tiers(self, staging_dir: Path, members: List[str],
+                                progress_callback: Optional[callable] = None) -> List[str]:
+        """Genera i tier delle texture nello staging (solo dentro Blender)"""
+        try:
+            from .texture_tiers import get_texture_tier_processor, is_texture_tiers_enabled
+        except ImportError:
+            return []
+
+        processor = get_texture_tier_processor()
+        if not is_texture_tiers_enabled() or not processor.find_textures(members):
+            return []
+
+        if progress_callback:
+            progress_callback("Processing textures...")
+        return processor.generate(staging_dir, members)
+
+    def fetch_skipped_files(self, asset_id: str, names: Optional[List[str]] = None,
+                            progress_callback: Optional[callable] = None) -> List[str]:
+        """
+        Recupera su richiesta i membri dell'archivio saltati dall'estrazione selettiva
+
+        Args:
+            asset_id: ID dell'asset nella libreria
+            names: Nomi dei membri da recuperare (None = tutti quelli saltati)
+            progress_callback: Callback per messaggi di progresso
+
+        Returns:
+            Lista dei path estratti nella directory dell'asset
+        """
+        metadata = self.get_asset_metadata(asset_id)
+        if not metadata or not metadata.get('skipped_files'):
+            return []
+
+        skipped_names = [entry['name'] for entry in metadata['skipped_files']]
+        wanted = [name for name in skipped_names if names is None or name in names]
+        if not wanted:
+            return []
+
+        temp_download_dir = self.temp_dir / f"fetch_{uuid.uuid4().hex[:8]}"
+        temp_download_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            archive = None
+            for url in metadata.get('source_urls', []):
+                archive = self._download_file(url, temp_download_dir, progress_callback=progress_callback)
+                if archive:
+                    break
+
+            if not archive:
+                raise Exception("Failed to download from any URL")
+
+            extracted = get_archive_extractor().extract(
+                archive, self.get_asset_directory(asset_id), members=wanted
+            )
+
+            metadata['files'] = metadata.get('files', []) + wanted
+            metadata['skipped_files'] = [entry for entry in metadata['skipped_files']
+                                         if entry['name'] not in wanted]
+            self.save_asset_metadata(asset_id, metadata)
+            self.index.add_files(asset_id, describe_files(self.get_asset_directory(asset_id), wanted))
 
-        for ext in priority_extensions:
-            files = list(asset_dir.glob(f"*{ext}"))
+            logger.info("Fetched %d skipped files for asset %s", len(extracted), asset_id)
+            return extracted
+
+        except Exception as e:
+            logger.error("Error fetching skipped files for %s: %s", asset_id, e)
+            if progress_callback:
+                progress_callback(f"Error: {str(e)}")
+            return []
+        finally:
+            shutil.rmtree(temp_download_dir, ignore_errors=True)
+
+    def _probe_primary_model(self, asset_dir: Path, metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Cerca su disco il modello principale (path relativo) di una directory asset"""
+        if metadata and metadata.get('primary_model'):
+            if (asset_dir / metadata['primary_model']).is_file():
+                return metadata['primary_model']
+
+        # Priorità: .obj, .gltf, .glb (anche in sottocartelle dell'archivio)
+        for ext in ['.obj', '.gltf', '.glb']:
+            files = sorted(asset_dir.rglob(f"*{ext}"), key=lambda path: (len(path.parts), str(path)))
             if files:
-                return str(files[0])  # Restituisce il primo trovato
+                return files[0].relative_to(asset_dir).as_posix()
 
         return None
 
+    def _get_primary_model_file(self, asset_id: str) -> Optional[str]:
+        """Trova il file modello principale per un asset"""
+        record = self.index.get(asset_id)
+        if not record or not record['primary_model']:
+            return None
+
+        return str(Path(record['asset_dir']) / record['primary_model'])
+
+    @traced("download")
     def _download_file(self, url: str, download_dir: Path,
                       progress_callback: Optional[callable] = None) -> Optional[Path]:
         """Scarica un file da URL"""
@@ -293,103 +700,122 @@ class LocalLibraryManager:
             return local_path
 
         except Exception as e:
-            print(f"OpenShelf: Download error for {url}: {e}")
+            logger.error("Download error for %s: %s", url, e)
             return None
 
-    def _extract_archive(self, archive_path: Path, extract_dir: Path):
-        """Estrai un archivio ZIP"""
-        extract_dir.mkdir(parents=True, exist_ok=True)
-
-        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
+    @traced("download.stream")
+    def _stream_archive(self, url: str, download_dir: Path, staging_dir: Path,
+                        progress_callback: Optional[callable] = None):
+        """
+        Scarica un archivio per intervalli estraendo i membri mentre arrivano
 
-    def _find_3d_files(self, directory: Path) -> List[Path]:
-        """Trova tutti i file 3D in una directory"""
-        supported_extensions = ['.obj', '.gltf', '.glb']
-        found_files = []
+        Args:
+            url: URL dell'archivio ZIP
+            download_dir: Directory temporanea per l'archivio (parziale)
+            staging_dir: Directory di staging dell'asset
+            progress_callback: Callback per messaggi di progresso
 
-        for ext in supported_extensions:
-            found_files.extend(directory.rglob(f"*{ext}"))
+        Returns:
+            ArchivePlan usato, o None se lo streaming non è possibile (fallback al download completo)
+        """
+        if not url.split('?')[0].lower().endswith('.zip'):
+            return None
 
-        return found_files
+        fetch_start = time.time()
+        last_percent = [-1]
 
-    def _copy_asset_files(self, source_dir: Path, dest_dir: Path, progress_callback=None):
-        """Copia tutti i file dell'asset nella directory finale - FIX MODAL COMMUNICATION"""
-        import time
-        start_time = time.time()
+        def stream_progress(downloaded, expected):
+            if not progress_callback or expected <= 0:
+                return
+            # Il totale previsto cresce dopo il planner: il progresso non torna indietro
+            percent = min(99, int(downloaded / expected * 100))
+            if percent > last_percent[0]:
+                last_percent[0] = percent
+                progress_callback(f"Downloading... {percent}%")
 
-        print(f"OpenShelf DEBUG: === STARTING FILE COPY ===")
-        print(f"OpenShelf DEBUG: Source dir: {source_dir}")
-        print(f"OpenShelf DEBUG: Dest dir: {dest_dir}")
+        stream = StreamingArchiveDownload(url, download_dir / "archive.zip", staging_dir)
 
         try:
-            # Trova tutti i file da copiare
-            all_items = list(source_dir.rglob("*"))
-            files_to_copy = [item for item in all_items if item.is_file()]
-
-            if not files_to_copy:
-                print(f"OpenShelf DEBUG: ⚠️ No files found to copy!")
-                if progress_callback:
-                    progress_callback("No files to copy - completing...")
-                return
+            stream.run(selective=True, progress_callback=stream_progress)
+        except RangeNotSupported as e:
+            logger.info("Streaming not available for %s: %s", url, e)
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return None
+        except InterruptedError:
+            raise
+        except Exception as e:
+            logger.warning("Streaming download failed for %s, falling back: %s", url, e)
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return None
 
-            print(f"OpenShelf DEBUG: Found {len(files_to_copy)} files to copy")
+        get_cache_metrics().record_miss('library', stream.bytes_downloaded, time.time() - fetch_start)
+        logger.info("Streamed %d/%d bytes of %s", stream.bytes_downloaded, stream.total_size, url)
+        return stream.plan
 
-            # FIX CRITICO: Comunica inizio copia con numero file
-            if progress_callback:
-                progress_callback(f"Organizing {len(files_to_copy)} files...")
+    def _extract_archive(self, archive_path: Path, extract_dir: Path,
+                         members: Optional[List[str]] = None, progress_callback=None):
+        """
+        Estrae un archivio ZIP direttamente nella directory indicata
 
-            # Copia file con progress incrementale
-            for i, source_file in enumerate(files_to_copy):
-                try:
-                    # Calcola path relativo
-                    relative_path = source_file.relative_to(source_dir)
-                    dest_file = dest_dir / relative_path
+        Args:
+            archive_path: Path all'archivio ZIP
+            extract_dir: Directory di destinazione (di norma lo staging dell'asset)
+            members: Membri da estrarre (None = tutti)
+            progress_callback: Callback per messaggi di progresso
+        """
+        if members is not None:
+            member_count = len(members)
+        else:
+            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+                member_count = sum(1 for info in zip_ref.infolist() if not info.is_dir())
 
-                    # Crea directory se necessaria
-                    dest_file.parent.mkdir(parents=True, exist_ok=True)
+        if progress_callback:
+            progress_callback(f"Organizing {member_count} files...")
 
-                    # Copia file
-                    import shutil
-                    shutil.copy2(source_file, dest_file)
+        last_percent = [-1]
 
-                    # FIX CRITICO: Progress callback incrementale
-                    if progress_callback and len(files_to_copy) > 5:  # Solo se ci sono molti file
-                        percent = int((i + 1) / len(files_to_copy) * 100)
-                        progress_callback(f"Organizing files... {percent}%")
+        def extract_progress(extracted_bytes, total_bytes):
+            if not progress_callback or total_bytes <= 0:
+                return
+            percent = int(extracted_bytes / total_bytes * 100)
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                progress_callback(f"Organizing files... {percent}%")
 
-                    print(f"OpenShelf DEBUG: Copied {i+1}/{len(files_to_copy)}: {relative_path}")
+        get_archive_extractor().extract(archive_path, extract_dir, members=members,
+                                        progress_callback=extract_progress)
 
-                except Exception as e:
-                    print(f"OpenShelf DEBUG: Error copying {source_file}: {e}")
-                    continue
+    @traced("copy")
+    def _commit_staging_dir(self, staging_dir: Path, asset_dir: Path):
+        """
+        Sposta la directory di staging nella posizione finale con un rename atomico
 
-            # FIX CRITICO: Comunica sempre il completamento
-            copy_time = time.time() - start_time
-            print(f"OpenShelf DEBUG: === FILE COPY COMPLETED in {copy_time:.2f}s ===")
+        Lo staging vive in temp/ all'interno della libreria, quindi sullo stesso
+        filesystem di models/: il rename non copia dati. Un'eventuale versione
+        precedente (incompleta) dell'asset viene prima spostata da parte.
+        """
+        replaced_dir = None
 
-            if progress_callback:
-                progress_callback("Files organized - ready for import!")
+        if asset_dir.exists():
+            replaced_dir = self.temp_dir / f"replaced_{uuid.uuid4().hex[:8]}"
+            os.replace(asset_dir, replaced_dir)
 
-        except Exception as e:
-            print(f"OpenShelf DEBUG: FATAL COPY ERROR: {e}")
-            if progress_callback:
-                progress_callback(f"Copy error: {str(e)}")
+        try:
+            os.replace(staging_dir, asset_dir)
+        except Exception:
+            # Ripristina la versione precedente se il rename fallisce
+            if replaced_dir is not None and not asset_dir.exists():
+                os.replace(replaced_dir, asset_dir)
+                replaced_dir = None
             raise
+        finally:
+            if replaced_dir is not None:
+                shutil.rmtree(replaced_dir, ignore_errors=True)
 
     def get_library_stats(self) -> Dict[str, Any]:
-        """Ottiene statistiche della libreria locale"""
+        """Ottiene statistiche della libreria locale (dall'indice, senza scansioni)"""
         try:
-            asset_count = len([d for d in self.models_dir.iterdir() if d.is_dir()])
-
-            total_size = 0
-            for root, dirs, files in os.walk(self.models_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    try:
-                        total_size += os.path.getsize(file_path)
-                    except:
-                        pass
+            asset_count, total_size = self.index.get_totals()
 
             return {
                 "library_path": str(self.library_path),
@@ -418,20 +844,22 @@ class LocalLibraryManager:
             else:  # Linux
                 subprocess.run(["xdg-open", self.library_path])
         except Exception as e:
-            print(f"OpenShelf: Cannot open library folder: {e}")
+            logger.error("Cannot open library folder: %s", e)
 
     def remove_asset(self, asset_id: str) -> bool:
-        """Rimuove un asset dalla libreria locale"""
+        """Rimuove un asset dalla libreria locale (rimozione esplicita: non conta come eviction)"""
         asset_dir = self.get_asset_directory(asset_id)
 
         try:
+            was_indexed = self.index.remove_asset(asset_id)
+
             if asset_dir.exists():
                 shutil.rmtree(asset_dir)
-                print(f"OpenShelf: Removed asset {asset_id} from library")
+                logger.info("Removed asset %s from library", asset_id)
                 return True
-            return False
+            return was_indexed
         except Exception as e:
-            print(f"OpenShelf: Error removing asset {asset_id}: {e}")
+            logger.error("Error removing asset %s: %s", asset_id, e)
             return False
 
 # Istanza globale
@@ -441,24 +869,20 @@ def get_library_manager() -> LocalLibraryManager:
     """Ottiene l'istanza globale del library manager"""
     global _global_library_manager
 
-    # Ottieni path dalla preferenze se disponibile
-    library_path = None
-    try:
-        import bpy
-        for addon_name in bpy.context.preferences.addons.keys():
-            if 'openshelf' in addon_name.lower():
-                prefs = bpy.context.preferences.addons[addon_name].preferences
-                if hasattr(prefs, 'local_library_path') and prefs.local_library_path.strip():
-                    library_path = prefs.local_library_path.strip()
-                    break
-    except:
-        pass
+    # Path dalle preferenze (politica dell'ambiente ospite)
+    library_path = (get_preference('local_library_path', '') or '').strip() or None
+    shared_path = (get_preference('shared_library_path', '') or '').strip() or None
 
     # Crea o aggiorna manager se necessario
     if (_global_library_manager is None or
         (library_path and str(_global_library_manager.library_path) != library_path)):
 
-        print(f"OpenShelf: Creating library manager with path: {library_path or 'default'}")
+        logger.info("Creating library manager with path: %s", library_path or 'default')
+        if _global_library_manager is not None:
+            _global_library_manager.index.close()
         _global_library_manager = LocalLibraryManager(library_path)
 
+    # Senza attesa: la share viene aperta in background, i worker la attendono
+    _global_library_manager.shared_library_path = shared_path
+    _global_library_manager.shared_library = get_shared_library(shared_path)
     return _global_library_manager
@@ -0,0 +1,331 @@
+"""
+OpenShelf LOD Manager
+Livelli di dettaglio per mesh pesanti: genera una volta per asset versioni
+decimate (proxy 5%, medium 25%, full 100%), le salva in un .blend nella
+libreria e permette di importare il proxy e passare alla risoluzione piena
+solo quando serve. La decimazione gira in un Blender headless quando
+possibile, così l'import non blocca l'interfaccia
+"""
+
+import bpy
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from mathutils import Matrix
+from pathlib import Path
+from typing import Optional
+
+from .local_library_manager import get_library_manager
+from .library_index import describe_files
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Livelli disponibili e rapporto di decimazione
+LOD_LEVELS = {
+    'PROXY': 0.05,
+    'MEDIUM': 0.25,
+    'FULL': 1.0,
+}
+DEFAULT_LOD_LEVEL = 'PROXY'
+
+# Sotto questa soglia di facce il proxy non serve
+LOD_MIN_FACES = 200000
+
+LOD_FILE_PATTERN = "openshelf_{checksum}_lod.blend"
+CHECKSUM_PREFIX_LENGTH = 16
+
+# Proprietà custom su oggetti e mesh LOD
+LOD_ASSET_KEY = "openshelf_lod_asset"
+LOD_CHECKSUM_KEY = "openshelf_lod_checksum"
+LOD_LEVEL_KEY = "openshelf_lod_level"
+# matrix_world dell'oggetto sorgente (16 float per righe), ripristinata sui proxy
+LOD_MATRIX_KEY = "openshelf_lod_matrix"
+
+# Controllo periodico dei LOD generati in background (secondi)
+LOD_POLL_INTERVAL = 0.5
+
+
+def _lod_mesh_name(checksum: str, level: str) -> str:
+    return f"OpenShelf_{checksum[:CHECKSUM_PREFIX_LENGTH]}_{level}"
+
+
+def _flatten_matrix(matrix) -> list:
+    return [value for row in matrix for value in row]
+
+
+class LODManager:
+    """Genera, carica e scambia i livelli di dettaglio degli asset della libreria"""
+
+    def get_lod_path(self, asset_id: str, checksum: str) -> Optional[Path]:
+        """Path del .blend con i LOD (None se l'asset non è in libreria)"""
+        record = get_library_manager().index.get(asset_id)
+        if not record:
+            return None
+
+        name = LOD_FILE_PATTERN.format(checksum=checksum[:CHECKSUM_PREFIX_LENGTH])
+        return Path(record['asset_dir']) / name
+
+    def has_lods(self, asset_id: str, checksum: str) -> bool:
+        """True se i LOD dell'asset sono già in cache"""
+        lod_path = self.get_lod_path(asset_id, checksum)
+        return lod_path is not None and lod_path.exists()
+
+    @staticmethod
+    def needs_lods(obj: bpy.types.Object) -> bool:
+        """True se la mesh è abbastanza pesante da giustificare un proxy"""
+        return obj is not None and obj.type == 'MESH' and obj.data is not None \
+            and len(obj.data.polygons) >= LOD_MIN_FACES
+
+    @staticmethod
+    def model_needs_lods(asset_id: str) -> bool:
+        """
+        Come needs_lods, ma prima dell'import: decide dalle statistiche del file
+        in libreria già in cache, senza mai leggere il file (main thread).
+        Senza statistiche risponde True e la decisione resta a needs_lods
+        sull'oggetto importato; per un OBJ la scansione parte in un thread,
+        così il prossimo import trova le statistiche
+        """
+        library_manager = get_library_manager()
+        stats = library_manager.get_model_stats(asset_id, scan=False)
+        if stats is not None:
+            return stats.face_count >= LOD_MIN_FACES
+
+        threading.Thread(target=library_manager.get_model_stats, args=(asset_id,),
+                         name="openshelf_obj_stats", daemon=True).start()
+        return True
+
+    def generate(self, context, obj: bpy.types.Object, asset_id: str, checksum: str) -> bool:
+        """
+        Genera i LOD decimati dalla mesh piena e li salva nella libreria
+
+        Args:
+            context: Contesto Blender
+            obj: Oggetto con la mesh a risoluzione piena
+            asset_id: ID dell'asset
+            checksum: Checksum del file sorgente
+
+        Returns:
+            True se il file LOD è stato scritto
+        """
+        lod_path = self.get_lod_path(asset_id, checksum)
+        if lod_path is None:
+            return False
+
+        start_time = time.time()
+        full_mesh = obj.data
+        meshes = {'FULL': full_mesh}
+
+        try:
+            for level, ratio in LOD_LEVELS.items():
+                if ratio >= 1.0:
+                    continue
+
+                modifier = obj.modifiers.new(name="OpenShelf_LOD", type='DECIMATE')
+                modifier.ratio = ratio
+                try:
+                    depsgraph = context.evaluated_depsgraph_get()
+                    mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph),
+                                                           preserve_all_data_layers=True,
+                                                           depsgraph=depsgraph)
+                finally:
+                    obj.modifiers.remove(modifier)
+
+                mesh.name = _lod_mesh_name(checksum, level)
+                meshes[level] = mesh
+
+            for level, mesh in meshes.items():
+                mesh[LOD_ASSET_KEY] = asset_id
+                mesh[LOD_CHECKSUM_KEY] = checksum
+                mesh[LOD_LEVEL_KEY] = level
+                mesh[LOD_MATRIX_KEY] = _flatten_matrix(obj.matrix_world)
+
+            # La mesh piena viene salvata col suo nome canonico e poi ripristinata
+            original_name = full_mesh.name
+            full_mesh.name = _lod_mesh_name(checksum, 'FULL')
+            try:
+                bpy.data.libraries.write(str(lod_path), set(meshes.values()),
+                                         path_remap='RELATIVE_ALL', fake_user=True)
+            finally:
+                full_mesh.name = original_name
+
+            get_library_manager().index.add_files(
+                asset_id, describe_files(lod_path.parent, [lod_path.name], with_checksum=False)
+            )
+
+            faces = {level: len(mesh.polygons) for level, mesh in meshes.items()}
+            logger.info("Generated LODs for %s in %.1fs: %s", asset_id, time.time() - start_time, faces)
+            return True
+
+        except Exception as e:
+            logger.error("Error generating LODs for %s: %s", asset_id, e)
+            return False
+
+    def generate_in_background(self, obj: bpy.types.Object, asset_id: str, checksum: str) -> Optional[Future]:
+        """
+        Come generate, ma la decimazione avviene in un Blender headless: qui si
+        salva soltanto l'oggetto in un .blend temporaneo
+
+        Returns:
+            Future con True quando il file LOD è pronto, None se i worker non sono disponibili
+        """
+        from .background_converter import BackgroundConverter, get_background_converter
+
+        lod_path = self.get_lod_path(asset_id, checksum)
+        if lod_path is None or not BackgroundConverter.is_available():
+            return None
+
+        source_blend = get_library_manager().temp_dir / f"lod_source_{uuid.uuid4().hex[:8]}.blend"
+        try:
+            # Path assoluti: il worker riscrive i riferimenti relativi al file dei LOD
+            bpy.data.libraries.write(str(source_blend), {obj}, path_remap='ABSOLUTE')
+        except Exception as e:
+            logger.error("Cannot save %s for background LOD generation: %s", obj.name, e)
+            return None
+
+        spec = {
+            'object': obj.name,
+            'levels': [[level, ratio, _lod_mesh_name(checksum, level)] for level, ratio in LOD_LEVELS.items()],
+            'properties': {LOD_ASSET_KEY: asset_id, LOD_CHECKSUM_KEY: checksum},
+            'level_key': LOD_LEVEL_KEY,
+            'matrix_key': LOD_MATRIX_KEY,
+            'matrix': _flatten_matrix(obj.matrix_world),
+        }
+        logger.info("Generating LODs for %s in background", asset_id)
+        return get_background_converter().generate_lods(asset_id, source_blend, lod_path, spec)
+
+    def load_mesh(self, asset_id: str, checksum: str, level: str) -> Optional[bpy.types.Mesh]:
+        """Mesh di un livello: già nel file o appesa dal .blend dei LOD"""
+        for mesh in bpy.data.meshes:
+            if (mesh.get(LOD_ASSET_KEY) == asset_id and mesh.get(LOD_CHECKSUM_KEY) == checksum
+                    and mesh.get(LOD_LEVEL_KEY) == level):
+                return mesh
+
+        lod_path = self.get_lod_path(asset_id, checksum)
+        if lod_path is None or not lod_path.exists():
+            return None
+
+        name = _lod_mesh_name(checksum, level)
+        try:
+            with bpy.data.libraries.load(str(lod_path), link=False) as (data_from, data_to):
+                data_to.meshes = [name] if name in data_from.meshes else []
+        except Exception as e:
+            logger.error("Cannot load LOD %s of %s: %s", level, asset_id, e)
+            return None
+
+        return data_to.meshes[0] if data_to.meshes else None
+
+    def _tag_object(self, obj: bpy.types.Object, asset_id: str, checksum: str, level: str):
+        obj[LOD_ASSET_KEY] = asset_id
+        obj[LOD_CHECKSUM_KEY] = checksum
+        obj[LOD_LEVEL_KEY] = level
+
+    def create_proxy_object(self, context, asset_id: str, checksum: str,
+                            level: str = DEFAULT_LOD_LEVEL) -> Optional[bpy.types.Object]:
+        """Crea un oggetto che usa direttamente la mesh LOD (nessun parsing del modello)"""
+        mesh = self.load_mesh(asset_id, checksum, level)
+        if mesh is None:
+            return None
+
+        obj = bpy.data.objects.new(f"OpenShelf_{asset_id}", mesh)
+        context.collection.objects.link(obj)
+        self._tag_object(obj, asset_id, checksum, level)
+
+        # Rotazione degli assi e scala dell'importer stanno sull'oggetto, non nella mesh
+        values = mesh.get(LOD_MATRIX_KEY)
+        if values is not None and len(values) == 16:
+            obj.matrix_world = Matrix([values[row * 4:row * 4 + 4] for row in range(4)])
+
+        logger.info("Imported %s LOD of %s (%d faces)", level, asset_id, len(mesh.polygons))
+        return obj
+
+    def apply_proxy_first(self, context, obj: bpy.types.Object, asset_id: str, checksum: str) -> bool:
+        """
+        Dopo un import pieno: genera i LOD se servono e passa l'oggetto al proxy.
+        Con i worker headless la generazione è asincrona e il passaggio avviene
+        quando il file dei LOD è pronto (restituisce False nel frattempo)
+        """
+        if not self.needs_lods(obj):
+            return False
+
+        if not self.has_lods(asset_id, checksum):
+            job = self.generate_in_background(obj, asset_id, checksum)
+            if job is not None:
+                self._swap_when_ready(job, obj.name, asset_id, checksum)
+                return False
+            if not self.generate(context, obj, asset_id, checksum):
+                return False
+
+        self._tag_full(obj, asset_id, checksum)
+        return self.swap(obj, DEFAULT_LOD_LEVEL)
+
+    def _tag_full(self, obj: bpy.types.Object, asset_id: str, checksum: str):
+        """Marca oggetto e mesh corrente come livello FULL (ritorno alla mesh già nel file)"""
+        self._tag_object(obj, asset_id, checksum, 'FULL')
+        obj.data[LOD_ASSET_KEY] = asset_id
+        obj.data[LOD_CHECKSUM_KEY] = checksum
+        obj.data[LOD_LEVEL_KEY] = 'FULL'
+
+    def _swap_when_ready(self, job: Future, object_name: str, asset_id: str, checksum: str):
+        """Timer sul main thread: quando il worker ha finito passa l'oggetto al proxy"""
+        def check_job():
+            if not job.done():
+                return LOD_POLL_INTERVAL
+
+            obj = bpy.data.objects.get(object_name)
+            # L'oggetto può essere stato rimosso o già gestito a LOD nel frattempo
+            ready = not job.cancelled() and job.exception() is None and job.result()
+            if ready and obj is not None and not obj.get(LOD_LEVEL_KEY):
+                self._tag_full(obj, asset_id, checksum)
+                self.swap(obj, DEFAULT_LOD_LEVEL)
+            return None
+
+        bpy.app.timers.register(check_job, first_interval=LOD_POLL_INTERVAL)
+
+    def swap(self, obj: bpy.types.Object, level: str) -> bool:
+        """Sostituisce la mesh dell'oggetto con quella del livello richiesto"""
+        asset_id = obj.get(LOD_ASSET_KEY)
+        checksum = obj.get(LOD_CHECKSUM_KEY)
+        if not asset_id or not checksum or level not in LOD_LEVELS:
+            return False
+
+        if obj.get(LOD_LEVEL_KEY) == level:
+            return True
+
+        current_mesh = obj.data
+        mesh = self.load_mesh(asset_id, checksum, level)
+        if mesh is None:
+            return False
+
+        # Riusa i materiali già nel file invece delle copie appese (Material.001, ...)
+        for i, material in enumerate(current_mesh.materials):
+            if i < len(mesh.materials) and mesh.materials[i] != material:
+                appended = mesh.materials[i]
+                mesh.materials[i] = material
+                if appended is not None and appended.users == 0:
+                    bpy.data.materials.remove(appended)
+
+        obj.data = mesh
+        obj[LOD_LEVEL_KEY] = level
+
+        logger.debug("Swapped %s to %s (%d faces)", obj.name, level, len(mesh.polygons))
+        return True
+
+    @staticmethod
+    def get_level(obj: bpy.types.Object) -> Optional[str]:
+        """Livello corrente dell'oggetto (None se non gestito a LOD)"""
+        return obj.get(LOD_LEVEL_KEY) if obj is not None else None
+
+
+# Istanza globale
+_global_lod_manager = None
+
+def get_lod_manager() -> LODManager:
+    """Ottiene l'istanza globale del LOD manager"""
+    global _global_lod_manager
+
+    if _global_lod_manager is None:
+        _global_lod_manager = LODManager()
+
+    return _global_lod_manager
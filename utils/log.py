@@ -0,0 +1,163 @@
+"""
+OpenShelf Log
+Logging strutturato basato su 'logging' e collegato alle preferenze
+log_level / debug_mode: i livelli disabilitati non formattano nulla (usare
+gli argomenti %-style, mai f-string), le righe di progresso sono limitate
+nel tempo e un file di log rotante è opzionale
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+LOGGER_NAME = "openshelf"
+
+CONSOLE_FORMAT = "OpenShelf: %(message)s"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(name)s [%(threadName)s] %(message)s"
+
+DEFAULT_LOG_FILE = os.path.join(tempfile.gettempdir(), "openshelf_logs", "openshelf.log")
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+# Intervallo minimo tra due righe di progresso con la stessa chiave (secondi)
+PROGRESS_LOG_INTERVAL = 1.0
+
+_LEVELS = {
+    'ERROR': logging.ERROR,
+    'WARNING': logging.WARNING,
+    'INFO': logging.INFO,
+    'DEBUG': logging.DEBUG,
+}
+
+_root = logging.getLogger(LOGGER_NAME)
+_console_handler: Optional[logging.Handler] = None
+_file_handler: Optional[logging.Handler] = None
+_configure_lock = threading.Lock()
+
+# chiave -> ultimo istante in cui è stata scritta una riga di progresso
+_progress_times: Dict[str, float] = {}
+
+
+def _ensure_console_handler():
+    """Handler console installato una sola volta (anche prima delle preferenze)"""
+    global _console_handler
+
+    if _console_handler is None:
+        with _configure_lock:
+            if _console_handler is None:
+                _console_handler = logging.StreamHandler(sys.stdout)
+                _console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+                _root.addHandler(_console_handler)
+                # Non duplica i messaggi nel logger root di Blender
+                _root.propagate = False
+                if _root.level == logging.NOTSET:
+                    _root.setLevel(logging.INFO)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger di un modulo OpenShelf (es. get_logger(__name__))
+
+    Args:
+        name: Nome del modulo; viene messo sotto il logger 'openshelf'
+    """
+    _ensure_console_handler()
+    short_name = name.rsplit('.', 1)[-1]
+    return _root.getChild(short_name)
+
+
+def configure_logging(log_level: str = 'INFO', debug_mode: bool = False,
+                      log_to_file: bool = False, log_file: Optional[str] = None):
+    """
+    Applica livello e handler
+
+    Args:
+        log_level: 'ERROR', 'WARNING', 'INFO' o 'DEBUG'
+        debug_mode: Forza il livello DEBUG
+        log_to_file: Abilita il file di log rotante
+        log_file: Path del file (default nella directory temporanea)
+    """
+    global _file_handler
+
+    _ensure_console_handler()
+    level = logging.DEBUG if debug_mode else _LEVELS.get(log_level, logging.INFO)
+
+    with _configure_lock:
+        _root.setLevel(level)
+
+        wanted_file = (log_file or DEFAULT_LOG_FILE) if log_to_file else None
+        current_file = getattr(_file_handler, 'baseFilename', None)
+
+        if _file_handler is not None and (wanted_file is None or os.path.abspath(wanted_file) != current_file):
+            _root.removeHandler(_file_handler)
+            _file_handler.close()
+            _file_handler = None
+
+        if wanted_file and _file_handler is None:
+            try:
+                # logging.handlers (socket, pickle, queue) solo se il file di log è attivo
+                import logging.handlers
+                os.makedirs(os.path.dirname(os.path.abspath(wanted_file)), exist_ok=True)
+                _file_handler = logging.handlers.RotatingFileHandler(
+                    wanted_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding='utf-8'
+                )
+                _file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+                _root.addHandler(_file_handler)
+            except OSError as e:
+                _file_handler = None
+                _root.error("Cannot open log file %s: %s", wanted_file, e)
+
+    _root.debug("Logging configured: level=%s, file=%s",
+                logging.getLevelName(level), wanted_file or "disabled")
+
+
+def configure_from_preferences(prefs):
+    """Applica le preferenze dell'addon (log_level, debug_mode, log_to_file, log_file_path)"""
+    if prefs is None:
+        return
+    configure_logging(
+        log_level=getattr(prefs, 'log_level', 'INFO'),
+        debug_mode=getattr(prefs, 'debug_mode', False),
+        log_to_file=getattr(prefs, 'log_to_file', False),
+        log_file=getattr(prefs, 'log_file_path', '').strip() or None,
+    )
+
+
+def progress_due(logger: logging.Logger, key: str, final: bool = False,
+                 interval: float = PROGRESS_LOG_INTERVAL) -> bool:
+    """
+    True se va scritta una riga di progresso INFO per 'key': al massimo una
+    ogni 'interval' secondi, sempre quella finale. Va controllato prima di
+    calcolare gli argomenti del messaggio:
+
+        if progress_due(logger, path):
+            logger.info("Downloading %s: %d%%", name, progress.get_percentage())
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return False
+
+    now = time.monotonic()
+    if final:
+        _progress_times.pop(key, None)
+        return True
+
+    last = _progress_times.get(key)
+    if last is not None and now - last < interval:
+        return False
+    _progress_times[key] = now
+    return True
+
+
+def shutdown_logging():
+    """Chiude il file di log (unregister dell'addon)"""
+    global _file_handler
+
+    with _configure_lock:
+        if _file_handler is not None:
+            _root.removeHandler(_file_handler)
+            _file_handler.close()
+            _file_handler = None
@@ -0,0 +1,191 @@
+"""
+OpenShelf Mesh Ops
+Post-processing degli oggetti importati con le API dati (foreach_get, bmesh,
+matrici) invece di bpy.ops: nessun cambio di modalità, nessuna dipendenza da
+selezione o contesto, applicabile in batch a molti oggetti. Le coordinate
+vengono lette in array NumPy: bounds e centri sono vettorializzati anche su
+mesh da milioni di vertici
+"""
+
+import bpy
+import bmesh
+import time
+import numpy as np
+from contextlib import contextmanager
+from mathutils import Matrix, Vector
+from typing import Optional, Dict, Iterable, List, Tuple
+
+try:
+    from .tracing import span
+except ImportError:
+    # Caricato come modulo top-level accanto a background_convert.py
+    from tracing import span
+
+
+class StageTimer:
+    """Tempi cumulativi per fase di post-processing (anche come span di tracing)"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            with span("post." + name):
+                yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start_time
+
+    def report(self) -> str:
+        return ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.timings.items())
+
+
+def vertex_coords(mesh: bpy.types.Mesh) -> np.ndarray:
+    """Coordinate locali dei vertici come array (N, 3) float32"""
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', coords)
+    return coords.reshape(-1, 3)
+
+
+def world_coords(obj: bpy.types.Object) -> np.ndarray:
+    """Coordinate dei vertici trasformate da matrix_world, array (N, 3)"""
+    matrix = np.array(obj.matrix_world, dtype=np.float32)
+    return vertex_coords(obj.data) @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def local_bounds(mesh: bpy.types.Mesh) -> Optional[Tuple[Vector, Vector]]:
+    """Bounding box (min, max) della mesh in coordinate locali, None se vuota"""
+    if len(mesh.vertices) == 0:
+        return None
+
+    coords = vertex_coords(mesh)
+    return Vector(coords.min(axis=0)), Vector(coords.max(axis=0))
+
+
+def _mesh_objects(objects: Iterable[bpy.types.Object]) -> List[bpy.types.Object]:
+    return [obj for obj in objects
+            if obj is not None and obj.type == 'MESH' and obj.data is not None and len(obj.data.vertices)]
+
+
+def world_bounds(objects: Iterable[bpy.types.Object]) -> Optional[Tuple[Vector, Vector]]:
+    """Bounding box (min, max) combinato degli oggetti in coordinate mondo"""
+    mins, maxs = [], []
+    for obj in _mesh_objects(objects):
+        coords = world_coords(obj)
+        mins.append(coords.min(axis=0))
+        maxs.append(coords.max(axis=0))
+
+    if not mins:
+        return None
+    return Vector(np.min(mins, axis=0)), Vector(np.max(maxs, axis=0))
+
+
+def root_objects(objects: Iterable[bpy.types.Object]) -> List[bpy.types.Object]:
+    """Oggetti senza genitore nel gruppo: spostarli sposta anche i figli"""
+    objects = list(objects)
+    members = set(objects)
+    return [obj for obj in objects if obj.parent not in members]
+
+
+def center_objects(objects: Iterable[bpy.types.Object],
+                   bounds: Optional[Tuple[Vector, Vector]] = None) -> Optional[Vector]:
+    """
+    Sposta il gruppo di oggetti in modo che il centro del bounding box combinato
+    sia nell'origine del mondo
+
+    Args:
+        objects: Oggetti del gruppo
+        bounds: Bounding box mondo già calcolato (evita una seconda lettura)
+
+    Returns:
+        Spostamento applicato o None se il gruppo non ha geometria
+    """
+    objects = list(objects)
+    bounds = bounds or world_bounds(objects)
+    if bounds is None:
+        return None
+
+    center = (bounds[0] + bounds[1]) / 2
+    for obj in root_objects(objects):
+        obj.location -= center
+    return center
+
+
+def center_origin(obj: bpy.types.Object, move_to_origin: bool = True) -> bool:
+    """
+    Porta l'origine al centro del bounding box della geometria (come
+    origin_set con center='BOUNDS') e, se richiesto, l'oggetto nell'origine
+
+    Returns:
+        True se la geometria è stata spostata
+    """
+    if obj is None or obj.type != 'MESH' or obj.data is None:
+        return False
+
+    mesh = obj.data
+    moved = False
+
+    # Una mesh condivisa da altre istanze è già centrata
+    if mesh.users == 1:
+        bounds = local_bounds(mesh)
+        if bounds is not None:
+            center = (bounds[0] + bounds[1]) / 2
+            if center.length > 0.0:
+                mesh.transform(Matrix.Translation(-center))
+                # L'oggetto resta fermo nel mondo finché non viene spostato
+                obj.matrix_world = obj.matrix_world @ Matrix.Translation(center)
+                mesh.update()
+                moved = True
+
+    if move_to_origin:
+        obj.location = (0, 0, 0)
+
+    return moved
+
+
+def recalculate_normals(obj: bpy.types.Object) -> bool:
+    """Rende coerenti le normali verso l'esterno (come normals_make_consistent)"""
+    if obj is None or obj.type != 'MESH' or obj.data is None or not obj.data.polygons:
+        return False
+
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(obj.data)
+        bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+        bm.to_mesh(obj.data)
+    finally:
+        bm.free()
+
+    obj.data.update()
+    return True
+
+
+def post_process_objects(objects: Iterable[bpy.types.Object], auto_center: bool = True,
+                         normals: bool = False, timer: Optional[StageTimer] = None) -> StageTimer:
+    """
+    Centra e ricalcola le normali di più oggetti senza bpy.ops
+
+    Args:
+        objects: Oggetti importati
+        auto_center: Centra origine e oggetto
+        normals: Ricalcola le normali
+        timer: StageTimer da aggiornare (nuovo se None)
+
+    Returns:
+        StageTimer con i tempi per fase
+    """
+    timer = timer or StageTimer()
+    objects = [obj for obj in objects if obj is not None and obj.type == 'MESH']
+
+    if normals:
+        with timer.stage("normals"):
+            for obj in objects:
+                recalculate_normals(obj)
+
+    if auto_center:
+        with timer.stage("center"):
+            for obj in objects:
+                center_origin(obj)
+
+    return timer
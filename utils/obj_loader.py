@@ -9,11 +9,14 @@ import os
 import bmesh
 from mathutils import Vector
 from typing import Optional, Dict, Any, List
+from .mesh_ops import StageTimer, center_origin, recalculate_normals
+from .tracing import traced
 
 class OBJLoader:
     """Loader riutilizzabile per file OBJ"""
 
     @staticmethod
+    @traced("import.obj")
     def import_obj(filepath: str, **kwargs) -> Optional[bpy.types.Object]:
         """
         Importa un file OBJ in Blender - VERSIONE CORRETTA PER BLENDER 4.2+
@@ -116,11 +119,13 @@ class OBJLoader:
 
     @staticmethod
     def _post_process_object(obj: bpy.types.Object, **kwargs):
-        """Applica post-processing all'oggetto importato"""
+        """Applica post-processing all'oggetto importato (tempi per fase nel log)"""
+        timer = StageTimer()
 
         # Centra oggetto se richiesto
         if kwargs.get('auto_center', True):
-            OBJLoader._center_object(obj)
+            with timer.stage("center"):
+                OBJLoader._center_object(obj)
 
         # Applica scala se richiesta
         scale_factor = kwargs.get('import_scale', kwargs.get('scale_factor', 1.0))
@@ -129,25 +134,23 @@ class OBJLoader:
 
         # Applica materiali se richiesto
         if kwargs.get('auto_materials', kwargs.get('apply_materials', True)):
-            OBJLoader._setup_materials(obj)
+            with timer.stage("materials"):
+                OBJLoader._setup_materials(obj)
 
         # Calcola normali se richiesto
         if kwargs.get('recalculate_normals', False):
-            OBJLoader._recalculate_normals(obj)
+            with timer.stage("normals"):
+                OBJLoader._recalculate_normals(obj)
+
+        if timer.timings:
+            print(f"OpenShelf: Post-processed {obj.name}: {timer.report()}")
 
     @staticmethod
     def _center_object(obj: bpy.types.Object):
         """Centra l'oggetto nell'origine"""
         try:
-            # Assicurati che l'oggetto sia selezionato e attivo
-            bpy.context.view_layer.objects.active = obj
-            obj.select_set(True)
-
-            # Centra geometria
-            bpy.ops.object.origin_set(type='GEOMETRY_ORIGIN', center='BOUNDS')
-
-            # Sposta all'origine
-            obj.location = (0, 0, 0)
+            # Geometria centrata sull'origine dell'oggetto, senza bpy.ops
+            center_origin(obj)
 
         except Exception as e:
             print(f"OpenShelf: Error centering object: {e}")
@@ -211,26 +214,11 @@ class OBJLoader:
     def _recalculate_normals(obj: bpy.types.Object):
         """Ricalcola le normali dell'oggetto"""
         try:
-            # Passa in edit mode
-            bpy.context.view_layer.objects.active = obj
-            bpy.ops.object.mode_set(mode='EDIT')
-
-            # Seleziona tutto
-            bpy.ops.mesh.select_all(action='SELECT')
-
-            # Ricalcola normali
-            bpy.ops.mesh.normals_make_consistent(inside=False)
-
-            # Torna in object mode
-            bpy.ops.object.mode_set(mode='OBJECT')
+            # bmesh sui dati della mesh: nessun passaggio in edit mode
+            recalculate_normals(obj)
 
         except Exception as e:
             print(f"OpenShelf: Error recalculating normals: {e}")
-            # Assicurati di tornare in object mode
-            try:
-                bpy.ops.object.mode_set(mode='OBJECT')
-            except:
-                pass
 
     @staticmethod
     def apply_cultural_metadata(obj: bpy.types.Object, asset_data: Dict[str, Any]):
@@ -400,92 +388,3 @@ class OBJLoader:
                 continue
 
         return imported_objects
-
-    @staticmethod
-    def validate_obj_file(filepath: str) -> Dict[str, Any]:
-        """
-        Valida un file OBJ
-
-        Args:
-            filepath: Path al file OBJ
-
-        Returns:
-            Dizionario con risultati validazione
-        """
-        result = {
-            "valid": False,
-            "errors": [],
-            "warnings": [],
-            "info": {}
-        }
-
-        try:
-            if not os.path.exists(filepath):
-                result["errors"].append("File does not exist")
-                return result
-
-            if not filepath.lower().endswith('.obj'):
-                result["warnings"].append("File does not have .obj extension")
-
-            # Controlla dimensione file
-            file_size = os.path.getsize(filepath)
-            result["info"]["file_size"] = file_size
-
-            if file_size == 0:
-                result["errors"].append("File is empty")
-                return result
-
-            if file_size > 100 * 1024 * 1024:  # 100MB
-                result["warnings"].append("File is very large (>100MB)")
-
-            # Controlla contenuto base
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-
-                has_vertices = False
-                has_faces = False
-
-                for line in lines[:1000]:  # Controlla prime 1000 righe
-                    line = line.strip()
-                    if line.startswith('v '):
-                        has_vertices = True
-                    elif line.startswith('f '):
-                        has_faces = True
-
-                if not has_vertices:
-                    result["errors"].append("No vertices found in file")
-
-                if not has_faces:
-                    result["warnings"].append("No faces found in file")
-
-                result["info"]["line_count"] = len(lines)
-
-            if not result["errors"]:
-                result["valid"] = True
-
-        except Exception as e:
-            result["errors"].append(f"Error validating file: {str(e)}")
-
-        return result
-
-    @staticmethod
-    def get_obj_info(filepath: str) -> Dict[str, Any]:
-        """
-        Ottiene informazioni dettagliate su un file OBJ
-
-        Args:
-            filepath: Path al file OBJ
-
-        Returns:
-            Dizionario con informazioni dettagliate
-        """
-        validation = OBJLoader.validate_obj_file(filepath)
-
-        if not validation["valid"]:
-            return validation
-
-        info = validation["info"].copy()
-        info["filepath"] = filepath
-        info["filename"] = os.path.basename(filepath)
-
-        return info
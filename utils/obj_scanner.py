@@ -0,0 +1,595 @@
+"""
+OpenShelf OBJ Scanner
+Validazione e statistiche di un file OBJ in un solo passaggio a memoria
+limitata: il file viene letto a blocchi (mai per intero), il checksum SHA-256
+è calcolato sugli stessi blocchi e i conteggi sono esatti (vertici, facce, UV,
+normali, bounding box, gruppi, librerie MTL).
+
+Le statistiche dipendono solo dal contenuto del file e vengono messe in cache
+per checksum (in memoria e nell'indice della libreria); i riferimenti a MTL e
+texture dipendono invece dalla directory e vengono risolti a ogni richiesta.
+Non richiede bpy
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict, fields, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Incrementare quando cambia il contenuto delle statistiche (invalida la cache)
+SCANNER_VERSION = 1
+
+# Blocco di lettura: la memoria usata è blocco + riga più lunga
+SCAN_CHUNK_SIZE = 1024 * 1024
+
+# Nomi conservati al massimo per tipo (file con migliaia di gruppi)
+MAX_NAMES = 1000
+
+# Statistiche tenute in memoria
+MAX_CACHED_STATS = 256
+
+# Stima del tempo di import in Blender (importer OBJ nativo + setup materiali)
+IMPORT_BASE_SECONDS = 0.5
+IMPORT_BYTES_PER_SECOND = 40 * 1024 * 1024
+IMPORT_FACES_PER_SECOND = 1000000
+
+# Istruzioni MTL che riferiscono una texture
+MTL_TEXTURE_STATEMENTS = frozenset((
+    'map_ka', 'map_kd', 'map_ks', 'map_ke', 'map_ns', 'map_d', 'map_bump', 'bump',
+    'disp', 'decal', 'refl', 'norm', 'map_pr', 'map_pm', 'map_ps', 'map_rma', 'map_orm',
+))
+
+# Opzioni delle texture MTL con un argomento fisso (le altre hanno argomenti numerici variabili)
+MTL_SINGLE_ARG_OPTIONS = frozenset((
+    '-blendu', '-blendv', '-bm', '-boost', '-cc', '-clamp', '-imfchan', '-texres', '-type',
+))
+
+
+@dataclass
+class ObjStats:
+    """Statistiche di un file OBJ"""
+    file_size: int = 0
+    line_count: int = 0
+    vertex_count: int = 0
+    uv_count: int = 0
+    normal_count: int = 0
+    face_count: int = 0
+    triangle_count: int = 0
+    polyline_count: int = 0
+    object_names: List[str] = field(default_factory=list)
+    group_names: List[str] = field(default_factory=list)
+    material_names: List[str] = field(default_factory=list)
+    material_libraries: List[str] = field(default_factory=list)
+    bbox_min: Optional[Tuple[float, float, float]] = None
+    bbox_max: Optional[Tuple[float, float, float]] = None
+    invalid_face_count: int = 0
+    degenerate_face_count: int = 0
+    malformed_line_count: int = 0
+    names_truncated: bool = False
+    checksum: Optional[str] = None
+    scanner_version: int = SCANNER_VERSION
+    scan_seconds: float = 0.0
+
+    # Riferimenti risolti sul disco (non salvati in cache)
+    material_files: List[str] = field(default_factory=list)
+    texture_files: List[str] = field(default_factory=list)
+    missing_files: List[str] = field(default_factory=list)
+
+    @property
+    def dimensions(self) -> Optional[Tuple[float, float, float]]:
+        """Dimensioni del bounding box (None senza vertici)"""
+        if self.bbox_min is None or self.bbox_max is None:
+            return None
+        return tuple(high - low for low, high in zip(self.bbox_min, self.bbox_max))
+
+    def to_dict(self, include_references: bool = True) -> Dict[str, Any]:
+        data = asdict(self)
+        if not include_references:
+            for name in ('material_files', 'texture_files', 'missing_files'):
+                data.pop(name)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ObjStats':
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        for name in ('bbox_min', 'bbox_max'):
+            if values.get(name) is not None:
+                values[name] = tuple(values[name])
+        return cls(**values)
+
+
+class _NameCollector:
+    """Nomi unici in ordine di apparizione, al massimo MAX_NAMES"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._seen = set()
+        self.truncated = False
+
+    def add(self, raw: bytes):
+        name = raw.strip().decode('utf-8', errors='replace')
+        if not name or name in self._seen:
+            return
+        if len(self.names) >= MAX_NAMES:
+            self.truncated = True
+            return
+        self._seen.add(name)
+        self.names.append(name)
+
+
+def scan_obj(filepath: str) -> ObjStats:
+    """
+    Scansiona un file OBJ in un solo passaggio (checksum incluso)
+
+    Args:
+        filepath: Path al file OBJ
+
+    Returns:
+        ObjStats con i riferimenti a MTL e texture già risolti
+
+    Raises:
+        OSError: Se il file non è leggibile
+    """
+    start = time.perf_counter()
+    scan = _ObjScan(ObjStats(file_size=os.path.getsize(filepath)))
+    digest = hashlib.sha256()
+
+    with open(filepath, 'rb') as f:
+        pending = b""
+        while True:
+            chunk = f.read(SCAN_CHUNK_SIZE)
+            if not chunk:
+                if pending:
+                    scan.feed([pending], ordered=True)
+                break
+
+            digest.update(chunk)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            # Righe spezzate con '\' finale (rare): il blocco va letto in ordine
+            scan.feed(lines, ordered=bool(scan.continuation) or b"\\" in chunk)
+
+    stats = scan.finish()
+    stats.checksum = digest.hexdigest()
+    stats.scan_seconds = time.perf_counter() - start
+
+    return resolve_references(filepath, stats)
+
+
+# Righe elaborate in blocco (le altre passano da _scan_line)
+_BULK_PREFIXES = frozenset((b"v ", b"f "))
+
+# Caratteri ammessi nel corpo delle righe "f" lette in blocco
+_FACE_CHARACTERS = b"0123456789/- \t\r\n"
+
+# Indici di texture e normale di un angolo ("1/2/3" -> "1")
+_FACE_CORNER_SUFFIX = re.compile(rb"/[^ \t\r\n]*")
+
+
+class _ObjScan:
+    """
+    Stato della scansione. Un blocco di righe viene smistato per prefisso e
+    ogni tipo elaborato in blocco (float/int parsati con map, bbox con min/max
+    su liste); le righe insolite e i blocchi con facce che non si possono
+    validare in blocco passano per il percorso riga per riga, in ordine
+    """
+
+    def __init__(self, stats: ObjStats):
+        self.stats = stats
+        self.objects, self.groups, self.materials, self.libraries = (_NameCollector() for _ in range(4))
+        self.bbox_min = [float('inf')] * 3
+        self.bbox_max = [float('-inf')] * 3
+        self.continuation = b""
+
+    def feed(self, lines: List[bytes], ordered: bool = False):
+        self.stats.line_count += len(lines)
+        if ordered or not self._feed_bulk(lines):
+            self._feed_ordered(lines)
+
+    def finish(self) -> ObjStats:
+        stats = self.stats
+        if stats.vertex_count:
+            stats.bbox_min = tuple(self.bbox_min)
+            stats.bbox_max = tuple(self.bbox_max)
+
+        collectors = (self.objects, self.groups, self.materials, self.libraries)
+        stats.object_names = self.objects.names
+        stats.group_names = self.groups.names
+        stats.material_names = self.materials.names
+        stats.material_libraries = self.libraries.names
+        stats.names_truncated = any(collector.truncated for collector in collectors)
+        return stats
+
+    # ---------------------------------------------------------------- blocco
+
+    def _feed_bulk(self, lines: List[bytes]) -> bool:
+        """False (senza aver contato nulla) se il blocco va letto in ordine"""
+        # I file sono fatti di lunghe sequenze dello stesso tipo: blocchi omogenei senza smistamento
+        text = b"\n" + b"\n".join(lines)
+        if text.count(b"\nv ") == len(lines):
+            vertex_lines, face_lines, other_lines = lines, [], []
+        elif text.count(b"\nf ") == len(lines):
+            vertex_lines, face_lines, other_lines = [], lines, []
+        else:
+            vertex_lines = [line for line in lines if line[:2] == b"v "]
+            face_lines = [line for line in lines if line[:2] == b"f "]
+            other_lines = [line for line in lines if line[:2] not in _BULK_PREFIXES]
+
+        stats = self.stats
+        if face_lines:
+            corner_counts = [len(line.split()) - 1 for line in face_lines]
+            if not self._faces_reference_defined_vertices(face_lines, sum(corner_counts)):
+                return False
+
+            stats.face_count += len(face_lines)
+            for count in corner_counts:
+                if count < 3:
+                    stats.degenerate_face_count += 1
+                else:
+                    stats.triangle_count += count - 2
+
+        self._add_vertices(vertex_lines)
+
+        for line in other_lines:
+            prefix = line[:3]
+            if prefix == b"vt ":
+                stats.uv_count += 1
+            elif prefix == b"vn ":
+                stats.normal_count += 1
+            elif line[:1] != b"#":
+                self._scan_line(line.strip())
+
+        return True
+
+    def _faces_reference_defined_vertices(self, face_lines: List[bytes], corners: int) -> bool:
+        """
+        True se tutte le facce del blocco riferiscono vertici letti prima del
+        blocco. Per indici positivi basta confrontare le lunghezze dei numeri
+        con quella del numero di vertici: si convertono solo i più lunghi
+        """
+        body = b"\n".join(face_lines)[2:].replace(b"\nf ", b"\n")
+        if body.translate(None, _FACE_CHARACTERS):
+            return False  # caratteri inattesi: contati riga per riga
+        if b"/" in body:
+            body = _FACE_CORNER_SUFFIX.sub(b"", body)
+
+        tokens = body.split()
+        defined = self.stats.vertex_count
+        if not tokens or len(tokens) != corners or b"0" in tokens:
+            return False  # facce vuote o indici non validi: contati riga per riga
+
+        if b"-" in body:
+            indices = list(map(int, tokens))
+            return max(indices) <= defined and -min(indices) <= defined
+
+        digits = len(str(defined))
+        longest = max(map(len, tokens))
+        if longest < digits:
+            return True
+        if longest > digits:
+            return False
+        return max(int(token) for token in tokens if len(token) == digits) <= defined
+
+    def _add_vertices(self, vertex_lines: List[bytes]):
+        if not vertex_lines:
+            return
+
+        tokens = b" ".join(vertex_lines).split()
+        if len(tokens) == 4 * len(vertex_lines):
+            try:
+                xs = list(map(float, tokens[1::4]))
+                ys = list(map(float, tokens[2::4]))
+                zs = list(map(float, tokens[3::4]))
+            except ValueError:
+                xs = None
+            if xs is not None:
+                self.stats.vertex_count += len(vertex_lines)
+                self._extend_bbox(xs, ys, zs)
+                return
+
+        # Colori per vertice, coordinata w o righe malformate
+        for line in vertex_lines:
+            self._scan_line(line.strip())
+
+    def _extend_bbox(self, xs: List[float], ys: List[float], zs: List[float]):
+        low, high = self.bbox_min, self.bbox_max
+        self.bbox_min = [min(low[0], min(xs)), min(low[1], min(ys)), min(low[2], min(zs))]
+        self.bbox_max = [max(high[0], max(xs)), max(high[1], max(ys)), max(high[2], max(zs))]
+
+    # -------------------------------------------------------- riga per riga
+
+    def _feed_ordered(self, lines: List[bytes]):
+        for line in lines:
+            line = line.strip()
+
+            if self.continuation:
+                line = self.continuation + b" " + line
+                self.continuation = b""
+            if line.endswith(b"\\"):
+                self.continuation = line[:-1]
+                continue
+
+            self._scan_line(line)
+
+    def _scan_line(self, line: bytes):
+        if not line or line[0] == 0x23:  # '#'
+            return
+
+        stats = self.stats
+        parts = line.split()
+        keyword = parts[0]
+        if keyword == b"v":
+            try:
+                x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
+            except (IndexError, ValueError):
+                stats.malformed_line_count += 1
+                return
+            stats.vertex_count += 1
+            self._extend_bbox((x,), (y,), (z,))
+        elif keyword == b"f":
+            self._scan_face(parts)
+        elif keyword == b"vt":
+            stats.uv_count += 1
+        elif keyword == b"vn":
+            stats.normal_count += 1
+        elif keyword == b"g":
+            # 'g' può assegnare più gruppi alla stessa faccia
+            for name in parts[1:]:
+                self.groups.add(name)
+        elif keyword == b"o":
+            self.objects.add(b" ".join(parts[1:]))
+        elif keyword == b"usemtl":
+            self.materials.add(b" ".join(parts[1:]))
+        elif keyword == b"mtllib":
+            for name in parts[1:]:
+                self.libraries.add(name)
+        elif keyword == b"l":
+            stats.polyline_count += 1
+
+    def _scan_face(self, parts: List[bytes]):
+        """Conta una faccia e controlla che i vertici riferiti siano già definiti"""
+        stats = self.stats
+        corners = parts[1:]
+        count = len(corners)
+        stats.face_count += 1
+
+        if count < 3:
+            stats.degenerate_face_count += 1
+            return
+        stats.triangle_count += count - 2
+
+        vertex_count = stats.vertex_count
+        try:
+            for corner in corners:
+                index = int(corner.split(b"/", 1)[0])
+                # Indici 1-based, negativi = relativi all'ultimo vertice letto
+                if index > vertex_count or index == 0 or -index > vertex_count:
+                    stats.invalid_face_count += 1
+                    return
+        except ValueError:
+            stats.malformed_line_count += 1
+
+
+def resolve_references(filepath: str, stats: ObjStats) -> ObjStats:
+    """
+    Risolve sul disco le librerie MTL e le texture che riferiscono
+
+    Returns:
+        Copia di stats con material_files, texture_files e missing_files
+    """
+    base_dir = Path(filepath).parent
+    material_files, texture_files, missing = [], [], []
+
+    for library in stats.material_libraries:
+        mtl_path = _find_file(base_dir, library)
+        if mtl_path is None:
+            missing.append(library)
+            continue
+        material_files.append(str(mtl_path))
+
+        for texture in _read_mtl_textures(mtl_path):
+            texture_path = _find_file(mtl_path.parent, texture) or _find_file(base_dir, texture)
+            if texture_path is None:
+                if texture not in missing:
+                    missing.append(texture)
+            elif str(texture_path) not in texture_files:
+                texture_files.append(str(texture_path))
+
+    return replace(stats, material_files=material_files, texture_files=texture_files,
+                   missing_files=missing)
+
+
+def _find_file(base_dir: Path, reference: str) -> Optional[Path]:
+    """Path riferito (relativo alla directory o solo per nome, come fanno gli exporter)"""
+    reference = reference.replace("\\", "/")
+    for candidate in (base_dir / reference, base_dir / Path(reference).name):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _read_mtl_textures(mtl_path: Path) -> List[str]:
+    """Nomi delle texture di un file MTL, senza le opzioni (-s, -o, -bm, ...)"""
+    textures = []
+    try:
+        with open(mtl_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                tokens = line.split()
+                if len(tokens) < 2 or tokens[0].lower() not in MTL_TEXTURE_STATEMENTS:
+                    continue
+
+                args = tokens[1:]
+                i = 0
+                while i < len(args) and args[i].startswith("-"):
+                    option = args[i].lower()
+                    i += 1
+                    if option in MTL_SINGLE_ARG_OPTIONS:
+                        i += 1
+                    else:
+                        while i < len(args) and _is_number(args[i]):
+                            i += 1
+
+                name = " ".join(args[i:])
+                if name and name not in textures:
+                    textures.append(name)
+    except OSError as e:
+        logger.warning("Cannot read material library %s: %s", mtl_path, e)
+    return textures
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def estimate_import_seconds(stats: ObjStats) -> float:
+    """Stima grezza del tempo di import in Blender (dimensione e numero di facce)"""
+    return IMPORT_BASE_SECONDS + max(stats.file_size / IMPORT_BYTES_PER_SECOND,
+                                     stats.face_count / IMPORT_FACES_PER_SECOND)
+
+
+class ObjStatsCache:
+    """
+    Statistiche per checksum: memoria (LRU), poi store persistente opzionale
+    (oggetto con get_model_stats/put_model_stats, es. LibraryIndex)
+    """
+
+    def __init__(self, store=None, max_entries: int = MAX_CACHED_STATS):
+        self.store = store
+        self.max_entries = max_entries
+        self._stats: 'OrderedDict[str, ObjStats]' = OrderedDict()
+        # path -> (size, mtime_ns, checksum): evita di rileggere file già visti
+        self._paths: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, filepath: str, checksum: Optional[str] = None) -> ObjStats:
+        """
+        Statistiche del file, scansionandolo solo se il contenuto non è in cache
+
+        Args:
+            filepath: Path al file OBJ
+            checksum: SHA-256 già noto (es. dall'indice della libreria)
+
+        Raises:
+            OSError: Se il file non è leggibile
+        """
+        cached, stat = self._cached(filepath, checksum)
+        if cached is not None:
+            return cached
+
+        stats = scan_obj(filepath)
+        self._paths[filepath] = (stat.st_size, stat.st_mtime_ns, stats.checksum)
+        self._remember(stats)
+        return stats
+
+    def peek(self, filepath: str, checksum: Optional[str] = None) -> Optional[ObjStats]:
+        """
+        Come get, ma senza mai leggere il file: None se le statistiche non
+        sono in cache (adatto al main thread)
+
+        Raises:
+            OSError: Se il file non esiste
+        """
+        return self._cached(filepath, checksum)[0]
+
+    def _cached(self, filepath: str, checksum: Optional[str]) -> Tuple[Optional[ObjStats], os.stat_result]:
+        stat = os.stat(filepath)
+        if checksum is None:
+            known = self._paths.get(filepath)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                checksum = known[2]
+
+        cached = self._lookup(checksum) if checksum else None
+        if cached is None:
+            return None, stat
+
+        self._paths[filepath] = (stat.st_size, stat.st_mtime_ns, checksum)
+        return resolve_references(filepath, cached), stat
+
+    def _lookup(self, checksum: str) -> Optional[ObjStats]:
+        with self._lock:
+            stats = self._stats.get(checksum)
+            if stats is not None:
+                self._stats.move_to_end(checksum)
+                return stats
+
+        if self.store is None:
+            return None
+
+        try:
+            data = self.store.get_model_stats(checksum)
+        except Exception as e:
+            logger.warning("Cannot read cached OBJ stats: %s", e)
+            return None
+
+        if not data or data.get('scanner_version') != SCANNER_VERSION:
+            return None
+
+        stats = ObjStats.from_dict(data)
+        self._cache(stats)
+        return stats
+
+    def _remember(self, stats: ObjStats):
+        self._cache(stats)
+        if self.store is not None:
+            try:
+                self.store.put_model_stats(stats.checksum, stats.to_dict(include_references=False))
+            except Exception as e:
+                logger.warning("Cannot store OBJ stats: %s", e)
+
+    def _cache(self, stats: ObjStats):
+        with self._lock:
+            self._stats[stats.checksum] = stats
+            self._stats.move_to_end(stats.checksum)
+            while len(self._stats) > self.max_entries:
+                self._stats.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+            self._paths.clear()
+
+
+class _LibraryIndexStore:
+    """Store persistente sull'indice della libreria corrente (il manager può cambiare path)"""
+
+    @staticmethod
+    def _index():
+        from .local_library_manager import get_library_manager
+        return get_library_manager().index
+
+    def get_model_stats(self, checksum: str) -> Optional[Dict[str, Any]]:
+        return self._index().get_model_stats(checksum)
+
+    def put_model_stats(self, checksum: str, stats: Dict[str, Any]):
+        self._index().put_model_stats(checksum, stats)
+
+
+# Istanza globale
+_stats_cache = None
+
+
+def get_obj_stats_cache() -> ObjStatsCache:
+    """Cache globale, persistita nell'indice della libreria locale"""
+    global _stats_cache
+    if _stats_cache is None:
+        _stats_cache = ObjStatsCache(_LibraryIndexStore())
+    return _stats_cache
+
+
+def get_obj_stats(filepath: str, checksum: Optional[str] = None) -> ObjStats:
+    """Scorciatoia: statistiche di un OBJ dalla cache globale"""
+    return get_obj_stats_cache().get(filepath, checksum)
@@ -0,0 +1,133 @@
+"""
+OpenShelf Progress Channel
+Canale tra thread di lavoro e main thread: i worker pubblicano snapshot
+immutabili del progresso (uno per operazione, vince l'ultimo) ed eventi
+one-shot (es. risultati pronti); un solo timer nel main thread li applica
+alla scena (vedi ProgressPump in ui_timer_utils.py).
+
+I worker non toccano mai proprietà RNA e non prendono lock: l'assegnazione
+in un dict e l'append a una deque sono atomiche in CPython. Non richiede bpy
+"""
+
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Tipi di operazione con effetto sulle proprietà della scena
+KIND_SEARCH = 'search'
+KIND_DOWNLOAD = 'download'
+KIND_TASK = 'task'
+
+
+@dataclass(frozen=True)
+class ProgressSnapshot:
+    """Stato di un'operazione in un istante (immutabile)"""
+    operation_id: str
+    kind: str = KIND_TASK
+    message: str = ""
+    progress: float = -1.0  # 0-100, -1 = indeterminato
+    active: bool = True
+    error: Optional[str] = None
+    seq: int = 0
+    timestamp: float = 0.0
+
+
+class ProgressChannel:
+    """Ultimo snapshot per operazione + coda di eventi per il main thread"""
+
+    def __init__(self):
+        self._latest: Dict[str, ProgressSnapshot] = {}
+        self._events = deque()
+        self._seq = itertools.count(1)
+        self._handlers: Dict[str, Callable[[Any], None]] = {}
+
+    # ------------------------------------------------------------ worker
+
+    def publish(self, operation_id: str, kind: Optional[str] = None, message: Optional[str] = None,
+                progress: Optional[float] = None, active: bool = True,
+                error: Optional[str] = None) -> ProgressSnapshot:
+        """
+        Pubblica un nuovo snapshot; i campi None restano quelli del precedente
+
+        Ogni operazione ha un solo thread che pubblica, quindi leggere il
+        precedente e sostituirlo non perde aggiornamenti
+        """
+        previous = self._latest.get(operation_id) or ProgressSnapshot(operation_id)
+        changes = {'active': active, 'error': error, 'seq': next(self._seq), 'timestamp': time.time()}
+        if kind is not None:
+            changes['kind'] = kind
+        if message is not None:
+            changes['message'] = message
+        if progress is not None:
+            changes['progress'] = max(0.0, min(100.0, float(progress)))
+
+        snapshot = replace(previous, **changes)
+        self._latest[operation_id] = snapshot
+        return snapshot
+
+    def finish(self, operation_id: str, message: Optional[str] = None,
+               error: Optional[str] = None) -> ProgressSnapshot:
+        """Ultimo snapshot di un'operazione (inattiva, eventualmente con errore)"""
+        return self.publish(operation_id, message=message if message is not None else error,
+                            active=False, error=error)
+
+    def post_event(self, name: str, payload: Any = None):
+        """Evento one-shot consegnato al gestore registrato, nel main thread"""
+        self._events.append((name, payload))
+
+    # ------------------------------------------------------- main thread
+
+    def snapshots(self) -> Dict[str, ProgressSnapshot]:
+        """Copia degli ultimi snapshot (la copia di un dict è atomica)"""
+        return dict(self._latest)
+
+    def latest(self, operation_id: str) -> Optional[ProgressSnapshot]:
+        return self._latest.get(operation_id)
+
+    def discard(self, snapshot: ProgressSnapshot):
+        """Rimuove un'operazione conclusa se nel frattempo non è stata aggiornata"""
+        if self._latest.get(snapshot.operation_id) is snapshot:
+            self._latest.pop(snapshot.operation_id, None)
+
+    def drain_events(self) -> List[Tuple[str, Any]]:
+        events = []
+        while True:
+            try:
+                events.append(self._events.popleft())
+            except IndexError:
+                return events
+
+    def subscribe(self, name: str, handler: Callable[[Any], None]):
+        """Registra il gestore (main thread) di un tipo di evento"""
+        self._handlers[name] = handler
+
+    def unsubscribe(self, name: str):
+        self._handlers.pop(name, None)
+
+    def dispatch(self, name: str, payload: Any):
+        handler = self._handlers.get(name)
+        if handler is None:
+            logger.warning("No handler for progress event '%s'", name)
+            return
+        handler(payload)
+
+    def has_pending(self, since_seq: int) -> bool:
+        """True se ci sono eventi o snapshot più recenti di since_seq"""
+        if self._events:
+            return True
+        return any(snapshot.seq > since_seq for snapshot in self.snapshots().values())
+
+
+# Istanza globale
+_channel = ProgressChannel()
+
+
+def get_progress_channel() -> ProgressChannel:
+    """Ottiene il canale globale del progresso"""
+    return _channel
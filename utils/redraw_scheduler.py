@@ -0,0 +1,158 @@
+"""
+OpenShelf Redraw Scheduler
+Coalescing dei redraw dell'interfaccia: operatori, timer e thread di lavoro
+segnano le regioni "sporche" e un unico timer le ridisegna al massimo una
+volta per frame budget, solo nelle sidebar 3D aperte sulla tab OpenShelf.
+Senza modifiche il timer rallenta fino a IDLE_INTERVAL
+"""
+
+import threading
+import bpy # type: ignore
+from typing import Dict, Set, Tuple
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Intervallo minimo tra due redraw (20 FPS bastano per barre e messaggi)
+FRAME_BUDGET = 0.05
+
+# Intervallo massimo del timer quando non cambia nulla
+IDLE_INTERVAL = 0.5
+
+# Categoria della sidebar con i pannelli dell'addon
+PANEL_CATEGORY = "OpenShelf"
+
+RegionKey = Tuple[str, str]
+
+
+class RedrawScheduler:
+    """Raccoglie le richieste di redraw e le esegue in blocco dal main thread"""
+
+    def __init__(self, frame_budget: float = FRAME_BUDGET, idle_interval: float = IDLE_INTERVAL):
+        self.frame_budget = frame_budget
+        self.idle_interval = idle_interval
+        self._dirty: Set[RegionKey] = set()
+        self._lock = threading.Lock()
+        self._interval = frame_budget
+        self._running = False
+        self._enabled = False
+        self.stats: Dict[str, int] = {'requests': 0, 'flushes': 0, 'regions_tagged': 0}
+        # bpy.app.timers identifica le funzioni per oggetto: serve sempre lo stesso bound method
+        self._timer_func = self._tick
+
+    def request(self, area_type: str = 'VIEW_3D', region_type: str = 'UI'):
+        """
+        Segna una regione da ridisegnare (sicuro anche dai thread di lavoro)
+
+        Dal main thread un timer rallentato viene riportato subito al frame
+        budget; dai thread la richiesta viene raccolta al tick successivo
+        """
+        with self._lock:
+            self._dirty.add((area_type, region_type))
+            self.stats['requests'] += 1
+
+        if threading.current_thread() is threading.main_thread():
+            self._wake()
+
+    def _wake(self):
+        """Riavvia il timer al frame budget se era fermo o rallentato"""
+        if not self._enabled or (self._running and self._interval <= self.frame_budget):
+            return
+
+        if bpy.app.timers.is_registered(self._timer_func):
+            bpy.app.timers.unregister(self._timer_func)
+        self._interval = self.frame_budget
+        self._running = True
+        bpy.app.timers.register(self._timer_func, first_interval=self.frame_budget, persistent=True)
+
+    def start(self):
+        """Avvia il timer (registrazione dell'addon)"""
+        self._enabled = True
+        self._running = False
+        self._wake()
+
+    def stop(self):
+        """Ferma il timer e scarta le richieste pendenti"""
+        self._enabled = False
+        self._running = False
+        if bpy.app.timers.is_registered(self._timer_func):
+            bpy.app.timers.unregister(self._timer_func)
+        with self._lock:
+            self._dirty.clear()
+
+    def _tick(self):
+        """Timer: un solo passaggio di redraw per tutte le richieste accumulate"""
+        if not self._running:
+            return None
+
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+
+        if dirty:
+            try:
+                self.flush(dirty)
+            except Exception as e:
+                logger.error("Redraw error: %s", e)
+            self._interval = self.frame_budget
+        else:
+            # Backoff esponenziale fino all'intervallo di riposo
+            self._interval = min(self.idle_interval, self._interval * 2)
+
+        return self._interval
+
+    def flush(self, dirty: Set[RegionKey]):
+        """Tag delle regioni richieste nelle finestre aperte (non in tutti gli screen)"""
+        area_types = {area_type for area_type, _ in dirty}
+        self.stats['flushes'] += 1
+
+        for window in bpy.context.window_manager.windows:
+            screen = window.screen
+            if screen is None:
+                continue
+
+            for area in screen.areas:
+                if area.type not in area_types:
+                    continue
+
+                for region in area.regions:
+                    if (area.type, region.type) not in dirty or not self._shows_openshelf(region):
+                        continue
+                    region.tag_redraw()
+                    self.stats['regions_tagged'] += 1
+
+    @staticmethod
+    def _shows_openshelf(region) -> bool:
+        """False per sidebar chiuse o aperte su un'altra tab"""
+        if region.type != 'UI':
+            return True
+        if region.width <= 1:
+            return False
+        category = getattr(region, 'active_panel_category', None)
+        return not category or category == PANEL_CATEGORY
+
+
+# Istanza globale
+_scheduler = None
+
+
+def get_redraw_scheduler() -> RedrawScheduler:
+    """Ottiene lo scheduler globale dei redraw"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RedrawScheduler()
+    return _scheduler
+
+
+def request_redraw(area_type: str = 'VIEW_3D', region_type: str = 'UI'):
+    """Scorciatoia: segna da ridisegnare la sidebar OpenShelf (default)"""
+    get_redraw_scheduler().request(area_type, region_type)
+
+
+def register():
+    get_redraw_scheduler().start()
+
+
+def unregister():
+    get_redraw_scheduler().stop()
@@ -0,0 +1,511 @@
+"""
+OpenShelf Shared Library
+Libreria condivisa su una share di rete (NAS) usata da più postazioni: ogni
+asset viene scaricato una sola volta dal team e copiato nella libreria locale
+di ciascuna postazione alla prima richiesta (read-through).
+
+Nessun database condiviso (SQLite su NFS/SMB non è affidabile):
+- installazioni con staging nella share + rename atomico in models/
+- lock advisory per asset (locks/<asset>.lock) con heartbeat e recupero
+  dei lock orfani di processi terminati
+- manifest append-only (manifest.jsonl), una riga JSON per installazione o
+  rimozione: i lettori lo seguono in modo incrementale e ignorano le righe
+  incomplete, senza mai bloccare chi scrive
+"""
+
+import json
+import os
+import shutil
+import socket
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FILENAME = "manifest.jsonl"
+
+# Un lock senza heartbeat da più di LOCK_STALE_AFTER secondi è considerato orfano
+LOCK_STALE_AFTER = 600.0
+LOCK_HEARTBEAT_INTERVAL = 30.0
+LOCK_POLL_INTERVAL = 0.5
+
+# Attesa massima di un asset che un'altra postazione sta installando
+LOCK_WAIT_TIMEOUT = 300.0
+
+# Directory di staging più vecchie di così appartengono a installazioni interrotte
+STAGING_MAX_AGE = 24 * 3600.0
+
+
+def asset_dirname(asset_id: str) -> str:
+    """Nome della directory di un asset (stessa regola in libreria locale e condivisa)"""
+    safe_id = "".join(c for c in asset_id if c.isalnum() or c in "._-")
+    return f"asset_{safe_id}"
+
+
+def _pid_alive(pid: Any) -> bool:
+    """True se il processo esiste (su Windows non verificabile senza API native)"""
+    if not isinstance(pid, int) or pid <= 0 or sys.platform == "win32":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AssetLock:
+    """
+    Lock advisory su file creato con O_EXCL (atomico anche su NFSv3+ e SMB)
+
+    Il proprietario aggiorna l'mtime del file ogni LOCK_HEARTBEAT_INTERVAL
+    secondi; un lock senza heartbeat, o di un processo morto sulla stessa
+    macchina, viene recuperato da chi lo attende
+    """
+
+    def __init__(self, path: Path, stale_after: float = LOCK_STALE_AFTER):
+        self.path = Path(path)
+        self.stale_after = stale_after
+        self.owner = {
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'token': uuid.uuid4().hex,
+        }
+        self.held = False
+        self.lost = False
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread = None
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """Prova ad acquisire il lock, attendendo al massimo timeout secondi"""
+        deadline = time.monotonic() + timeout
+
+        while True:
+            if self._try_create():
+                self.held = True
+                self.lost = False
+                self._start_heartbeat()
+                return True
+
+            self._break_if_stale()
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self):
+        """Rilascia il lock (solo se ancora nostro)"""
+        if not self.held:
+            return
+        self.held = False
+        self._stop_heartbeat.set()
+
+        if self._read_owner().get('token') == self.owner['token']:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        if not self.acquire(LOCK_WAIT_TIMEOUT):
+            raise TimeoutError(f"Timed out waiting for {self.path}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def _try_create(self) -> bool:
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(dict(self.owner, created=time.time()), f)
+        return True
+
+    def _read_owner(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Mancante o appena creato e non ancora scritto
+            return {}
+
+    def _break_if_stale(self):
+        """Rimuove un lock orfano; il rename garantisce che un solo processo lo recuperi"""
+        try:
+            age = time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return
+
+        owner = self._read_owner()
+        stale = age > self.stale_after
+        if not stale and owner.get('host') == self.owner['host']:
+            stale = age > LOCK_POLL_INTERVAL * 4 and not _pid_alive(owner.get('pid'))
+        if not stale:
+            return
+
+        tombstone = self.path.with_name(f"{self.path.name}.stale-{uuid.uuid4().hex[:8]}")
+        try:
+            os.replace(self.path, tombstone)
+        except FileNotFoundError:
+            return
+
+        try:
+            with open(tombstone, 'r', encoding='utf-8') as f:
+                removed = json.load(f)
+        except (OSError, ValueError):
+            removed = {}
+
+        if owner.get('token') and removed.get('token') != owner.get('token'):
+            # Nel frattempo il lock era stato ripreso da un altro: lo rimettiamo al suo posto
+            try:
+                os.link(tombstone, self.path)
+            except OSError:
+                pass
+        else:
+            logger.warning("Recovered stale lock %s (owner %s pid %s)",
+                           self.path.name, owner.get('host'), owner.get('pid'))
+
+        try:
+            os.remove(tombstone)
+        except OSError:
+            pass
+
+    def _start_heartbeat(self):
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="openshelf_lock_heartbeat",
+                                                  args=(self._stop_heartbeat,), daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat(self, stop_event: threading.Event):
+        while not stop_event.wait(LOCK_HEARTBEAT_INTERVAL):
+            if self._read_owner().get('token') != self.owner['token']:
+                # Recuperato da un altro processo (es. rete irraggiungibile a lungo)
+                self.lost = True
+                logger.warning("Lost shared library lock %s", self.path.name)
+                return
+            try:
+                os.utime(self.path)
+            except OSError as e:
+                logger.debug("Lock heartbeat failed for %s: %s", self.path.name, e)
+
+
+class LibraryManifest:
+    """Manifest append-only degli asset installati, letto in modo incrementale"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._assets: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+        self.version = 0
+
+    def refresh(self) -> bool:
+        """Legge le righe aggiunte dall'ultima lettura; True se qualcosa è cambiato"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                size = 0
+
+            if size < self._offset:
+                # Manifest sostituito (es. ricostruito a mano): rilettura completa
+                self._assets.clear()
+                self._offset = 0
+            if size == self._offset:
+                return False
+
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+
+            # Solo righe complete: un'append in corso verrà letta al prossimo refresh
+            end = data.rfind(b"\n")
+            if end < 0:
+                return False
+
+            changed = False
+            for line in data[:end].split(b"\n"):
+                if line.strip():
+                    changed = self._apply(line) or changed
+            self._offset += end + 1
+
+            if changed:
+                self.version += 1
+            return changed
+
+    def _apply(self, line: bytes) -> bool:
+        try:
+            entry = json.loads(line)
+            asset_id = entry['asset_id']
+            op = entry['op']
+        except (ValueError, KeyError, TypeError):
+            logger.debug("Skipping malformed manifest line in %s", self.path)
+            return False
+
+        if op == 'add':
+            self._assets[asset_id] = entry
+        elif op == 'remove':
+            self._assets.pop(asset_id, None)
+        else:
+            return False
+        return True
+
+    def append(self, entry: Dict[str, Any]):
+        """Aggiunge una riga con una singola write in O_APPEND"""
+        line = (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def get(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._assets.get(asset_id)
+            return dict(entry) if entry else None
+
+    def asset_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._assets)
+
+
+class SharedLibrary:
+    """Libreria condivisa tra postazioni (vedi docstring del modulo)"""
+
+    def __init__(self, root: str, lock_timeout: float = LOCK_WAIT_TIMEOUT):
+        self.root = Path(root)
+        self.lock_timeout = lock_timeout
+        self.models_dir = self.root / "models"
+        self.staging_dir = self.root / "staging"
+        self.locks_dir = self.root / "locks"
+
+        for directory in (self.models_dir, self.staging_dir, self.locks_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self.manifest = LibraryManifest(self.root / MANIFEST_FILENAME)
+        self.manifest.refresh()
+        self.cleanup_staging()
+
+    def get_asset_directory(self, asset_id: str) -> Path:
+        return self.models_dir / asset_dirname(asset_id)
+
+    def lock(self, asset_id: str) -> AssetLock:
+        """Lock advisory per installare o rimuovere un asset"""
+        return AssetLock(self.locks_dir / f"{asset_dirname(asset_id)}.lock")
+
+    def lookup(self, asset_id: str) -> Optional[Dict[str, Any]]:
+        """Voce del manifest di un asset installato e presente su disco, o None"""
+        self.manifest.refresh()
+        entry = self.manifest.get(asset_id)
+        if entry is None:
+            return None
+
+        asset_dir = self.get_asset_directory(asset_id)
+        if not entry.get('primary_model') or not (asset_dir / entry['primary_model']).is_file():
+            logger.warning("Shared library entry %s has no model on disk", asset_id)
+            return None
+        return entry
+
+    def copy_to(self, asset_id: str, target_dir: Path) -> Optional[Dict[str, Any]]:
+        """
+        Copia un asset condiviso in target_dir (staging della libreria locale)
+
+        Returns:
+            Voce del manifest, o None se l'asset manca o i file non corrispondono
+        """
+        entry = self.lookup(asset_id)
+        if entry is None:
+            return None
+
+        source_dir = self.get_asset_directory(asset_id)
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+        for relative, size, _ in entry['files']:
+            target = target_dir / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source_dir / relative, target)
+            if target.stat().st_size != size:
+                logger.warning("Shared copy of %s/%s has unexpected size", asset_id, relative)
+                return None
+
+        metadata_file = source_dir / "metadata.json"
+        if metadata_file.is_file():
+            shutil.copyfile(metadata_file, target_dir / "metadata.json")
+
+        return entry
+
+    def publish(self, asset_id: str, source_dir: Path, primary_model: str,
+                files: List[Tuple[str, int, Optional[str]]]):
+        """
+        Copia un asset installato localmente nella share e lo registra nel manifest.
+        Da chiamare con il lock dell'asset acquisito
+        """
+        staging = self.staging_dir / f"{asset_dirname(asset_id)}.{uuid.uuid4().hex[:8]}"
+        asset_dir = self.get_asset_directory(asset_id)
+        replaced_dir = None
+
+        try:
+            staging.mkdir(parents=True)
+            for relative in [path for path, _, _ in files] + ["metadata.json"]:
+                source = source_dir / relative
+                if source.is_file():
+                    target = staging / relative
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(source, target)
+
+            if asset_dir.exists():
+                replaced_dir = self.staging_dir / f"replaced_{uuid.uuid4().hex[:8]}"
+                os.replace(asset_dir, replaced_dir)
+            os.replace(staging, asset_dir)
+
+            self.manifest.append({
+                'op': 'add',
+                'asset_id': asset_id,
+                'primary_model': primary_model,
+                'files': [list(entry) for entry in files],
+                'host': socket.gethostname(),
+                'at': time.time(),
+            })
+            self.manifest.refresh()
+            logger.info("Published asset %s to shared library %s", asset_id, self.root)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            if replaced_dir is not None:
+                shutil.rmtree(replaced_dir, ignore_errors=True)
+
+    def remove(self, asset_id: str) -> bool:
+        """Rimuove un asset dalla share (prima dal manifest, poi dal disco)"""
+        lock = self.lock(asset_id)
+        if not lock.acquire(self.lock_timeout):
+            logger.warning("Cannot remove %s from shared library: asset is locked", asset_id)
+            return False
+
+        try:
+            self.manifest.refresh()
+            if self.manifest.get(asset_id) is None:
+                return False
+
+            self.manifest.append({'op': 'remove', 'asset_id': asset_id, 'host': socket.gethostname(),
+                                  'at': time.time()})
+            self.manifest.refresh()
+
+            asset_dir = self.get_asset_directory(asset_id)
+            if asset_dir.exists():
+                removed_dir = self.staging_dir / f"removed_{uuid.uuid4().hex[:8]}"
+                os.replace(asset_dir, removed_dir)
+                shutil.rmtree(removed_dir, ignore_errors=True)
+            return True
+        finally:
+            lock.release()
+
+    def cleanup_staging(self, max_age: float = STAGING_MAX_AGE) -> int:
+        """Rimuove le directory di staging lasciate da installazioni interrotte"""
+        removed = 0
+        now = time.time()
+
+        try:
+            for path in self.staging_dir.iterdir():
+                try:
+                    if now - path.stat().st_mtime > max_age:
+                        shutil.rmtree(path, ignore_errors=True)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        except OSError as e:
+            logger.debug("Cannot clean shared staging %s: %s", self.staging_dir, e)
+
+        return removed
+
+    def get_stats(self, refresh: bool = True) -> Dict[str, Any]:
+        """Numero di asset e dimensione totale secondo il manifest (refresh=False: senza I/O sulla share)"""
+        if refresh:
+            self.manifest.refresh()
+        asset_ids = self.manifest.asset_ids()
+        total_size = 0
+        for asset_id in asset_ids:
+            entry = self.manifest.get(asset_id)
+            if entry:
+                total_size += sum(size for _, size, _ in entry['files'])
+
+        return {
+            'shared_path': str(self.root),
+            'asset_count': len(asset_ids),
+            'total_size_bytes': total_size,
+        }
+
+
+# Attesa prima di ritentare una share non raggiungibile
+SHARE_RETRY_INTERVAL = 60.0
+
+# Istanze per path (la share può cambiare dalle preferenze)
+_shared_libraries: Dict[str, SharedLibrary] = {}
+_unavailable_since: Dict[str, float] = {}
+_probes: Dict[str, threading.Event] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_library(root: Optional[str], wait: bool = False) -> Optional[SharedLibrary]:
+    """
+    SharedLibrary per un path (None se la modalità condivisa è disattivata o la share non è raggiungibile)
+
+    La prima apertura (mkdir e pulizia dello staging sulla share) avviene in un
+    thread di probe: senza wait restituisce None finché il probe non è concluso,
+    così il thread UI non si blocca mai su una share lenta o irraggiungibile.
+    I worker passano wait=True per attendere l'esito
+    """
+    if not root:
+        return None
+
+    with _shared_lock:
+        library = _shared_libraries.get(root)
+        if library is not None:
+            return library
+
+        probe = _probes.get(root)
+        if probe is None:
+            if time.time() - _unavailable_since.get(root, 0.0) < SHARE_RETRY_INTERVAL:
+                return None
+            probe = _probes[root] = threading.Event()
+            threading.Thread(target=_probe_share, args=(root, probe),
+                             name="openshelf_share_probe", daemon=True).start()
+
+    if not wait:
+        return None
+    probe.wait()
+    with _shared_lock:
+        return _shared_libraries.get(root)
+
+
+def is_shared_library_probing(root: Optional[str]) -> bool:
+    """True mentre la share è in fase di apertura nel thread di probe"""
+    with _shared_lock:
+        return bool(root) and root in _probes
+
+
+def _probe_share(root: str, probe: threading.Event):
+    """Thread di probe: apre la share e pubblica l'esito"""
+    try:
+        library = SharedLibrary(root)
+    except OSError as e:
+        logger.error("Shared library %s not available: %s", root, e)
+        library = None
+
+    with _shared_lock:
+        if library is None:
+            _unavailable_since[root] = time.time()
+        else:
+            _shared_libraries[root] = library
+        _probes.pop(root, None)
+    probe.set()
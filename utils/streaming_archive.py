@@ -0,0 +1,282 @@
+"""
+OpenShelf Streaming Archive
+Download a intervalli (HTTP Range) di archivi ZIP con estrazione sovrapposta:
+la central directory viene letta dalla coda del file, poi i membri necessari
+vengono scaricati per primi (modello principale e MTL) ed estratti appena completi
+"""
+
+import struct
+import threading
+import urllib.request
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, List, Callable, Dict, Tuple
+
+from .archive_extractor import ArchiveExtractor
+from .archive_planner import plan_archive, choose_primary_model
+
+USER_AGENT = 'OpenShelf/1.0 (Blender Addon)'
+
+# Byte letti dalla coda per trovare End Of Central Directory
+TAIL_FETCH_SIZE = 64 * 1024
+
+# Dimensione dei blocchi di lettura della risposta HTTP
+READ_CHUNK_SIZE = 256 * 1024
+
+# Intervalli separati da meno di questo gap vengono uniti in una sola richiesta
+RANGE_MERGE_GAP = 64 * 1024
+
+EOCD_SIGNATURE = b'PK\x05\x06'
+EOCD_MIN_SIZE = 22
+
+
+class RangeNotSupported(Exception):
+    """Il server non supporta richieste HTTP Range: usare il download completo"""
+
+
+class StreamingArchiveDownload:
+    """Scarica uno ZIP per intervalli estraendo i membri mentre arrivano"""
+
+    def __init__(self, url: str, archive_path: str, dest_dir: str,
+                 max_extract_workers: int = 4, timeout: int = 30):
+        self.url = url
+        self.archive_path = Path(archive_path)
+        self.dest_dir = Path(dest_dir)
+        self.timeout = timeout
+        self.total_size = 0
+        self.bytes_downloaded = 0
+        self.plan = None
+        self.extracted: List[str] = []
+        self.cancel_event = threading.Event()
+        self._extractor = ArchiveExtractor(max_workers=1)
+        self._executor = ThreadPoolExecutor(max_workers=max_extract_workers,
+                                            thread_name_prefix="openshelf_stream_extract")
+        self._extract_futures = []
+        self._extracted_lock = threading.Lock()
+        self._file = None
+        # Da questo offset alla fine il file locale è già completo (coda e central directory)
+        self._fetched_from = None
+
+    # ------------------------------------------------------------------ HTTP
+
+    def _request(self, method: str = 'GET', byte_range: Optional[Tuple[int, int]] = None):
+        """Apre una richiesta HTTP, eventualmente limitata a un intervallo"""
+        headers = {'User-Agent': USER_AGENT, 'Accept': '*/*'}
+        if byte_range is not None:
+            headers['Range'] = f"bytes={byte_range[0]}-{byte_range[1]}"
+
+        req = urllib.request.Request(self.url, headers=headers)
+        req.get_method = lambda: method
+        return urllib.request.urlopen(req, timeout=self.timeout)
+
+    def _fetch_range(self, start: int, end: int, progress_callback=None, position_callback=None):
+        """
+        Scarica [start, end] e lo scrive alla stessa posizione nel file locale
+
+        Args:
+            progress_callback: Chiamata con il totale dei byte scaricati
+            position_callback: Chiamata con l'offset assoluto raggiunto dopo ogni blocco
+        """
+        with self._request(byte_range=(start, end)) as response:
+            if response.status != 206:
+                raise RangeNotSupported(f"Server answered {response.status} to a Range request")
+
+            position = start
+            self._file.seek(start)
+            while True:
+                if self.cancel_event.is_set():
+                    raise InterruptedError("Download cancelled")
+
+                chunk = response.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                self._file.write(chunk)
+                position += len(chunk)
+                self.bytes_downloaded += len(chunk)
+                if progress_callback:
+                    progress_callback(self.bytes_downloaded)
+                if position_callback:
+                    position_callback(position)
+
+        # Rende i byte visibili agli handle ZIP dei thread di estrazione
+        self._file.flush()
+
+    # ------------------------------------------------------------- ZIP index
+
+    def _read_central_directory(self) -> List[zipfile.ZipInfo]:
+        """Scarica la coda dell'archivio e legge la central directory"""
+        with self._request(method='HEAD') as response:
+            self.total_size = int(response.headers.get('Content-Length', 0))
+
+        if self.total_size <= EOCD_MIN_SIZE:
+            raise RangeNotSupported("Unknown archive size")
+
+        # File sparso della dimensione finale: i range vengono scritti al loro offset
+        self._file.truncate(self.total_size)
+
+        tail_start = max(0, self.total_size - TAIL_FETCH_SIZE)
+        self._fetch_range(tail_start, self.total_size - 1)
+
+        self._file.seek(tail_start)
+        tail = self._file.read(self.total_size - tail_start)
+        eocd_pos = tail.rfind(EOCD_SIGNATURE)
+        if eocd_pos < 0:
+            raise RangeNotSupported("End of central directory not found in archive tail")
+
+        cd_size, cd_offset = struct.unpack('<II', tail[eocd_pos + 12:eocd_pos + 20])
+        if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+            raise RangeNotSupported("ZIP64 archives are not streamed")
+
+        if cd_offset < tail_start:
+            self._fetch_range(cd_offset, tail_start - 1)
+
+        self._central_directory_offset = cd_offset
+        self._fetched_from = min(cd_offset, tail_start)
+
+        with zipfile.ZipFile(self.archive_path, 'r') as zip_ref:
+            return zip_ref.infolist()
+
+    def _member_ranges(self, infos: List[zipfile.ZipInfo]) -> Dict[str, Tuple[int, int]]:
+        """Intervallo di byte (header locale + dati + descriptor) di ogni membro"""
+        ordered = sorted(infos, key=lambda info: info.header_offset)
+        ranges = {}
+
+        for i, info in enumerate(ordered):
+            if i + 1 < len(ordered):
+                end = ordered[i + 1].header_offset - 1
+            else:
+                end = self._central_directory_offset - 1
+            ranges[info.filename] = (info.header_offset, end)
+
+        return ranges
+
+    @staticmethod
+    def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Unisce intervalli contigui o vicini per ridurre il numero di richieste"""
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start - merged[-1][1] <= RANGE_MERGE_GAP:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _missing_bytes(self, names: List[str], ranges) -> int:
+        """Byte dei membri ancora da scaricare (esclusa la parte già letta con la coda)"""
+        return sum(max(0, min(end, self._fetched_from - 1) - start + 1)
+                   for start, end in (ranges[name] for name in names))
+
+    # ------------------------------------------------------------ extraction
+
+    def _submit_extraction(self, names: List[str]):
+        """Estrae in background i membri già scaricati"""
+        def job():
+            if self.cancel_event.is_set():
+                return
+            paths = self._extractor.extract(str(self.archive_path), str(self.dest_dir), members=names)
+            with self._extracted_lock:
+                self.extracted.extend(paths)
+
+        self._extract_futures.append(self._executor.submit(job))
+
+    def _fetch_members(self, names: List[str], ranges, progress_callback):
+        """Scarica i membri indicati estraendo ciascuno appena il suo intervallo è completo"""
+        pending = sorted(names, key=lambda name: ranges[name][0])
+
+        def submit_completed(position):
+            # Membri il cui ultimo byte è già su disco (position è esclusivo)
+            ready = []
+            while pending and ranges[pending[0]][1] < position:
+                ready.append(pending.pop(0))
+            if ready:
+                self._file.flush()
+                self._submit_extraction(ready)
+
+        for start, end in self._merge_ranges([ranges[name] for name in pending]):
+            # I byte nella coda già scaricata non vengono richiesti di nuovo
+            fetch_end = min(end, self._fetched_from - 1)
+            if start <= fetch_end:
+                self._fetch_range(start, fetch_end, progress_callback, submit_completed)
+            submit_completed(end + 1)
+
+    # ------------------------------------------------------------------ main
+
+    def run(self, selective: bool = True,
+            progress_callback: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """
+        Esegue download ed estrazione sovrapposti
+
+        Args:
+            selective: Scarica solo modello principale e file referenziati
+            progress_callback: Callback (bytes scaricati, bytes previsti)
+
+        Returns:
+            Lista dei path estratti
+
+        Raises:
+            RangeNotSupported: se il server o l'archivio non consentono lo streaming
+        """
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        expected = [0]
+
+        def report(downloaded):
+            if progress_callback:
+                progress_callback(downloaded, max(expected[0], downloaded))
+
+        try:
+            with open(self.archive_path, 'w+b') as self._file:
+                infos = [info for info in self._read_central_directory() if not info.is_dir()]
+                ranges = self._member_ranges(infos)
+
+                primary = choose_primary_model(infos)
+                if primary is None:
+                    raise Exception("No 3D files found in archive")
+
+                # 1. Modello principale e MTL: servono al planner e arrivano per primi
+                first = [primary.filename] + [
+                    info.filename for info in infos
+                    if info.filename.lower().endswith('.mtl') and info.filename != primary.filename
+                ]
+                if not selective:
+                    expected[0] = self.bytes_downloaded + self._missing_bytes(list(ranges), ranges)
+                else:
+                    expected[0] = self.bytes_downloaded + self._missing_bytes(first, ranges)
+
+                self._fetch_members(first, ranges, report)
+
+                # 2. Planner sul file parziale (legge solo OBJ/MTL già presenti)
+                if selective:
+                    self.plan = plan_archive(str(self.archive_path))
+                    remaining = [name for name in self.plan.members if name not in first]
+                    extra_mtl = [name for name in first[1:] if name not in self.plan.members]
+                    expected[0] += self._missing_bytes(remaining, ranges)
+                else:
+                    remaining = [info.filename for info in infos if info.filename not in first]
+                    extra_mtl = []
+
+                # 3. Texture e buffer, estratti man mano che i loro byte arrivano
+                self._fetch_members(remaining, ranges, report)
+
+                for future in self._extract_futures:
+                    future.result()
+
+                # Gli MTL non referenziati sono serviti solo al planner
+                for name in extra_mtl:
+                    path = self.dest_dir / name
+                    if path.exists():
+                        path.unlink()
+                    with self._extracted_lock:
+                        if str(path) in self.extracted:
+                            self.extracted.remove(str(path))
+
+            return list(self.extracted)
+
+        except BaseException:
+            self.cancel_event.set()
+            raise
+        finally:
+            self._executor.shutdown(wait=True)
+
@@ -0,0 +1,275 @@
+"""
+OpenShelf Texture Tiers
+Versioni ridotte (1K/2K/4K) delle texture degli asset della libreria: generate
+all'installazione da un Blender headless, scelte all'import e sostituite con
+l'originale solo durante il render
+"""
+
+import bpy
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+
+from .local_library_manager import get_library_manager
+from .host import get_preference
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Lato massimo in pixel di ogni tier
+TEXTURE_TIERS = {
+    '1K': 1024,
+    '2K': 2048,
+    '4K': 4096,
+}
+TIER_ORIGINAL = 'ORIGINAL'
+DEFAULT_TEXTURE_TIER = '2K'
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.tif', '.tiff', '.bmp', '.tga', '.exr'}
+
+TIER_OUTPUT_DIR = "openshelf_textures"
+TIER_MANIFEST = TIER_OUTPUT_DIR + "/manifest.json"
+
+WORKER_SCRIPT = Path(__file__).with_name("background_textures.py")
+
+# Timeout per asset (secondi)
+DEFAULT_TEXTURE_TIMEOUT = 600
+
+# Proprietà custom sulle immagini: path originale e tier in uso
+IMAGE_ORIGINAL_KEY = "openshelf_texture_original"
+IMAGE_TIER_KEY = "openshelf_texture_tier"
+
+
+class TextureTierProcessor:
+    """Genera e applica i tier di risoluzione delle texture"""
+
+    def __init__(self, timeout: int = DEFAULT_TEXTURE_TIMEOUT):
+        self.timeout = timeout
+        # asset_dir -> (mtime_ns, manifest)
+        self._manifests: Dict[str, tuple] = {}
+        # Immagini portate all'originale per il render in corso: nome -> filepath del tier
+        self._render_swapped: Dict[str, str] = {}
+
+    @staticmethod
+    def is_available() -> bool:
+        """True se l'eseguibile di Blender è disponibile per lanciare il worker"""
+        return bool(bpy.app.binary_path) and os.path.exists(bpy.app.binary_path)
+
+    @staticmethod
+    def find_textures(relative_paths: List[str]) -> List[str]:
+        """Filtra le immagini tra i file installati (esclusi i tier già generati)"""
+        return [path for path in relative_paths
+                if Path(path).suffix.lower() in IMAGE_EXTENSIONS
+                and not path.startswith(TIER_OUTPUT_DIR + "/")]
+
+    def generate(self, asset_dir: Path, relative_paths: List[str]) -> List[str]:
+        """
+        Genera i tier delle texture di un asset (chiamabile dal thread di download)
+
+        Args:
+            asset_dir: Directory dell'asset (anche lo staging dell'installazione)
+            relative_paths: File installati, relativi ad asset_dir
+
+        Returns:
+            Nuovi file relativi (tier e manifest) da aggiungere all'indice
+        """
+        textures = self.find_textures(relative_paths)
+        if not textures or not self.is_available():
+            return []
+
+        job = {
+            'asset_dir': str(asset_dir),
+            'textures': textures,
+            'tiers': TEXTURE_TIERS,
+            'output_dir': TIER_OUTPUT_DIR,
+            'manifest': TIER_MANIFEST,
+        }
+
+        job_fd, job_path = tempfile.mkstemp(prefix="openshelf_textures_", suffix=".json")
+        try:
+            with os.fdopen(job_fd, 'w', encoding='utf-8') as f:
+                json.dump(job, f)
+
+            command = [
+                bpy.app.binary_path, "--background", "--factory-startup",
+                "--python", str(WORKER_SCRIPT), "--", job_path
+            ]
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    text=True, timeout=self.timeout)
+
+            if result.returncode != 0:
+                tail = "\n".join(result.stdout.splitlines()[-5:])
+                logger.error("Texture processing failed (exit %d):\n%s", result.returncode, tail)
+                return []
+
+        except subprocess.TimeoutExpired:
+            logger.error("Texture processing of %s timed out", asset_dir.name)
+            return []
+        except Exception as e:
+            logger.error("Cannot start texture processing: %s", e)
+            return []
+        finally:
+            try:
+                os.remove(job_path)
+            except OSError:
+                pass
+
+        manifest = self._read_manifest(asset_dir / TIER_MANIFEST)
+        if manifest is None:
+            return []
+
+        new_files = [TIER_MANIFEST]
+        for entry in manifest.values():
+            new_files.extend(entry.get('tiers', {}).values())
+
+        logger.info("Generated %d texture tiers for %d textures", len(new_files) - 1, len(manifest))
+        return new_files
+
+    @staticmethod
+    def _read_manifest(manifest_path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Cannot read texture manifest %s: %s", manifest_path, e)
+            return None
+
+    def get_manifest(self, asset_dir: Path) -> Optional[Dict[str, Any]]:
+        """Manifest dei tier di un asset (None se non generati)"""
+        manifest_path = asset_dir / TIER_MANIFEST
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        cached = self._manifests.get(str(asset_dir))
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        manifest = self._read_manifest(manifest_path)
+        if manifest is not None:
+            self._manifests[str(asset_dir)] = (mtime, manifest)
+        return manifest
+
+    @staticmethod
+    def resolve_tier(entry: Dict[str, Any], tier: str) -> Optional[str]:
+        """File relativo del tier richiesto (None = usa l'originale)"""
+        if tier == TIER_ORIGINAL:
+            return None
+        return entry.get('tiers', {}).get(tier)
+
+    def apply(self, obj: bpy.types.Object, asset_id: str, tier: str) -> int:
+        """
+        Punta le immagini dei materiali dell'oggetto al tier richiesto
+
+        Returns:
+            Numero di immagini cambiate
+        """
+        if obj is None or obj.type != 'MESH' or obj.data is None:
+            return 0
+        if tier != TIER_ORIGINAL and tier not in TEXTURE_TIERS:
+            return 0
+
+        record = get_library_manager().index.get(asset_id)
+        if not record:
+            return 0
+
+        asset_dir = Path(record['asset_dir'])
+        manifest = self.get_manifest(asset_dir)
+        if not manifest:
+            return 0
+
+        changed = 0
+        for image in _iter_images(obj):
+            original = image.get(IMAGE_ORIGINAL_KEY) or bpy.path.abspath(image.filepath, library=image.library)
+            try:
+                relative = Path(original).resolve().relative_to(asset_dir.resolve()).as_posix()
+            except (ValueError, OSError):
+                continue
+
+            entry = manifest.get(relative)
+            if entry is None:
+                continue
+
+            tier_file = self.resolve_tier(entry, tier)
+            target = str(asset_dir / tier_file) if tier_file else original
+
+            image[IMAGE_ORIGINAL_KEY] = original
+            image[IMAGE_TIER_KEY] = tier if tier_file else TIER_ORIGINAL
+            if bpy.path.abspath(image.filepath, library=image.library) != target:
+                image.filepath = target
+                changed += 1
+
+        if changed:
+            logger.info("Using %s textures for %s (%d images)", tier, obj.name, changed)
+        return changed
+
+    def upgrade_for_render(self):
+        """Porta tutte le immagini ridotte all'originale (prima del render)"""
+        for image in bpy.data.images:
+            original = image.get(IMAGE_ORIGINAL_KEY)
+            if not original or image.get(IMAGE_TIER_KEY, TIER_ORIGINAL) == TIER_ORIGINAL:
+                continue
+            if image.name in self._render_swapped or not os.path.exists(original):
+                continue
+
+            self._render_swapped[image.name] = image.filepath
+            image.filepath = original
+
+        if self._render_swapped:
+            logger.info("Upgraded %d textures to full resolution for render", len(self._render_swapped))
+
+    def restore_after_render(self):
+        """Ripristina i tier dopo il render"""
+        for name, filepath in self._render_swapped.items():
+            image = bpy.data.images.get(name)
+            if image is not None:
+                image.filepath = filepath
+        self._render_swapped.clear()
+
+
+def _iter_images(obj: bpy.types.Object):
+    """Immagini usate dai nodi Image Texture dei materiali dell'oggetto"""
+    seen = set()
+    for material in obj.data.materials:
+        if material is None or not material.use_nodes or material.node_tree is None:
+            continue
+        for node in material.node_tree.nodes:
+            image = getattr(node, 'image', None) if node.type == 'TEX_IMAGE' else None
+            if image is not None and image.source == 'FILE' and image.name not in seen:
+                seen.add(image.name)
+                yield image
+
+
+def is_texture_tiers_enabled() -> bool:
+    """True se la generazione dei tier all'installazione è attiva (sicura dai thread di download)"""
+    return bool(get_preference('texture_tiers_enabled', True))
+
+
+def get_import_texture_tier(scene) -> str:
+    """Tier scelto nel pannello di import, o quello predefinito delle preferenze"""
+    tier = getattr(scene, 'openshelf_texture_tier', 'DEFAULT')
+    if tier == 'DEFAULT':
+        tier = get_preference('default_texture_tier', DEFAULT_TEXTURE_TIER)
+    return tier
+
+
+def is_render_upgrade_enabled() -> bool:
+    """True se le texture originali vanno usate durante il render"""
+    return bool(get_preference('texture_render_upgrade', True))
+
+
+# Istanza globale
+_global_texture_tier_processor = None
+
+def get_texture_tier_processor() -> TextureTierProcessor:
+    """Ottiene l'istanza globale del processore di texture"""
+    global _global_texture_tier_processor
+
+    if _global_texture_tier_processor is None:
+        _global_texture_tier_processor = TextureTierProcessor()
+
+    return _global_texture_tier_processor
@@ -0,0 +1,327 @@
+"""
+OpenShelf Tracing
+Span temporizzati sui percorsi caldi (catalogo, ricerca, download, estrazione,
+import, post-processing) raggruppati per operazione. Con il tracing spento
+span() restituisce un context manager vuoto condiviso: nessuna allocazione,
+nessuna chiamata al clock. Le operazioni concluse restano in un ring buffer
+e si esportano nel formato JSON di chrome://tracing / Perfetto
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+# Operazioni concluse mantenute in memoria
+DEFAULT_TRACE_BUFFER_SIZE = 50
+
+# Span oltre questo numero vengono scartati (operazioni anomale)
+MAX_SPANS_PER_OPERATION = 5000
+
+
+class Span:
+    """Intervallo temporizzato dentro un'operazione"""
+
+    __slots__ = ('name', 'start', 'end', 'depth', 'thread', 'args')
+
+    def __init__(self, name: str, start: float, depth: int, thread: str, args: Optional[Dict[str, Any]]):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.depth = depth
+        self.thread = thread
+        self.args = args
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+
+class Operation:
+    """Operazione utente (import, ricerca, ...) con i suoi span"""
+
+    def __init__(self, name: str, args: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.args = dict(args or {})
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status = 'RUNNING'
+        self.spans: List[Span] = []
+        self._step: Optional[Span] = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    @property
+    def finished(self) -> bool:
+        return self.end is not None
+
+    def _add(self, span: Span):
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_OPERATION:
+                self.spans.append(span)
+
+    def mark_step(self, name: str, **args):
+        """
+        Chiude lo step corrente e ne apre uno nuovo (operatori a stati, come
+        l'import modale, i cui step durano più tick del timer)
+        """
+        now = time.perf_counter()
+        if self._step is not None:
+            self._step.end = now
+        self._step = Span(name, now, 0, threading.current_thread().name, args or None)
+        self._add(self._step)
+
+
+# Contesto per thread: operazione attiva e profondità di annidamento
+_local = threading.local()
+
+
+class _NullSpan:
+    """Context manager vuoto usato quando il tracing è spento"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Span in corso: si registra nell'operazione attiva del thread"""
+
+    __slots__ = ('_tracer', '_name', '_args', '_span', '_operation', '_owns_operation')
+
+    def __init__(self, tracer: 'Tracer', name: str, args: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._span = None
+        self._operation = None
+        self._owns_operation = False
+
+    def __enter__(self):
+        operation = getattr(_local, 'operation', None)
+        if operation is None or operation.finished:
+            # Span fuori da un'operazione: diventa un'operazione a sé
+            operation = Operation(self._name, self._args)
+            _local.operation = operation
+            self._owns_operation = True
+
+        depth = getattr(_local, 'depth', 0)
+        _local.depth = depth + 1
+        self._operation = operation
+        self._span = Span(self._name, time.perf_counter(), depth,
+                          threading.current_thread().name, self._args)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        self._span.end = time.perf_counter()
+        if exc_type is not None:
+            self._span.args = dict(self._span.args or {}, error=str(exc))
+        self._operation._add(self._span)
+        _local.depth = max(0, getattr(_local, 'depth', 1) - 1)
+
+        if self._owns_operation:
+            _local.operation = None
+            self._tracer.finish(self._operation, 'ERROR' if exc_type else 'OK')
+        return False
+
+
+class _Activation:
+    """Rende un'operazione attiva nel thread corrente (anche tra thread diversi)"""
+
+    __slots__ = ('_operation', '_previous', '_previous_depth')
+
+    def __init__(self, operation: Optional[Operation]):
+        self._operation = operation
+        self._previous = None
+        self._previous_depth = 0
+
+    def __enter__(self):
+        self._previous = getattr(_local, 'operation', None)
+        self._previous_depth = getattr(_local, 'depth', 0)
+        _local.operation = self._operation
+        _local.depth = 1 if self._operation is not None and self._operation._step is not None else 0
+        return self._operation
+
+    def __exit__(self, exc_type, exc, tb):
+        _local.operation = self._previous
+        _local.depth = self._previous_depth
+        return False
+
+
+class Tracer:
+    """Raccoglie le operazioni tracciate in un ring buffer"""
+
+    def __init__(self, buffer_size: int = DEFAULT_TRACE_BUFFER_SIZE):
+        self.enabled = False
+        self._operations = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        # Riferimento comune per i timestamp dell'export
+        self._epoch = time.perf_counter()
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = bool(enabled)
+
+    def set_buffer_size(self, buffer_size: int):
+        buffer_size = max(1, int(buffer_size))
+        with self._lock:
+            if buffer_size != self._operations.maxlen:
+                self._operations = deque(self._operations, maxlen=buffer_size)
+
+    def begin(self, name: str, **args) -> Optional[Operation]:
+        """Inizia un'operazione (None se il tracing è spento)"""
+        if not self.enabled:
+            return None
+        return Operation(name, args)
+
+    def finish(self, operation: Optional[Operation], status: str = 'OK'):
+        """Conclude un'operazione e la mette nel ring buffer"""
+        if operation is None or operation.finished:
+            return
+
+        operation.end = time.perf_counter()
+        if operation._step is not None:
+            operation._step.end = operation.end
+            operation._step = None
+        operation.status = status
+
+        with self._lock:
+            self._operations.append(operation)
+
+    def activate(self, operation: Optional[Operation]) -> _Activation:
+        """Context manager: gli span del thread corrente finiscono in 'operation'"""
+        return _Activation(operation)
+
+    def span(self, name: str, **args):
+        """Context manager che misura un blocco (vuoto se il tracing è spento)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, args or None)
+
+    def get_operations(self) -> List[Operation]:
+        """Operazioni concluse, dalla più recente"""
+        with self._lock:
+            return list(reversed(self._operations))
+
+    def clear(self):
+        with self._lock:
+            self._operations.clear()
+
+    def to_chrome_trace(self, operations: Optional[List[Operation]] = None) -> Dict[str, Any]:
+        """
+        Operazioni nel formato Trace Event di Chrome (chrome://tracing, Perfetto)
+
+        Ogni operazione è un processo, ogni thread una riga; gli span sono
+        eventi completi ('X') con timestamp in microsecondi
+        """
+        operations = operations if operations is not None else list(reversed(self.get_operations()))
+        events = []
+
+        for pid, operation in enumerate(operations, start=1):
+            label = operation.name
+            if operation.args:
+                label += " " + ", ".join(f"{key}={value}" for key, value in operation.args.items())
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                           'args': {'name': label}})
+
+            thread_ids: Dict[str, int] = {}
+            for span in operation.spans:
+                tid = thread_ids.setdefault(span.thread, len(thread_ids) + 1)
+                event = {
+                    'name': span.name,
+                    'cat': operation.name,
+                    'ph': 'X',
+                    'pid': pid,
+                    'tid': tid,
+                    'ts': round((span.start - self._epoch) * 1e6, 3),
+                    'dur': round((span.end - span.start) * 1e6, 3),
+                }
+                if span.args:
+                    event['args'] = {key: str(value) for key, value in span.args.items()}
+                events.append(event)
+
+            for thread_name, tid in thread_ids.items():
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                               'args': {'name': thread_name}})
+
+            end = operation.end if operation.end is not None else time.perf_counter()
+            events.append({
+                'name': operation.name,
+                'cat': 'operation',
+                'ph': 'X',
+                'pid': pid,
+                'tid': 0,
+                'ts': round((operation.start - self._epoch) * 1e6, 3),
+                'dur': round((end - operation.start) * 1e6, 3),
+                'args': {'status': operation.status},
+            })
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, filepath: str, operations: Optional[List[Operation]] = None) -> bool:
+        """Scrive le operazioni in un file JSON per chrome://tracing"""
+        try:
+            directory = os.path.dirname(os.path.abspath(filepath))
+            os.makedirs(directory, exist_ok=True)
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(self.to_chrome_trace(operations), f)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"OpenShelf: Cannot export trace to {filepath}: {e}")
+            return False
+
+
+# Istanza globale
+_global_tracer = Tracer()
+
+def get_tracer() -> Tracer:
+    """Ottiene l'istanza globale del tracer"""
+    return _global_tracer
+
+
+def span(name: str, **args):
+    """
+    Misura un blocco nell'operazione attiva del thread:
+
+        with span("download", url=url):
+            ...
+    """
+    if not _global_tracer.enabled:
+        return _NULL_SPAN
+    return _ActiveSpan(_global_tracer, name, args or None)
+
+
+def traced(name: Optional[str] = None):
+    """Decoratore: esegue la funzione dentro uno span (nome della funzione se omesso)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _global_tracer.enabled:
+                return func(*args, **kwargs)
+            with _ActiveSpan(_global_tracer, span_name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def configure_from_preferences(prefs):
+    """Applica le preferenze dell'addon (trace_enabled, trace_buffer_size)"""
+    if prefs is None:
+        return
+    _global_tracer.set_buffer_size(getattr(prefs, 'trace_buffer_size', DEFAULT_TRACE_BUFFER_SIZE))
+    _global_tracer.set_enabled(getattr(prefs, 'trace_enabled', False))
@@ -8,6 +8,8 @@ import bpy
 import time
 from typing import Optional, Callable, Dict, Any
 from dataclasses import dataclass
+from .redraw_scheduler import request_redraw, FRAME_BUDGET, IDLE_INTERVAL
+from .progress_channel import get_progress_channel, KIND_DOWNLOAD, KIND_SEARCH
 
 
 @dataclass
@@ -38,13 +40,13 @@ class UIState:
 class ResponsiveTimer:
     """Timer responsivo per operazioni modal non-bloccanti"""
     
-    def __init__(self, context, timer_interval: float = 0.02):
+    def __init__(self, context, timer_interval: float = 0.05):
         """
         Inizializza timer responsivo
         
         Args:
             context: Blender context
-            timer_interval: Intervallo timer in secondi (default 50 FPS)
+            timer_interval: Intervallo timer in secondi (default 20 FPS, come FRAME_BUDGET)
         """
         self.context = context
         self.timer_interval = timer_interval
@@ -52,6 +54,7 @@ class ResponsiveTimer:
         self.ui_state = UIState()
         self.ui_update_interval = 0.05  # 20 FPS per UI updates
         self.last_ui_update = 0.0
+        self._last_ui_values = None
         
         # Callbacks
         self.step_callback: Optional[Callable] = None
@@ -167,6 +170,12 @@ class ResponsiveTimer:
         try:
             scene = self.context.scene
             
+            # Niente scritture né redraw se i valori mostrati non cambiano
+            values = (int(self.ui_state.progress), self.ui_state.status_message, self.ui_state.is_active)
+            if values == self._last_ui_values:
+                return
+            self._last_ui_values = values
+            
             # Aggiorna proprietà scene per progress panel
             if hasattr(scene, 'openshelf_download_progress'):
                 scene.openshelf_download_progress = int(self.ui_state.progress)
@@ -184,23 +193,9 @@ class ResponsiveTimer:
             print(f"ResponsiveTimer: UI update error: {e}")
     
     def force_ui_redraw(self):
-        """Force redraw ottimizzato dell'UI"""
+        """Redraw della sidebar tramite lo scheduler condiviso (coalescing tra operazioni)"""
         try:
-            # Update window manager
-            if hasattr(self.context, 'window_manager'):
-                self.context.window_manager.update_tag()
-            
-            # Update solo aree 3D (dove sono i nostri pannelli)
-            if hasattr(self.context, 'screen') and hasattr(self.context.screen, 'areas'):
-                for area in self.context.screen.areas:
-                    if area.type == 'VIEW_3D':
-                        area.tag_redraw()
-                        # Update regione UI specifica
-                        for region in area.regions:
-                            if region.type == 'UI':
-                                region.tag_redraw()
-                                break
-        
+            request_redraw()
         except Exception as e:
             print(f"ResponsiveTimer: Force redraw error: {e}")
     
@@ -228,7 +223,7 @@ class ModalOperatorMixin:
                              progress_callback: Optional[Callable] = None,
                              complete_callback: Optional[Callable] = None,
                              error_callback: Optional[Callable] = None,
-                             timer_interval: float = 0.02) -> bool:
+                             timer_interval: float = 0.05) -> bool:
         """Avvia timer responsivo"""
         self._responsive_timer = ResponsiveTimer(context, timer_interval)
         
@@ -325,6 +320,19 @@ class UIStateManager:
         self.global_ui_state.status_message = latest_state.status_message
         self.global_ui_state.last_update = time.time()
     
+    def sync_from_snapshots(self, snapshots):
+        """Ricostruisce le operazioni attive dagli snapshot del ProgressChannel"""
+        self.active_operations = {
+            snapshot.operation_id: UIState(
+                is_active=True,
+                progress=max(0.0, snapshot.progress),
+                status_message=snapshot.message,
+                last_update=snapshot.timestamp,
+            )
+            for snapshot in snapshots if snapshot.active
+        }
+        self._update_global_state()
+    
     def get_global_state(self) -> UIState:
         """Restituisce stato globale"""
         return self.global_ui_state
@@ -345,6 +353,125 @@ def get_ui_state_manager() -> UIStateManager:
     return UIStateManager()
 
 
+def _set_if_changed(scene, name: str, value):
+    """Scrive una proprietà della scena solo se cambia (niente update RNA inutili)"""
+    if hasattr(scene, name) and getattr(scene, name) != value:
+        setattr(scene, name, value)
+
+
+class ProgressPump:
+    """
+    Unico punto in cui il progresso dei thread di lavoro arriva alla scena:
+    un timer nel main thread applica l'ultimo snapshot di ogni operazione
+    del ProgressChannel e consegna gli eventi ai gestori registrati
+    """
+    
+    def __init__(self, frame_budget: float = FRAME_BUDGET, idle_interval: float = IDLE_INTERVAL):
+        self.frame_budget = frame_budget
+        self.idle_interval = idle_interval
+        self._applied_seq = 0
+        self._interval = frame_budget
+        self._enabled = False
+        # bpy.app.timers identifica le funzioni per oggetto: serve sempre lo stesso bound method
+        self._timer_func = self._tick
+    
+    def start(self):
+        """Avvia il timer (registrazione dell'addon)"""
+        self._enabled = True
+        self._interval = self.idle_interval
+        self.wake()
+    
+    def stop(self):
+        """Ferma il timer"""
+        self._enabled = False
+        if bpy.app.timers.is_registered(self._timer_func):
+            bpy.app.timers.unregister(self._timer_func)
+    
+    def wake(self):
+        """Riporta il timer al frame budget (chiamare dal main thread dopo aver avviato un worker)"""
+        if not self._enabled or self._interval <= self.frame_budget:
+            return
+        if bpy.app.timers.is_registered(self._timer_func):
+            bpy.app.timers.unregister(self._timer_func)
+        self._interval = self.frame_budget
+        bpy.app.timers.register(self._timer_func, first_interval=0.0, persistent=True)
+    
+    def _tick(self):
+        if not self._enabled:
+            return None
+        
+        try:
+            changed = self.pump()
+        except Exception as e:
+            print(f"OpenShelf: Progress pump error: {e}")
+            changed = False
+        
+        # Senza novità il timer rallenta fino all'intervallo di riposo
+        self._interval = self.frame_budget if changed else min(self.idle_interval, self._interval * 2)
+        return self._interval
+    
+    def pump(self) -> bool:
+        """Applica snapshot nuovi ed eventi; True se qualcosa è cambiato"""
+        channel = get_progress_channel()
+        snapshots = list(channel.snapshots().values())
+        fresh = [snapshot for snapshot in snapshots if snapshot.seq > self._applied_seq]
+        events = channel.drain_events()
+        
+        if not fresh and not events:
+            return False
+        
+        if fresh:
+            self._apply_snapshots(bpy.context.scene, snapshots)
+            get_ui_state_manager().sync_from_snapshots(snapshots)
+            self._applied_seq = max(snapshot.seq for snapshot in fresh)
+            
+            # Le operazioni concluse restano in scena solo con il loro ultimo messaggio
+            for snapshot in snapshots:
+                if not snapshot.active:
+                    channel.discard(snapshot)
+        
+        # Eventi dopo gli snapshot: i gestori possono sovrascrivere il messaggio finale
+        for name, payload in events:
+            try:
+                channel.dispatch(name, payload)
+            except Exception as e:
+                print(f"OpenShelf: Error handling progress event '{name}': {e}")
+        
+        request_redraw()
+        return True
+    
+    def _apply_snapshots(self, scene, snapshots):
+        """Stato combinato: messaggio dell'operazione più recente, flag da tutte le attive"""
+        latest = max(snapshots, key=lambda snapshot: snapshot.seq)
+        _set_if_changed(scene, 'openshelf_status_message', latest.message)
+        
+        searches = [snapshot for snapshot in snapshots if snapshot.kind == KIND_SEARCH]
+        if searches:
+            _set_if_changed(scene, 'openshelf_is_searching', any(snapshot.active for snapshot in searches))
+        
+        downloads = [snapshot for snapshot in snapshots if snapshot.kind == KIND_DOWNLOAD]
+        if downloads:
+            active = [snapshot for snapshot in downloads if snapshot.active]
+            _set_if_changed(scene, 'openshelf_is_downloading', bool(active))
+            if active:
+                current = max(active, key=lambda snapshot: snapshot.seq)
+                if current.progress >= 0:
+                    _set_if_changed(scene, 'openshelf_download_progress', int(current.progress))
+            else:
+                _set_if_changed(scene, 'openshelf_download_progress', 0)
+
+
+_progress_pump = None
+
+
+def get_progress_pump() -> ProgressPump:
+    """Restituisce il pump globale del progresso"""
+    global _progress_pump
+    if _progress_pump is None:
+        _progress_pump = ProgressPump()
+    return _progress_pump
+
+
 # Utility functions
 def safe_ui_update(context, force_redraw: bool = True):
     """Aggiornamento UI sicuro"""
@@ -352,10 +479,8 @@ def safe_ui_update(context, force_redraw: bool = True):
         if hasattr(context, 'window_manager'):
             context.window_manager.update_tag()
         
-        if force_redraw and hasattr(context, 'screen'):
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
+        if force_redraw:
+            request_redraw()
                     
     except Exception as e:
         print(f"Safe UI update error: {e}")